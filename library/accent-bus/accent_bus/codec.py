@@ -0,0 +1,172 @@
+# accent_bus/codec.py
+# Copyright 2025 Accent Communications
+
+"""Message body codecs.
+
+Bodies are always bytes. The JSON codec uses ``orjson`` when it is installed
+and falls back to the standard library otherwise, producing the same
+documents. Values JSON cannot represent natively (datetimes, UUIDs, decimals,
+enums, sets) are converted to strings or lists; ``bytes`` values are wrapped
+as ``{"$binary": "<base64>"}`` and restored on decoding.
+"""
+
+from __future__ import annotations
+
+import base64
+import datetime
+import decimal
+import enum
+import json
+import uuid
+from typing import Any, Protocol
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+BINARY_KEY = "$binary"
+
+
+class Codec(Protocol):
+    """Protocol for message body codecs."""
+
+    content_type: str
+
+    def encode(self, payload: Any) -> bytes:
+        """Serialize a payload to a message body."""
+        ...
+
+    def decode(self, body: bytes) -> Any:
+        """Deserialize a message body."""
+        ...
+
+
+def _default(value: Any) -> Any:
+    """Convert values unsupported by JSON.
+
+    Args:
+        value: The value to convert.
+
+    Returns:
+        A JSON-serializable value.
+
+    Raises:
+        TypeError: If the value cannot be converted.
+
+    """
+    if isinstance(value, bytes | bytearray | memoryview):
+        return {BINARY_KEY: base64.b64encode(bytes(value)).decode("ascii")}
+    if isinstance(value, datetime.datetime | datetime.date | datetime.time):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID | decimal.Decimal):
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, set | frozenset | tuple):
+        return list(value)
+    msg = f"Object of type {type(value).__name__} is not JSON serializable"
+    raise TypeError(msg)
+
+
+def _restore_binary(value: Any) -> Any:
+    """Restore the ``bytes`` values wrapped on encoding.
+
+    Args:
+        value: A decoded JSON value.
+
+    Returns:
+        The value with its binary markers replaced by bytes.
+
+    """
+    if isinstance(value, dict):
+        if len(value) == 1 and isinstance(value.get(BINARY_KEY), str):
+            return base64.b64decode(value[BINARY_KEY])
+        return {key: _restore_binary(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_restore_binary(item) for item in value]
+    return value
+
+
+class JsonCodec:
+    """JSON codec, backed by orjson when available."""
+
+    content_type = "application/json"
+
+    def __init__(self, use_orjson: bool | None = None) -> None:
+        """Initialize the codec.
+
+        Args:
+            use_orjson: Force or disable orjson, defaults to using it when
+                installed.
+
+        Raises:
+            RuntimeError: If orjson is requested but not installed.
+
+        """
+        if use_orjson is None:
+            use_orjson = orjson is not None
+        elif use_orjson and orjson is None:
+            msg = "orjson is not installed"
+            raise RuntimeError(msg)
+        self.use_orjson = use_orjson
+
+    def encode(self, payload: Any) -> bytes:
+        """Serialize a payload to JSON.
+
+        Args:
+            payload: The payload.
+
+        Returns:
+            bytes: The UTF-8 encoded JSON document.
+
+        """
+        if self.use_orjson:
+            # orjson natively serializes datetimes, UUIDs and enums, the
+            # passthrough keeps the stdlib representation of datetimes
+            return orjson.dumps(
+                payload,
+                default=_default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+            )
+        return json.dumps(
+            payload, default=_default, separators=(",", ":"), ensure_ascii=False
+        ).encode()
+
+    def decode(self, body: bytes | str) -> Any:
+        """Deserialize a JSON document.
+
+        Args:
+            body: The message body.
+
+        Returns:
+            The decoded payload.
+
+        """
+        if isinstance(body, str):
+            body = body.encode()
+        payload = orjson.loads(body) if self.use_orjson else json.loads(body)
+        if BINARY_KEY.encode() in body:
+            return _restore_binary(payload)
+        return payload
+
+
+def encode_body(codec: Codec, payload: Any) -> bytes:
+    """Build a message body from a marshaled payload.
+
+    Payloads already serialized by a mixin (e.g. collectd lines) are sent as
+    is, anything else goes through the codec.
+
+    Args:
+        codec: The codec of structured payloads.
+        payload: The marshaled payload.
+
+    Returns:
+        bytes: The message body.
+
+    """
+    if isinstance(payload, bytes):
+        return payload
+    if isinstance(payload, str):
+        return payload.encode()
+    return codec.encode(payload)
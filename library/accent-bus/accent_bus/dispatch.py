@@ -0,0 +1,388 @@
+# accent_bus/dispatch.py
+# Copyright 2025 Accent Communications
+
+"""Concurrent dispatch of consumed events to their handlers.
+
+Every subscribed handler gets its own bounded queue and pool of workers, so
+a slow handler only delays its own events. Handlers run concurrently, at
+most ``max_concurrency`` events at a time, unless they are declared
+``ordered``: those get a single worker and see the events in the order they
+were received. Each handler call can be bounded by a timeout.
+
+`Dispatcher.dispatch` returns a future done once every handler has been
+called with the event, so the consumer acknowledges a message only after its
+handlers ran: events still queued when the dispatcher stops are cancelled
+and delivered again by the broker.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, replace
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+OPTIONS_ATTRIBUTE = "__dispatch_options__"
+
+
+@dataclass(frozen=True)
+class DispatchOptions:
+    """How events are dispatched to a handler."""
+
+    ordered: bool = False
+    max_concurrency: int = 10
+    timeout: float | None = None
+    max_queue_size: int = 1000
+
+    def merge(self, **overrides: Any) -> DispatchOptions:
+        """Return options with the given values replaced, ignoring Nones.
+
+        Args:
+            **overrides: Option values.
+
+        Returns:
+            DispatchOptions: The merged options.
+
+        """
+        values = {key: value for key, value in overrides.items() if value is not None}
+        return replace(self, **values) if values else self
+
+
+def dispatch_options(
+    ordered: bool | None = None,
+    max_concurrency: int | None = None,
+    timeout: float | None = None,
+    max_queue_size: int | None = None,
+) -> Callable[[Callable], Callable]:
+    """Declare the dispatch options of a handler.
+
+    Example:
+        @dispatch_options(ordered=True)
+        async def on_user_edited(event): ...
+
+    Args:
+        ordered: Whether the handler needs the events in order.
+        max_concurrency: Maximum number of concurrent calls.
+        timeout: Maximum duration of a call, in seconds.
+        max_queue_size: Maximum number of events waiting for the handler.
+
+    Returns:
+        A decorator storing the options on the handler.
+
+    """
+    overrides = {
+        "ordered": ordered,
+        "max_concurrency": max_concurrency,
+        "timeout": timeout,
+        "max_queue_size": max_queue_size,
+    }
+
+    def decorator(handler: Callable) -> Callable:
+        setattr(handler, OPTIONS_ATTRIBUTE, overrides)
+        return handler
+
+    return decorator
+
+
+@dataclass
+class HandlerStats:
+    """Counters of a handler."""
+
+    calls: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+
+    def record(self, latency: float) -> None:
+        """Record the duration of a call.
+
+        Args:
+            latency: Duration of the call, in seconds.
+
+        """
+        self.calls += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+
+    def todict(self) -> dict[str, float]:
+        """Convert the counters to a dictionary.
+
+        Returns:
+            dict[str, float]: The counters, with the average latency.
+
+        """
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "avg_latency": self.total_latency / self.calls if self.calls else 0.0,
+            "max_latency": self.max_latency,
+        }
+
+
+def _handler_name(handler: Callable) -> str:
+    return getattr(handler, "__qualname__", None) or repr(handler)
+
+
+def _all_done(futures: list[asyncio.Future]) -> asyncio.Future:
+    """Return a future done once all the futures are, cancelled if one is."""
+    result = asyncio.get_running_loop().create_future()
+    remaining = len(futures)
+
+    def on_done(future: asyncio.Future) -> None:
+        nonlocal remaining
+        remaining -= 1
+        if result.done():
+            return
+        if future.cancelled():
+            result.cancel()
+        elif not remaining:
+            result.set_result(None)
+
+    if not futures:
+        result.set_result(None)
+    for future in futures:
+        future.add_done_callback(on_done)
+    return result
+
+
+class HandlerRunner:
+    """Queue and workers of one handler of one event."""
+
+    def __init__(
+        self, event_name: str, handler: Callable, options: DispatchOptions
+    ) -> None:
+        """Initialize the runner.
+
+        Args:
+            event_name: The event the handler is subscribed to.
+            handler: The handler, sync or async, called with the payload.
+            options: The dispatch options.
+
+        """
+        self.event_name = event_name
+        self.handler = handler
+        self.options = options
+        self.stats = HandlerStats()
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=options.max_queue_size)
+        self._workers: list[asyncio.Task] = []
+
+    @property
+    def concurrency(self) -> int:
+        """Number of workers of the handler."""
+        return 1 if self.options.ordered else max(1, self.options.max_concurrency)
+
+    async def submit(self, payload: Any) -> asyncio.Future:
+        """Queue an event, waiting when the queue of the handler is full.
+
+        Args:
+            payload: The event payload.
+
+        Returns:
+            asyncio.Future: Done once the handler was called, failed or not,
+            cancelled if the runner is closed first.
+
+        """
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._work()) for _ in range(self.concurrency)
+            ]
+        handled = asyncio.get_running_loop().create_future()
+        await self._queue.put((payload, handled))
+        self.stats.queue_depth = self._queue.qsize()
+        self.stats.max_queue_depth = max(
+            self.stats.max_queue_depth, self.stats.queue_depth
+        )
+        return handled
+
+    async def join(self) -> None:
+        """Wait until every queued event is handled."""
+        await self._queue.join()
+
+    async def close(self) -> None:
+        """Stop the workers, cancelling the queued events."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        while not self._queue.empty():
+            _, handled = self._queue.get_nowait()
+            handled.cancel()
+            self._queue.task_done()
+        self.stats.queue_depth = 0
+
+    async def _work(self) -> None:
+        while True:
+            payload, handled = await self._queue.get()
+            self.stats.queue_depth = self._queue.qsize()
+            try:
+                await self._call(payload)
+            except asyncio.CancelledError:
+                handled.cancel()
+                raise
+            else:
+                if not handled.done():
+                    handled.set_result(None)
+            finally:
+                self._queue.task_done()
+
+    async def _call(self, payload: Any) -> None:
+        start = time.monotonic()
+        try:
+            result = self.handler(payload)
+            if inspect.isawaitable(result):
+                await asyncio.wait_for(result, self.options.timeout)
+        except TimeoutError:
+            self.stats.timeouts += 1
+            logger.error(
+                "Handler '%s' for event '%s' timed out after %ss",
+                _handler_name(self.handler),
+                self.event_name,
+                self.options.timeout,
+            )
+        except Exception:
+            self.stats.failures += 1
+            logger.exception(
+                "Handler '%s' for event '%s' failed",
+                _handler_name(self.handler),
+                self.event_name,
+            )
+        finally:
+            self.stats.record(time.monotonic() - start)
+
+
+class Dispatcher:
+    """Dispatch events to the runners of their handlers."""
+
+    def __init__(self, default_options: DispatchOptions | None = None) -> None:
+        """Initialize the dispatcher.
+
+        Args:
+            default_options: Options of handlers not declaring their own.
+
+        """
+        self.default_options = default_options or DispatchOptions()
+        self._runners: dict[str, list[HandlerRunner]] = {}
+
+    def register(
+        self, event_name: str, handler: Callable, **overrides: Any
+    ) -> HandlerRunner:
+        """Register a handler.
+
+        Options are, by priority, the overrides, the options declared with
+        `dispatch_options` and the default options.
+
+        Args:
+            event_name: The event name.
+            handler: The handler.
+            **overrides: Dispatch options of this subscription.
+
+        Returns:
+            HandlerRunner: The runner of the handler.
+
+        """
+        declared = getattr(handler, OPTIONS_ATTRIBUTE, {})
+        options = self.default_options.merge(**declared).merge(**overrides)
+        runner = HandlerRunner(event_name, handler, options)
+        self._runners.setdefault(event_name, []).append(runner)
+        return runner
+
+    async def unregister(self, event_name: str, handler: Callable) -> bool:
+        """Unregister a handler, after its queued events are handled.
+
+        Args:
+            event_name: The event name.
+            handler: The handler.
+
+        Returns:
+            bool: True if the handler was registered.
+
+        """
+        runners = self._runners.get(event_name, [])
+        for runner in runners:
+            if runner.handler == handler:
+                runners.remove(runner)
+                if not runners:
+                    self._runners.pop(event_name)
+                await runner.join()
+                await runner.close()
+                return True
+        return False
+
+    def handles(self, event_name: str) -> bool:
+        """Check whether an event has handlers.
+
+        Args:
+            event_name: The event name.
+
+        Returns:
+            bool: True if at least one handler is registered.
+
+        """
+        return bool(self._runners.get(event_name))
+
+    async def dispatch(self, event_name: str, payload: Any) -> asyncio.Future:
+        """Queue an event for each of its handlers.
+
+        Returns once the event is queued, not handled.
+
+        Args:
+            event_name: The event name.
+            payload: The event payload.
+
+        Returns:
+            asyncio.Future: Done once every handler was called with the event,
+            cancelled if a handler was stopped before.
+
+        """
+        handled = [
+            await runner.submit(payload)
+            for runner in list(self._runners.get(event_name, []))
+        ]
+        return _all_done(handled)
+
+    async def drain(self) -> None:
+        """Wait until every queued event is handled."""
+        for runners in list(self._runners.values()):
+            for runner in list(runners):
+                await runner.join()
+
+    async def close(self, timeout: float | None = None) -> None:
+        """Stop every runner, first waiting for the queued events.
+
+        Args:
+            timeout: Maximum time to wait for the queued events, in seconds.
+
+        """
+        try:
+            await asyncio.wait_for(self.drain(), timeout)
+        except TimeoutError:
+            logger.warning("Stopping dispatcher with unhandled events")
+        for runners in self._runners.values():
+            for runner in runners:
+                await runner.close()
+
+    def stats(self) -> dict[str, dict[str, dict[str, float]]]:
+        """Get the counters of every handler.
+
+        Returns:
+            Counters by event name and handler name.
+
+        """
+        return {
+            event_name: {
+                _handler_name(runner.handler): runner.stats.todict()
+                for runner in runners
+            }
+            for event_name, runners in self._runners.items()
+        }
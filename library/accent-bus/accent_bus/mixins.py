@@ -14,8 +14,8 @@ from datetime import datetime
 from types import TracebackType  # Import TracebackType
 from typing import Any, ClassVar, NamedTuple, Protocol, Self, TypedDict
 
-import aiopika
-from aiopika import (
+import aio_pika
+from aio_pika import (
     Channel,
     Connection,
     ExchangeType,
@@ -23,10 +23,13 @@ from aiopika import (
     RobustExchange,
     RobustQueue,
 )
-from aiopika.abc import AbstractRobustConnection
+from aio_pika.abc import AbstractRobustConnection
 
 from .base import BaseProtocol
+from .codec import Codec, JsonCodec
 from .collectd.common import CollectdEvent
+from .dispatch import Dispatcher, DispatchOptions
+from .publishing import BatchPublisher, ExchangeTransport
 from .resources.common.abstract import EventProtocol
 
 
@@ -55,8 +58,8 @@ class Subscription(NamedTuple):
     """Event Subscription."""
 
     handler: EventHandlerType
-    # Removed binding for asyncio
-    # binding: Binding
+    routing_key: str | None
+    headers: dict | None
 
 
 class ThreadableProtocol(Protocol):
@@ -110,19 +113,40 @@ class ConsumerMixin(BaseProtocol):
         * `consumer_connected`: Returns whether the consumer is connected to RabbitMQ.
         * `subscribe`: Install a handler for the specified event.
         * `unsubscribe`: Uninstall a handler for the specified event.
+        * `handler_stats`: Returns the latency and queue depth of every handler.
+
+    Each handler has its own queue and runs concurrently with the others, see
+    `accent_bus.dispatch`; handlers needing the events in order declare it
+    with `dispatch_options(ordered=True)` or `subscribe(..., ordered=True)`.
+    A message is acknowledged once all its handlers were called, failed or
+    not, so up to `prefetch_count` messages are handled at once and those
+    not handled when the consumer stops are delivered again.
     """
 
-    consumer_args: ClassVar[dict] = {}
+    consumer_args: ClassVar[dict] = {
+        "handler_concurrency": 10,
+        "handler_timeout": None,
+        "handler_queue_size": 1000,
+        "drain_timeout": 10,
+        "prefetch_count": 100,
+    }
 
-    def __init__(self, subscribe: SubscribeExchangeDict | None = None, **kwargs: Any) -> None:
+    def __init__(
+        self,
+        subscribe: SubscribeExchangeDict | None = None,
+        codec: Codec | None = None,
+        **kwargs: Any,
+    ) -> None:
         """Initialize the ConsumerMixin.
 
         Args:
             subscribe (SubscribeExchangeDict | None): Subscription details.
+            codec (Codec | None): Codec of message bodies, defaults to JSON.
             **kwargs: Additional keyword arguments.
 
         """
         super().__init__(**kwargs)
+        self._codec: Codec = codec or JsonCodec()
         name = f"{self._name}.{os.urandom(3).hex()}"
         if subscribe:
             exchange_name = subscribe["exchange_name"]
@@ -138,8 +162,17 @@ class ConsumerMixin(BaseProtocol):
         self.__exchange: RobustExchange | None = None
 
         self.__subscriptions: defaultdict[str, list[Subscription]] = defaultdict(list)
+        self.__dispatcher = Dispatcher(
+            DispatchOptions(
+                max_concurrency=self.consumer_args["handler_concurrency"],
+                timeout=self.consumer_args["handler_timeout"],
+                max_queue_size=self.consumer_args["handler_queue_size"],
+            )
+        )
         self.__queue_name: str = name
         self.__queue: RobustQueue | None = None
+        self.__consumer_tag: str | None = None
+        self.__in_flight: set[asyncio.Task] = set()
         self.log.debug("setting consuming exchange as '%s'", self.__exchange_name)
 
 
@@ -223,13 +256,13 @@ class ConsumerMixin(BaseProtocol):
                 await queue.unbind(exchange, routing_key=routing_key)
             else:
                 await queue.unbind(exchange, arguments=headers)
-        except aiopika.exceptions.ChannelInvalidStateError: # pragma: no cover - defensive
+        except aio_pika.exceptions.ChannelInvalidStateError: # pragma: no cover - defensive
             self.log.warning("Attempted to unbind from an exchange on a closed channel.")
 
 
     async def __dispatch(
         self, event_name: str, payload: dict, headers: dict | None = None
-    ) -> None:
+    ) -> asyncio.Future:
         """Dispatch an event to its handlers.
 
         Args:
@@ -237,26 +270,20 @@ class ConsumerMixin(BaseProtocol):
             payload (dict): The event payload.
             headers (dict | None): The event headers.
 
+        Returns:
+            asyncio.Future: Done once every handler was called.
+
         """
-        # NOTE:  Locking is not necessary in asyncio as it's single-threaded.
-        subscriptions = self.__subscriptions[event_name].copy()
-        if subscriptions:
+        # Handlers run in their own workers, a slow handler does not delay
+        # the others nor the next messages
+        if self.__dispatcher.handles(event_name):
             self.log.debug(
                 "Received bus event: name=%s, headers=%s, payload=%s",
                 event_name,
                 headers,
                 payload,
             )
-        for handler, _ in subscriptions:
-            try:
-                await handler(payload)  # Execute handler in the event loop
-            except Exception:
-                self.log.exception(
-                    "Handler '%s' for event '%s' failed",
-                    getattr(handler, "__name__", handler),
-                    event_name,
-                )
-
+        return await self.__dispatcher.dispatch(event_name, payload)
 
     def __extract_event_from_message(self, message: Message) -> tuple[str, dict, dict]:
         """Extract event information from a message.
@@ -275,7 +302,13 @@ class ConsumerMixin(BaseProtocol):
         headers = message.headers
         payload = message.body
 
-        if isinstance(payload, bytes):
+        if message.content_type == self._codec.content_type:
+            try:
+                payload = self._codec.decode(message.body)
+            except ValueError:
+                msg = "Received invalid message; payload could not be decoded."
+                raise ValueError(msg)  # pragma: no cover - defensive
+        elif isinstance(payload, bytes):
             try:
                 payload = message.body.decode()
             except UnicodeDecodeError:
@@ -300,6 +333,9 @@ class ConsumerMixin(BaseProtocol):
         headers: dict | None = None,
         routing_key: str | None = None,
         headers_match_all: bool = True,
+        ordered: bool | None = None,
+        max_concurrency: int | None = None,
+        timeout: float | None = None,
     ) -> None:
         """Subscribe a handler to an event.
 
@@ -309,6 +345,10 @@ class ConsumerMixin(BaseProtocol):
             headers (dict | None): Optional headers.
             routing_key (str | None): Optional routing key.
             headers_match_all (bool): Whether all headers must match.
+            ordered (bool | None): Whether the handler needs the events in
+                order, overriding the options declared on the handler.
+            max_concurrency (int | None): Maximum number of concurrent calls.
+            timeout (float | None): Maximum duration of a call, in seconds.
 
         """
         headers = dict(headers or {})
@@ -319,8 +359,15 @@ class ConsumerMixin(BaseProtocol):
 
         await self.__create_binding(headers, routing_key)
 
-        subscription = Subscription(handler, None) # Remove binding
+        subscription = Subscription(handler, routing_key, headers)
         self.__subscriptions[event_name].append(subscription)
+        self.__dispatcher.register(
+            event_name,
+            handler,
+            ordered=ordered,
+            max_concurrency=max_concurrency,
+            timeout=timeout,
+        )
         self.log.debug(
             "Registered handler '%s' to event '%s'",
             getattr(handler, "__name__", handler),
@@ -343,8 +390,10 @@ class ConsumerMixin(BaseProtocol):
         for subscription in subscriptions:
             if subscription.handler == handler:
                 self.__subscriptions[event_name].remove(subscription)
-                # await self.__remove_binding(routing_key=subscription.binding, headers=subscription.binding.arguments) # type: ignore[attr-defined]
-                await self.__remove_binding(routing_key=routing_key, headers=headers) # Remove the binding
+                await self.__dispatcher.unregister(event_name, handler)
+                await self.__remove_binding(
+                    routing_key=subscription.routing_key, headers=subscription.headers
+                )
                 self.log.debug(
                     "Unregistered handler '%s' from '%s'",
                     getattr(handler, "__name__", handler),
@@ -362,34 +411,67 @@ class ConsumerMixin(BaseProtocol):
 
     async def connect(self) -> None:
         """Connects to the AMQP broker."""
-        self.__connection = await aiopika.connect_robust(self.url)
+        self.__connection = await aio_pika.connect_robust(self.url)
         self.__channel = await self.__connection.channel()
-        await self.__channel.set_qos(prefetch_count=1) # Fair dispatch of messages.
+        # Messages are acknowledged once handled, the prefetch bounds the
+        # number of messages handled at once
+        await self.__channel.set_qos(
+            prefetch_count=self.consumer_args["prefetch_count"]
+        )
         exchange = await self._get_exchange()
         queue = await self._get_queue()
 
         # Declaring queue
         await queue.bind(exchange)  # Bind to the default exchange.
-        await queue.consume(self.__on_message_received)
+        self.__consumer_tag = await queue.consume(self.__on_message_received)
 
 
     async def __on_message_received(self, message: Message) -> None:
         """Handle received messages.
 
+        The message is acknowledged after its handlers were called. If the
+        handlers are stopped first, the message is requeued. `close` waits
+        for the messages being handled before closing the channel.
+
+        Args:
+            message (Message): The received message.
+
+        """
+        task = asyncio.current_task()
+        self.__in_flight.add(task)
+        try:
+            await self.__process_message(message)
+        finally:
+            self.__in_flight.discard(task)
+
+    async def __process_message(self, message: Message) -> None:
+        """Dispatch a message to its handlers and acknowledge it.
+
         Args:
             message (Message): The received message.
 
         """
-        async with message.process():
+        async with message.process(ignore_processed=True):
             event_name, headers, payload = self.__extract_event_from_message(message)
-            if event_name not in self.__subscriptions:
+            if not self.__dispatcher.handles(event_name):
                 return
             try:
                 headers, payload = self._unmarshal(event_name, headers, payload)
             except Exception:
                 raise
             else:
-                await self.__dispatch(event_name, payload, headers)
+                handled = await self.__dispatch(event_name, payload, headers)
+            try:
+                await handled
+            except asyncio.CancelledError:
+                try:
+                    await message.nack(requeue=True)
+                except aio_pika.exceptions.ChannelInvalidStateError:
+                    # The broker requeues the unacknowledged messages of a
+                    # closed channel
+                    pass
+                if asyncio.current_task().cancelling():
+                    raise
 
     async def on_connection_error(self, exc: Exception, interval: str) -> None:
         """Handle connection errors.
@@ -407,11 +489,33 @@ class ConsumerMixin(BaseProtocol):
 
 
     async def close(self) -> None:
-        """Closes the connection."""
+        """Stop consuming, let the handlers finish, then close the connection.
+
+        The messages handled before the drain timeout are acknowledged and
+        the others requeued while the channel is still open.
+        """
+        if self.__queue is not None and self.__consumer_tag is not None:
+            try:
+                await self.__queue.cancel(self.__consumer_tag)
+            except aio_pika.exceptions.ChannelInvalidStateError:
+                pass
+            self.__consumer_tag = None
+        await self.__dispatcher.close(timeout=self.consumer_args["drain_timeout"])
+        if self.__in_flight:
+            await asyncio.wait(self.__in_flight)
         if self.__connection:
             await self.__connection.close()
             self.__connection = None
 
+    def handler_stats(self) -> dict[str, dict[str, dict[str, float]]]:
+        """Get the calls, failures, latency and queue depth of every handler.
+
+        Returns:
+            Counters by event name and handler name.
+
+        """
+        return self.__dispatcher.stats()
+
     async def __aenter__(self) -> Self:
         """Asynchronous context manager entry.
 
@@ -450,13 +554,22 @@ class PublisherMixin(BaseProtocol):
 
     publisher_args: ClassVar[dict] = {
         "max_retries": 2,
+        "max_batch_size": 100,
+        "max_batch_delay": 0.005,
+        "max_in_flight": 256,
     }
 
-    def __init__(self, publish: PublishExchangeDict | None = None, **kwargs: Any) -> None:
+    def __init__(
+        self,
+        publish: PublishExchangeDict | None = None,
+        codec: Codec | None = None,
+        **kwargs: Any,
+    ) -> None:
         """Initialize the PublisherMixin.
 
         Args:
             publish (PublishExchangeDict | None): The exchange to publish to.
+            codec (Codec | None): Codec of message bodies, defaults to JSON.
             **kwargs: Additional keyword arguments.
 
         """
@@ -474,6 +587,15 @@ class PublisherMixin(BaseProtocol):
         self.__exchange_name: str = exchange_name
         self.__exchange_type: str = exchange_type
         self.__exchange: RobustExchange | None = None
+        self._codec: Codec = codec or JsonCodec()
+        # One batch publisher per instance, started on the channel by connect()
+        self._batcher = BatchPublisher(
+            codec=self._codec,
+            content_type=getattr(self, "content_type", None),
+            max_batch_size=self.publisher_args["max_batch_size"],
+            max_delay=self.publisher_args["max_batch_delay"],
+            max_in_flight=self.publisher_args["max_in_flight"],
+        )
 
         self.log.debug("setting publishing exchange as '%s'", self.__exchange_name)
 
@@ -508,20 +630,24 @@ class PublisherMixin(BaseProtocol):
     async def Producer(self, connection: Connection) -> AsyncIterator[Callable]:
         """Context manager for publishing messages.
 
+        Messages go through the batch publisher, on the channel opened by
+        `connect`; no channel or publisher is created per message.
+
         Args:
-           connection: aiopika.RobustConnection
+           connection: aio_pika.RobustConnection
         Yields:
-            Callable: publish function.
+            Callable: publish function, returning once the message is confirmed.
 
         """
-        # NOTE:  aiopika does automatic retries, no need for connection.ensure.
-
-        exchange = await self._get_exchange()
+        # NOTE:  aio_pika does automatic retries, no need for connection.ensure.
+        if not self._batcher.running:
+            msg = "Publisher is not connected"
+            raise RuntimeError(msg)
 
         async def publish_func(
             payload: dict, headers: dict | None, routing_key: str | None
         ) -> None:
-            """Publishes a message using the given channel.
+            """Publish a message and wait for its confirm.
 
             Args:
                 payload (dict): The message payload.
@@ -529,13 +655,7 @@ class PublisherMixin(BaseProtocol):
                 routing_key (str): routing_key.
 
             """
-            message = Message(
-                body=str(payload).encode(),
-                headers=headers,
-                content_type=getattr(self, "content_type", None),
-            )
-
-            await exchange.publish(message, routing_key=routing_key or "")
+            await self._batcher.publish(payload, headers, routing_key)
 
         yield publish_func
 
@@ -575,19 +695,20 @@ class PublisherMixin(BaseProtocol):
         self.log.debug("Published %s", str(event))
 
     async def connect(self) -> None:
-        """Connect to the AMQP broker."""
-        self.__connection = await aiopika.connect_robust(self.url)
-        self.__channel = await self.__connection.channel()
-        await self.__channel.set_qos(
-            prefetch_count=1
-        )  # Not really necessary for publishers.
-        await self._get_exchange()
+        """Connect to the AMQP broker and start the batch publisher."""
+        self.__connection = await aio_pika.connect_robust(self.url)
+        self.__channel = await self.__connection.channel(publisher_confirms=True)
+        exchange = await self._get_exchange()
+        await self._batcher.start(ExchangeTransport(exchange))
 
     async def close(self) -> None:
-        """Close the AMQP connection and channel."""
+        """Flush the pending messages, then close the AMQP connection."""
+        await self._batcher.stop()
         if self.__connection:
             await self.__connection.close()
             self.__connection = None
+            self.__channel = None
+            self.__exchange = None
 
     async def __aenter__(self) -> Self:
         """Asynchronous context manager entry.
@@ -625,7 +746,7 @@ class QueuePublisherMixin(PublisherMixin, ThreadableProtocol):
         * `publisher_connected`: Returns publisher's connection state to rabbitmq.
         * `queue_publisher_connected`: Returns threaded publisher's connection state to rabbitmq.
         * `publish`: Publish an event immediately to the bus without queueing.
-        * `publish_soon`: Queue an event to be processed by the publishing thread
+        * `publish_soon`: Queue an event to be sent by the batch publisher
     """
 
     queue_publisher_args: ClassVar[dict] = {
@@ -642,8 +763,6 @@ class QueuePublisherMixin(PublisherMixin, ThreadableProtocol):
 
         """
         super().__init__(**kwargs)
-        self.__queue: asyncio.Queue = asyncio.Queue()
-        self.__connection: AbstractRobustConnection | None = None
 
     async def queue_publisher_connected(self) -> bool:
         """Check if the queue publisher is connected.
@@ -652,25 +771,7 @@ class QueuePublisherMixin(PublisherMixin, ThreadableProtocol):
             bool: True if connected, False otherwise.
 
         """
-        return self.__connection is not None and not self.__connection.is_closed
-
-    async def _process_queue(self) -> None:
-        """Processes messages from the queue."""
-        while True:
-            try:
-                payload, headers, routing_key = await self.__queue.get()
-                async with self.Producer(self.__connection) as publish:  # type: ignore[attr-defined]
-                    await publish(payload, headers=headers, routing_key=routing_key)
-                self.__queue.task_done()
-            except aiopika.exceptions.ChannelInvalidStateError:
-                self.log.error(
-                    "Channel closed while processing the queue"
-                )  # pragma: no cover - defensive
-            except Exception as e:
-                self.log.exception(
-                    "Error while processing the queue: %s", e
-                )  # pragma: no cover - defensive
-            await asyncio.sleep(0)  # Yield control to the event loop
+        return await self.publisher_connected() and self._batcher.running
 
     async def publish_soon(
         self,
@@ -681,6 +782,9 @@ class QueuePublisherMixin(PublisherMixin, ThreadableProtocol):
     ) -> None:
         """Queue an event for publishing.
 
+        The event is added to the batch publisher queue without waiting for
+        its confirm. Events queued before `connect` are sent once connected.
+
         Args:
             event (EventProtocol): event
             headers (dict, optional): headers
@@ -691,20 +795,7 @@ class QueuePublisherMixin(PublisherMixin, ThreadableProtocol):
         headers, payload, routing_key = self._marshal(
             event, headers, payload, routing_key
         )
-        await self.__queue.put((payload, headers, routing_key))
-
-    async def connect(self) -> None:
-        """Connects to the AMQP broker and starts processing queue."""
-        await super().connect()  # Connect using PublisherMixin's connect
-        asyncio.create_task(
-            self._process_queue()
-        )  # Start processing the queue in the background
-
-    async def close(self) -> None:
-        """Close connection."""
-        await super().close()
-        # NOTE:  No need to explicitly stop queue processing.  The background task will exit.
-        #        when the connection is closed due to ChannelInvalidStateError.
+        self._batcher.submit(payload, headers, routing_key)
 
 
 class AccentEventMixin(BaseProtocol):
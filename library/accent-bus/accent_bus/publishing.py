@@ -0,0 +1,330 @@
+# accent_bus/publishing.py
+# Copyright 2025 Accent Communications
+
+"""Batched publishing with publisher confirms.
+
+Messages submitted to a :class:`BatchPublisher` are encoded immediately and
+sent by a single background task, in batches of up to ``max_batch_size``
+messages waiting at most ``max_delay`` seconds for a batch to fill up. The
+broker confirm of each message is awaited concurrently, with at most
+``max_in_flight`` unconfirmed messages, so publishing does not wait for a
+round trip per message.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Protocol
+
+from aio_pika import DeliveryMode, Message
+
+from .codec import Codec, JsonCodec, encode_body
+
+if TYPE_CHECKING:
+    from aio_pika.abc import AbstractExchange
+
+logger = logging.getLogger(__name__)
+
+
+class PublishTransport(Protocol):
+    """Protocol of the channel messages are sent to."""
+
+    async def send(
+        self,
+        body: bytes,
+        headers: dict | None,
+        routing_key: str,
+        content_type: str | None,
+    ) -> None:
+        """Send a message, returning once the broker confirmed it."""
+        ...
+
+
+class ExchangeTransport:
+    """Transport publishing to an aio-pika exchange.
+
+    With a channel opened with ``publisher_confirms=True`` (the aio-pika
+    default), ``exchange.publish`` returns when the broker acknowledged the
+    message.
+    """
+
+    def __init__(self, exchange: AbstractExchange, persistent: bool = False) -> None:
+        """Initialize the transport.
+
+        Args:
+            exchange: The exchange to publish to.
+            persistent: Whether messages are persisted by the broker.
+
+        """
+        self.exchange = exchange
+        self.delivery_mode = (
+            DeliveryMode.PERSISTENT if persistent else DeliveryMode.NOT_PERSISTENT
+        )
+
+    async def send(
+        self,
+        body: bytes,
+        headers: dict | None,
+        routing_key: str,
+        content_type: str | None,
+    ) -> None:
+        """Publish a message and wait for its confirm.
+
+        Args:
+            body: The message body.
+            headers: The message headers.
+            routing_key: The routing key.
+            content_type: The content type of the body.
+
+        """
+        message = Message(
+            body=body,
+            headers=headers,
+            content_type=content_type,
+            delivery_mode=self.delivery_mode,
+        )
+        await self.exchange.publish(message, routing_key=routing_key)
+
+
+@dataclass
+class PublisherStats:
+    """Counters of a batch publisher."""
+
+    submitted: int = 0
+    confirmed: int = 0
+    failed: int = 0
+    batches: int = 0
+
+    def todict(self) -> dict[str, int]:
+        """Convert the counters to a dictionary.
+
+        Returns:
+            dict[str, int]: The counters.
+
+        """
+        return {
+            "submitted": self.submitted,
+            "confirmed": self.confirmed,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
+
+
+def _retrieve_exception(future: asyncio.Future) -> None:
+    if not future.cancelled():
+        future.exception()
+
+
+class _Pending:
+    __slots__ = ("body", "content_type", "future", "headers", "routing_key")
+
+    def __init__(
+        self,
+        body: bytes,
+        headers: dict | None,
+        routing_key: str,
+        content_type: str | None,
+        future: asyncio.Future,
+    ) -> None:
+        self.body = body
+        self.headers = headers
+        self.routing_key = routing_key
+        self.content_type = content_type
+        self.future = future
+
+
+class BatchPublisher:
+    """Publish messages in batches over one transport, tracking confirms."""
+
+    def __init__(
+        self,
+        codec: Codec | None = None,
+        content_type: str | None = None,
+        max_batch_size: int = 100,
+        max_delay: float = 0.005,
+        max_in_flight: int = 256,
+    ) -> None:
+        """Initialize the publisher.
+
+        Args:
+            codec: Codec of structured payloads, defaults to JSON.
+            content_type: Content type of the messages, defaults to the one of
+                the codec.
+            max_batch_size: Maximum number of messages sent per batch.
+            max_delay: Maximum time, in seconds, a message waits for its batch
+                to fill up.
+            max_in_flight: Maximum number of messages awaiting a confirm.
+
+        """
+        self.codec = codec or JsonCodec()
+        self.content_type = content_type or self.codec.content_type
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.max_in_flight = max_in_flight
+        self.stats = PublisherStats()
+
+        self._transport: PublishTransport | None = None
+        self._pending: list[_Pending] = []
+        self._wakeup = asyncio.Event()
+        self._in_flight: set[asyncio.Task] = set()
+        self._window = asyncio.Semaphore(max_in_flight)
+        self._task: asyncio.Task | None = None
+        self._flushing = 0
+
+    @property
+    def running(self) -> bool:
+        """Whether the background task is running."""
+        return self._task is not None and not self._task.done()
+
+    def pending(self) -> int:
+        """Count the messages not yet sent.
+
+        Returns:
+            int: The number of queued messages.
+
+        """
+        return len(self._pending)
+
+    def submit(
+        self, payload: Any, headers: dict | None = None, routing_key: str | None = None
+    ) -> asyncio.Future:
+        """Queue a message.
+
+        The payload is encoded right away, so serialization errors are raised
+        to the caller.
+
+        Args:
+            payload: The marshaled payload.
+            headers: The message headers.
+            routing_key: The routing key.
+
+        Returns:
+            asyncio.Future: Resolved when the broker confirmed the message.
+
+        """
+        body = encode_body(self.codec, payload)
+        future = asyncio.get_running_loop().create_future()
+        # Failures are logged, callers not awaiting the future (publish_soon)
+        # must not trigger "exception was never retrieved" warnings
+        future.add_done_callback(_retrieve_exception)
+        self._pending.append(
+            _Pending(body, headers, routing_key or "", self.content_type, future)
+        )
+        self.stats.submitted += 1
+        if len(self._pending) == 1 or len(self._pending) >= self.max_batch_size:
+            self._wakeup.set()
+        return future
+
+    async def publish(
+        self, payload: Any, headers: dict | None = None, routing_key: str | None = None
+    ) -> None:
+        """Publish a message and wait for its confirm.
+
+        Args:
+            payload: The marshaled payload.
+            headers: The message headers.
+            routing_key: The routing key.
+
+        """
+        await self.submit(payload, headers, routing_key)
+
+    async def start(self, transport: PublishTransport) -> None:
+        """Start sending the queued messages to a transport.
+
+        Messages submitted before the publisher was started are sent too.
+
+        Args:
+            transport: The transport to send messages to.
+
+        """
+        self._transport = transport
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+        if self._pending:
+            self._wakeup.set()
+
+    async def flush(self) -> None:
+        """Wait until every queued message is confirmed or failed."""
+        self._flushing += 1
+        try:
+            while True:
+                if self._pending:
+                    self._wakeup.set()
+                    await asyncio.wait([pending.future for pending in self._pending])
+                # Finished tasks are discarded by a callback that may not have
+                # run yet
+                in_flight = [task for task in self._in_flight if not task.done()]
+                if in_flight:
+                    await asyncio.wait(in_flight)
+                elif not self._pending:
+                    return
+        finally:
+            self._flushing -= 1
+
+    async def stop(self, flush: bool = True) -> None:
+        """Stop the background task.
+
+        Args:
+            flush: Whether to send the queued messages first.
+
+        """
+        if flush and self.running:
+            await self.flush()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for pending in self._pending:
+            if not pending.future.done():
+                pending.future.set_exception(RuntimeError("Publisher stopped"))
+        self._pending.clear()
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            if len(self._pending) < self.max_batch_size and not self._flushing:
+                # Give the batch a chance to fill up
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.max_delay)
+                except TimeoutError:
+                    pass
+            batch = self._pending[: self.max_batch_size]
+            del self._pending[: self.max_batch_size]
+            if not self._pending:
+                self._wakeup.clear()
+            if batch:
+                await self._send(batch)
+
+    async def _send(self, batch: list[_Pending]) -> None:
+        self.stats.batches += 1
+        for pending in batch:
+            await self._window.acquire()
+            task = asyncio.create_task(self._send_one(pending))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _send_one(self, pending: _Pending) -> None:
+        try:
+            await self._transport.send(  # type: ignore[union-attr]
+                pending.body,
+                pending.headers,
+                pending.routing_key,
+                pending.content_type,
+            )
+        except Exception as exc:
+            self.stats.failed += 1
+            logger.error("Failed to publish message: %s", exc)
+            if not pending.future.done():
+                pending.future.set_exception(exc)
+        else:
+            self.stats.confirmed += 1
+            if not pending.future.done():
+                pending.future.set_result(None)
+        finally:
+            self._window.release()
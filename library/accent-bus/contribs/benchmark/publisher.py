@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# Copyright 2025 Accent Communications
+
+"""Publisher throughput without a broker.
+
+Messages are sent to an in-memory transport confirming each message after a
+simulated broker round trip. Publishing one message at a time, waiting for
+each confirm as the previous publisher did, is compared with the batch
+publisher, and the JSON codecs are timed on a typical event payload.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime
+import json
+import time
+import uuid
+
+from accent_bus.codec import JsonCodec
+from accent_bus.publishing import BatchPublisher
+
+
+class MemoryTransport:
+    """Transport confirming messages after a fixed latency."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.count = 0
+        self.size = 0
+
+    async def send(self, body, headers, routing_key, content_type) -> None:
+        await asyncio.sleep(self.latency)
+        self.count += 1
+        self.size += len(body)
+
+
+def make_payload(n: int) -> dict:
+    return {
+        "name": "call_updated",
+        "origin_uuid": str(uuid.uuid4()),
+        "timestamp": datetime.datetime.now().isoformat(),
+        "data": {
+            "call_id": f"1700000000.{n}",
+            "user_uuid": str(uuid.uuid4()),
+            "caller_id_name": "Alice Example",
+            "caller_id_number": "1001",
+            "peer_caller_id_number": "5551234",
+            "status": "Up",
+            "talking_to": {"1700000001.1": "1002"},
+            "is_video": False,
+            "dialed_extension": "1002",
+        },
+    }
+
+
+async def sequential(transport, payloads) -> None:
+    for payload in payloads:
+        await transport.send(str(payload).encode(), None, "", None)
+
+
+async def batched(transport, payloads, args) -> None:
+    publisher = BatchPublisher(
+        max_batch_size=args.batch_size,
+        max_delay=args.max_delay,
+        max_in_flight=args.in_flight,
+    )
+    await publisher.start(transport)
+    for payload in payloads:
+        publisher.submit(payload, {"name": payload["name"]}, "calls.call.updated")
+    await publisher.stop()
+
+
+def time_codec(name, encode, payloads) -> None:
+    begin = time.perf_counter()
+    for payload in payloads:
+        encode(payload)
+    elapsed = time.perf_counter() - begin
+    print(f"{name:<22} {len(payloads) / elapsed:12,.0f} msg/s")
+
+
+async def run(args) -> None:
+    payloads = [make_payload(n) for n in range(args.messages)]
+
+    for name, coroutine in (
+        ("sequential (legacy)", lambda t: sequential(t, payloads)),
+        ("batched", lambda t: batched(t, payloads, args)),
+    ):
+        transport = MemoryTransport(args.latency / 1000)
+        begin = time.perf_counter()
+        await coroutine(transport)
+        elapsed = time.perf_counter() - begin
+        print(f"{name:<22} {transport.count / elapsed:12,.0f} msg/s")
+
+    time_codec("str().encode()", lambda p: str(p).encode(), payloads)
+    time_codec("json (stdlib)", JsonCodec(use_orjson=False).encode, payloads)
+    time_codec("json.dumps", lambda p: json.dumps(p).encode(), payloads)
+    try:
+        time_codec("json (orjson)", JsonCodec(use_orjson=True).encode, payloads)
+    except RuntimeError:
+        print("orjson is not installed")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--latency", type=float, default=0.2, help="confirm RTT, ms")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--max-delay", type=float, default=0.005)
+    parser.add_argument("--in-flight", type=int, default=256)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
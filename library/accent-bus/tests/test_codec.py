@@ -0,0 +1,77 @@
+# tests/test_codec.py
+import datetime
+import enum
+import uuid
+
+import pytest
+from accent_bus.codec import JsonCodec, encode_body
+
+
+class Color(enum.Enum):
+    RED = "red"
+
+
+CODECS = [JsonCodec(use_orjson=False)]
+try:
+    CODECS.append(JsonCodec(use_orjson=True))
+except RuntimeError:  # orjson not installed
+    pass
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_roundtrip(codec):
+    """Payloads are encoded as JSON bytes and decoded back."""
+    payload = {"name": "call_created", "data": {"id": 1, "label": "héllo", "n": None}}
+
+    body = codec.encode(payload)
+
+    assert isinstance(body, bytes)
+    assert codec.decode(body) == payload
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_binary_values_are_restored(codec):
+    """Bytes values survive a roundtrip."""
+    payload = {"data": {"blob": b"\x00\xff\x10", "items": [b"a", "b"]}}
+
+    assert codec.decode(codec.encode(payload)) == payload
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_non_json_values(codec):
+    """Datetimes, UUIDs, enums and sets are converted."""
+    value = uuid.UUID("12345678-1234-5678-1234-567812345678")
+    now = datetime.datetime(2025, 1, 2, 3, 4, 5, 6, tzinfo=datetime.timezone.utc)
+
+    result = codec.decode(
+        codec.encode({"uuid": value, "at": now, "color": Color.RED, "set": {1}})
+    )
+
+    assert result == {
+        "uuid": str(value),
+        "at": now.isoformat(),
+        "color": "red",
+        "set": [1],
+    }
+
+
+def test_codecs_produce_the_same_documents():
+    """orjson and the standard library give identical bodies."""
+    if len(CODECS) < 2:
+        pytest.skip("orjson is not installed")
+    payload = {
+        "a": [1, 2.5, "é"],
+        "b": {"c": b"\x01"},
+        "at": datetime.date(2025, 1, 1),
+    }
+
+    assert CODECS[0].encode(payload) == CODECS[1].encode(payload)
+
+
+def test_encode_body_keeps_serialized_payloads():
+    """Strings (collectd lines) and bytes are sent as is."""
+    codec = JsonCodec()
+
+    assert encode_body(codec, "PUTVAL host/calls") == b"PUTVAL host/calls"
+    assert encode_body(codec, b"raw") == b"raw"
+    assert encode_body(codec, {"a": 1}) == b'{"a":1}'
@@ -0,0 +1,149 @@
+# tests/test_consumer_ack.py
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from aio_pika import ExchangeType
+from aio_pika.message import ProcessContext
+from accent_bus.consumer import BusConsumer
+
+
+class Message:
+    """Incoming message recording its acknowledgement."""
+
+    content_type = "application/json"
+    body = b'{"data": {"id": 1}}'
+
+    def __init__(self, name):
+        self.headers = {"name": name}
+        self.outcome = None
+
+    @property
+    def processed(self):
+        return self.outcome is not None
+
+    def process(self, ignore_processed=False):
+        return ProcessContext(
+            self,
+            requeue=False,
+            reject_on_redelivered=False,
+            ignore_processed=ignore_processed,
+        )
+
+    async def ack(self):
+        self.outcome = "ack"
+
+    async def nack(self, requeue=True):
+        self.outcome = "requeue" if requeue else "nack"
+
+    async def reject(self, requeue=False):
+        self.outcome = "reject"
+
+
+@pytest.fixture
+def consumer(monkeypatch):
+    consumer = BusConsumer(name="test")
+    exchange = Mock(type=ExchangeType.HEADERS)
+    monkeypatch.setattr(consumer, "_get_exchange", AsyncMock(return_value=exchange))
+    monkeypatch.setattr(consumer, "_ConsumerMixin__create_binding", AsyncMock())
+    return consumer
+
+
+async def receive(consumer, message):
+    return asyncio.create_task(consumer._ConsumerMixin__on_message_received(message))
+
+
+@pytest.mark.asyncio
+async def test_message_is_acked_after_its_handlers(consumer):
+    """The message is acknowledged only once its handlers ran."""
+    release = asyncio.Event()
+    received = []
+
+    async def handler(payload):
+        await release.wait()
+        received.append(payload)
+
+    await consumer.subscribe("event", handler)
+    message = Message("event")
+
+    task = await receive(consumer, message)
+    await asyncio.sleep(0.01)
+    assert message.outcome is None
+
+    release.set()
+    await asyncio.wait_for(task, 1)
+    assert received == [{"id": 1}]
+    assert message.outcome == "ack"
+
+
+@pytest.mark.asyncio
+async def test_failed_handler_message_is_acked(consumer):
+    """A failing handler is logged, its message is not delivered again."""
+
+    async def handler(payload):
+        raise ValueError(payload)
+
+    await consumer.subscribe("event", handler)
+    message = Message("event")
+
+    await asyncio.wait_for(await receive(consumer, message), 1)
+
+    assert message.outcome == "ack"
+
+
+@pytest.mark.asyncio
+async def test_unhandled_message_is_requeued_on_close(consumer):
+    """Messages whose handlers did not run when closing are requeued."""
+
+    async def handler(payload):
+        await asyncio.Event().wait()
+
+    await consumer.subscribe("event", handler)
+    message = Message("event")
+    task = await receive(consumer, message)
+    await asyncio.sleep(0)
+
+    consumer.consumer_args = {**consumer.consumer_args, "drain_timeout": 0.01}
+    await consumer.close()
+    await asyncio.wait_for(task, 1)
+
+    assert message.outcome == "requeue"
+
+
+@pytest.mark.asyncio
+async def test_message_without_handler_is_acked(consumer):
+    message = Message("other")
+
+    await asyncio.wait_for(await receive(consumer, message), 1)
+
+    assert message.outcome == "ack"
+
+
+@pytest.mark.asyncio
+async def test_in_flight_message_is_acked_before_closing(consumer):
+    """Closing stops consuming and acks the messages handled in time."""
+    events = []
+
+    async def handler(payload):
+        await asyncio.sleep(0.01)
+        events.append("handled")
+
+    async def close_connection():
+        events.append(f"connection closed after {message.outcome}")
+
+    queue = Mock(cancel=AsyncMock(side_effect=lambda tag: events.append("cancel")))
+    consumer._ConsumerMixin__queue = queue
+    consumer._ConsumerMixin__consumer_tag = "tag"
+    consumer._ConsumerMixin__connection = Mock(
+        close=AsyncMock(side_effect=close_connection)
+    )
+    await consumer.subscribe("event", handler)
+    message = Message("event")
+    task = await receive(consumer, message)
+    await asyncio.sleep(0)
+
+    await consumer.close()
+
+    assert task.done()
+    queue.cancel.assert_awaited_once_with("tag")
+    assert events == ["cancel", "handled", "connection closed after ack"]
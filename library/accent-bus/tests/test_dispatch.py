@@ -0,0 +1,196 @@
+# tests/test_dispatch.py
+import asyncio
+
+import pytest
+from accent_bus.dispatch import Dispatcher, DispatchOptions, dispatch_options
+
+
+@pytest.mark.asyncio
+async def test_slow_handler_does_not_block_others():
+    """A slow handler only delays its own events."""
+    release = asyncio.Event()
+    fast_calls = []
+
+    async def slow(payload):
+        await release.wait()
+
+    async def fast(payload):
+        fast_calls.append(payload)
+
+    dispatcher = Dispatcher()
+    dispatcher.register("call_created", slow)
+    dispatcher.register("call_created", fast)
+
+    for n in range(3):
+        await dispatcher.dispatch("call_created", n)
+    await asyncio.sleep(0.01)
+
+    assert fast_calls == [0, 1, 2]
+    release.set()
+    await dispatcher.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded():
+    """No more than max_concurrency calls of a handler run at once."""
+    running = 0
+    peak = 0
+
+    async def handler(payload):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.001)
+        running -= 1
+
+    dispatcher = Dispatcher(DispatchOptions(max_concurrency=3))
+    dispatcher.register("event", handler)
+    for n in range(20):
+        await dispatcher.dispatch("event", n)
+    await dispatcher.drain()
+
+    assert peak == 3
+    assert dispatcher.stats()["event"][handler.__qualname__]["calls"] == 20
+    await dispatcher.close()
+
+
+@pytest.mark.asyncio
+async def test_ordered_handler_receives_events_in_order():
+    """Handlers declared ordered get one event at a time, in order."""
+    received = []
+
+    @dispatch_options(ordered=True)
+    async def handler(payload):
+        await asyncio.sleep(0.001 * (5 - payload))
+        received.append(payload)
+
+    dispatcher = Dispatcher()
+    runner = dispatcher.register("event", handler)
+    for n in range(5):
+        await dispatcher.dispatch("event", n)
+    await dispatcher.drain()
+
+    assert runner.concurrency == 1
+    assert received == [0, 1, 2, 3, 4]
+    await dispatcher.close()
+
+
+@pytest.mark.asyncio
+async def test_timeout_and_failures_are_counted():
+    """Timed out and failing calls are recorded and do not stop the worker."""
+
+    async def handler(payload):
+        if payload == "slow":
+            await asyncio.sleep(1)
+        elif payload == "bad":
+            raise ValueError(payload)
+
+    dispatcher = Dispatcher()
+    dispatcher.register("event", handler, timeout=0.01)
+    for payload in ("slow", "bad", "ok"):
+        await dispatcher.dispatch("event", payload)
+    await dispatcher.drain()
+
+    stats = dispatcher.stats()["event"][handler.__qualname__]
+    assert stats["calls"] == 3
+    assert stats["timeouts"] == 1
+    assert stats["failures"] == 1
+    await dispatcher.close()
+
+
+@pytest.mark.asyncio
+async def test_sync_handler():
+    """Synchronous handlers are supported."""
+    received = []
+    dispatcher = Dispatcher()
+    dispatcher.register("event", received.append)
+
+    await dispatcher.dispatch("event", {"a": 1})
+    await dispatcher.drain()
+
+    assert received == [{"a": 1}]
+    await dispatcher.close()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_applies_backpressure():
+    """dispatch waits while the queue of a handler is full."""
+    release = asyncio.Event()
+
+    @dispatch_options(ordered=True, max_queue_size=1)
+    async def handler(payload):
+        await release.wait()
+
+    dispatcher = Dispatcher()
+    runner = dispatcher.register("event", handler)
+    await dispatcher.dispatch("event", 1)
+    await asyncio.sleep(0)
+    await dispatcher.dispatch("event", 2)
+
+    blocked = asyncio.create_task(dispatcher.dispatch("event", 3))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+    assert runner.stats.max_queue_depth == 1
+
+    release.set()
+    await blocked
+    await dispatcher.drain()
+    await dispatcher.close()
+
+
+@pytest.mark.asyncio
+async def test_unregister():
+    """Unregistered handlers no longer receive events."""
+    received = []
+    dispatcher = Dispatcher()
+    dispatcher.register("event", received.append)
+
+    assert await dispatcher.unregister("event", received.append)
+    assert not dispatcher.handles("event")
+    await dispatcher.dispatch("event", 1)
+
+    assert received == []
+    assert not await dispatcher.unregister("event", received.append)
+
+
+@pytest.mark.asyncio
+async def test_dispatch_returns_when_queued_with_a_future_of_the_handling():
+    """The future returned by dispatch is done once the handlers ran."""
+    release = asyncio.Event()
+
+    async def slow(payload):
+        await release.wait()
+
+    dispatcher = Dispatcher()
+    dispatcher.register("event", slow)
+    dispatcher.register("event", lambda payload: None)
+
+    handled = await dispatcher.dispatch("event", 1)
+    await asyncio.sleep(0.01)
+    assert not handled.done()
+
+    release.set()
+    await asyncio.wait_for(handled, 1)
+    await dispatcher.close()
+
+
+@pytest.mark.asyncio
+async def test_close_cancels_the_unhandled_events():
+    """Events not handled when the dispatcher stops are cancelled."""
+    release = asyncio.Event()
+
+    @dispatch_options(ordered=True)
+    async def handler(payload):
+        await release.wait()
+
+    dispatcher = Dispatcher()
+    dispatcher.register("event", handler)
+    running = await dispatcher.dispatch("event", 1)
+    queued = await dispatcher.dispatch("event", 2)
+    await asyncio.sleep(0)
+
+    await dispatcher.close(timeout=0.01)
+    await asyncio.sleep(0)
+
+    assert running.cancelled()
+    assert queued.cancelled()
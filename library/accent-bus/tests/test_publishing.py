@@ -0,0 +1,125 @@
+# tests/test_publishing.py
+import asyncio
+
+import pytest
+from accent_bus.codec import JsonCodec
+from accent_bus.publishing import BatchPublisher
+
+
+class MemoryTransport:
+    """Transport recording messages, confirming them after a delay."""
+
+    def __init__(self, delay=0.0, fail_on=None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.messages = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def send(self, body, headers, routing_key, content_type):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.fail_on is not None and self.fail_on in body:
+                raise ConnectionError("nack")
+            self.messages.append((body, headers, routing_key, content_type))
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.mark.asyncio
+async def test_publish_waits_for_confirm():
+    """publish returns once the transport confirmed the message."""
+    transport = MemoryTransport()
+    publisher = BatchPublisher()
+    await publisher.start(transport)
+
+    await publisher.publish({"a": 1}, {"name": "x"}, "rk")
+
+    assert transport.messages == [(b'{"a":1}', {"name": "x"}, "rk", "application/json")]
+    assert publisher.stats.confirmed == 1
+    await publisher.stop()
+
+
+@pytest.mark.asyncio
+async def test_messages_are_batched():
+    """Messages submitted together are sent in full batches, in order."""
+    transport = MemoryTransport()
+    publisher = BatchPublisher(max_batch_size=10, max_delay=1)
+    await publisher.start(transport)
+
+    futures = [publisher.submit({"n": n}) for n in range(25)]
+    await publisher.flush()
+
+    assert all(future.done() for future in futures)
+    assert [body for body, *_ in transport.messages] == [
+        JsonCodec().encode({"n": n}) for n in range(25)
+    ]
+    assert publisher.stats.batches == 3
+    await publisher.stop()
+
+
+@pytest.mark.asyncio
+async def test_in_flight_window_is_bounded():
+    """No more than max_in_flight messages await a confirm."""
+    transport = MemoryTransport(delay=0.001)
+    publisher = BatchPublisher(max_batch_size=50, max_in_flight=8)
+    await publisher.start(transport)
+
+    for n in range(100):
+        publisher.submit({"n": n})
+    await publisher.flush()
+
+    assert len(transport.messages) == 100
+    assert transport.max_in_flight == 8
+    await publisher.stop()
+
+
+@pytest.mark.asyncio
+async def test_failed_confirm_is_raised_to_publish():
+    """A nack fails the future of the message only."""
+    transport = MemoryTransport(fail_on=b"bad")
+    publisher = BatchPublisher()
+    await publisher.start(transport)
+
+    with pytest.raises(ConnectionError):
+        await publisher.publish({"v": "bad"})
+    await publisher.publish({"v": "good"})
+
+    assert publisher.stats.todict() == {
+        "submitted": 2,
+        "confirmed": 1,
+        "failed": 1,
+        "batches": 2,
+    }
+    await publisher.stop()
+
+
+@pytest.mark.asyncio
+async def test_messages_submitted_before_start_are_sent():
+    """publish_soon before connect is not lost."""
+    transport = MemoryTransport()
+    publisher = BatchPublisher(content_type="text/collectd")
+    future = publisher.submit("PUTVAL host/x")
+
+    await publisher.start(transport)
+    await future
+
+    assert transport.messages == [(b"PUTVAL host/x", None, "", "text/collectd")]
+    await publisher.stop()
+
+
+@pytest.mark.asyncio
+async def test_stop_flushes_pending_messages():
+    """stop sends the queued messages before returning."""
+    transport = MemoryTransport(delay=0.001)
+    publisher = BatchPublisher(max_delay=1)
+    await publisher.start(transport)
+    for n in range(5):
+        publisher.submit({"n": n})
+
+    await publisher.stop()
+
+    assert len(transport.messages) == 5
+    assert not publisher.running
@@ -65,6 +65,7 @@ from accent_dao.alchemy.meeting import Meeting, MeetingOwner
 from accent_dao.alchemy.meeting_authorization import MeetingAuthorization
 from accent_dao.alchemy.moh import MOH
 from accent_dao.alchemy.netiface import Netiface
+from accent_dao.alchemy.outbox import OutboxMessage
 from accent_dao.alchemy.outcall import Outcall
 from accent_dao.alchemy.outcalltrunk import OutcallTrunk
 from accent_dao.alchemy.paging import Paging
@@ -111,6 +112,7 @@ from accent_dao.alchemy.switchboard_member_user import SwitchboardMemberUser
 from accent_dao.alchemy.tenant import Tenant
 from accent_dao.alchemy.trunkfeatures import TrunkFeatures
 from accent_dao.alchemy.user_external_app import UserExternalApp
+from accent_dao.alchemy.user_import_job import UserImportJob
 from accent_dao.alchemy.user_line import UserLine
 from accent_dao.alchemy.usercustom import UserCustom
 from accent_dao.alchemy.userfeatures import UserFeatures
@@ -185,6 +187,7 @@ __all__ = [
     "MeetingAuthorization",
     "MeetingOwner",
     "Netiface",
+    "OutboxMessage",
     "Outcall",
     "OutcallTrunk",
     "PJSIPTransport",
@@ -232,6 +235,7 @@ __all__ = [
     "TrunkFeatures",
     "UserCustom",
     "UserExternalApp",
+    "UserImportJob",
     "UserFeatures",
     "UserIAX",
     "UserLine",
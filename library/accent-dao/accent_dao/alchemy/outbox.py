@@ -0,0 +1,63 @@
+# file: accent_dao/alchemy/outbox.py
+# Copyright 2025 Accent Communications
+
+import datetime
+
+from sqlalchemy import (
+    BigInteger,
+    CheckConstraint,
+    DateTime,
+    Index,
+    Integer,
+    String,
+    Text,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from accent_dao.helpers.db_manager import Base
+from accent_dao.helpers.uuid import new_uuid
+
+
+class OutboxMessage(Base):
+    """Represents a message to send once the transaction writing it commits.
+
+    Attributes:
+        id: The position of the message, messages are sent in this order.
+        uuid: The deduplication identifier sent with the message.
+        kind: The destination of the message ('bus' or 'sysconfd').
+        body: The message, as needed to send it again (as JSON).
+        created_at: The timestamp when the message was written.
+        published_at: The timestamp when the message was sent, if it was.
+        attempts: The number of failed attempts to send the message.
+        last_error: The error of the last failed attempt.
+
+    """
+
+    __tablename__: str = "outbox"
+    __table_args__: tuple = (
+        CheckConstraint("kind in ('bus', 'sysconfd')", name="outbox_kind_check"),
+        Index(
+            "outbox__idx__pending",
+            "id",
+            postgresql_where=text("published_at IS NULL"),
+        ),
+        Index("outbox__idx__published_at", "published_at"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    uuid: Mapped[str] = mapped_column(
+        String(38), nullable=False, default=new_uuid, unique=True
+    )
+    kind: Mapped[str] = mapped_column(String(16), nullable=False)
+    body: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    published_at: Mapped[datetime.datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
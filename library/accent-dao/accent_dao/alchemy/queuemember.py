@@ -136,7 +136,7 @@ class QueueMember(Base):
     _context: str | None = None
 
     @property
-    @cached_query()
+    @cached_query(depends_on=("group", "user", "call_pickup"))
     def users_from_call_pickup_group_interceptor_user_targets(
         self,
     ) -> list["UserFeatures"]:
@@ -149,7 +149,7 @@ class QueueMember(Base):
         return self.group.users_from_call_pickup_user_targets if self.group else []
 
     @property
-    @cached_query()
+    @cached_query(depends_on=("group", "user", "call_pickup"))
     def users_from_call_pickup_group_interceptor_group_targets(
         self,
     ) -> list["GroupFeatures"]:
@@ -0,0 +1,84 @@
+# file: accent_dao/alchemy/user_import_job.py
+# Copyright 2025 Accent Communications
+
+import datetime
+
+from sqlalchemy import (
+    CheckConstraint,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from accent_dao.helpers.db_manager import Base
+from accent_dao.helpers.uuid import new_uuid
+
+
+class UserImportJob(Base):
+    """Represents a background import of users from a CSV file.
+
+    Attributes:
+        uuid: The unique identifier of the job.
+        tenant_uuid: The UUID of the tenant the users are imported in.
+        status: The status of the job ('pending', 'running', 'completed',
+            'failed').
+        rows: The validated CSV rows, with the UUID assigned to each user.
+        processed_rows: The number of rows processed, where the job resumes.
+        created: The identifiers of the resources created, per row.
+        errors: The errors of the rows that could not be imported.
+        created_at: The timestamp when the job was created.
+        updated_at: The timestamp of the last processed rows.
+
+    """
+
+    __tablename__: str = "user_import_job"
+    __table_args__: tuple = (
+        CheckConstraint(
+            "status in ('pending', 'running', 'completed', 'failed')",
+            name="user_import_job_status_check",
+        ),
+        Index("user_import_job__idx__tenant_uuid", "tenant_uuid"),
+        Index(
+            "user_import_job__idx__unfinished",
+            "created_at",
+            postgresql_where=text("status in ('pending', 'running')"),
+        ),
+    )
+
+    uuid: Mapped[str] = mapped_column(String(38), primary_key=True, default=new_uuid)
+    tenant_uuid: Mapped[str] = mapped_column(
+        String(36), ForeignKey("tenant.uuid", ondelete="CASCADE"), nullable=False
+    )
+    status: Mapped[str] = mapped_column(
+        String(16), nullable=False, server_default="pending"
+    )
+    rows: Mapped[list] = mapped_column(JSONB, nullable=False)
+    processed_rows: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default="0"
+    )
+    created: Mapped[list] = mapped_column(
+        JSONB, nullable=False, server_default=text("'[]'::jsonb")
+    )
+    errors: Mapped[list] = mapped_column(
+        JSONB, nullable=False, server_default=text("'[]'::jsonb")
+    )
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    updated_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+    @property
+    def total_rows(self) -> int:
+        """The number of rows to import."""
+        return len(self.rows)
@@ -572,7 +572,11 @@ class UserFeatures(Base):
             if hasattr(d, "incall") and d.incall
         ]
 
-    @cached_query()
+    @cached_query(
+        depends_on=("user", "extension"),
+        tags=lambda self, extension=None: [("user", self.id)]
+        + ([("extension", extension.id)] if extension else []),
+    )
     def extrapolate_caller_id(
         self, extension: Optional["Extension"] = None
     ) -> tuple[str | None, str | None]:
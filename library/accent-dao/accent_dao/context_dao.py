@@ -16,7 +16,7 @@ from accent_dao.helpers.db_manager import (
 logger = logging.getLogger(__name__)
 
 
-@cached_query()
+@cached_query(depends_on=("context",))
 @async_daosession
 async def get(session: AsyncSession, context_name: str) -> Context | None:
     """Retrieve a context by its name asynchronously.
@@ -42,7 +42,7 @@ async def get(session: AsyncSession, context_name: str) -> Context | None:
     return context
 
 
-@cached_query()
+@cached_query(depends_on=("context",))
 @async_daosession
 async def get_by_uuid(
     session: AsyncSession, context_uuid: str
@@ -0,0 +1,353 @@
+# helpers/cache.py
+# Copyright 2025 Accent Communications
+
+"""Cache regions for DAO query results, invalidated from confd bus events.
+
+Each cached query belongs to a region that declares the entity types it
+depends on. Every entry remembers the entities it was built from, as
+``(entity_type, entity_id)`` tags. When an entity is created, edited or
+deleted, only the entries tagged with that entity are evicted, along with
+the entries that cannot be attributed to a single entity (lists, misses,
+values without an id), which are evicted on any event of the type.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from collections.abc import Callable, Hashable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from cachetools import TTLCache
+from cachetools.keys import hashkey
+
+logger = logging.getLogger(__name__)
+
+Tag = tuple[str, Any]
+
+# confd event name suffixes and the entity type of their payload
+EVENT_ACTIONS = ("created", "edited", "deleted")
+
+
+@dataclass
+class RegionStats:
+    """Counters of a cache region."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    def todict(self) -> dict[str, int]:
+        """Convert the counters to a dictionary.
+
+        Returns:
+            Dictionary of the counters.
+
+        """
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+class _Entry:
+    __slots__ = ("tagged_types", "tags", "value")
+
+    def __init__(self, value: Any, tags: set[Tag]) -> None:
+        self.value = value
+        self.tags = tags
+        self.tagged_types = {entity_type for entity_type, _ in tags}
+
+
+class CacheRegion:
+    """TTL cache of query results depending on a set of entity types."""
+
+    def __init__(
+        self,
+        name: str,
+        depends_on: Iterable[str] = (),
+        maxsize: int = 128,
+        ttl: float = 300,
+    ) -> None:
+        """Initialize the region.
+
+        Args:
+            name: Unique name of the region.
+            depends_on: Entity types whose changes invalidate the region.
+            maxsize: Maximum number of entries.
+            ttl: Time-to-live of the entries in seconds.
+
+        """
+        self.name = name
+        self.depends_on = frozenset(depends_on)
+        self.stats = RegionStats()
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def get(self, key: Hashable) -> tuple[bool, Any]:
+        """Look up a key.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            A (found, value) tuple.
+
+        """
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return False, None
+            self.stats.hits += 1
+            return True, entry.value
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[Tag] | None = None) -> None:
+        """Store a value.
+
+        Args:
+            key: Cache key.
+            value: Value to cache.
+            tags: Entities the value was built from. Defaults to the ids found
+                on the value itself.
+
+        """
+        if tags is None:
+            tags = self._tags_from_value(value)
+        with self._lock:
+            self._cache[key] = _Entry(value, set(tags))
+
+    def invalidate(self, entity_type: str, entity_id: Any = None) -> int:
+        """Evict the entries affected by a change of an entity.
+
+        Args:
+            entity_type: Type of the changed entity.
+            entity_id: Id of the changed entity, None to evict every entry
+                depending on the type.
+
+        Returns:
+            Number of evicted entries.
+
+        """
+        if entity_type not in self.depends_on:
+            return 0
+        with self._lock:
+            keys = [
+                key
+                for key, entry in self._cache.items()
+                if entity_id is None
+                or entity_type not in entry.tagged_types
+                or (entity_type, entity_id) in entry.tags
+            ]
+            for key in keys:
+                self._cache.pop(key, None)
+            self.stats.evictions += len(keys)
+        return len(keys)
+
+    def clear(self) -> None:
+        """Evict every entry of the region."""
+        with self._lock:
+            self.stats.evictions += len(self._cache)
+            self._cache.clear()
+
+    def _tags_from_value(self, value: Any) -> set[Tag]:
+        # A single entity is tagged with its id for the first declared type,
+        # anything else is only evicted by type
+        if len(self.depends_on) != 1 or isinstance(value, list | tuple | set):
+            return set()
+        entity_id = getattr(value, "id", None)
+        if entity_id is None:
+            return set()
+        (entity_type,) = self.depends_on
+        return {(entity_type, entity_id)}
+
+
+class CacheRegistry:
+    """All the cache regions of the process, by name."""
+
+    def __init__(self) -> None:
+        self._regions: dict[str, CacheRegion] = {}
+        self._warmers: list[Callable[[], Any]] = []
+
+    def region(
+        self,
+        name: str,
+        depends_on: Iterable[str] = (),
+        maxsize: int = 128,
+        ttl: float = 300,
+    ) -> CacheRegion:
+        """Get a region, creating it on first use.
+
+        Args:
+            name: Unique name of the region.
+            depends_on: Entity types whose changes invalidate the region.
+            maxsize: Maximum number of entries.
+            ttl: Time-to-live of the entries in seconds.
+
+        Returns:
+            The region.
+
+        """
+        region = self._regions.get(name)
+        if region is None:
+            region = CacheRegion(name, depends_on, maxsize=maxsize, ttl=ttl)
+            self._regions[name] = region
+        return region
+
+    def regions(self) -> list[CacheRegion]:
+        """List the regions.
+
+        Returns:
+            The regions.
+
+        """
+        return list(self._regions.values())
+
+    def invalidate(self, entity_type: str, entity_id: Any = None) -> int:
+        """Evict the entries of every region affected by an entity change.
+
+        Args:
+            entity_type: Type of the changed entity.
+            entity_id: Id of the changed entity, None for any.
+
+        Returns:
+            Number of evicted entries.
+
+        """
+        evicted = sum(
+            region.invalidate(entity_type, entity_id)
+            for region in self._regions.values()
+        )
+        logger.debug(
+            "Cache invalidation of %s %s: %s entries evicted",
+            entity_type,
+            entity_id,
+            evicted,
+        )
+        return evicted
+
+    def clear(self) -> None:
+        """Evict every entry of every region."""
+        for region in self._regions.values():
+            region.clear()
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Get the counters of every region.
+
+        Returns:
+            Counters by region name.
+
+        """
+        return {
+            name: {**region.stats.todict(), "size": len(region)}
+            for name, region in self._regions.items()
+        }
+
+    def add_warmer(self, warmer: Callable[[], Any]) -> None:
+        """Register a callable filling the caches, e.g. on startup.
+
+        Args:
+            warmer: Callable, sync or async, calling cached queries.
+
+        """
+        self._warmers.append(warmer)
+
+    async def warm(self) -> None:
+        """Run the registered warmers."""
+        for warmer in self._warmers:
+            try:
+                result = warmer()
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception:
+                logger.exception("Cache warmer %s failed", warmer)
+
+
+registry = CacheRegistry()
+
+
+def cache_key(*args: Any, **kwargs: Any) -> Hashable:
+    """Build the cache key of a call, lists being converted to tuples.
+
+    Args:
+        *args: Positional arguments of the call.
+        **kwargs: Keyword arguments of the call.
+
+    Returns:
+        A hashable key.
+
+    """
+    return hashkey(
+        *(_hashable(arg) for arg in args),
+        **{name: _hashable(value) for name, value in kwargs.items()},
+    )
+
+
+def _hashable(value: Any) -> Any:
+    if isinstance(value, list):
+        return tuple(_hashable(item) for item in value)
+    return value
+
+
+class CacheInvalidator:
+    """Bus consumer evicting cached entries on confd entity events.
+
+    Subscribes to ``<entity>_created``, ``<entity>_edited`` and
+    ``<entity>_deleted`` for every entity type a region depends on.
+    """
+
+    def __init__(self, cache_registry: CacheRegistry | None = None) -> None:
+        self._registry = cache_registry or registry
+
+    def event_names(self) -> list[tuple[str, str]]:
+        """List the events to consume.
+
+        Returns:
+            (event name, entity type) pairs.
+
+        """
+        entity_types = sorted(
+            {
+                entity_type
+                for region in self._registry.regions()
+                for entity_type in region.depends_on
+            }
+        )
+        return [
+            (f"{entity_type}_{action}", entity_type)
+            for entity_type in entity_types
+            for action in EVENT_ACTIONS
+        ]
+
+    def subscribe(self, bus_consumer: Any) -> None:
+        """Subscribe to the entity events.
+
+        Args:
+            bus_consumer: Bus consumer with a ``subscribe(name, handler)`` method.
+
+        """
+        for event_name, entity_type in self.event_names():
+            bus_consumer.subscribe(event_name, self._handler(entity_type))
+
+    def _handler(self, entity_type: str) -> Callable[[dict[str, Any]], None]:
+        def on_event(event: dict[str, Any]) -> None:
+            self.on_entity_event(entity_type, event)
+
+        return on_event
+
+    def on_entity_event(self, entity_type: str, event: dict[str, Any]) -> None:
+        """Evict the entries affected by an entity event.
+
+        Args:
+            entity_type: Type of the entity.
+            event: Event payload, the entity id is read from ``id``.
+
+        """
+        entity_id = event.get("id") if isinstance(event, dict) else None
+        self._registry.invalidate(entity_type, entity_id)
+
+    def clear(self) -> None:
+        """Evict every entry, when events may have been missed."""
+        self._registry.clear()
@@ -3,6 +3,7 @@
 
 from __future__ import annotations
 
+import inspect
 import logging
 from contextlib import asynccontextmanager, contextmanager
 from datetime import timedelta
@@ -10,7 +11,7 @@ from functools import wraps
 from typing import TYPE_CHECKING, Any, TypeVar, overload
 
 # Import cachetools at the top
-from cachetools import TTLCache, cached
+from cachetools import TTLCache
 from sqlalchemy import Engine, String, create_engine
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
@@ -26,8 +27,17 @@ from sqlalchemy.orm import (
 )
 from sqlalchemy.types import TypeDecorator
 
+from accent_dao.helpers.cache import Tag, cache_key
+from accent_dao.helpers.cache import registry as cache_registry
+
 if TYPE_CHECKING:
-    from collections.abc import AsyncGenerator, Awaitable, Callable, Generator
+    from collections.abc import (
+        AsyncGenerator,
+        Awaitable,
+        Callable,
+        Generator,
+        Iterable,
+    )
 
 # Type variables for generic functions
 T = TypeVar("T")
@@ -371,13 +381,25 @@ def async_daosession(
 
 
 def cached_query(
-    maxsize: int = DEFAULT_CACHE_MAXSIZE, ttl: float = DEFAULT_CACHE_TTL
+    maxsize: int = DEFAULT_CACHE_MAXSIZE,
+    ttl: float = DEFAULT_CACHE_TTL,
+    region: str | None = None,
+    depends_on: Iterable[str] = (),
+    tags: Callable[..., Iterable[Tag]] | None = None,
 ) -> Callable[[Callable[..., R]], Callable[..., R]]:
     """Create a caching decorator for database queries.
 
+    Results are stored in a cache region, evicted when one of the entities
+    the region depends on changes (see ``accent_dao.helpers.cache``).
+    Coroutine functions are supported, their awaited result is cached.
+
     Args:
         maxsize: Maximum size of the cache.
         ttl: Time-to-live for cache entries in seconds.
+        region: Name of the cache region, defaults to the function name.
+        depends_on: Entity types whose changes invalidate the results.
+        tags: Optional callable receiving the call arguments and returning
+            the (entity_type, entity_id) pairs a result depends on.
 
     Returns:
         A decorator that caches function results.
@@ -385,13 +407,42 @@ def cached_query(
     """
 
     def decorator(func: Callable[..., R]) -> Callable[..., R]:
-        cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        cache_region = cache_registry.region(
+            region or f"{func.__module__}.{func.__qualname__}",
+            depends_on,
+            maxsize=maxsize,
+            ttl=ttl,
+        )
+
+        def _tags(args: tuple, kwargs: dict) -> Iterable[Tag] | None:
+            return tags(*args, **kwargs) if tags else None
+
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_wrapped(*args: Any, **kwargs: Any) -> R:
+                key = cache_key(*args, **kwargs)
+                found, value = cache_region.get(key)
+                if found:
+                    return value
+                value = await func(*args, **kwargs)
+                cache_region.set(key, value, _tags(args, kwargs))
+                return value
+
+            async_wrapped.cache_region = cache_region  # type: ignore[attr-defined]
+            return async_wrapped  # type: ignore[return-value]
 
-        @cached(cache)
         @wraps(func)
         def wrapped(*args: Any, **kwargs: Any) -> R:
-            return func(*args, **kwargs)
-
+            key = cache_key(*args, **kwargs)
+            found, value = cache_region.get(key)
+            if found:
+                return value
+            value = func(*args, **kwargs)
+            cache_region.set(key, value, _tags(args, kwargs))
+            return value
+
+        wrapped.cache_region = cache_region  # type: ignore[attr-defined]
         return wrapped
 
     return decorator
@@ -174,8 +174,7 @@ class BasePersistor(Generic[ModelType]):
 
         query = self._search_query()
         query = self._filter_tenant_uuid(query)
-        rows, total = self.search_system.search_from_query(query, parameters)
-        return SearchResult(total, rows)
+        return self.search_system.search_from_query(query, parameters)
 
     def _find_query(self, criteria: dict[str, Any]) -> Query:
         """Create a query for finding records.
@@ -356,10 +355,9 @@ class AsyncBasePersistor(Generic[ModelType]):
 
         stmt = await self._search_stmt()
         stmt = await self._filter_tenant_uuid(stmt)
-        rows, total = await self.search_system.search_from_query(
+        return await self.search_system.search_from_query(
             self.session, stmt, parameters
         )
-        return SearchResult(total, rows)
 
     async def _find_stmt(self, criteria: dict[str, Any]) -> Select:
         """Create a statement for finding records.
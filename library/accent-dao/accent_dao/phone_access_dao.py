@@ -16,7 +16,7 @@ from accent_dao.helpers.db_manager import (
 logger = logging.getLogger(__name__)
 
 
-@cached_query()
+@cached_query(depends_on=("access_feature",))
 @async_daosession
 async def get_authorized_subnets(session: AsyncSession) -> list[str]:
     """Retrieve all authorized subnets for phonebook access asynchronously.
@@ -69,6 +69,7 @@ async def add_authorized_subnet(
         # If commented, enable it
         existing.enabled = True
         await session.flush()
+        get_authorized_subnets.cache_region.clear()
         logger.info("Re-enabled authorized subnet %s", host)
         return existing
 
@@ -77,6 +78,7 @@ async def add_authorized_subnet(
     session.add(access_feature)
     await session.flush()
 
+    get_authorized_subnets.cache_region.clear()
     logger.info("Added new authorized subnet %s", host)
     return access_feature
 
@@ -107,5 +109,6 @@ async def remove_authorized_subnet(session: AsyncSession, host: str) -> bool:
     access_feature.enabled = False
     await session.flush()
 
+    get_authorized_subnets.cache_region.clear()
     logger.info("Removed authorized subnet %s", host)
     return True
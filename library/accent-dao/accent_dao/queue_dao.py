@@ -53,7 +53,7 @@ async def get(
     return queue
 
 
-@cached_query()
+@cached_query(depends_on=("queue",))
 @async_daosession
 async def get_by_name(
     session: AsyncSession, name: str, tenant_uuids: list[str] | None = None
@@ -89,7 +89,7 @@ async def get_by_name(
     return queue
 
 
-@cached_query()
+@cached_query(depends_on=("queue",))
 @async_daosession
 async def get_all(
     tenant_uuids: list[str] | str | None = None,
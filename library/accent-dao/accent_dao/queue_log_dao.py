@@ -11,6 +11,7 @@ from typing import Protocol, TypedDict, cast
 from sqlalchemy import (
     and_,
     between,
+    bindparam,
     distinct,
     func,
     or_,
@@ -335,6 +336,79 @@ async def get_first_time(session: AsyncSession) -> datetime:
     return cast(datetime, res)
 
 
+class AgentEventRow(Protocol):
+    """Protocol for agent login and pause events."""
+
+    id: int
+    time: datetime
+    event: str
+    agent: int
+    data2: str | None
+    counted: bool
+
+
+AGENT_EVENTS = (
+    "AGENTCALLBACKLOGIN",
+    "AGENTCALLBACKLOGOFF",
+    "PAUSEALL",
+    "UNPAUSEALL",
+)
+
+
+async def get_agent_events_after(
+    session: AsyncSession, last_id: int, end: datetime
+) -> list[AgentEventRow]:
+    """Get the agent login and pause events added since a queue_log id.
+
+    Args:
+        session: The database session
+        last_id: Id of the last queue_log row already processed
+        end: Events after this time are left for the next run
+
+    Returns:
+        The events ordered by id, with the stat_agent id as agent. Agents
+        of different tenants can share a name: an event is returned for each
+        of them, and counted is only true for the logoffs matching the
+        context and tenant of the agent, like the completed logins of
+        stat_dao.get_login_intervals_in_range.
+
+    """
+    query = """\
+SELECT
+    queue_log.id,
+    queue_log.time,
+    queue_log.event,
+    stat_agent.id AS agent,
+    queue_log.data2,
+    COALESCE(
+        queue_log.event = 'AGENTCALLBACKLOGOFF'
+        AND queue_log.data1 <> ''
+        AND context.tenant_uuid = stat_agent.tenant_uuid,
+        FALSE
+    ) AS counted
+FROM
+    queue_log
+JOIN
+    stat_agent ON queue_log.agent = stat_agent.name
+LEFT JOIN
+    context ON split_part(queue_log.data1, '@', 2) = context.name
+WHERE
+    queue_log.id > :last_id
+    AND queue_log.time <= :end
+    AND queue_log.event IN :events
+ORDER BY
+    queue_log.id, stat_agent.id
+"""
+    stmt = text(query).bindparams(
+        bindparam("events", expanding=True),
+        last_id=last_id,
+        end=end.strftime(_STR_TIME_FMT),
+        events=list(AGENT_EVENTS),
+    )
+    result = await session.execute(stmt)
+    return cast(list[AgentEventRow], result.all())
+
+
 async def get_queue_names_in_range(
     session: AsyncSession, start: datetime, end: datetime
 ) -> list[str]:
@@ -111,10 +111,9 @@ class IAXPersistor(CriteriaBuilderMixin, AsyncBasePersistor[IAX]):
         """
         query = await self._search_query()
         query = self._filter_tenant_uuid(query)
-        rows, total = await self.search_system.search_from_query(
+        return await self.search_system.search_from_query(
             self.session, query, parameters
         )
-        return SearchResult(total, rows)
 
     async def create(self, iax: IAX) -> IAX:
         """Create a new IAX endpoint.
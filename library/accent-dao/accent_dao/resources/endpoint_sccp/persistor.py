@@ -91,10 +91,9 @@ class SCCPPersistor(CriteriaBuilderMixin, AsyncBasePersistor[SCCP]):
         """
         query = await self._search_query()
         query = self._filter_tenant_uuid(query)
-        rows, total = await self.search_system.search_from_query(
+        return await self.search_system.search_from_query(
             self.session, query, parameters
         )
-        return SearchResult(total, rows)
 
     async def _search_query(self) -> Any:
         """Create a query for searching SCCP endpoints.
@@ -54,8 +54,8 @@ class ExtensionPersistor(CriteriaBuilderMixin, AsyncBasePersistor[Extension]):
         query = self._filter_tenant_uuid(query)
         return self.build_criteria(query, criteria)
 
-    async def _search_query(self) -> Any:
-        """Create a query for searching extensions."""
+    async def _search_stmt(self) -> Any:
+        """Create a statement for searching extensions."""
         return select(self.search_system.config.table)
 
     async def get_by(self, criteria: dict[str, Any]) -> Extension:
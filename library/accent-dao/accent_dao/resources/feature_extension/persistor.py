@@ -86,10 +86,9 @@ class FeatureExtensionPersistor(
 
         """
         query = await self._search_query()
-        rows, total = await feature_extension_search.search_from_query(
+        return await feature_extension_search.search_from_query(
             self.session, query, parameters
         )
-        return SearchResult(total, rows)
 
     async def _search_query(self) -> Any:
         """Create a query for searching feature extensions.
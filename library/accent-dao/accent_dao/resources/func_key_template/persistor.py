@@ -32,7 +32,7 @@ from accent_dao.resources.extension.database import (
     ForwardExtensionConverter,
     GroupMemberActionExtensionConverter,
 )
-from accent_dao.resources.utils.search import SearchResult
+from accent_dao.resources.utils.search import SearchPage
 
 from ...alchemy.feature_extension import FeatureExtension
 from .search import template_search
@@ -76,10 +76,10 @@ class FuncKeyPersistor:
     def search(self, parameters):
         query = self.session.query(FuncKeyTemplate.id)
         query = self._filter_tenant_uuid(query)
-        rows, total = self.template_search.search_from_query(query, parameters)
+        page = self.template_search.search_from_query(query, parameters)
 
-        items = [self.get(row.id) for row in rows]
-        return SearchResult(total=total, items=items)
+        items = [self.get(row.id) for row in page.items]
+        return SearchPage(page.total, items, page.next_cursor)
 
     def create(self, template):
         template = self.add_template(template)
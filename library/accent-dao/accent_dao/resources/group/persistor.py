@@ -88,10 +88,9 @@ class GroupPersistor(CriteriaBuilderMixin, AsyncBasePersistor[Group]):
         """
         query = await self._search_query()
         query = self._filter_tenant_uuid(query)
-        rows, total = await self.search_system.search_from_query(
+        return await self.search_system.search_from_query(
             self.session, query, parameters
         )
-        return SearchResult(total, rows)
 
     async def find_all_by(self, criteria: dict[str, Any]) -> list[Group]:
         """Find all Group by criteria.
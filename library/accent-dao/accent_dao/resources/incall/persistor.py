@@ -86,10 +86,9 @@ class IncallPersistor(CriteriaBuilderMixin, AsyncBasePersistor[Incall]):
         """
         query = await self._search_query()
         query = self._filter_tenant_uuid(query)
-        rows, total = await self.search_system.search_from_query(
+        return await self.search_system.search_from_query(
             self.session, query, parameters
         )
-        return SearchResult(total, rows)
 
     async def find_all_by(self, criteria: dict[str, Any]) -> list[Incall]:
         """Find all InCall by criteria.
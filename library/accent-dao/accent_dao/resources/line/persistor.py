@@ -55,6 +55,10 @@ class LinePersistor(CriteriaBuilderMixin, AsyncBasePersistor[LineFeatures]):
         query = self._filter_tenant_uuid(query)
         return self.build_criteria(query, criteria)
 
+    async def _search_stmt(self) -> Any:
+        """Create a statement for searching lines."""
+        return select(self.search_system.config.table)
+
     async def get_by(self, criteria: dict[str, Any]) -> LineFeatures:
         """Retrieve a single line by criteria.
 
@@ -118,10 +118,9 @@ class TrunkPersistor(CriteriaBuilderMixin, AsyncBasePersistor[Trunk]):
         """
         query = await self._search_query()
         query = self._filter_tenant_uuid(query)
-        rows, total = await self.search_system.search_from_query(
+        return await self.search_system.search_from_query(
             self.session, query, parameters
         )
-        return SearchResult(total, rows)
 
     async def edit(self, trunk: Trunk) -> None:
         """Edit an existing trunk."""
@@ -3,7 +3,14 @@
 
 from __future__ import annotations
 
+import base64
+import binascii
+import datetime
+import decimal
+import json
 import logging
+import operator
+import uuid
 from typing import TYPE_CHECKING, Any, NamedTuple, TypeVar
 
 import sqlalchemy as sa
@@ -33,10 +40,38 @@ class SearchResult(NamedTuple):
 
     """
 
-    total: int
+    total: int | None
     items: list[Any]
 
 
+class SearchPage(SearchResult):
+    """A search result along with the cursor of the next page.
+
+    It unpacks as a `SearchResult`, so the callers that only read the total
+    and the items are unchanged.
+
+    Attributes:
+        next_cursor: The opaque cursor to pass to get the next page, or None
+            on the last page.
+
+    """
+
+    def __new__(
+        cls, total: int | None, items: list[Any], next_cursor: str | None = None
+    ) -> SearchPage:
+        """Create the page.
+
+        Args:
+            total: The number of records, None when it was not counted.
+            items: The records of the page.
+            next_cursor: The cursor of the next page.
+
+        """
+        page = super().__new__(cls, total, items)
+        page.next_cursor = next_cursor
+        return page
+
+
 class unaccent(ReturnTypeFromArgs):  # noqa: N801
     """Custom SQL function for unaccenting strings."""
 
@@ -130,6 +165,21 @@ class SearchConfig:
         column_name = self._get_sort_column_name(name)
         return self._columns[column_name]
 
+    def key_columns(self) -> list:
+        """Return the primary key columns of the table, used to break ties.
+
+        Returns:
+            The primary key attributes, empty if the table is not mapped.
+
+        """
+        mapper = sa.inspect(self.table, raiseerr=False)
+        if mapper is None or not hasattr(mapper, "get_property_by_column"):
+            return []
+        return [
+            getattr(self.table, mapper.get_property_by_column(column).key)
+            for column in mapper.primary_key
+        ]
+
     def _get_sort_column_name(self, name: str | None = None) -> str:
         """Get the column name for sorting, handling default and validation."""
         name = name or self._default_sort
@@ -187,9 +237,20 @@ class CriteriaBuilderMixin:
 class SearchSystem:
     """System for performing search queries with pagination and sorting.
 
+    Besides limit/offset, the pages can be walked with the opaque `cursor`
+    returned as `next_cursor`, which seeks after the last row of the previous
+    page on the sort column and the primary key instead of skipping rows.
+
+    The `count` parameter chooses how the total is computed: "exact" counts
+    every matching row, "estimate" and "skip" count at most `count_threshold`
+    rows, then return the planner estimate or None respectively.
+
     Attributes:
         config: SearchConfig object defining the search configuration.
+        count_threshold: The number of rows counted in the "estimate" and
+            "skip" count modes.
         SORT_DIRECTIONS: Mapping of string direction names to SQLAlchemy functions.
+        COUNT_MODES: The accepted values of the `count` parameter.
         DEFAULTS: Default values for search parameters.
 
     """
@@ -199,22 +260,29 @@ class SearchSystem:
         "desc": sa.desc,
     }
 
+    COUNT_MODES = ("exact", "estimate", "skip")
+
     DEFAULTS: dict[str, None | str | int] = {
         "search": None,
         "order": None,
         "direction": "asc",
         "limit": None,
         "offset": 0,
+        "cursor": None,
+        "count": "exact",
     }
 
-    def __init__(self, config: SearchConfig) -> None:
+    def __init__(self, config: SearchConfig, count_threshold: int = 10000) -> None:
         """Initialize the SearchSystem.
 
         Args:
             config: SearchConfig object.
+            count_threshold: The number of rows counted before estimating or
+                skipping the total.
 
         """
         self.config = config
+        self.count_threshold = count_threshold
 
     def search(
         self,
@@ -269,11 +337,10 @@ class SearchSystem:
         self._validate_parameters(parameters)
         query = self._filter(query, parameters["search"])
         query = self._filter_exact_match(query, parameters)
-        sorted_query = self._sort(query, parameters["order"], parameters["direction"])
-        paginated_query = self._paginate(
-            sorted_query, parameters["limit"], parameters["offset"]
-        )
-        return SearchResult(sorted_query.count(), paginated_query.all())
+        total = self._count(query, parameters["count"])
+        paginated_query = self._page_query(query, parameters)
+        items = paginated_query.all()
+        return SearchPage(total, items, self._next_cursor(items, parameters))
 
     async def search_from_query(
         self,
@@ -295,28 +362,12 @@ class SearchSystem:
         self._validate_parameters(parameters)
         query = self._filter(query, parameters["search"])
         query = self._filter_exact_match(query, parameters)
+        total = await self._async_count(session, query, parameters["count"])
 
-        # Apply sorting
-        sort_column_name = parameters["order"]
-        sort_direction = parameters["direction"]
-        query = self._sort(query, sort_column_name, sort_direction)
-
-        # Apply pagination
-        limit = parameters["limit"]
-        offset = parameters["offset"]
-        query = self._paginate(query, limit, offset)
-
-        # Execute count and fetch queries concurrently using asyncio.gather
-        count_query = sa.select(func.count()).select_from(query.subquery())
-        count_task = session.execute(count_query)
-
-        # Fetch the rows with the limit and offset using await
-        result = await session.execute(query)
+        result = await session.execute(self._page_query(query, parameters))
         rows = result.scalars().all()
 
-        total = (await count_task).scalar_one()
-
-        return SearchResult(total, rows)
+        return SearchPage(total, rows, self._next_cursor(rows, parameters))
 
     def _populate_parameters(
         self, parameters: dict[str, Any] | None = None
@@ -354,6 +405,12 @@ class SearchSystem:
         if parameters["direction"] not in self.SORT_DIRECTIONS:
             raise errors.invalid_direction(parameters["direction"])
 
+        if parameters["count"] not in self.COUNT_MODES:
+            raise errors.invalid_choice("count", list(self.COUNT_MODES))
+
+        if parameters["cursor"] is not None and parameters["offset"]:
+            raise errors.invalid_query_parameter("offset", parameters["offset"])
+
     def _filter(self, query: Any, term: str | None = None) -> Any:
         """Apply full-text search filtering to the query.
 
@@ -421,8 +478,15 @@ class SearchSystem:
         """
         column = self.config.column_for_sorting(order)
         direction_func = self.SORT_DIRECTIONS[direction]
-
-        return query.order_by(direction_func(column))
+        # The NULL values are placed as PostgreSQL does by default, which the
+        # cursors rely on, and the primary key makes the order total, for the
+        # pages to be stable
+        nulls = sa.nulls_last if direction == "asc" else sa.nulls_first
+        keys = [key for key in self.config.key_columns() if key is not column]
+
+        return query.order_by(
+            nulls(direction_func(column)), *(direction_func(key) for key in keys)
+        )
 
     def _paginate(self, query: Any, limit: int | None = None, offset: int = 0) -> Any:
         """Apply pagination to the query.
@@ -443,3 +507,215 @@ class SearchSystem:
             query = query.limit(limit)
 
         return query
+
+    def _page_query(self, query: Any, parameters: dict[str, Any]) -> Any:
+        """Sort the query and restrict it to the requested page.
+
+        Args:
+            query: SQLAlchemy query object.
+            parameters: Dictionary of search parameters.
+
+        Returns:
+            The query of the page.
+
+        """
+        order, direction = parameters["order"], parameters["direction"]
+        if parameters["cursor"] is not None:
+            query = self._seek(query, order, direction, parameters["cursor"])
+        query = self._sort(query, order, direction)
+        return self._paginate(query, parameters["limit"], parameters["offset"])
+
+    def _seek(self, query: Any, order: str | None, direction: str, cursor: str) -> Any:
+        """Keep the rows after the cursor, in the sort order.
+
+        The NULL values are sorted last in ascending order and first in
+        descending order, so they are after, respectively before, any value.
+
+        Args:
+            query: SQLAlchemy query object.
+            order: Column name to sort by.
+            direction: Sort direction ('asc' or 'desc').
+            cursor: The cursor of the page.
+
+        Returns:
+            The filtered query.
+
+        """
+        column = self.config.column_for_sorting(order)
+        keys = self.config.key_columns()
+        value, key_values = self._decode_cursor(cursor, order, direction)
+        value = _load_value(column, value)
+        key_values = [_load_value(key, v) for key, v in zip(keys, key_values)]
+
+        after = operator.gt if direction == "asc" else operator.lt
+        key_after = after(sa.tuple_(*keys), sa.tuple_(*key_values))
+        if value is None:
+            if direction == "asc":
+                return query.filter(sql.and_(column.is_(None), key_after))
+            return query.filter(
+                sql.or_(column.is_not(None), sql.and_(column.is_(None), key_after))
+            )
+
+        criteria = sql.or_(after(column, value), sql.and_(column == value, key_after))
+        if direction == "asc":
+            criteria = sql.or_(criteria, column.is_(None))
+        return query.filter(criteria)
+
+    def _next_cursor(self, items: list[Any], parameters: dict[str, Any]) -> str | None:
+        """Return the cursor of the page after the items, None on the last page."""
+        limit = parameters["limit"]
+        if not limit or len(items) < limit:
+            return None
+
+        order, direction = parameters["order"], parameters["direction"]
+        column = self.config.column_for_sorting(order)
+        keys = self.config.key_columns()
+        if not keys:
+            return None
+        try:
+            value = _item_value(items[-1], column)
+            key_values = [_item_value(items[-1], key) for key in keys]
+            return self._encode_cursor(order, direction, value, key_values)
+        except (AttributeError, KeyError, TypeError):
+            logger.debug("no cursor for the sort column '%s'", order)
+            return None
+
+    def _encode_cursor(
+        self, order: str | None, direction: str, value: Any, key_values: list[Any]
+    ) -> str:
+        """Return the opaque cursor of the row having these values."""
+        payload = [order or None, direction, value, key_values]
+        data = json.dumps(payload, default=_dump_value, separators=(",", ":"))
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+    def _decode_cursor(
+        self, cursor: str, order: str | None, direction: str
+    ) -> tuple[Any, list[Any]]:
+        """Return the sort value and the key values of a cursor.
+
+        Raises:
+            InputError: If the cursor is malformed or was returned for another
+                order or direction.
+
+        """
+        try:
+            data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            cursor_order, cursor_direction, value, key_values = json.loads(data)
+        except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+            raise errors.invalid_query_parameter("cursor", cursor) from None
+
+        keys = self.config.key_columns()
+        if (
+            cursor_order != (order or None)
+            or cursor_direction != direction
+            or not keys
+            or not isinstance(key_values, list)
+            or len(key_values) != len(keys)
+        ):
+            raise errors.invalid_query_parameter("cursor", cursor)
+        return value, key_values
+
+    def _count(self, query: Any, mode: str) -> int | None:
+        """Count the rows of the query according to the count mode.
+
+        Args:
+            query: SQLAlchemy query object, not paginated.
+            mode: One of COUNT_MODES.
+
+        Returns:
+            The number of rows, estimated or None beyond `count_threshold`.
+
+        """
+        query = query.order_by(None)
+        if mode == "exact":
+            return query.count()
+
+        total = query.limit(self.count_threshold + 1).count()
+        if total <= self.count_threshold:
+            return total
+        if mode == "skip":
+            return None
+
+        connection = query.session.connection()
+        compiled = query.statement.compile(dialect=connection.dialect)
+        plan = connection.exec_driver_sql(*_explain(compiled)).scalar()
+        return self._estimated_total(plan)
+
+    async def _async_count(
+        self, session: AsyncSession, query: Any, mode: str
+    ) -> int | None:
+        """Async count the rows of the query according to the count mode.
+
+        Args:
+            session: SQLAlchemy AsyncSession object.
+            query: SQLAlchemy select statement, not paginated.
+            mode: One of COUNT_MODES.
+
+        Returns:
+            The number of rows, estimated or None beyond `count_threshold`.
+
+        """
+        query = query.order_by(None)
+        if mode == "exact":
+            count_query = select(func.count()).select_from(query.subquery())
+            return (await session.execute(count_query)).scalar_one()
+
+        capped = query.limit(self.count_threshold + 1).subquery()
+        count_query = select(func.count()).select_from(capped)
+        total = (await session.execute(count_query)).scalar_one()
+        if total <= self.count_threshold:
+            return total
+        if mode == "skip":
+            return None
+
+        connection = await session.connection()
+        compiled = query.compile(dialect=connection.dialect)
+        plan = (await connection.exec_driver_sql(*_explain(compiled))).scalar()
+        return self._estimated_total(plan)
+
+    def _estimated_total(self, plan: Any) -> int:
+        """Return the rows estimated by the planner, at least the rows counted."""
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        return max(estimate, self.count_threshold + 1)
+
+
+def _explain(compiled: Any) -> tuple[str, Any]:
+    """Return the EXPLAIN statement of a compiled query and its parameters."""
+    params = compiled.params
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+    return f"EXPLAIN (FORMAT JSON) {compiled}", params
+
+
+def _item_value(item: Any, column: Any) -> Any:
+    """Return the value of a column for a result item, a row or an entity."""
+    mapping = getattr(item, "_mapping", None)
+    if mapping is not None:
+        return mapping[column]
+    return getattr(item, column.key)
+
+
+def _dump_value(value: Any) -> str:
+    """Serialize the cursor values that JSON does not support."""
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} cannot be used in a cursor")
+
+
+def _load_value(column: Any, value: Any) -> Any:
+    """Convert a cursor value back to the type of its column."""
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except (AttributeError, NotImplementedError):
+        return value
+    if python_type in (datetime.datetime, datetime.date, datetime.time):
+        return python_type.fromisoformat(value)
+    if python_type is decimal.Decimal:
+        return decimal.Decimal(value)
+    return value
@@ -6,7 +6,7 @@
 import logging
 from datetime import datetime
 
-from sqlalchemy import delete
+from sqlalchemy import delete, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from accent_dao.alchemy.stat_agent_periodic import StatAgentPeriodic
@@ -14,6 +14,7 @@ from accent_dao.helpers.db_manager import async_daosession
 
 logger = logging.getLogger(__name__)
 
+INSERT_BATCH_SIZE = 1000
 
 
 @async_daosession
@@ -46,6 +47,38 @@ async def insert_stats(
     await session.flush()
 
 
+@async_daosession
+async def insert_periodic_stats(
+    session: AsyncSession,
+    periodic_stats: dict[datetime, dict[int, dict[str, str]]],
+) -> None:
+    """Insert the agent statistics of several periods with multi-row inserts.
+
+    Args:
+        session: The async database session
+        periodic_stats: Dictionary mapping period starts to agent statistics
+
+    """
+    rows = [
+        {
+            "time": period_start,
+            "login_time": times.get("login_time", "00:00:00"),
+            "pause_time": times.get("pause_time", "00:00:00"),
+            "wrapup_time": times.get("wrapup_time", "00:00:00"),
+            "stat_agent_id": agent_id,
+        }
+        for period_start, period_stats in periodic_stats.items()
+        for agent_id, times in period_stats.items()
+    ]
+    logger.debug("Inserting %s agent periodic stats", len(rows))
+
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        await session.execute(
+            insert(StatAgentPeriodic).values(rows[start : start + INSERT_BATCH_SIZE])
+        )
+    await session.flush()
+
+
 @async_daosession
 async def clean_table(session: AsyncSession) -> None:
     """Remove all entries from the StatAgentPeriodic table asynchronously.
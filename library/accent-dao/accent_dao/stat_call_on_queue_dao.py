@@ -3,14 +3,20 @@
 
 """Data access operations for stat_call_on_queue table."""
 
+import logging
 from datetime import datetime, timedelta
 
-from sqlalchemy import func, select, text
+from sqlalchemy import func, insert, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql.expression import between, cast, extract
 
 from accent_dao import stat_queue_dao
 from accent_dao.alchemy.stat_call_on_queue import CallExitType, StatCallOnQueue
+from accent_dao.alchemy.stat_queue import StatQueue
+
+logger = logging.getLogger(__name__)
+
+INSERT_BATCH_SIZE = 1000
 
 
 async def _add_call(  # noqa: PLR0913
@@ -45,6 +51,50 @@ async def _add_call(  # noqa: PLR0913
     await session.flush()
 
 
+async def add_calls(
+    session: AsyncSession,
+    calls: list[tuple[str, datetime, str, CallExitType, int | None]],
+) -> None:
+    """Add call records with multi-row inserts.
+
+    The calls on a queue missing from stat_queue are logged and skipped.
+
+    Args:
+        session: The database session
+        calls: (callid, time, queue_name, event, waittime) tuples
+
+    """
+    if not calls:
+        return
+
+    queue_names = {queue_name for _, _, queue_name, _, _ in calls}
+    result = await session.execute(
+        select(StatQueue.name, StatQueue.id).where(StatQueue.name.in_(queue_names))
+    )
+    queue_ids: dict[str, int] = {}
+    for name, queue_id in result.all():
+        queue_ids.setdefault(name, queue_id)
+    for queue_name in sorted(queue_names - queue_ids.keys()):
+        logger.error("No queue found with name %s", queue_name)
+
+    rows = [
+        {
+            "callid": callid,
+            "time": time,
+            "stat_queue_id": queue_ids[queue_name],
+            "status": event,
+            "waittime": waittime or None,
+        }
+        for callid, time, queue_name, event, waittime in calls
+        if queue_name in queue_ids
+    ]
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        await session.execute(
+            insert(StatCallOnQueue).values(rows[start : start + INSERT_BATCH_SIZE])
+        )
+    await session.flush()
+
+
 async def add_abandoned_call(
     session: AsyncSession, callid: str, time: datetime, queue_name: str, waittime: int
 ) -> None:
@@ -255,10 +255,9 @@ SELECT stat_agent.id AS agent,
 """
 
     start_str = start.strftime(_STR_TIME_FMT)
-    end_str = end.strftime(_STR_TIME_FMT)
 
-    # SQLAlchemy 2.0 style query
-    stmt = text(pause_in_range).bindparams(start=start_str, end=end_str)
+    # SQLAlchemy 2.0 style query, the query has no end bound
+    stmt = text(pause_in_range).bindparams(start=start_str)
     result = await session.execute(stmt)
     rows = result.all()
 
@@ -549,11 +548,10 @@ HAVING
   MAX(case when event = 'AGENTCALLBACKLOGIN' then time end) < :end
 """
 
-    start_str = start.strftime(_STR_TIME_FMT)
     end_str = end.strftime(_STR_TIME_FMT)
 
-    # SQLAlchemy 2.0 style query
-    stmt = text(query).bindparams(start=start_str, end=end_str)
+    # SQLAlchemy 2.0 style query, the query has no start bound
+    stmt = text(query).bindparams(end=end_str)
     result = await session.execute(stmt)
     rows = result.all()
 
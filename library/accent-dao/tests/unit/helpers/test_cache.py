@@ -0,0 +1,160 @@
+# Copyright 2023 Accent Communications
+
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+from hamcrest import assert_that, contains_inanyorder, equal_to, has_entries
+
+from accent_dao.helpers.cache import CacheInvalidator, CacheRegion, CacheRegistry
+from accent_dao.helpers.db_manager import cached_query
+
+
+class TestCacheRegion(unittest.TestCase):
+    def setUp(self):
+        self.region = CacheRegion('queue', depends_on=('queue',))
+
+    def test_get_counts_hits_and_misses(self):
+        self.region.set('key', 'value')
+
+        assert_that(self.region.get('key'), equal_to((True, 'value')))
+        assert_that(self.region.get('unknown'), equal_to((False, None)))
+        assert_that(self.region.stats.todict(), has_entries(hits=1, misses=1))
+
+    def test_invalidate_evicts_only_the_matching_entity(self):
+        self.region.set('queue-1', SimpleNamespace(id=1))
+        self.region.set('queue-2', SimpleNamespace(id=2))
+
+        evicted = self.region.invalidate('queue', 1)
+
+        assert_that(evicted, equal_to(1))
+        assert_that(self.region.get('queue-1')[0], equal_to(False))
+        assert_that(self.region.get('queue-2')[0], equal_to(True))
+        assert_that(self.region.stats.evictions, equal_to(1))
+
+    def test_invalidate_evicts_untagged_entries(self):
+        self.region.set('all', [SimpleNamespace(id=1), SimpleNamespace(id=2)])
+        self.region.set('missing', None)
+
+        evicted = self.region.invalidate('queue', 3)
+
+        assert_that(evicted, equal_to(2))
+
+    def test_invalidate_ignores_other_entity_types(self):
+        self.region.set('queue-1', SimpleNamespace(id=1))
+
+        evicted = self.region.invalidate('user', 1)
+
+        assert_that(evicted, equal_to(0))
+
+    def test_invalidate_with_explicit_tags(self):
+        region = CacheRegion('caller_id', depends_on=('user', 'extension'))
+        region.set('a', ('name', '1001'), [('user', 1), ('extension', 10)])
+        region.set('b', ('name', '1002'), [('user', 2)])
+
+        assert_that(region.invalidate('extension', 10), equal_to(2))
+        region.set('a', ('name', '1001'), [('user', 1), ('extension', 10)])
+        region.set('b', ('name', '1002'), [('user', 2)])
+        assert_that(region.invalidate('user', 2), equal_to(1))
+        assert_that(region.get('a')[0], equal_to(True))
+
+
+class TestCacheRegistry(unittest.TestCase):
+    def test_invalidate_all_regions_depending_on_the_type(self):
+        registry = CacheRegistry()
+        queues = registry.region('queues', depends_on=('queue',))
+        users = registry.region('users', depends_on=('user',))
+        queues.set('all', [])
+        users.set('all', [])
+
+        registry.invalidate('queue', 1)
+
+        assert_that(len(queues), equal_to(0))
+        assert_that(len(users), equal_to(1))
+        assert_that(
+            registry.stats(),
+            has_entries(
+                queues=has_entries(evictions=1, size=0),
+                users=has_entries(evictions=0, size=1),
+            ),
+        )
+
+    def test_warm(self):
+        registry = CacheRegistry()
+        sync_warmer, async_warmer = Mock(), Mock()
+
+        async def warmer():
+            async_warmer()
+
+        registry.add_warmer(sync_warmer)
+        registry.add_warmer(warmer)
+        asyncio.run(registry.warm())
+
+        sync_warmer.assert_called_once_with()
+        async_warmer.assert_called_once_with()
+
+
+class TestCacheInvalidator(unittest.TestCase):
+    def test_subscribe_to_entity_events(self):
+        registry = CacheRegistry()
+        registry.region('queues', depends_on=('queue',))
+        bus_consumer = Mock()
+
+        CacheInvalidator(registry).subscribe(bus_consumer)
+
+        names = [call.args[0] for call in bus_consumer.subscribe.call_args_list]
+        assert_that(
+            names,
+            contains_inanyorder('queue_created', 'queue_edited', 'queue_deleted'),
+        )
+
+    def test_event_evicts_entity(self):
+        registry = CacheRegistry()
+        region = registry.region('queues', depends_on=('queue',))
+        region.set('queue-1', SimpleNamespace(id=1))
+        region.set('queue-2', SimpleNamespace(id=2))
+
+        CacheInvalidator(registry).on_entity_event('queue', {'id': 2})
+
+        assert_that(region.get('queue-1')[0], equal_to(True))
+        assert_that(region.get('queue-2')[0], equal_to(False))
+
+    def test_clear(self):
+        registry = CacheRegistry()
+        region = registry.region('queues', depends_on=('queue',))
+        region.set('queue-1', SimpleNamespace(id=1))
+
+        CacheInvalidator(registry).clear()
+
+        assert_that(region.get('queue-1')[0], equal_to(False))
+
+
+class TestCachedQuery(unittest.TestCase):
+    def test_coroutine_result_is_cached(self):
+        calls = Mock()
+
+        @cached_query(region='test-coroutine', depends_on=('queue',))
+        async def get(queue_id):
+            calls(queue_id)
+            return SimpleNamespace(id=queue_id)
+
+        async def run():
+            first = await get(1)
+            second = await get(1)
+            return first, second
+
+        first, second = asyncio.run(run())
+
+        assert_that(first, equal_to(second))
+        calls.assert_called_once_with(1)
+
+    def test_list_arguments(self):
+        @cached_query(region='test-list', depends_on=('queue',))
+        def get_all(tenant_uuids):
+            return []
+
+        get_all(['tenant'])
+        get_all(['tenant'])
+
+        assert_that(get_all.cache_region.stats.hits, equal_to(1))
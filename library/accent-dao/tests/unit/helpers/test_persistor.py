@@ -0,0 +1,54 @@
+# Copyright 2023 Accent Communications
+
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, Mock, sentinel
+
+from hamcrest import assert_that, equal_to, same_instance
+
+from accent_dao.helpers.persistor import AsyncBasePersistor, BasePersistor
+from accent_dao.resources.utils.search import SearchPage
+
+
+class Persistor(BasePersistor):
+    def _search_query(self):
+        return sentinel.query
+
+
+class AsyncPersistor(AsyncBasePersistor):
+    async def _search_stmt(self):
+        return sentinel.stmt
+
+
+class TestBasePersistorSearch(unittest.TestCase):
+    def test_the_page_is_returned_with_its_cursor(self):
+        page = SearchPage(12, [sentinel.row], 'next-page')
+        search_system = Mock(search_from_query=Mock(return_value=page))
+        persistor = Persistor(Mock(), Mock(), search_system=search_system)
+
+        result = persistor.search({'limit': 1})
+
+        assert_that(result, same_instance(page))
+        assert_that(result.total, equal_to(12))
+        assert_that(result.items, equal_to([sentinel.row]))
+        assert_that(result.next_cursor, equal_to('next-page'))
+        search_system.search_from_query.assert_called_once_with(
+            sentinel.query, {'limit': 1}
+        )
+
+
+class TestAsyncBasePersistorSearch(unittest.TestCase):
+    def test_the_page_is_returned_with_its_cursor(self):
+        page = SearchPage(12, [sentinel.row], 'next-page')
+        search_system = Mock(search_from_query=AsyncMock(return_value=page))
+        session = Mock()
+        persistor = AsyncPersistor(session, Mock(), search_system=search_system)
+
+        result = asyncio.run(persistor.search({'limit': 1}))
+
+        assert_that(result, same_instance(page))
+        assert_that(result.total, equal_to(12))
+        assert_that(result.next_cursor, equal_to('next-page'))
+        search_system.search_from_query.assert_awaited_once_with(
+            session, sentinel.stmt, {'limit': 1}
+        )
@@ -7,6 +7,7 @@ from unittest.mock import Mock, sentinel as s
 from hamcrest import assert_that
 from hamcrest import calling
 from hamcrest import equal_to
+from hamcrest import greater_than
 from hamcrest import contains
 from hamcrest import contains_inanyorder
 from hamcrest import has_length
@@ -314,6 +315,83 @@ class TestSearchSystem(DAOTestCase):
         assert_that(total, equal_to(2))
         assert_that(rows, contains_exactly(user_row2, user_row3))
 
+    def test_given_cursor_then_returns_rows_after_previous_page(self):
+        user_row1 = self.add_user(lastname='Abigale')
+        user_row2 = self.add_user(lastname='Doe')
+        user_row3 = self.add_user(lastname='Doe')
+        user_row4 = self.add_user(lastname=None)
+
+        first_page = self.search.search(self.session, {'limit': 2})
+        second_page = self.search.search(
+            self.session, {'limit': 2, 'cursor': first_page.next_cursor}
+        )
+
+        assert_that(first_page.items, contains_exactly(user_row1, user_row2))
+        assert_that(second_page.items, contains_exactly(user_row3, user_row4))
+        assert_that(second_page.total, equal_to(4))
+
+    def test_given_cursor_and_direction_then_returns_rows_after_previous_page(self):
+        user_row1 = self.add_user(lastname='Abigale')
+        user_row2 = self.add_user(lastname='Zintrabi')
+        user_row3 = self.add_user(lastname=None)
+
+        first_page = self.search.search(self.session, {'limit': 2, 'direction': 'desc'})
+        second_page = self.search.search(
+            self.session,
+            {'limit': 2, 'direction': 'desc', 'cursor': first_page.next_cursor},
+        )
+
+        assert_that(first_page.items, contains_exactly(user_row3, user_row2))
+        assert_that(second_page.items, contains_exactly(user_row1))
+        assert_that(second_page.next_cursor, equal_to(None))
+
+    def test_given_cursor_of_another_order_then_raises_error(self):
+        self.add_user()
+        self.add_user()
+        page = self.search.search(self.session, {'limit': 1})
+
+        self.assert_search_raises_exception(
+            InputError,
+            f"Input Error - parameter 'cursor': '{page.next_cursor}' is not valid",
+            order='firstname',
+            cursor=page.next_cursor,
+        )
+
+    def test_given_count_skip_beyond_threshold_then_total_is_none(self):
+        search = SearchSystem(self.config, count_threshold=1)
+        self.add_user()
+        self.add_user()
+
+        result = search.search(self.session, {'count': 'skip', 'limit': 1})
+
+        assert_that(result.total, equal_to(None))
+        assert_that(result.items, has_length(1))
+
+    def test_given_count_estimate_beyond_threshold_then_total_is_estimated(self):
+        search = SearchSystem(self.config, count_threshold=1)
+        self.add_user()
+        self.add_user()
+
+        result = search.search(self.session, {'count': 'estimate'})
+
+        assert_that(result.total, greater_than(1))
+        assert_that(result.items, has_length(2))
+
+    def test_given_count_estimate_below_threshold_then_total_is_exact(self):
+        self.add_user()
+        self.add_user()
+
+        result = self.search.search(self.session, {'count': 'estimate'})
+
+        assert_that(result.total, equal_to(2))
+
+    def test_when_invalid_count(self):
+        self.assert_search_raises_exception(
+            InputError,
+            "Input Error - 'count' must be one of (exact, estimate, skip)",
+            count='invalid',
+        )
+
     def test_when_invalid_column(self):
         self.assert_search_raises_exception(
             InputError,
@@ -7,6 +7,7 @@ from hamcrest import assert_that, has_length, empty, contains_inanyorder
 from pytz import UTC
 
 from accent_dao import queue_log_dao
+from accent_dao.alchemy.context import Context
 from accent_dao.alchemy.stat_agent import StatAgent
 from accent_dao.alchemy.queue_log import QueueLog
 from accent_dao.helpers.db_utils import flush_session
@@ -152,6 +153,34 @@ class TestQueueLogDAO(DAOTestCase):
 
         self.assertEqual(result, queue_names)
 
+    def test_get_agent_events_after_multitenant(self):
+        tenant_1 = self.add_tenant()
+        tenant_2 = self.add_tenant()
+        self.add_me(Context(name='ctx_1', tenant_uuid=tenant_1.uuid))
+        _, agent_id_1 = self._insert_agent('Agent/1001', tenant_1.uuid)
+        _, agent_id_2 = self._insert_agent('Agent/1001', tenant_2.uuid)
+        t = datetime(2012, 1, 1, 1, 0, 0, tzinfo=UTC)
+        self._insert_entry_queue(
+            'AGENTCALLBACKLOGIN', self._build_timestamp(t), 'NONE', 'NONE', 'Agent/1001',
+            d1='1001@ctx_1',
+        )
+        self._insert_entry_queue(
+            'AGENTCALLBACKLOGOFF', self._build_timestamp(t + ONE_HOUR), 'NONE', 'NONE', 'Agent/1001',
+            d1='1001@ctx_1', d2='3600',
+        )
+
+        result = queue_log_dao.get_agent_events_after(self.session, 0, t + ONE_HOUR)
+
+        assert_that(
+            [(row.event, row.agent, row.counted) for row in result],
+            contains_inanyorder(
+                ('AGENTCALLBACKLOGIN', agent_id_1, False),
+                ('AGENTCALLBACKLOGIN', agent_id_2, False),
+                ('AGENTCALLBACKLOGOFF', agent_id_1, True),
+                ('AGENTCALLBACKLOGOFF', agent_id_2, False),
+            ),
+        )
+
     def test_get_queue_abandoned_call(self):
         start = datetime(2012, 1, 1, 1, 0, 0, tzinfo=UTC)
         expected = self._insert_abandon(start, [-1, 0, 10, 30, 59, 60, 120])
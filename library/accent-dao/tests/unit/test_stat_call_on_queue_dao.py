@@ -106,6 +106,40 @@ class TestStatCallOnQueueDAO(DAOTestCase):
         self.assertEqual(res[0].callid, 'callid')
         self.assertEqual(res[0].waittime, 27)
 
+    def test_add_calls(self):
+        timestamp = dt(2012, 1, 2, 0, 0, 0, tzinfo=UTC)
+        queue_name, queue_id = self._insert_queue_to_stat_queue()
+
+        stat_call_on_queue_dao.add_calls(
+            self.session,
+            [
+                ('callid1', timestamp, queue_name, 'abandoned', 42),
+                ('callid2', timestamp, queue_name, 'timeout', 27),
+            ],
+        )
+        res = self.session.query(StatCallOnQueue).order_by(StatCallOnQueue.callid)
+
+        self.assertEqual([call.callid for call in res], ['callid1', 'callid2'])
+        self.assertEqual([call.stat_queue_id for call in res], [queue_id, queue_id])
+        self.assertEqual([call.waittime for call in res], [42, 27])
+
+    def test_add_calls_skips_unknown_queues(self):
+        timestamp = dt(2012, 1, 2, 0, 0, 0, tzinfo=UTC)
+        queue_name, queue_id = self._insert_queue_to_stat_queue()
+
+        stat_call_on_queue_dao.add_calls(
+            self.session,
+            [
+                ('callid1', timestamp, 'unknown_queue', 'abandoned', 42),
+                ('callid2', timestamp, queue_name, 'abandoned', 13),
+            ],
+        )
+        res = self.session.query(StatCallOnQueue)
+
+        self.assertEqual(res.count(), 1)
+        self.assertEqual(res[0].callid, 'callid2')
+        self.assertEqual(res[0].stat_queue_id, queue_id)
+
     def test_get_periodic_stats_full(self):
         start = dt(2012, 1, 1, 0, 0, 0, tzinfo=UTC)
         end = dt(2012, 1, 1, 3, 0, 0, tzinfo=UTC)
@@ -4,9 +4,14 @@ from __future__ import annotations
 
 import logging
 import re
+import threading
+import time
+from collections import OrderedDict
 from collections.abc import Callable
+from datetime import datetime, timezone
 from typing import TYPE_CHECKING, Any, NamedTuple, TypeVar
 
+import httpx
 import requests
 from accent_auth_client import exceptions
 
@@ -55,7 +60,117 @@ def required_tenant(tenant_uuid: str) -> Callable[[F], F]:
     return wrapper
 
 
+class CachedToken(NamedTuple):
+    session_uuid: str | None
+    tenant_uuid: str | None
+    expires_at: float
+    access: AccessCheck
+
+
+class TokenCache:
+    """Bounded LRU of introspected tokens, keyed by token UUID.
+
+    Entries keep what is needed to authorize a request locally: the token
+    tenant, its expiration and a compiled ``AccessCheck``. An entry is dropped
+    when the token expires, when ``max_ttl`` elapses (so a missed revocation
+    does not live forever) or when its session is deleted on the bus.
+    """
+
+    DEFAULT_MAX_SIZE = 4096
+    DEFAULT_MAX_TTL = 60
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_MAX_SIZE,
+        max_ttl: float = DEFAULT_MAX_TTL,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._max_size = max_size
+        self._max_ttl = max_ttl
+        self._clock = clock
+        self._tokens: OrderedDict[str, CachedToken] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def get(self, token_uuid: str) -> CachedToken | None:
+        with self._lock:
+            cached = self._tokens.get(token_uuid)
+            if cached is None:
+                return None
+            if cached.expires_at <= self._clock():
+                del self._tokens[token_uuid]
+                return None
+            self._tokens.move_to_end(token_uuid)
+            return cached
+
+    def put(self, token_uuid: str, token: dict[str, Any]) -> CachedToken:
+        metadata = token.get("metadata") or {}
+        session_uuid = token.get("session_uuid")
+        session_uuid = str(session_uuid) if session_uuid else None
+        tenant_uuid = metadata.get("tenant_uuid")
+        cached = CachedToken(
+            session_uuid=session_uuid,
+            tenant_uuid=str(tenant_uuid) if tenant_uuid else None,
+            expires_at=self._expires_at(token),
+            access=AccessCheck(
+                token.get("auth_id", ""), session_uuid or "", token.get("acl") or []
+            ),
+        )
+        with self._lock:
+            self._tokens[token_uuid] = cached
+            self._tokens.move_to_end(token_uuid)
+            while len(self._tokens) > self._max_size:
+                self._tokens.popitem(last=False)
+        return cached
+
+    def invalidate(self, token_uuid: str) -> None:
+        with self._lock:
+            self._tokens.pop(token_uuid, None)
+
+    def invalidate_session(self, session_uuid: str) -> None:
+        with self._lock:
+            expired = [
+                token_uuid
+                for token_uuid, cached in self._tokens.items()
+                if cached.session_uuid == session_uuid
+            ]
+            for token_uuid in expired:
+                del self._tokens[token_uuid]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tokens.clear()
+
+    def subscribe(self, bus_consumer: Any) -> None:
+        bus_consumer.subscribe("auth_session_deleted", self.on_session_deleted)
+
+    def on_session_deleted(self, event: dict[str, Any]) -> None:
+        session_uuid = event.get("uuid")
+        if session_uuid:
+            logger.debug("Dropping cached tokens of session %s", session_uuid)
+            self.invalidate_session(str(session_uuid))
+
+    def _expires_at(self, token: dict[str, Any]) -> float:
+        ttl_limit = self._clock() + self._max_ttl
+        utc_expires_at = token.get("utc_expires_at")
+        if not utc_expires_at:
+            return ttl_limit
+        try:
+            expires_at = datetime.fromisoformat(str(utc_expires_at))
+        except ValueError:
+            logger.debug("Unparsable token expiration: %s", utc_expires_at)
+            return ttl_limit
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        return min(expires_at.timestamp(), ttl_limit)
+
+
 class AuthVerifierHelpers:
+    def __init__(self, token_cache: TokenCache | None = None) -> None:
+        self.token_cache = token_cache
+
     def extract_acl_check(self, func: Callable[..., R]) -> _ACLCheck:
         # backward compatibility: when func.acl is not defined, it should
         # probably just raise an AttributeError
@@ -74,6 +189,35 @@ class AuthVerifierHelpers:
         token_uuid: str,
         required_acl: str,
         tenant_uuid: str | None,
+    ) -> None:
+        token_cache = self.token_cache
+        if token_cache is None:
+            return self._check_token(auth_client, token_uuid, required_acl, tenant_uuid)
+
+        cached = token_cache.get(token_uuid)
+        if cached is None:
+            token = self._introspect_token(auth_client, token_uuid, required_acl)
+            cached = token_cache.put(token_uuid, token)
+
+        if tenant_uuid and tenant_uuid != cached.tenant_uuid:
+            # Sub-tenant visibility is only known by accent-auth
+            return self._check_token(auth_client, token_uuid, required_acl, tenant_uuid)
+
+        if not cached.access.matches_required_access(required_acl or None):
+            raise MissingPermissionsTokenAPIException(
+                token_uuid,
+                required_acl,
+                tenant_uuid,
+            )
+
+        return None
+
+    def _check_token(
+        self,
+        auth_client: AuthClient,
+        token_uuid: str,
+        required_acl: str,
+        tenant_uuid: str | None,
     ) -> None:
         try:
             token_is_valid = auth_client.token.check(
@@ -97,6 +241,18 @@ class AuthVerifierHelpers:
 
         return None
 
+    def _introspect_token(
+        self, auth_client: AuthClient, token_uuid: str, required_acl: str
+    ) -> dict[str, Any]:
+        try:
+            return auth_client.token.get(token_uuid)
+        except httpx.HTTPStatusError as error:
+            if error.response.status_code == 404:
+                raise InvalidTokenAPIException(token_uuid, required_acl)
+            raise AuthServerUnreachable(auth_client.host, auth_client.port, error)
+        except (httpx.HTTPError, requests.RequestException) as error:
+            raise AuthServerUnreachable(auth_client.host, auth_client.port, error)
+
     def extract_required_tenant(self, func: Callable[..., R]) -> str | None:
         return getattr(func, "tenant_uuid", None)
 
@@ -116,32 +272,145 @@ class AuthVerifierHelpers:
         return str(acl_check.pattern).format(**escaped_kwargs)
 
 
+class _ACLNode:
+    __slots__ = ("children", "hash", "loops", "star", "terminal")
+
+    def __init__(self, loops: bool = False) -> None:
+        self.children: dict[str, _ACLNode] = {}
+        self.star: _ACLNode | None = None
+        self.hash: _ACLNode | None = None
+        self.loops = loops
+        self.terminal = False
+
+
+class _ACLMatcher:
+    """Dot-segment trie over a list of accesses, matched as an NFA.
+
+    A ``*`` segment matches exactly one segment without ``#`` and a ``#``
+    segment matches one or more segments, which is what the regexes built by
+    ``AccessCheck._transform_access_to_regex`` accept. Accesses using
+    wildcards inside a segment (e.g. ``foo.bar*``) or reserved words whose
+    value is not a plain identifier keep using their regex.
+    """
+
+    _PLAIN_VALUE = re.compile(r"[\w-]*")
+
+    def __init__(self, auth_id: str, session_id: str, accesses: list[str]) -> None:
+        self._auth_id = auth_id
+        self._session_id = session_id
+        self._accesses = accesses
+        self._root = _ACLNode()
+        self._regexes: list[re.Pattern] = []
+        self._reserved_words = {
+            word: value
+            for word, value in (("me", auth_id), ("my_session", session_id))
+            if self._PLAIN_VALUE.fullmatch(value)
+        }
+        for access in accesses:
+            if not self._add(access):
+                self._regexes.append(self._to_regex(access))
+
+    def matches(self, required_access: str) -> bool:
+        if "\n" in required_access:
+            # "$" also matches before a trailing newline, leave it to the regexes
+            return any(
+                self._to_regex(access).match(required_access)
+                for access in self._accesses
+            )
+        if self._match_trie(required_access):
+            return True
+        return any(regex.match(required_access) for regex in self._regexes)
+
+    def _to_regex(self, access: str) -> re.Pattern:
+        return AccessCheck._transform_access_to_regex(
+            self._auth_id, self._session_id, access
+        )
+
+    def _add(self, access: str) -> bool:
+        if "\\" in access or "\n" in access:
+            return False
+
+        segments = access.split(".")
+        for segment in segments:
+            if segment in ("*", "#"):
+                continue
+            if "*" in segment or "#" in segment:
+                return False
+            if segment in ("me", "my_session") and segment not in self._reserved_words:
+                return False
+
+        nodes = [self._root]
+        for segment in segments:
+            alternatives = [segment]
+            if segment in self._reserved_words:
+                alternatives.append(self._reserved_words[segment])
+            nodes = [self._child(node, alt) for node in nodes for alt in alternatives]
+        for node in nodes:
+            node.terminal = True
+        return True
+
+    @staticmethod
+    def _child(node: _ACLNode, segment: str) -> _ACLNode:
+        if segment == "*":
+            if node.star is None:
+                node.star = _ACLNode()
+            return node.star
+        if segment == "#":
+            if node.hash is None:
+                node.hash = _ACLNode(loops=True)
+            return node.hash
+        return node.children.setdefault(segment, _ACLNode())
+
+    def _match_trie(self, required_access: str) -> bool:
+        states = [self._root]
+        for segment in required_access.split("."):
+            next_states: dict[int, _ACLNode] = {}
+            for node in states:
+                if node.loops:
+                    next_states[id(node)] = node
+                if node.hash is not None:
+                    next_states[id(node.hash)] = node.hash
+                if node.star is not None and "#" not in segment:
+                    next_states[id(node.star)] = node.star
+                child = node.children.get(segment)
+                if child is not None:
+                    next_states[id(child)] = child
+            if not next_states:
+                return False
+            states = list(next_states.values())
+        return any(node.terminal for node in states)
+
+
 class AccessCheck:
+    _MEMO_SIZE = 1024
+
     def __init__(self, auth_id: str, session_id: str, acl: list[str]) -> None:
         self.auth_id = auth_id
-        self._positive_access_regexes = [
-            self._transform_access_to_regex(auth_id, session_id, access)
-            for access in acl
-            if not access.startswith("!")
-        ]
-        self._negative_access_regexes = [
-            self._transform_access_to_regex(auth_id, session_id, access[1:])
-            for access in acl
-            if access.startswith("!")
-        ]
+        self._positive_matcher = _ACLMatcher(
+            auth_id,
+            session_id,
+            [access for access in acl if not access.startswith("!")],
+        )
+        self._negative_matcher = _ACLMatcher(
+            auth_id,
+            session_id,
+            [access[1:] for access in acl if access.startswith("!")],
+        )
+        self._memo: dict[str, bool] = {}
 
     def matches_required_access(self, required_access: str | None) -> bool:
         if required_access is None:
             return True
 
-        for access_regex in self._negative_access_regexes:
-            if access_regex.match(required_access):
-                return False
-
-        for access_regex in self._positive_access_regexes:
-            if access_regex.match(required_access):
-                return True
-        return False
+        result = self._memo.get(required_access)
+        if result is None:
+            result = not self._negative_matcher.matches(
+                required_access
+            ) and self._positive_matcher.matches(required_access)
+            if len(self._memo) >= self._MEMO_SIZE:
+                self._memo.clear()
+            self._memo[required_access] = result
+        return result
 
     def may_add_access(self, new_access: str) -> bool:
         return new_access.startswith("!") or self.matches_required_access(new_access)
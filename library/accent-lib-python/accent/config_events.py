@@ -0,0 +1,111 @@
+# Copyright 2023 Accent Communications
+
+"""Consume the configuration events published by confd.
+
+The daemons caching what is built from the configuration (generated files,
+dialplan objects) bind a queue to the events of the entity types they depend
+on, and drop what is stale when one of them is created, edited, deleted,
+associated or dissociated.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterable, Iterator, Mapping
+from typing import Any
+
+import kombu
+from kombu.mixins import ConsumerMixin
+
+logger = logging.getLogger(__name__)
+
+EVENT_SUFFIXES = (
+    "_added",
+    "_created",
+    "_edited",
+    "_deleted",
+    "_associated",
+    "_dissociated",
+    "_updated",
+)
+
+
+def event_entity_type(event_name: str) -> str | None:
+    """Return the entity type of a confd event, e.g. user_line for
+    user_line_associated, or None if it is not a configuration change."""
+    for suffix in EVENT_SUFFIXES:
+        if event_name.endswith(suffix):
+            return event_name[: -len(suffix)]
+    return None
+
+
+def event_entity_id(payload: Any) -> int | str | None:
+    """Return the id, or else the uuid, of the entity of a confd event, or
+    None if the event is not about a single entity, e.g. an association."""
+    if not isinstance(payload, Mapping):
+        return None
+    for field in ("id", "uuid"):
+        entity_id = payload.get(field)
+        if isinstance(entity_id, (int, str)) and not isinstance(entity_id, bool):
+            return entity_id
+    return None
+
+
+def config_event_names(entity_types: Iterable[str]) -> Iterator[str]:
+    """Return the names of the confd events modifying the entity types."""
+    for entity_type in entity_types:
+        for suffix in EVENT_SUFFIXES:
+            yield f"{entity_type}{suffix}"
+
+
+class ConfigEventConsumer(ConsumerMixin):
+    """Bus consumer of the confd configuration events.
+
+    Subclasses implement on_config_event, called with the event name, its
+    entity type (None if the name has no configuration suffix) and its data.
+    Every message is acked, even when it is invalid.
+    """
+
+    def __init__(self, bus_config: dict[str, Any], event_names: Iterable[str]):
+        self._bus_url = "amqp://{username}:{password}@{host}:{port}//".format(
+            **bus_config
+        )
+        exchange = kombu.Exchange(
+            bus_config["subscribe_exchange_name"],
+            type=bus_config["subscribe_exchange_type"],
+        )
+        self._queue = kombu.Queue(
+            exclusive=True,
+            bindings=[
+                kombu.binding(exchange, arguments={"x-match": "all", "name": name})
+                for name in sorted(set(event_names))
+            ],
+        )
+
+    def run(self) -> None:
+        logger.info("Running AMQP consumer")
+        with kombu.Connection(self._bus_url) as connection:
+            self.connection = connection
+            super().run()
+
+    def stop(self) -> None:
+        self.should_stop = True
+
+    def get_consumers(self, Consumer, channel):
+        return [Consumer(self._queue, callbacks=[self._on_bus_message])]
+
+    def on_config_event(
+        self, event_name: str, entity_type: str | None, payload: Any
+    ) -> None:
+        raise NotImplementedError()
+
+    def _on_bus_message(self, body, message) -> None:
+        try:
+            event_name = body["name"]
+            entity_type = event_entity_type(event_name)
+        except (KeyError, TypeError, AttributeError):
+            logger.error("Invalid event message received: %s", body)
+        else:
+            self.on_config_event(event_name, entity_type, body.get("data"))
+        finally:
+            message.ack()
@@ -8,7 +8,7 @@ from typing import Any, TypeVar
 
 from flask import g
 
-from ..auth_verifier import AuthVerifierHelpers
+from ..auth_verifier import AuthVerifierHelpers, TokenCache
 from ..http_exceptions import InvalidTokenAPIException, Unauthorized
 from ..tenant_flask_helpers import auth_client, token
 from .headers import extract_tenant_id_from_header, extract_token_id_from_header
@@ -17,8 +17,11 @@ R = TypeVar("R")
 
 
 class AuthVerifierFlask:
-    def __init__(self) -> None:
-        self.helpers = AuthVerifierHelpers()
+    def __init__(self, token_cache: TokenCache | None = None) -> None:
+        self.helpers = AuthVerifierHelpers(token_cache)
+
+    def set_token_cache(self, token_cache: TokenCache | None) -> None:
+        self.helpers.token_cache = token_cache
 
     def set_token_extractor(self, func: Callable[..., R]) -> None:
         endpoint_extract_token = self.helpers.extract_acl_check(func).extract_token_id
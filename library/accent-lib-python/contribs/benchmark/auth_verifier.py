@@ -0,0 +1,80 @@
+# Copyright 2023 Accent Communications
+
+"""Compare token validation throughput with and without the token cache.
+
+accent-auth is simulated by a client whose calls sleep for ``--latency``
+seconds, which is roughly the cost of one HTTP round-trip plus a token lookup.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Any
+
+from accent.auth_verifier import AuthVerifierHelpers, TokenCache
+
+ACL = [f"confd.users.{i}.#" for i in range(200)] + [
+    "!confd.users.0.delete",
+    "calld.#",
+    "dird.directories.lookup.*.read",
+]
+REQUIRED_ACLS = [
+    "confd.users.150.read",
+    "calld.calls.read",
+    "dird.directories.lookup.default.read",
+]
+
+
+class _TokenCommand:
+    def __init__(self, latency: float) -> None:
+        self._latency = latency
+
+    def check(self, token: str, required_acl: str | None, tenant: Any = None) -> bool:
+        time.sleep(self._latency)
+        return True
+
+    def get(self, token: str, *args: Any, **kwargs: Any) -> dict[str, Any]:
+        time.sleep(self._latency)
+        return {
+            "token": token,
+            "session_uuid": "session-uuid",
+            "auth_id": "user-uuid",
+            "acl": ACL,
+            "metadata": {"tenant_uuid": "tenant-uuid"},
+            "utc_expires_at": "2100-01-01T00:00:00",
+        }
+
+
+class _AuthClient:
+    host = "localhost"
+    port = 9497
+
+    def __init__(self, latency: float) -> None:
+        self.token = _TokenCommand(latency)
+
+
+def run(helpers: AuthVerifierHelpers, client: _AuthClient, requests: int) -> float:
+    start = time.perf_counter()
+    for i in range(requests):
+        required_acl = REQUIRED_ACLS[i % len(REQUIRED_ACLS)]
+        helpers.validate_token(client, "token-uuid", required_acl, "tenant-uuid")  # type: ignore[arg-type]
+    return requests / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--latency", type=float, default=0.001)
+    args = parser.parse_args()
+
+    client = _AuthClient(args.latency)
+    without_cache = run(AuthVerifierHelpers(), client, args.requests)
+    with_cache = run(AuthVerifierHelpers(TokenCache()), client, args.requests)
+
+    print(f"without cache: {without_cache:>12.0f} requests/s")
+    print(f"with cache:    {with_cache:>12.0f} requests/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,11 @@
 # Copyright 2023 Accent Communications
 
+import random
 import unittest
 from unittest.mock import Mock
 from unittest.mock import sentinel as s
 
+import httpx
 import pytest
 import requests
 from accent_auth_client.exceptions import (
@@ -12,16 +14,17 @@ from accent_auth_client.exceptions import (
 )
 from hamcrest import assert_that, equal_to, is_
 
-from ..auth_verifier import (
+from accent.auth_verifier import (
     AccessCheck,
     AuthServerUnreachable,
     AuthVerifierHelpers,
+    TokenCache,
     Unauthorized,
     no_auth,
     required_acl,
     required_tenant,
 )
-from ..http_exceptions import (
+from accent.http_exceptions import (
     InvalidTokenAPIException,
     MissingPermissionsTokenAPIException,
 )
@@ -188,6 +191,141 @@ class TestAuthVerifierHelpers(unittest.TestCase):
         assert result is None
 
 
+def _token(acl, session_uuid="session-uuid", tenant_uuid="tenant-uuid", **kwargs):
+    token = {
+        "token": "token-uuid",
+        "session_uuid": session_uuid,
+        "auth_id": "123",
+        "acl": acl,
+        "metadata": {"tenant_uuid": tenant_uuid},
+        "utc_expires_at": "2100-01-01T00:00:00",
+    }
+    token.update(kwargs)
+    return token
+
+
+class TestTokenCache(unittest.TestCase):
+    def setUp(self):
+        self.now = 1_000.0
+        self.cache = TokenCache(max_size=2, max_ttl=60, clock=lambda: self.now)
+
+    def test_get_unknown_token(self):
+        assert self.cache.get("unknown") is None
+
+    def test_put_then_get(self):
+        self.cache.put("token-uuid", _token(["foo.bar"]))
+
+        cached = self.cache.get("token-uuid")
+
+        assert cached.tenant_uuid == "tenant-uuid"
+        assert cached.session_uuid == "session-uuid"
+        assert cached.access.matches_required_access("foo.bar")
+
+    def test_entries_expire_after_max_ttl(self):
+        self.cache.put("token-uuid", _token(["foo"]))
+
+        self.now += 61
+
+        assert self.cache.get("token-uuid") is None
+        assert len(self.cache) == 0
+
+    def test_entries_expire_with_token(self):
+        self.cache.put("token-uuid", _token(["foo"], utc_expires_at="1970-01-01T00:10:00"))
+
+        assert self.cache.get("token-uuid") is None
+
+    def test_least_recently_used_is_evicted(self):
+        self.cache.put("a", _token([]))
+        self.cache.put("b", _token([]))
+        self.cache.get("a")
+
+        self.cache.put("c", _token([]))
+
+        assert self.cache.get("a") is not None
+        assert self.cache.get("b") is None
+        assert self.cache.get("c") is not None
+
+    def test_on_session_deleted(self):
+        self.cache.put("a", _token([], session_uuid="session-1"))
+        self.cache.put("b", _token([], session_uuid="session-2"))
+
+        self.cache.on_session_deleted({"uuid": "session-1", "user_uuid": "user"})
+
+        assert self.cache.get("a") is None
+        assert self.cache.get("b") is not None
+
+    def test_subscribe(self):
+        consumer = Mock()
+
+        self.cache.subscribe(consumer)
+
+        consumer.subscribe.assert_called_once_with(
+            "auth_session_deleted", self.cache.on_session_deleted
+        )
+
+
+class TestAuthVerifierHelpersWithTokenCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = TokenCache()
+        self.helpers = AuthVerifierHelpers(self.cache)
+        self.client = Mock(host=s.host, port=s.port)
+        self.client.token.get.return_value = _token(["foo.#", "!foo.secret"])
+
+    def test_introspects_once(self):
+        self.helpers.validate_token(self.client, "token-uuid", "foo.bar", None)
+        self.helpers.validate_token(self.client, "token-uuid", "foo.baz", None)
+
+        self.client.token.get.assert_called_once_with("token-uuid")
+        self.client.token.check.assert_not_called()
+
+    def test_missing_access_is_checked_locally(self):
+        with pytest.raises(MissingPermissionsTokenAPIException):
+            self.helpers.validate_token(self.client, "token-uuid", "foo.secret", None)
+
+        self.client.token.check.assert_not_called()
+
+    def test_no_required_acl(self):
+        self.helpers.validate_token(self.client, "token-uuid", "", None)
+
+    def test_token_tenant_is_checked_locally(self):
+        self.helpers.validate_token(self.client, "token-uuid", "foo.bar", "tenant-uuid")
+
+        self.client.token.check.assert_not_called()
+
+    def test_other_tenant_is_checked_by_auth(self):
+        self.helpers.validate_token(self.client, "token-uuid", "foo.bar", s.subtenant)
+
+        self.client.token.check.assert_called_once_with(
+            "token-uuid", "foo.bar", tenant=s.subtenant
+        )
+
+    def test_unknown_token_raise_invalid_token(self):
+        request = httpx.Request("GET", "http://auth/token/token-uuid")
+        response = httpx.Response(404, request=request)
+        self.client.token.get.side_effect = httpx.HTTPStatusError(
+            "not found", request=request, response=response
+        )
+
+        with pytest.raises(InvalidTokenAPIException):
+            self.helpers.validate_token(self.client, "token-uuid", "foo.bar", None)
+
+        assert len(self.cache) == 0
+
+    def test_auth_unreachable(self):
+        self.client.token.get.side_effect = httpx.ConnectError("refused")
+
+        with pytest.raises(AuthServerUnreachable):
+            self.helpers.validate_token(self.client, "token-uuid", "foo.bar", None)
+
+    def test_deleted_session_is_introspected_again(self):
+        self.helpers.validate_token(self.client, "token-uuid", "foo.bar", None)
+
+        self.cache.on_session_deleted({"uuid": "session-uuid"})
+        self.helpers.validate_token(self.client, "token-uuid", "foo.bar", None)
+
+        assert self.client.token.get.call_count == 2
+
+
 class TestAccessCheck:
     scenarios = [
         {
@@ -382,3 +520,47 @@ class TestAccessCheck:
             check.matches_required_access("foo.another-session-uuid"),
             equal_to(False),
         )
+
+
+def _regex_matches_required_access(auth_id, session_id, acl, required_access):
+    def regex(access):
+        return AccessCheck._transform_access_to_regex(auth_id, session_id, access)
+
+    for access in acl:
+        if access.startswith("!") and regex(access[1:]).match(required_access):
+            return False
+    for access in acl:
+        if not access.startswith("!") and regex(access).match(required_access):
+            return True
+    return False
+
+
+class TestAccessCheckEquivalence:
+    acl_segments = ["foo", "bar", "me", "my_session", "123", "*", "#", "", "a*", "b#"]
+    required_segments = ["foo", "bar", "me", "my_session", "123", "sess", "*", "#", ""]
+
+    def _random_access(self, rng, segments):
+        return ".".join(rng.choice(segments) for _ in range(rng.randint(1, 5)))
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_matches_regex_implementation(self, seed):
+        rng = random.Random(seed)
+        auth_id, session_id = rng.choice([("123", "sess"), ("a.b", "sess"), ("1", "")])
+
+        for _ in range(50):
+            acl = [
+                rng.choice(["", "", "!"]) + self._random_access(rng, self.acl_segments)
+                for _ in range(rng.randint(0, 8))
+            ]
+            check = AccessCheck(auth_id, session_id, acl)
+            for _ in range(20):
+                required_access = self._random_access(rng, self.required_segments)
+                if rng.random() < 0.02:
+                    required_access += "\n"
+                expected = _regex_matches_required_access(
+                    auth_id, session_id, acl, required_access
+                )
+                assert check.matches_required_access(required_access) is expected, (
+                    acl,
+                    required_access,
+                )
@@ -0,0 +1,102 @@
+# Copyright 2023 Accent Communications
+
+from __future__ import annotations
+
+import unittest
+from unittest.mock import Mock
+
+from hamcrest import assert_that, equal_to, none
+
+from accent.config_events import (
+    ConfigEventConsumer,
+    config_event_names,
+    event_entity_id,
+    event_entity_type,
+)
+
+BUS_CONFIG = {
+    "username": "guest",
+    "password": "guest",
+    "host": "localhost",
+    "port": 5672,
+    "subscribe_exchange_name": "accent-headers",
+    "subscribe_exchange_type": "headers",
+}
+
+
+class TestEventEntityType(unittest.TestCase):
+    def test_entity_type(self):
+        assert_that(event_entity_type("user_edited"), equal_to("user"))
+        assert_that(event_entity_type("user_line_associated"), equal_to("user_line"))
+        assert_that(event_entity_type("auth_tenant_added"), equal_to("auth_tenant"))
+        assert_that(event_entity_type("pjsip_global_updated"), equal_to("pjsip_global"))
+
+    def test_not_a_configuration_change(self):
+        assert_that(event_entity_type("call_answered"), none())
+
+
+class TestEventEntityId(unittest.TestCase):
+    def test_id(self):
+        assert_that(event_entity_id({"id": 42, "uuid": "abc"}), equal_to(42))
+
+    def test_uuid(self):
+        assert_that(event_entity_id({"uuid": "abc"}), equal_to("abc"))
+
+    def test_association(self):
+        payload = {"user": {"id": 42}, "line": {"id": 1}}
+
+        assert_that(event_entity_id(payload), none())
+
+    def test_no_payload(self):
+        assert_that(event_entity_id(None), none())
+        assert_that(event_entity_id({"id": None}), none())
+
+
+class TestConfigEventNames(unittest.TestCase):
+    def test_names(self):
+        names = set(config_event_names(["user"]))
+
+        assert_that("user_edited" in names)
+        assert_that("user_associated" in names)
+        assert_that("line_edited" not in names)
+
+
+class Consumer(ConfigEventConsumer):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.on_config_event = Mock()
+
+
+class TestConfigEventConsumer(unittest.TestCase):
+    def setUp(self):
+        self.consumer = Consumer(BUS_CONFIG, ["user_edited", "user_deleted"])
+        self.message = Mock()
+
+    def test_bindings(self):
+        names = {binding.arguments["name"] for binding in self.consumer._queue.bindings}
+
+        assert_that(names, equal_to({"user_edited", "user_deleted"}))
+
+    def test_event(self):
+        body = {"name": "user_edited", "data": {"id": 42}}
+
+        self.consumer._on_bus_message(body, self.message)
+
+        self.consumer.on_config_event.assert_called_once_with(
+            "user_edited", "user", {"id": 42}
+        )
+        self.message.ack.assert_called_once_with()
+
+    def test_invalid_message_is_acked(self):
+        self.consumer._on_bus_message({}, self.message)
+
+        self.consumer.on_config_event.assert_not_called()
+        self.message.ack.assert_called_once_with()
+
+    def test_message_is_acked_when_handling_fails(self):
+        self.consumer.on_config_event.side_effect = Exception
+
+        with self.assertRaises(Exception):
+            self.consumer._on_bus_message({"name": "user_edited"}, self.message)
+
+        self.message.ack.assert_called_once_with()
@@ -28,6 +28,7 @@ from accent_dao import (
     queue_member_dao,
 )
 from accent_dao import queue_dao as orig_queue_dao
+from accent_dao.helpers.cache import CacheInvalidator
 from accent_dao.resources.user import dao as user_dao
 
 from accent_agentd import http
@@ -245,3 +246,5 @@ def _init_bus_consume(bus_consumer, service_proxy):
     )
     for event, action in events:
         bus_consumer.subscribe(event.name, action)
+    # Evicts the cached contexts and queues when confd modifies them
+    CacheInvalidator().subscribe(bus_consumer)
@@ -5,6 +5,7 @@ from __future__ import annotations
 import logging
 import signal
 import socketserver
+import threading
 import time
 from collections.abc import Callable
 from contextlib import contextmanager
@@ -17,7 +18,10 @@ from accent_dao.helpers.db_utils import session_scope
 from psycopg2.extras import DictCursor
 from sqlalchemy.engine.url import make_url
 
+from accent_agid import objects
+from accent_agid.bus import BusConsumer
 from accent_agid.fastagi import FastAGI, FastAGIDialPlanBreak
+from accent_agid.object_cache import cache as object_cache
 
 logger = logging.getLogger(__name__)
 
@@ -164,10 +168,12 @@ class Handler:
         handler_name: str,
         setup_fn: SetupFunction | None,
         handle_fn: HandleFunction,
+        batch: bool = False,
     ) -> None:
         self.handler_name = handler_name
         self.setup_fn = setup_fn
         self.handle_fn = handle_fn
+        self.batch = batch
         self.lock = moresynchro.RWLock()
 
     def setup(self, cursor: DictCursor) -> None:
@@ -190,24 +196,40 @@ class Handler:
         self.lock.acquire_read()
         try:
             with session_scope():
-                self.handle_fn(agi, cursor, args)
+                if self.batch:
+                    with agi.batch():
+                        self.handle_fn(agi, cursor, args)
+                else:
+                    self.handle_fn(agi, cursor, args)
         finally:
             self.lock.release()
 
 
-def register(handle_fn: HandleFunction, setup_fn: SetupFunction | None = None) -> None:
+def register(
+    handle_fn: HandleFunction,
+    setup_fn: SetupFunction | None = None,
+    batch: bool = False,
+) -> None:
+    """Register an AGI handler.
+
+    batch -- pipeline the channel variables set by the handler, see
+      FastAGI.batch
+    """
     handler_name = handle_fn.__name__
 
     if handler_name in _handlers:
         raise ValueError("handler %r already registered", handler_name)
 
-    _handlers[handler_name] = Handler(handler_name, setup_fn, handle_fn)
+    _handlers[handler_name] = Handler(handler_name, setup_fn, handle_fn, batch)
 
 
 def sighup_handle(signum: int, frame: FrameType | None) -> None:
     logger.debug("reloading core engine")
     _server.setup()
 
+    object_cache.log_stats()
+    object_cache.invalidate()
+
     logger.debug("reloading handlers")
     with _server.database.connection() as conn:
         with _server.database.transaction(conn) as cursor:
@@ -223,9 +245,36 @@ def run() -> None:
             for handler in _handlers.values():
                 handler.setup(cursor)
 
+    if _server.config['object_cache']['enabled']:
+        _start_object_cache(_server.config)
+
     _server.serve_forever()
 
 
+def _start_object_cache(config: dict[str, Any]) -> None:
+    warm = _warm_object_cache if config['object_cache']['warm'] else None
+    bus_consumer = BusConsumer(config['bus'], object_cache, warm)
+    bus_consumer_thread = threading.Thread(
+        target=bus_consumer.run, name='bus_consumer_thread', daemon=True
+    )
+    bus_consumer_thread.start()
+
+
+def _warm_object_cache() -> None:
+    logger.info('warming the object cache')
+    start = time.monotonic()
+    try:
+        with _server.database.connection() as conn:
+            with _server.database.transaction(conn) as cursor:
+                with session_scope():
+                    objects.warm_cache(cursor)
+    except Exception:
+        logger.exception('failed to warm the object cache')
+        return
+    logger.info('object cache warmed in %.1fs', time.monotonic() - start)
+    object_cache.log_stats()
+
+
 def init(config) -> None:
     global _server
     _server = AGID(config)
@@ -0,0 +1,53 @@
+# Copyright 2023 Accent Communications
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections.abc import Callable
+
+from accent.config_events import (
+    ConfigEventConsumer,
+    config_event_names,
+    event_entity_id,
+)
+
+from accent_agid.object_cache import ObjectCache
+
+logger = logging.getLogger(__name__)
+
+
+class BusConsumer(ConfigEventConsumer):
+    """Drop the cached dialplan objects when confd modifies their entities."""
+
+    def __init__(
+        self,
+        bus_config,
+        object_cache: ObjectCache,
+        warm: Callable[[], None] | None = None,
+    ):
+        """
+        warm -- called in its own thread each time the cache is enabled, to
+          load the objects before the calls need them
+        """
+        super().__init__(bus_config, config_event_names(object_cache.entity_types))
+        self._object_cache = object_cache
+        self._warm = warm
+
+    def on_consume_ready(self, connection, channel, consumers, **kwargs):
+        super().on_consume_ready(connection, channel, consumers, **kwargs)
+        # events may have been missed while the queue was not bound
+        self._object_cache.invalidate()
+        self._object_cache.enable()
+        if self._warm:
+            threading.Thread(
+                target=self._warm, name='object_cache_warm', daemon=True
+            ).start()
+
+    def on_consume_end(self, connection, channel):
+        super().on_consume_end(connection, channel)
+        self._object_cache.disable()
+
+    def on_config_event(self, event_name, entity_type, payload):
+        if entity_type:
+            self._object_cache.mark_dirty(entity_type, event_entity_id(payload))
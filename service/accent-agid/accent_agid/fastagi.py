@@ -16,6 +16,8 @@ from __future__ import annotations
 
 import pprint
 import re
+from collections.abc import Iterator
+from contextlib import contextmanager
 from typing import TYPE_CHECKING, Any, BinaryIO, NoReturn, Union
 
 if TYPE_CHECKING:
@@ -27,6 +29,7 @@ ResultDict = dict[str, tuple[str, str]]
 
 DEFAULT_TIMEOUT = 2000  # 2sec timeout used as default for functions that take timeouts
 DEFAULT_RECORD = 20000  # 20sec record time
+DEFAULT_BATCH_SIZE = 64  # commands sent before reading their responses
 
 re_code = re.compile(r'(^\d*)\s*(.*)')
 re_kv = re.compile(r'(?P<key>\w+)=(?P<value>[^\s]+)\s*(?:\((?P<data>.*)\))*')
@@ -42,6 +45,7 @@ __all__ = [
     'FastAGIDBError',
     'FastAGIUsageError',
     'FastAGIInvalidCommand',
+    'FastAGIBatchError',
     'FastAGI',
 ]
 
@@ -88,6 +92,20 @@ class FastAGIInvalidCommand(FastAGIError):
     pass
 
 
+class FastAGIBatchError(FastAGIError):
+    """Commands of a batch failed.
+
+    failures holds the failed commands with their error, in the order they
+    were sent. It is raised once the responses of the whole batch are read.
+    """
+
+    def __init__(self, failures: list[tuple[str, FastAGIError]]) -> None:
+        super().__init__(
+            '; '.join(f'{command}: {error!r}' for command, error in failures)
+        )
+        self.failures = failures
+
+
 class FastAGIDialPlanBreak(FastAGIException):
     pass
 
@@ -110,6 +128,8 @@ class FastAGI:
         self._get_agi_env()
         self.args: list[str] = []
         self._get_agi_args()
+        self._batch: list[str] | None = None
+        self._batch_size = DEFAULT_BATCH_SIZE
 
     def _get_agi_env(self) -> None:
         while 1:
@@ -152,6 +172,7 @@ class FastAGI:
 
     def execute(self, command: str, *args: str | int) -> ResultDict:
         try:
+            self.flush()
             self.send_command(command, *args)
             return self.get_result()
         except OSError as e:
@@ -161,12 +182,82 @@ class FastAGI:
             else:
                 raise
 
+    @staticmethod
+    def _format_command(command: str, *args: str | int) -> str:
+        return ' '.join([command.strip()] + list(map(str, args))).strip() + "\n"
+
     def send_command(self, command: str, *args: str | int) -> None:
         """Send a command to Asterisk"""
-        command = ' '.join([command.strip()] + list(map(str, args))).strip() + "\n"
-        self.outf.write(command.encode('utf8'))
+        self.outf.write(self._format_command(command, *args).encode('utf8'))
         self.outf.flush()
 
+    @contextmanager
+    def batch(self, max_size: int = DEFAULT_BATCH_SIZE) -> Iterator[None]:
+        """Pipeline the channel variables set within the block.
+
+        Instead of waiting for the response of each SET VARIABLE, the commands
+        are sent together, by max_size at most, and their responses are read
+        in bulk. Any other command first sends the queued ones, so the
+        commands are still run in order. The failed commands are reported by
+        a FastAGIBatchError once all the responses are read, but a hangup is
+        raised as is, without reading the responses left.
+        """
+        if self._batch is not None:
+            yield
+            return
+
+        self._batch = []
+        self._batch_size = max_size
+        try:
+            yield
+        except BaseException:
+            # The responses must still be read, but the error of the block
+            # is the one that matters
+            try:
+                self.flush()
+            except Exception:
+                pass
+            raise
+        else:
+            self.flush()
+        finally:
+            self._batch = None
+
+    def _queue_command(self, command: str, *args: str | int) -> None:
+        if self._batch is None:
+            self.execute(command, *args)
+            return
+
+        self._batch.append(self._format_command(command, *args))
+        if len(self._batch) >= self._batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Send the queued commands and read their responses."""
+        if not self._batch:
+            return
+
+        commands, self._batch = self._batch, []
+        try:
+            self.outf.write(''.join(commands).encode('utf8'))
+            self.outf.flush()
+        except OSError as e:
+            if e.errno == 32:
+                raise FastAGISIGPIPEHangup("Received SIGPIPE")
+            raise
+
+        failures = []
+        for command in commands:
+            try:
+                self.get_result()
+            except FastAGIHangup:
+                # the channel is gone, the commands left will not run either
+                raise
+            except FastAGIError as e:
+                failures.append((command.strip(), e))
+        if failures:
+            raise FastAGIBatchError(failures) from failures[0][1]
+
     def fail(self) -> None:
         """Force Asterisk to change the result state of the AGI to
         AGI_RESULT_FAILURE so that it will abort the AGI.
@@ -561,8 +652,11 @@ class FastAGI:
         return int(result['result'][0])
 
     def set_variable(self, name: str, value: str | int) -> None:
-        """Set a channel variable."""
-        self.execute('SET VARIABLE', self._quote(name), self._quote(value))
+        """Set a channel variable.
+
+        Within a batch, the variable is set when the batch is flushed.
+        """
+        self._queue_command('SET VARIABLE', self._quote(name), self._quote(value))
 
     def get_variable(self, name: str) -> str:
         """Get a channel variable.
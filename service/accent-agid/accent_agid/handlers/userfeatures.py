@@ -3,6 +3,8 @@
 from __future__ import annotations
 
 import logging
+from collections import namedtuple
+from functools import partial
 from typing import TYPE_CHECKING
 
 from accent_dao import callfilter_dao
@@ -14,10 +16,33 @@ from accent_dao.resources.user_line import dao as user_line_dao
 from accent_agid import dialplan_variables, objects
 from accent_agid.handlers.handler import Handler
 from accent_agid.helpers import build_sip_interface
+from accent_agid.object_cache import cache
 from accent_agid.objects import CallerID, DialAction
 
 logger = logging.getLogger(__name__)
 
+LineSnapshot = namedtuple('LineSnapshot', ['id', 'protocol', 'name'])
+ExtensionSnapshot = namedtuple('ExtensionSnapshot', ['id', 'exten', 'context'])
+CallfiltermemberSnapshot = namedtuple(
+    'CallfiltermemberSnapshot', ['id', 'callfilterid', 'ringseconds']
+)
+
+
+def _freeze_lines(found):
+    main_line, main_extension, lines = found
+    return (
+        LineSnapshot(main_line.id, main_line.protocol, main_line.name),
+        ExtensionSnapshot(
+            main_extension.id, main_extension.exten, main_extension.context
+        ),
+        [LineSnapshot(line.id, line.protocol, line.name) for line in lines],
+    )
+
+
+def _freeze_callfiltermember(member):
+    return CallfiltermemberSnapshot(member.id, member.callfilterid, member.ringseconds)
+
+
 if TYPE_CHECKING:
     from accent_dao.alchemy.extension import Extension
     from accent_dao.alchemy.linefeatures import LineFeatures
@@ -106,32 +131,14 @@ class UserFeatures(Handler):
     def _set_line(self) -> None:
         if self._dstid:
             try:
-                user_main_line = user_line_dao.get_by(
-                    user_id=self._dstid, main_line=True
+                self.main_line, self.main_extension, lines = cache.get_or_load(
+                    'line',
+                    (self._dstid, self._destination_extension_id),
+                    self._find_lines,
+                    _freeze_lines,
                 )
-                # XXX Should use get_by
-                self.main_line = line_dao.find_by(id=user_main_line.line_id)
-
-                # destination_extension_id may be unset (e.g. incoming call)
-                # In this case, only the main extension of the main line should be rung
-                if not self._destination_extension_id:
-                    line_extension = line_extension_dao.get_by(
-                        line_id=self.main_line.id
-                    )  # main_extension=True
-                    self._destination_extension_id = line_extension.extension_id
-
-                self.main_extension = extension_dao.get_by(
-                    id=self._destination_extension_id
-                )
-
-                line_extensions = line_extension_dao.find_all_by(
-                    extension_id=self.main_extension.id
-                )
-                for line_extension in line_extensions:
-                    # XXX Should use get_by
-                    line = line_dao.find_by(id=line_extension.line_id)
-                    self.lines.append(line)
-
+                self.lines.extend(lines)
+                self._destination_extension_id = self.main_extension.id
             except (ValueError, LookupError) as e:
                 self._agi.dp_break(str(e))
             else:
@@ -140,6 +147,29 @@ class UserFeatures(Handler):
                     'ACCENT_DST_USER_CONTEXT', self.main_extension.context
                 )
 
+    def _find_lines(self):
+        user_main_line = user_line_dao.get_by(user_id=self._dstid, main_line=True)
+        # XXX Should use get_by
+        main_line = line_dao.find_by(id=user_main_line.line_id)
+
+        # destination_extension_id may be unset (e.g. incoming call)
+        # In this case, only the main extension of the main line should be rung
+        destination_extension_id = self._destination_extension_id
+        if not destination_extension_id:
+            line_extension = line_extension_dao.get_by(
+                line_id=main_line.id
+            )  # main_extension=True
+            destination_extension_id = line_extension.extension_id
+
+        main_extension = extension_dao.get_by(id=destination_extension_id)
+
+        lines = []
+        line_extensions = line_extension_dao.find_all_by(extension_id=main_extension.id)
+        for line_extension in line_extensions:
+            # XXX Should use get_by
+            lines.append(line_dao.find_by(id=line_extension.line_id))
+        return main_line, main_extension, lines
+
     def _set_user(self) -> None:
         if self._dstid:
             try:
@@ -207,7 +237,12 @@ class UserFeatures(Handler):
     def _call_filtering(self) -> bool:
         callee = self._user
 
-        boss_callfiltermember = callfilter_dao.find_boss(callee.id)
+        boss_callfiltermember = cache.get_or_load(
+            'callfilter_boss',
+            callee.id,
+            partial(callfilter_dao.find_boss, callee.id),
+            _freeze_callfiltermember,
+        )
         if not boss_callfiltermember:
             logger.debug('Ignoring callfilter: No boss')
             return False
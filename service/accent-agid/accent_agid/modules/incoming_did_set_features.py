@@ -31,4 +31,4 @@ def incoming_did_set_features(
     did.rewrite_cid()
 
 
-agid.register(incoming_did_set_features)
+agid.register(incoming_did_set_features, batch=True)
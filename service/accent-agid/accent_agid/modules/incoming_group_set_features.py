@@ -15,4 +15,4 @@ def incoming_group_set_features(
     groupfeatures_handler.execute()
 
 
-agid.register(incoming_group_set_features)
+agid.register(incoming_group_set_features, batch=True)
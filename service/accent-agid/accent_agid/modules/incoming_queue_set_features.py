@@ -131,5 +131,5 @@ def set_call_record_side(agi, queue):
     agi.set_variable('__ACCENT_LOCAL_CHAN_MATCH_UUID', str(uuid4()))
 
 
-agid.register(incoming_queue_set_features)
+agid.register(incoming_queue_set_features, batch=True)
 agid.register(holdtime_announce)
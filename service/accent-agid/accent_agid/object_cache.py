@@ -0,0 +1,292 @@
+# Copyright 2023 Accent Communications
+
+"""In-memory cache of the dialplan objects.
+
+Setting up a call reads the same users, lines, queues, incalls and schedules
+from the database over and over, yet they rarely change between two calls.
+The rows behind these objects are kept in memory until one of the entities
+they are built from is created, edited, deleted, associated or dissociated,
+as announced by the confd events on the bus. When the event names the
+modified entity, only the objects built from it are dropped.
+
+The cache is only used while the events are received: it starts disabled and
+is disabled again, and emptied, when the connection to the bus is lost. While
+it is disabled, every object is loaded from the database as before.
+"""
+
+from __future__ import annotations
+
+import logging
+import sys
+import threading
+from collections.abc import Callable, Hashable, Iterable, Mapping
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+_USER = (
+    'user',
+    'user_agent',
+    'user_voicemail',
+    'users_forwards_busy',
+    'users_forwards_noanswer',
+    'users_forwards_unconditional',
+    'users_services_dnd',
+    'users_services_incallfilter',
+    'voicemail',
+)
+
+DEFAULT_DEPENDENCIES: dict[str, tuple[str, ...]] = {
+    'callerid': ('call_filter', 'group', 'incall', 'queue', 'user'),
+    'callfilter_boss': (
+        'call_filter',
+        'call_filter_recipient_users',
+        'call_filter_surrogate_users',
+        'user',
+    ),
+    'dialaction': (
+        'call_filter',
+        'call_filter_fallback',
+        'group',
+        'group_fallback',
+        'incall',
+        'ivr',
+        'queue',
+        'queue_fallback',
+        'user',
+        'user_fallback',
+    ),
+    'did': ('extension', 'incall', 'incall_extension'),
+    'line': (
+        'extension',
+        'line',
+        'line_endpoint_custom',
+        'line_endpoint_sccp',
+        'line_endpoint_sip',
+        'line_extension',
+        'user',
+        'user_line',
+        'user_line_extension',
+    ),
+    'meeting': ('meeting',),
+    'moh': ('moh',),
+    'queue': ('queue',),
+    'schedule': (
+        'group_schedule',
+        'incall_schedule',
+        'outcall_schedule',
+        'queue_schedule',
+        'schedule',
+        'user_schedule',
+    ),
+    'tenant': ('auth_tenant', 'localization'),
+    'user': _USER,
+    'voicemail': ('context', 'contexts', 'user_voicemail', 'voicemail'),
+}
+
+
+class ObjectCache:
+    """Cache of dialplan objects, keyed by kind and by lookup key.
+
+    The cache is shared between the threads handling the AGI requests, which
+    load the objects, and the bus consumer thread, which marks them dirty.
+    An object may be tagged with the ids of the entities it is built from:
+    when one of them is modified, only the objects tagged with its id and the
+    objects not tagged with its entity type are dropped. Otherwise, the
+    objects of a kind are all dropped when one of the entity types it depends
+    on is modified. The lookups that found nothing are cached too, so that a
+    call to a user without call filter does not query it every time.
+    """
+
+    def __init__(self, dependencies: Mapping[str, Iterable[str]] | None = None):
+        """
+        dependencies -- the entity types each kind of object depends on,
+          defaults to DEFAULT_DEPENDENCIES
+        """
+        if dependencies is None:
+            dependencies = DEFAULT_DEPENDENCIES
+        self._dependents: dict[str, set[str]] = {}
+        for kind, entity_types in dependencies.items():
+            for entity_type in entity_types:
+                self._dependents.setdefault(entity_type, set()).add(kind)
+        self._kinds = frozenset(dependencies)
+        self._lock = threading.Lock()
+        self._enabled = False
+        self._entries: dict[str, dict[Hashable, Any]] = {
+            kind: {} for kind in self._kinds
+        }
+        self._tags: dict[str, dict[Hashable, Mapping[str, Hashable]]] = {
+            kind: {} for kind in self._kinds
+        }
+        self._versions: dict[str, int] = dict.fromkeys(self._kinds, 0)
+        self._hits: dict[str, int] = dict.fromkeys(self._kinds, 0)
+        self._misses: dict[str, int] = dict.fromkeys(self._kinds, 0)
+
+    @property
+    def entity_types(self) -> set[str]:
+        return set(self._dependents)
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def enable(self) -> None:
+        with self._lock:
+            self._enabled = True
+
+    def disable(self) -> None:
+        self.invalidate()
+        with self._lock:
+            self._enabled = False
+
+    def get_or_load(
+        self,
+        kind: str,
+        key: Hashable,
+        loader: Callable[[], T],
+        freeze: Callable[[T], Any] | None = None,
+        entity_ids: Callable[[Any], Mapping[str, Hashable]] | None = None,
+    ) -> Any:
+        """Return the cached object, or load it and cache it.
+
+        freeze -- turns the loaded object into a copy that can be kept once
+          the transaction is over, e.g. a snapshot of an ORM object. It is
+          only applied when the object is cached.
+        entity_ids -- returns the id of the entities the cached object is
+          built from, by entity type, e.g. {'user': 42}
+        """
+        if kind not in self._kinds:
+            raise ValueError(f'unknown object kind: {kind}')
+
+        with self._lock:
+            enabled = self._enabled
+            if enabled:
+                entries = self._entries[kind]
+                if key in entries:
+                    self._hits[kind] += 1
+                    return entries[key]
+                self._misses[kind] += 1
+                version = self._versions[kind]
+
+        value = loader()
+        if not enabled:
+            return value
+        tags = {}
+        if value is not None:
+            if freeze is not None:
+                value = freeze(value)
+            if entity_ids is not None:
+                tags = entity_ids(value)
+
+        with self._lock:
+            # An object loaded while one of its entities was being modified
+            # may already be stale
+            if self._enabled and self._versions[kind] == version:
+                self._entries[kind][key] = value
+                if tags:
+                    self._tags[kind][key] = tags
+            else:
+                logger.debug('%s %s modified during loading, not caching', kind, key)
+        return value
+
+    def mark_dirty(self, entity_type: str, entity_id: Hashable | None = None) -> None:
+        """Drop the objects built from a modified entity, or from every
+        entity of its type if entity_id is None."""
+        kinds = self._dependents.get(entity_type)
+        if not kinds:
+            return
+        with self._lock:
+            for kind in kinds:
+                if entity_id is None:
+                    self._invalidate(kind)
+                else:
+                    self._invalidate_entity(kind, entity_type, entity_id)
+        logger.debug(
+            '%s %s modified, marked dirty: %s',
+            entity_type,
+            '*' if entity_id is None else entity_id,
+            sorted(kinds),
+        )
+
+    def invalidate(self, kind: str | None = None) -> None:
+        """Drop the objects of a kind, or every object if kind is None."""
+        kinds = self._kinds if kind is None else [kind]
+        with self._lock:
+            for kind_ in kinds:
+                self._invalidate(kind_)
+
+    def _invalidate(self, kind: str) -> None:
+        self._entries[kind] = {}
+        self._tags[kind] = {}
+        self._versions[kind] += 1
+
+    def _invalidate_entity(
+        self, kind: str, entity_type: str, entity_id: Hashable
+    ) -> None:
+        tags = self._tags[kind]
+        # the objects not tagged with the entity type, e.g. the lookups that
+        # found nothing, may be built from the modified entity too
+        stale = [
+            key
+            for key in self._entries[kind]
+            if tags.get(key, {}).get(entity_type, entity_id) == entity_id
+        ]
+        for key in stale:
+            del self._entries[kind][key]
+            tags.pop(key, None)
+        self._versions[kind] += 1
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Return the entries, hits, misses, hit ratio and approximate size
+        in bytes of each kind of object."""
+        with self._lock:
+            snapshot = {
+                kind: (dict(self._entries[kind]), self._hits[kind], self._misses[kind])
+                for kind in sorted(self._kinds)
+            }
+
+        stats = {}
+        for kind, (entries, hits, misses) in snapshot.items():
+            lookups = hits + misses
+            stats[kind] = {
+                'entries': len(entries),
+                'hits': hits,
+                'misses': misses,
+                'hit_ratio': hits / lookups if lookups else 0.0,
+                'size': _sizeof(entries),
+            }
+        return stats
+
+    def log_stats(self) -> None:
+        for kind, stats in self.stats().items():
+            logger.info(
+                'object cache %s: %s entries, %s bytes, %s hits, %s misses (%.1f%%)',
+                kind,
+                stats['entries'],
+                stats['size'],
+                stats['hits'],
+                stats['misses'],
+                stats['hit_ratio'] * 100,
+            )
+
+
+def _sizeof(value: Any, seen: set[int] | None = None) -> int:
+    if seen is None:
+        seen = set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_sizeof(k, seen) + _sizeof(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_sizeof(item, seen) for item in value)
+    elif hasattr(value, '__dict__'):
+        size += _sizeof(vars(value), seen)
+    return size
+
+
+cache = ObjectCache()
@@ -5,12 +5,15 @@ from __future__ import annotations
 import logging
 import re
 from collections.abc import Sequence
+from functools import partial
+from types import SimpleNamespace
 from typing import TYPE_CHECKING
 
 from accent_dao import user_dao
 from psycopg2.extras import DictCursor, DictRow
 from psycopg2.sql import SQL, Composable, Identifier
 
+from accent_agid.object_cache import cache
 from accent_agid.schedule import (
     AlwaysOpenedSchedule,
     Schedule,
@@ -48,6 +51,16 @@ def join_column_names(fields: Sequence[str]) -> Composable:
     return SQL(',').join(sanitize_column(f) for f in fields)
 
 
+def fetch_one(cursor: DictCursor, query, args) -> DictRow | None:
+    cursor.execute(query, args)
+    return cursor.fetchone()
+
+
+def freeze_row(row: DictRow) -> dict:
+    """Copy a row so that it can be kept in the object cache."""
+    return dict(row)
+
+
 class ExtenFeatures:
     FEATURES = {
         'agents': (
@@ -171,13 +184,16 @@ class VMBox:
         else:
             where_comment = ""
 
-        if xid:
+        def load_by_id():
             query = SQL(
                 "SELECT {columns} FROM voicemail WHERE voicemail.uniqueid = %s "
                 + where_comment
             )
-            cursor.execute(query.format(columns=join_column_names(columns)), (xid,))
-        elif mailbox and context:
+            return fetch_one(
+                cursor, query.format(columns=join_column_names(columns)), (xid,)
+            )
+
+        def load_by_mailbox():
             contextinclude = Context(agi, cursor, context).include
             query = SQL(
                 "SELECT {columns} FROM voicemail "
@@ -187,16 +203,30 @@ class VMBox:
                 + ") "
                 + where_comment
             )
-            cursor.execute(
+            return fetch_one(
+                cursor,
                 query.format(columns=join_column_names(columns)),
                 [mailbox] + contextinclude,
             )
+
+        if xid:
+            key = ('id', xid, commentcond)
+            loader = load_by_id
+        elif mailbox and context:
+            key = ('mailbox', mailbox, context, commentcond)
+            loader = load_by_mailbox
         else:
             raise LookupError(
                 "id or mailbox@context must be provided to look up a voicemail entry"
             )
 
-        res: DictRow = cursor.fetchone()
+        res = cache.get_or_load(
+            'voicemail',
+            key,
+            loader,
+            freeze_row,
+            lambda row: {'voicemail': row['uniqueid']},
+        )
 
         if not res:
             raise LookupError(
@@ -226,6 +256,7 @@ class VMBox:
         if self.cursor.rowcount != 1:
             raise DBUpdateException("Unable to perform the requested update")
         self.commented = enabled
+        cache.mark_dirty('voicemail')
 
     def has_password(self) -> bool:
         return bool(self.password) and self.skipcheckpass == 0
@@ -251,9 +282,13 @@ class Meeting:
         else:
             raise Exception('Cannot find a meeting with no UUID or number')
 
-        cursor.execute(query.format(field=Identifier(field)), arguments)
-
-        res: DictRow = cursor.fetchone()
+        res = cache.get_or_load(
+            'meeting',
+            (field,) + arguments,
+            lambda: fetch_one(cursor, query.format(field=Identifier(field)), arguments),
+            freeze_row,
+            lambda row: {'meeting': row['uuid']},
+        )
         if not res:
             raise LookupError(f'Unable to find Meeting {uuid} in tenant {tenant_uuid}')
 
@@ -267,12 +302,13 @@ class MOH:
         self.cursor = cursor
         self.name = None
 
-        cursor.execute(
-            "SELECT name FROM moh WHERE uuid = %s",
-            (uuid,),
+        res = cache.get_or_load(
+            'moh',
+            uuid,
+            lambda: fetch_one(cursor, "SELECT name FROM moh WHERE uuid = %s", (uuid,)),
+            freeze_row,
+            lambda row: {'moh': uuid},
         )
-
-        res: DictRow = cursor.fetchone()
         if not res:
             raise LookupError(f'Unable to find MOH {uuid}')
 
@@ -366,6 +402,42 @@ class Paging:
 
 
 class User:
+    ATTRIBUTES = (
+        'id',
+        'uuid',
+        'tenant_uuid',
+        'firstname',
+        'lastname',
+        'language',
+        'userfield',
+        'callerid',
+        'mobilephonenumber',
+        'musiconhold',
+        'outcallerid',
+        'ringseconds',
+        'simultcalls',
+        'enablevoicemail',
+        'voicemailid',
+        'enablexfer',
+        'dtmf_hangup',
+        'enableonlinerec',
+        'incallfilter',
+        'enablednd',
+        'enableunc',
+        'destunc',
+        'enablerna',
+        'destrna',
+        'enablebusy',
+        'destbusy',
+        'preprocess_subroutine',
+        'bsfilter',
+        'rightcallcode',
+        'call_record_outgoing_external_enabled',
+        'call_record_outgoing_internal_enabled',
+        'call_record_incoming_external_enabled',
+        'call_record_incoming_internal_enabled',
+    )
+
     def __init__(
         self, agi, cursor: DictCursor, xid=None, exten=None, context=None, agent_id=None
     ):
@@ -373,16 +445,23 @@ class User:
         self.cursor = cursor
 
         if xid:
-            user_row = user_dao.get(xid)
+            key = ('id', str(xid))
+            loader = partial(user_dao.get, xid)
         elif exten and context:
-            user_row = user_dao.get_user_by_number_context(exten, context)
+            key = ('exten', exten, context)
+            loader = partial(user_dao.get_user_by_number_context, exten, context)
         elif agent_id:
-            user_row = user_dao.get_user_by_agent_id(agent_id)
+            key = ('agent_id', agent_id)
+            loader = partial(user_dao.get_user_by_agent_id, agent_id)
         else:
             raise LookupError(
                 '"id", "exten@context" or "agent_id" must be provided to look up an user entry'
             )
 
+        user_row = cache.get_or_load(
+            'user', key, loader, self._freeze, lambda user: {'user': user.id}
+        )
+
         self.id = user_row.id
         self.uuid = user_row.uuid
         self.tenant_uuid = user_row.tenant_uuid
@@ -452,6 +531,12 @@ class User:
         if not self.vmbox:
             self.enablevoicemail = 0
 
+    @classmethod
+    def _freeze(cls, user_row) -> SimpleNamespace:
+        return SimpleNamespace(
+            **{name: getattr(user_row, name) for name in cls.ATTRIBUTES}
+        )
+
     def toggle_feature(self, feature):
         if feature == 'enablevoicemail':
             enabled = int(not self.enablevoicemail)
@@ -477,6 +562,7 @@ class User:
 
         if self.cursor.rowcount != 1:
             raise DBUpdateException("Unable to perform the requested update")
+        cache.mark_dirty('user')
 
 
 class Queue:
@@ -525,11 +611,15 @@ class Queue:
             "AND queue.commented = 0 "
             "AND queue.category = 'queue'"
         )
-        cursor.execute(
-            query.format(columns=join_column_names(columns)),
-            (queue_id,),
+        res = cache.get_or_load(
+            'queue',
+            str(queue_id),
+            lambda: fetch_one(
+                cursor, query.format(columns=join_column_names(columns)), (queue_id,)
+            ),
+            freeze_row,
+            lambda row: {'queue': row['id']},
         )
-        res: DictRow = cursor.fetchone()
         if not res:
             raise LookupError(f"Unable to find queue (id: {queue_id})")
 
@@ -678,14 +768,19 @@ class DialAction:
         self.event = event
         self.category = category
 
-        cursor.execute(
-            "SELECT action, actionarg1, actionarg2 FROM dialaction "
-            "WHERE event = %s "
-            "AND category = %s "
-            "AND categoryval::INTEGER = %s ",
-            (event, category, categoryval),
+        res = cache.get_or_load(
+            'dialaction',
+            (event, category, str(categoryval)),
+            lambda: fetch_one(
+                cursor,
+                "SELECT action, actionarg1, actionarg2 FROM dialaction "
+                "WHERE event = %s "
+                "AND category = %s "
+                "AND categoryval::INTEGER = %s ",
+                (event, category, categoryval),
+            ),
+            freeze_row,
         )
-        res: DictRow = cursor.fetchone()
         if not res:
             self.action = "none"
             self.actionarg1 = None
@@ -725,11 +820,16 @@ class Tenant:
             'country',
         ]
         query = SQL('SELECT {columns} FROM tenant WHERE uuid = %s')
-        cursor.execute(
-            query.format(columns=join_column_names(columns)),
-            (tenant_uuid,),
+        res = cache.get_or_load(
+            'tenant',
+            tenant_uuid,
+            lambda: fetch_one(
+                cursor,
+                query.format(columns=join_column_names(columns)),
+                (tenant_uuid,),
+            ),
+            freeze_row,
         )
-        res = cursor.fetchone()
         if not res:
             raise LookupError(f'Unable to find tenant (uuid: {tenant_uuid})')
 
@@ -800,11 +900,14 @@ class DID:
             "WHERE incall.id = %s "
             "AND incall.commented = 0 AND extensions.commented = 0"
         )
-        cursor.execute(
-            query.format(columns=join_column_names(columns)),
-            (incall_id,),
+        res = cache.get_or_load(
+            'did',
+            str(incall_id),
+            lambda: fetch_one(
+                cursor, query.format(columns=join_column_names(columns)), (incall_id,)
+            ),
+            freeze_row,
         )
-        res: DictRow = cursor.fetchone()
 
         if not res:
             raise LookupError(f"Unable to find DID entry (id: {incall_id})")
@@ -905,6 +1008,13 @@ class Outcall:
 class ScheduleDataMapper:
     @classmethod
     def get_from_path(cls, cursor: DictCursor, path, path_id):
+        # the schedules are not modified once built, they can be shared
+        return cache.get_or_load(
+            'schedule', (path, str(path_id)), partial(cls._load, cursor, path, path_id)
+        )
+
+    @classmethod
+    def _load(cls, cursor: DictCursor, path, path_id):
         # fetch schedule info
         columns = (
             'id',
@@ -1101,14 +1211,19 @@ class CallerID:
         self.type = xtype
         self.typeval = typeval
 
-        cursor.execute(
-            "SELECT mode, callerdisplay FROM callerid "
-            "WHERE type = %s "
-            "AND typeval = %s "
-            "AND mode IS NOT NULL",
-            (xtype, typeval),
+        res = cache.get_or_load(
+            'callerid',
+            (xtype, str(typeval)),
+            lambda: fetch_one(
+                cursor,
+                "SELECT mode, callerdisplay FROM callerid "
+                "WHERE type = %s "
+                "AND typeval = %s "
+                "AND mode IS NOT NULL",
+                (xtype, typeval),
+            ),
+            freeze_row,
         )
-        res: DictRow = cursor.fetchone()
 
         self.mode = None
         self.calleridname = None
@@ -1221,3 +1336,29 @@ class ChanCustom:
         # returns False though there is a suffix. Casting it to
         # a string prevents such an error.
         return res['interface'], str(res['intfsuffix'])
+
+
+def warm_cache(cursor: DictCursor) -> None:
+    """Load the objects used by most calls in the object cache."""
+    queries = (
+        ("SELECT id FROM userfeatures", User),
+        ("SELECT id FROM queuefeatures", Queue),
+        ("SELECT id FROM incall WHERE commented = 0", DID),
+        ("SELECT uuid FROM tenant", Tenant),
+        (
+            "SELECT event, category, categoryval FROM dialaction "
+            "WHERE categoryval ~ '^[0-9]+$'",
+            DialAction,
+        ),
+    )
+    for query, object_class in queries:
+        cursor.execute(query)
+        for row in cursor.fetchall():
+            try:
+                object_class(None, cursor, *row)
+            except (ValueError, LookupError):
+                pass
+
+    cursor.execute("SELECT path, pathid FROM schedule_path")
+    for path, path_id in cursor.fetchall():
+        ScheduleDataMapper.get_from_path(cursor, path, path_id)
@@ -1,10 +1,17 @@
 # Copyright 2023 Accent Communications
 
+import bisect
 import datetime
 import re
 
 import pytz
 
+# the compiled schedules are valid for a week, or until the next DST change
+DEFAULT_HORIZON = datetime.timedelta(days=7)
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_DAY = 24 * 3600
+
 
 class Schedule:
     def __init__(self, opened_periods, closed_periods, default_action, timezone_name):
@@ -12,6 +19,7 @@ class Schedule:
         self._closed_periods = closed_periods
         self._default_action = default_action
         self._timezone_name = timezone_name
+        self._compiled = None
 
     def compute_state(self, current_datetime):
         for closed_period in self._closed_periods:
@@ -23,13 +31,105 @@ class Schedule:
         return ScheduleState.new_closed_state(self._default_action)
 
     def compute_state_for_now(self):
-        current_datetime = self._get_current_localized_time()
-        return self.compute_state(current_datetime)
+        return self.compute_state_at(datetime.datetime.now(datetime.timezone.utc))
+
+    def compute_state_at(self, utc_datetime):
+        """Same as compute_state, for an aware datetime, using the compiled
+        schedule, which is compiled again once it no longer covers it."""
+        timestamp = utc_datetime.timestamp()
+        compiled = self._compiled
+        if compiled is None or not compiled.covers(timestamp):
+            compiled = CompiledSchedule.compile(self, utc_datetime)
+            self._compiled = compiled
+        return compiled.state_at(timestamp)
+
+    @property
+    def timezone_name(self):
+        return self._timezone_name
+
+    def boundaries(self):
+        """Return the local times of the day, in seconds, at which the state
+        may change, besides midnight."""
+        boundaries = set()
+        for period in self._closed_periods + self._opened_periods:
+            boundaries.update(period.boundaries())
+        return boundaries
+
+
+class CompiledSchedule:
+    """The states of a schedule over a horizon, at sorted UTC instants.
+
+    The state of a schedule only changes at midnight and at the bounds of the
+    hours of its periods, local time. The horizon ends at the next DST change
+    at the latest, so its UTC offset is fixed: the state is computed once for
+    each of these instants and is then looked up by bisection.
+    """
+
+    def __init__(self, instants, states, end):
+        self._instants = instants
+        self._states = states
+        self._end = end
+
+    def covers(self, timestamp):
+        return self._instants[0] <= timestamp < self._end
+
+    def state_at(self, timestamp):
+        return self._states[bisect.bisect_right(self._instants, timestamp) - 1]
+
+    @classmethod
+    def compile(cls, schedule, start, horizon=DEFAULT_HORIZON):
+        timezone = pytz.timezone(schedule.timezone_name)
+        start_ts = int(start.timestamp()) // 60 * 60
+        offset = _utc_offset(timezone, start_ts)
+        local_start = start_ts + offset
+        local_end = local_start + int(horizon.total_seconds())
+
+        candidates = set()
+        boundaries = schedule.boundaries() | {0}
+        for midnight in range(local_start - local_start % _DAY, local_end, _DAY):
+            candidates.update(
+                midnight + boundary
+                for boundary in boundaries
+                if local_start < midnight + boundary < local_end
+            )
+
+        instants = [start_ts]
+        states = [schedule.compute_state(_local_datetime(local_start))]
+        end = local_end - offset
+        previous = start_ts
+        for local in sorted(candidates) + [local_end]:
+            timestamp = local - offset
+            if _utc_offset(timezone, timestamp) != offset:
+                end = _next_offset_change(timezone, offset, previous, timestamp)
+                break
+            previous = timestamp
+            if local == local_end:
+                break
+            state = schedule.compute_state(_local_datetime(local))
+            if state.state != states[-1].state or state.action is not states[-1].action:
+                instants.append(timestamp)
+                states.append(state)
+        return cls(instants, states, end)
+
+
+def _utc_offset(timezone, timestamp):
+    utc_datetime = datetime.datetime.fromtimestamp(timestamp, pytz.utc)
+    return int(utc_datetime.astimezone(timezone).utcoffset().total_seconds())
+
+
+def _next_offset_change(timezone, offset, before, after):
+    # the first minute after before whose UTC offset is not offset
+    while after - before > 60:
+        middle = (before + after) // 120 * 60
+        if _utc_offset(timezone, middle) == offset:
+            before = middle
+        else:
+            after = middle
+    return after
 
-    def _get_current_localized_time(self):
-        timezone = pytz.timezone(self._timezone_name)
-        utc_now = pytz.utc.localize(datetime.datetime.utcnow())
-        return utc_now.astimezone(timezone)
+
+def _local_datetime(local_timestamp):
+    return _EPOCH + datetime.timedelta(seconds=local_timestamp)
 
 
 class AlwaysOpenedSchedule:
@@ -110,6 +210,12 @@ class SchedulePeriod:
                 return False
         return True
 
+    def boundaries(self):
+        boundaries = set()
+        for checker in self._checkers:
+            boundaries.update(checker.boundaries())
+        return boundaries
+
 
 class SchedulePeriodBuilder:
     def __init__(self):
@@ -161,6 +267,15 @@ class HoursChecker:
         tested_time = (tested_datetime.hour, tested_datetime.minute)
         return self._start_time <= tested_time <= self._end_time
 
+    def boundaries(self):
+        start_hour, start_minute = self._start_time
+        end_hour, end_minute = self._end_time
+        # the end minute is included
+        return {
+            start_hour * 3600 + start_minute * 60,
+            end_hour * 3600 + (end_minute + 1) * 60,
+        }
+
     _HOURS_VALUE_REGEX = re.compile(r'^(\d\d):([0-5]\d)-(\d\d):([0-5]\d)$')
 
     @classmethod
@@ -193,6 +308,10 @@ class _SimpleChecker:
     def _extract_tested_value_from_datetime(self, tested_datetime):
         raise NotImplementedError()
 
+    def boundaries(self):
+        # the days, weekdays and months change at midnight
+        return set()
+
     @classmethod
     def new_from_value(cls, value):
         accepted_values = set()
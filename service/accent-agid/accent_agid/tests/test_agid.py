@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from unittest import TestCase
-from unittest.mock import Mock
+from unittest.mock import MagicMock, Mock, patch
 
 from accent_agid.agid import Handler
 
@@ -17,3 +17,23 @@ class TestHandler(TestCase):
         handler.setup(fake_cursor)
 
         setup_function.assert_called_once_with(fake_cursor)
+
+    @patch('accent_agid.agid.session_scope', MagicMock())
+    def test_handle_in_a_batch(self):
+        handle_function = Mock()
+        agi = MagicMock()
+
+        handler = Handler("foo", None, handle_function, batch=True)
+        handler.handle(agi, Mock(), [])
+
+        agi.batch.assert_called_once_with()
+        handle_function.assert_called_once()
+
+    @patch('accent_agid.agid.session_scope', MagicMock())
+    def test_handle_not_in_a_batch(self):
+        agi = MagicMock()
+
+        handler = Handler("foo", None, Mock())
+        handler.handle(agi, Mock(), [])
+
+        agi.batch.assert_not_called()
@@ -0,0 +1,136 @@
+# Copyright 2023 Accent Communications
+
+from __future__ import annotations
+
+from io import BytesIO
+from unittest import TestCase
+
+from hamcrest import (
+    assert_that,
+    calling,
+    contains_exactly,
+    equal_to,
+    instance_of,
+    raises,
+)
+
+from ..fastagi import (
+    FastAGI,
+    FastAGIBatchError,
+    FastAGIDialPlanBreak,
+    FastAGIInvalidCommand,
+    FastAGIResultHangup,
+)
+
+ENV = b'agi_network_script: test\n\n'
+OK = b'200 result=1\n'
+
+
+class TestFastAGIBatch(TestCase):
+    def new_agi(self, *responses: bytes) -> FastAGI:
+        self.outf = BytesIO()
+        return FastAGI(BytesIO(ENV + b''.join(responses)), self.outf, {})
+
+    def sent(self) -> list[str]:
+        return self.outf.getvalue().decode('utf8').splitlines()
+
+    def test_variables_are_sent_when_the_batch_ends(self):
+        agi = self.new_agi(OK, OK)
+
+        with agi.batch():
+            agi.set_variable('FOO', 'foo')
+            agi.set_variable('BAR', 'bar')
+            assert_that(self.sent(), equal_to([]))
+
+        assert_that(
+            self.sent(),
+            contains_exactly(
+                'SET VARIABLE "FOO" "foo"',
+                'SET VARIABLE "BAR" "bar"',
+            ),
+        )
+
+    def test_other_commands_are_sent_after_the_queued_ones(self):
+        agi = self.new_agi(OK, b'200 result=1 (bar)\n')
+
+        with agi.batch():
+            agi.set_variable('FOO', 'foo')
+            value = agi.get_variable('BAR')
+
+        assert_that(value, equal_to('bar'))
+        assert_that(
+            self.sent(),
+            contains_exactly('SET VARIABLE "FOO" "foo"', 'GET VARIABLE "BAR"'),
+        )
+
+    def test_sent_when_full(self):
+        agi = self.new_agi(OK, OK, OK)
+
+        with agi.batch(max_size=2):
+            agi.set_variable('FOO', 'foo')
+            agi.set_variable('BAR', 'bar')
+            assert_that(
+                self.sent(),
+                equal_to(['SET VARIABLE "FOO" "foo"', 'SET VARIABLE "BAR" "bar"']),
+            )
+            agi.set_variable('BAZ', 'baz')
+
+        assert_that(len(self.sent()), equal_to(3))
+
+    def test_failures_are_mapped_to_their_command(self):
+        agi = self.new_agi(OK, b'510 Invalid or unknown command\n', OK)
+
+        with self.assertRaises(FastAGIBatchError) as raised:
+            with agi.batch():
+                agi.set_variable('FOO', 'foo')
+                agi.set_variable('BAR', 'bar')
+                agi.set_variable('BAZ', 'baz')
+
+        [(command, error)] = raised.exception.failures
+        assert_that(command, equal_to('SET VARIABLE "BAR" "bar"'))
+        assert_that(error, instance_of(FastAGIInvalidCommand))
+        # all the responses were read
+        assert_that(agi.inf.read(), equal_to(b''))
+
+    def test_hangup_is_not_wrapped(self):
+        agi = self.new_agi(
+            b'510 Invalid or unknown command\n', b'200 result=1 (hangup)\n', OK
+        )
+
+        def set_variables():
+            with agi.batch():
+                agi.set_variable('FOO', 'foo')
+                agi.set_variable('BAR', 'bar')
+                agi.set_variable('BAZ', 'baz')
+
+        assert_that(calling(set_variables), raises(FastAGIResultHangup))
+
+    def test_hangup_when_full_is_not_wrapped(self):
+        agi = self.new_agi(OK, b'200 result=1 (hangup)\n')
+
+        def set_variables():
+            with agi.batch(max_size=2):
+                agi.set_variable('FOO', 'foo')
+                agi.set_variable('BAR', 'bar')
+                agi.set_variable('BAZ', 'baz')
+
+        assert_that(calling(set_variables), raises(FastAGIResultHangup))
+        assert_that(len(self.sent()), equal_to(2))
+
+    def test_the_error_of_the_block_prevails(self):
+        agi = self.new_agi(b'510 Invalid or unknown command\n')
+
+        def set_variables():
+            with agi.batch():
+                agi.set_variable('FOO', 'foo')
+                agi.dp_break('broken')
+
+        assert_that(calling(set_variables), raises(FastAGIDialPlanBreak))
+        assert_that(self.sent(), contains_exactly('SET VARIABLE "FOO" "foo"'))
+
+    def test_not_batched_outside_of_a_batch(self):
+        agi = self.new_agi(OK)
+
+        agi.set_variable('FOO', 'foo')
+
+        assert_that(self.sent(), contains_exactly('SET VARIABLE "FOO" "foo"'))
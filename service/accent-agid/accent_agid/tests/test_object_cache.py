@@ -0,0 +1,154 @@
+# Copyright 2023 Accent Communications
+
+from __future__ import annotations
+
+from unittest import TestCase
+from unittest.mock import Mock
+
+from hamcrest import assert_that, calling, equal_to, has_entries, raises
+
+from ..object_cache import ObjectCache
+
+DEPENDENCIES = {
+    'user': ('user', 'user_voicemail'),
+    'line': ('line', 'user'),
+}
+
+
+class TestObjectCache(TestCase):
+    def setUp(self):
+        self.cache = ObjectCache(DEPENDENCIES)
+        self.cache.enable()
+        self.loader = Mock(return_value='loaded')
+
+    def test_disabled_loads_every_time(self):
+        self.cache.disable()
+        freeze = Mock()
+
+        self.cache.get_or_load('user', 42, self.loader, freeze)
+        result = self.cache.get_or_load('user', 42, self.loader, freeze)
+
+        assert_that(result, equal_to('loaded'))
+        assert_that(self.loader.call_count, equal_to(2))
+        freeze.assert_not_called()
+
+    def test_loads_once(self):
+        self.cache.get_or_load('user', 42, self.loader)
+        result = self.cache.get_or_load('user', 42, self.loader)
+
+        assert_that(result, equal_to('loaded'))
+        self.loader.assert_called_once_with()
+
+    def test_freezes_the_cached_object(self):
+        result = self.cache.get_or_load('user', 42, self.loader, str.upper)
+
+        assert_that(result, equal_to('LOADED'))
+        assert_that(self.cache.get_or_load('user', 42, self.loader), equal_to('LOADED'))
+
+    def test_caches_not_found(self):
+        loader = Mock(return_value=None)
+
+        self.cache.get_or_load('user', 42, loader, str.upper)
+        result = self.cache.get_or_load('user', 42, loader, str.upper)
+
+        assert_that(result, equal_to(None))
+        loader.assert_called_once_with()
+
+    def test_errors_are_not_cached(self):
+        loader = Mock(side_effect=[LookupError, 'loaded'])
+
+        assert_that(
+            calling(self.cache.get_or_load).with_args('user', 42, loader),
+            raises(LookupError),
+        )
+        assert_that(self.cache.get_or_load('user', 42, loader), equal_to('loaded'))
+
+    def test_unknown_kind(self):
+        assert_that(
+            calling(self.cache.get_or_load).with_args('queue', 1, self.loader),
+            raises(ValueError),
+        )
+
+    def test_mark_dirty_drops_the_dependent_kinds(self):
+        self.cache.get_or_load('user', 42, self.loader)
+        self.cache.get_or_load('line', 42, self.loader)
+
+        self.cache.mark_dirty('user_voicemail')
+        self.cache.get_or_load('user', 42, self.loader)
+        self.cache.get_or_load('line', 42, self.loader)
+
+        assert_that(self.loader.call_count, equal_to(3))
+
+    def test_mark_dirty_entity_drops_its_objects(self):
+        self.cache.get_or_load('user', 42, self.loader, None, lambda _: {'user': 42})
+        self.cache.get_or_load('user', 43, self.loader, None, lambda _: {'user': 43})
+
+        self.cache.mark_dirty('user', 42)
+        self.cache.get_or_load('user', 42, self.loader, None, lambda _: {'user': 42})
+        self.cache.get_or_load('user', 43, self.loader, None, lambda _: {'user': 43})
+
+        assert_that(self.loader.call_count, equal_to(3))
+
+    def test_mark_dirty_entity_drops_the_untagged_objects(self):
+        not_found = Mock(return_value=None)
+        self.cache.get_or_load('user', 44, not_found, None, lambda _: {'user': 44})
+        self.cache.get_or_load('line', 1, self.loader)
+
+        self.cache.mark_dirty('user', 42)
+        self.cache.get_or_load('user', 44, not_found, None, lambda _: {'user': 44})
+        self.cache.get_or_load('line', 1, self.loader)
+
+        assert_that(not_found.call_count, equal_to(2))
+        assert_that(self.loader.call_count, equal_to(2))
+
+    def test_mark_dirty_without_entity_drops_the_kind(self):
+        self.cache.get_or_load('user', 43, self.loader, None, lambda _: {'user': 43})
+
+        self.cache.mark_dirty('user')
+        self.cache.get_or_load('user', 43, self.loader, None, lambda _: {'user': 43})
+
+        assert_that(self.loader.call_count, equal_to(2))
+
+    def test_mark_dirty_unknown_entity_type(self):
+        self.cache.get_or_load('user', 42, self.loader)
+
+        self.cache.mark_dirty('queue')
+        self.cache.get_or_load('user', 42, self.loader)
+
+        self.loader.assert_called_once_with()
+
+    def test_modified_while_loading_is_not_cached(self):
+        def loader():
+            self.cache.mark_dirty('user')
+            return 'stale'
+
+        self.cache.get_or_load('user', 42, loader)
+        result = self.cache.get_or_load('user', 42, self.loader)
+
+        assert_that(result, equal_to('loaded'))
+
+    def test_disable_empties_the_cache(self):
+        self.cache.get_or_load('user', 42, self.loader)
+
+        self.cache.disable()
+        self.cache.enable()
+        self.cache.get_or_load('user', 42, self.loader)
+
+        assert_that(self.loader.call_count, equal_to(2))
+
+    def test_stats(self):
+        self.cache.get_or_load('user', 42, self.loader)
+        self.cache.get_or_load('user', 42, self.loader)
+        self.cache.get_or_load('user', 42, self.loader)
+        self.cache.get_or_load('user', 43, self.loader)
+
+        stats = self.cache.stats()
+
+        assert_that(
+            stats['user'],
+            has_entries(entries=2, hits=2, misses=2, hit_ratio=0.5),
+        )
+        assert_that(stats['user']['size'] > 0, equal_to(True))
+        assert_that(
+            stats['line'], has_entries(entries=0, hits=0, misses=0, hit_ratio=0.0)
+        )
@@ -3,10 +3,14 @@
 from __future__ import annotations
 
 import datetime
+import random
 import unittest
 from unittest.mock import Mock, call
 
+import pytz
+
 from accent_agid.schedule import (
+    CompiledSchedule,
     DaysChecker,
     HoursChecker,
     MonthsChecker,
@@ -241,6 +245,104 @@ class TestSchedule(unittest.TestCase):
         self._assert_schedule_is_in_state(schedule, current_time, 'opened')
 
 
+class TestCompiledSchedule(unittest.TestCase):
+    TIMEZONES = {
+        'America/Montreal': ['2023-03-12', '2023-11-05'],
+        'Australia/Lord_Howe': ['2023-04-02', '2023-10-01'],
+        'Europe/Paris': ['2023-03-26', '2023-10-29'],
+        'Asia/Kolkata': ['2023-03-26'],
+    }
+
+    def test_lookup(self):
+        schedule = (
+            _a_schedule()
+            .opened(_a_period().hours('08:00-16:59').weekdays('1-5').build())
+            .closed(_a_period().days('25').months('12').action('holiday').build())
+            .default_action('closed')
+            .timezone_name('Europe/Paris')
+            .build()
+        )
+        start = _utc('2023-12-21 12:00')
+        compiled = CompiledSchedule.compile(schedule, start)
+
+        # friday the 22nd, before and after the opening hours, in UTC+1
+        state = compiled.state_at(_utc('2023-12-22 06:59').timestamp())
+        self.assertEqual(('closed', 'closed'), (state.state, state.action))
+        state = compiled.state_at(_utc('2023-12-22 07:00').timestamp())
+        self.assertEqual('opened', state.state)
+        state = compiled.state_at(_utc('2023-12-22 15:59').timestamp())
+        self.assertEqual('opened', state.state)
+        state = compiled.state_at(_utc('2023-12-22 16:00').timestamp())
+        self.assertEqual('closed', state.state)
+        # monday the 25th
+        state = compiled.state_at(_utc('2023-12-25 10:00').timestamp())
+        self.assertEqual(('closed', 'holiday'), (state.state, state.action))
+
+    def test_horizon_ends_at_the_dst_change(self):
+        schedule = (
+            _a_schedule()
+            .opened(_a_period().hours('08:00-17:00').build())
+            .timezone_name('Europe/Paris')
+            .build()
+        )
+        start = _utc('2023-03-24 12:00')
+
+        compiled = CompiledSchedule.compile(schedule, start)
+
+        self.assertTrue(compiled.covers(_utc('2023-03-26 00:59').timestamp()))
+        self.assertFalse(compiled.covers(_utc('2023-03-26 01:00').timestamp()))
+
+    def test_same_states_as_compute_state_across_dst_changes(self):
+        rand = random.Random(42)
+        for timezone_name, dst_changes in self.TIMEZONES.items():
+            timezone = pytz.timezone(timezone_name)
+            for dst_change in dst_changes:
+                for _ in range(20):
+                    schedule = _a_random_schedule(rand, timezone_name)
+                    instant = _utc(f'{dst_change} 00:00') - datetime.timedelta(days=3)
+                    for _ in range(200):
+                        instant += datetime.timedelta(minutes=rand.randint(1, 90))
+                        expected = schedule.compute_state(instant.astimezone(timezone))
+
+                        result = schedule.compute_state_at(instant)
+
+                        self.assertEqual(
+                            (expected.state, expected.action),
+                            (result.state, result.action),
+                            f'{timezone_name} {instant}',
+                        )
+
+
+def _utc(value):
+    return pytz.utc.localize(datetime.datetime.strptime(value, '%Y-%m-%d %H:%M'))
+
+
+def _a_random_schedule(rand, timezone_name):
+    def random_period(action=None):
+        period = _a_period().action(action)
+        if rand.random() < 0.8:
+            start = rand.randrange(24 * 60)
+            end = rand.randrange(start, 24 * 60)
+            period.hours(
+                f'{start // 60:02d}:{start % 60:02d}-{end // 60:02d}:{end % 60:02d}'
+            )
+        if rand.random() < 0.5:
+            low = rand.randint(1, 7)
+            period.weekdays(f'{low}-{rand.randint(low, 7)}')
+        if rand.random() < 0.3:
+            period.days(','.join(str(rand.randint(1, 31)) for _ in range(5)))
+        if rand.random() < 0.2:
+            period.months(str(rand.randint(1, 12)))
+        return period.build()
+
+    schedule = _a_schedule().timezone_name(timezone_name).default_action('default')
+    for _ in range(rand.randint(0, 3)):
+        schedule.opened(random_period())
+    for i in range(rand.randint(0, 2)):
+        schedule.closed(random_period(action=f'closed-{i}'))
+    return schedule.build()
+
+
 def _a_schedule():
     return ScheduleBuilder()
 
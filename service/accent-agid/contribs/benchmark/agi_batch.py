@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# Copyright 2023 Accent Communications
+
+"""Time the channel variables set one by one and in a batch.
+
+Runs a handler setting channel variables against a fake AGI peer, which
+answers each command after a given latency, as an Asterisk server across a
+network would. The commands are sent one by one, waiting for each response,
+then pipelined with FastAGI.batch. Reports the median time of the rounds for
+each mode.
+"""
+
+import argparse
+import queue
+import socket
+import statistics
+import threading
+import time
+
+from accent_agid.fastagi import DEFAULT_BATCH_SIZE, FastAGI
+
+
+class FakeAGIPeer:
+    """Answer the AGI commands of a connection after a latency.
+
+    The commands are read as soon as they arrive and each response is written
+    latency seconds after its command was received, in order, so pipelined
+    commands wait for the latency once rather than once per command.
+    """
+
+    def __init__(self, sock, latency):
+        self._sock = sock
+        self._latency = latency
+        self._responses = queue.Queue()
+
+    def start(self):
+        self._sock.sendall(b'agi_network_script: benchmark\n\n')
+        threading.Thread(target=self._read, daemon=True).start()
+        threading.Thread(target=self._write, daemon=True).start()
+
+    def _read(self):
+        with self._sock.makefile('rb') as commands:
+            for _ in commands:
+                self._responses.put(time.monotonic() + self._latency)
+        self._responses.put(None)
+
+    def _write(self):
+        while True:
+            due = self._responses.get()
+            if due is None:
+                return
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            try:
+                self._sock.sendall(b'200 result=1\n')
+            except OSError:
+                return
+
+
+def set_variables(agi, count):
+    for i in range(count):
+        agi.set_variable(f'ACCENT_VARIABLE_{i}', f'value-{i}')
+
+
+def run(count, latency, batch_size):
+    client, server = socket.socketpair()
+    FakeAGIPeer(server, latency).start()
+    with client.makefile('rb') as rfile, client.makefile('wb') as wfile:
+        agi = FastAGI(rfile, wfile, {})
+
+        begin = time.perf_counter()
+        set_variables(agi, count)
+        sequential = time.perf_counter() - begin
+
+        begin = time.perf_counter()
+        with agi.batch(batch_size):
+            set_variables(agi, count)
+        batched = time.perf_counter() - begin
+    client.close()
+    server.close()
+    return sequential, batched
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--variables', type=int, default=40, help='set per call, default 40'
+    )
+    parser.add_argument(
+        '--latency',
+        type=float,
+        default=1.0,
+        help='round trip to Asterisk in milliseconds, default 1',
+    )
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    results = [
+        run(args.variables, args.latency / 1000, args.batch_size)
+        for _ in range(args.rounds)
+    ]
+    sequential = statistics.median(result[0] for result in results)
+    batched = statistics.median(result[1] for result in results)
+
+    print(
+        f'{args.variables} variables, {args.latency} ms latency, '
+        f'median of {args.rounds} rounds'
+    )
+    print(f'{"mode":<12} {"time (ms)":>10}')
+    print(f'{"sequential":<12} {sequential * 1000:>10.1f}')
+    print(f'{"batched":<12} {batched * 1000:>10.1f}')
+    print(f'speedup: {sequential / batched:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
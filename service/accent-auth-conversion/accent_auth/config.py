@@ -20,6 +20,8 @@ _DEFAULT_CONFIG = {
     'default_token_lifetime': TWO_HOURS,
     'token_cleanup_interval': 60.0,
     'token_cleanup_batch_size': 5000,
+    'token_store_enabled': True,
+    'token_store_flush_interval': 1.0,
     'password_reset_expiration': 172800,
     'password_reset_from_name': 'accent-auth',
     'password_reset_from_address': 'noreply@accentvoice.io',
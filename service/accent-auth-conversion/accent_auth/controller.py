@@ -55,6 +55,9 @@ class Controller:
         self._bus_publisher = BusPublisher.from_config(config['uuid'], config['amqp'])
 
         self.dao = queries.DAO.from_defaults()
+        self._token_store = None
+        if config['token_store_enabled']:
+            self._token_store = token.TokenStore(config, self.dao)
         self._backends = BackendsProxy()
         self._default_group_service = services.DefaultGroupService(
             self.dao,
@@ -65,6 +68,7 @@ class Controller:
             config['all_users_policies'],
             self._default_group_service,
             self._bus_publisher,
+            token_store=self._token_store,
         )
         self._saml_service = services.SAMLService(
             self._config, self._tenant_service, self.dao
@@ -94,10 +98,18 @@ class Controller:
         )
         group_service = services.GroupService(self.dao)
         policy_service = services.PolicyService(self.dao)
-        session_service = services.SessionService(self.dao, self._bus_publisher)
-        self._user_service = services.UserService(self.dao, self._tenant_service)
+        session_service = services.SessionService(
+            self.dao, self._bus_publisher, token_store=self._token_store
+        )
+        self._user_service = services.UserService(
+            self.dao, self._tenant_service, token_store=self._token_store
+        )
         self._token_service = services.TokenService(
-            config, self.dao, self._bus_publisher, self._user_service
+            config,
+            self.dao,
+            self._bus_publisher,
+            self._user_service,
+            token_store=self._token_store,
         )
         self._default_policy_service = services.DefaultPolicyService(
             self.dao,
@@ -186,7 +198,11 @@ class Controller:
         self._rest_api = CoreRestApi(config, self._token_service, self._user_service)
 
         self._expired_token_remover = token.ExpiredTokenRemover(
-            config, self.dao, self._bus_publisher, self._saml_service
+            config,
+            self.dao,
+            self._bus_publisher,
+            self._saml_service,
+            token_store=self._token_store,
         )
 
     def run(self):
@@ -207,9 +223,13 @@ class Controller:
                     self._config.get('bootstrap_user_policy_slug')
                     or bootstrap.DEFAULT_POLICY_SLUG,
                 )
+            if self._token_store:
+                self._token_store.load()
 
         try:
             with ServiceCatalogRegistration(*self._service_discovery_args):
+                if self._token_store:
+                    self._token_store.start()
                 self._expired_token_remover.start()
                 self._rest_api.run()
         finally:
@@ -219,6 +239,8 @@ class Controller:
     def stop(self, reason):
         logger.warning('Stopping accent-auth: %s', reason)
         self._expired_token_remover.stop()
+        if self._token_store:
+            self._token_store.stop()
         self._stopping_thread = threading.Thread(
             target=self._rest_api.stop, name=reason
         )
@@ -5,7 +5,7 @@ import time
 
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Bundle
-from sqlalchemy.sql import cast
+from sqlalchemy.sql import and_, cast, exists, or_
 
 from ... import exceptions
 from ..models import Session, Tenant
@@ -44,23 +44,73 @@ class TokenDAO(BaseDAO):
     def get(self, token_uuid):
         token = self.session.query(TokenModel).get(str(token_uuid))
         if token:
-            return {
-                'uuid': token.uuid,
-                'auth_id': token.auth_id,
-                'pbx_user_uuid': token.pbx_user_uuid,
-                'accent_uuid': token.accent_uuid,
-                'issued_t': token.issued_t,
-                'expire_t': token.expire_t,
-                'acl': token.acl,
-                'metadata': json.loads(token.metadata_) if token.metadata_ else {},
-                'session_uuid': token.session_uuid,
-                'remote_addr': token.remote_addr,
-                'user_agent': token.user_agent,
-                'refresh_token_uuid': token.refresh_token_uuid,
-            }
+            return self._to_dict(token)
 
         raise exceptions.UnknownTokenException()
 
+    def list_unexpired(self, batch_size=5_000):
+        filter_ = or_(TokenModel.expire_t.is_(None), TokenModel.expire_t >= time.time())
+        query = self.session.query(TokenModel).filter(filter_).order_by(TokenModel.uuid)
+
+        last_uuid = None
+        while True:
+            batch_query = query
+            if last_uuid is not None:
+                batch_query = batch_query.filter(TokenModel.uuid > last_uuid)
+            tokens = batch_query.limit(batch_size).all()
+            if not tokens:
+                return
+
+            yield [self._to_dict(token) for token in tokens]
+            if len(tokens) < batch_size:
+                return
+            last_uuid = tokens[-1].uuid
+
+    def delete_batch(self, token_uuids, session_uuids):
+        if session_uuids:
+            self.session.query(Session).filter(Session.uuid.in_(session_uuids)).delete(
+                synchronize_session=False
+            )
+
+        if token_uuids:
+            filter_ = TokenModel.uuid.in_(token_uuids)
+            orphan_candidates = [
+                session_uuid
+                for (session_uuid,) in self.session.query(TokenModel.session_uuid)
+                .filter(filter_)
+                .distinct()
+            ]
+            self.session.query(TokenModel).filter(filter_).delete(
+                synchronize_session=False
+            )
+            if orphan_candidates:
+                has_token = exists().where(TokenModel.session_uuid == Session.uuid)
+                orphan_filter = and_(
+                    Session.uuid.in_(orphan_candidates), ~has_token
+                )
+                self.session.query(Session).filter(orphan_filter).delete(
+                    synchronize_session=False
+                )
+
+        self.session.flush()
+
+    @staticmethod
+    def _to_dict(token):
+        return {
+            'uuid': token.uuid,
+            'auth_id': token.auth_id,
+            'pbx_user_uuid': token.pbx_user_uuid,
+            'accent_uuid': token.accent_uuid,
+            'issued_t': token.issued_t,
+            'expire_t': token.expire_t,
+            'acl': token.acl,
+            'metadata': json.loads(token.metadata_) if token.metadata_ else {},
+            'session_uuid': token.session_uuid,
+            'remote_addr': token.remote_addr,
+            'user_agent': token.user_agent,
+            'refresh_token_uuid': token.refresh_token_uuid,
+        }
+
     def delete(self, token_uuid):
         filter_ = TokenModel.uuid == str(token_uuid)
 
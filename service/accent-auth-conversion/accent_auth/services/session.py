@@ -6,9 +6,10 @@ from accent_auth.services.helpers import BaseService
 
 
 class SessionService(BaseService):
-    def __init__(self, dao, bus_publisher):
+    def __init__(self, dao, bus_publisher, token_store=None):
         super().__init__(dao)
         self._bus_publisher = bus_publisher
+        self._token_store = token_store
 
     def count(self, scoping_tenant_uuid, recurse=False, **kwargs):
         if scoping_tenant_uuid:
@@ -29,6 +30,8 @@ class SessionService(BaseService):
         visible_tenants = self._dao.tenant.list_visible_tenants(scoping_tenant_uuid)
         tenant_uuids = [tenant.uuid for tenant in visible_tenants]
         session, token = self._dao.session.delete(session_uuid, tenant_uuids)
+        if self._token_store:
+            self._token_store.evict_session(str(session_uuid))
         if not token:
             return
 
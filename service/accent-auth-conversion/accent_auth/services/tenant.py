@@ -21,9 +21,11 @@ class TenantService(BaseService):
         all_users_policies,
         default_group_service,
         bus_publisher=None,
+        token_store=None,
     ):
         super().__init__(dao)
         self._bus_publisher = bus_publisher
+        self._token_store = token_store
         self._all_users_policies = all_users_policies
         self._default_group_service = default_group_service
 
@@ -38,6 +40,9 @@ class TenantService(BaseService):
             raise exceptions.UnknownTenantException(tenant_uuid)
 
         result = self._dao.tenant.delete(tenant_uuid)
+        if self._token_store:
+            # Sessions of the tenant are deleted in cascade
+            self._token_store.evict_tenant(tenant_uuid)
 
         event = TenantDeletedEvent(tenant_uuid)
         self._bus_publisher.publish(event)
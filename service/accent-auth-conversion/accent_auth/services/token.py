@@ -26,8 +26,9 @@ logger = logging.getLogger(__name__)
 
 
 class TokenService(BaseService):
-    def __init__(self, config, dao, bus_publisher, user_service):
+    def __init__(self, config, dao, bus_publisher, user_service, token_store=None):
         super().__init__(dao)
+        self._token_store = token_store
         self._deprecated_backend_policies = config.get('backend_policies', {})
         self._default_user_policy = config.get('default_user_policy')
         self._default_expiration = config['default_token_lifetime']
@@ -56,6 +57,8 @@ class TokenService(BaseService):
         )
         self._bus_publisher.publish(event)
         self._dao.refresh_token.delete(tenant_uuids, user_uuid, client_id)
+        if self._token_store:
+            self._token_store.evict_user(user_uuid)
 
     def delete_refresh_token_by_uuid(self, uuid):
         refresh_token = self._dao.refresh_token.get_by_uuid(uuid)
@@ -71,6 +74,8 @@ class TokenService(BaseService):
             refresh_token['user_uuid'],
             refresh_token['client_id'],
         )
+        if self._token_store:
+            self._token_store.evict_user(refresh_token['user_uuid'])
 
     def list_refresh_tokens(
         self, scoping_tenant_uuid=None, recurse=False, **search_params
@@ -152,6 +157,8 @@ class TokenService(BaseService):
             args.get('refresh_token', None) or token_payload.get('refresh_token', None),
         )
         token = Token(token_uuid, session_uuid=session_uuid, **token_payload)
+        if self._token_store:
+            self._token_store.add(token)
 
         user_uuid = auth_id if is_uuid(auth_id) else None
         event = SessionCreatedEvent(
@@ -182,10 +189,13 @@ class TokenService(BaseService):
         session_args = {}
         token_uuid, session_uuid = self._dao.token.create(token_args, session_args)
         token = Token(token_uuid, session_uuid=session_uuid, **token_args)
+        if self._token_store:
+            self._token_store.add(token)
         return token
 
     def remove_token(self, token_uuid):
-        token, session = self._dao.token.delete(token_uuid)
+        result = self._token_store.remove(token_uuid) if self._token_store else None
+        token, session = result or self._dao.token.delete(token_uuid)
         if not session:
             return
 
@@ -195,14 +205,11 @@ class TokenService(BaseService):
         self._bus_publisher.publish(event)
 
     def get(self, token_uuid, required_access):
-        token_data = self._dao.token.get(token_uuid)
-        if not token_data:
+        token = self._get_token(token_uuid)
+        if not token:
             logger.debug('Rejecting unknown token')
             raise UnknownTokenException()
 
-        id_ = token_data.pop('uuid')
-        token = Token(id_, **token_data)
-
         if token.is_expired():
             logger.debug('Rejecting token: expired')
             raise UnknownTokenException()
@@ -214,13 +221,10 @@ class TokenService(BaseService):
         return token
 
     def check_scopes(self, token_uuid, scopes):
-        token_data = self._dao.token.get(token_uuid)
-        if not token_data:
+        token = self._get_token(token_uuid)
+        if not token:
             raise UnknownTokenException()
 
-        id_ = token_data.pop('uuid')
-        token = Token(id_, **token_data)
-
         if token.is_expired():
             raise UnknownTokenException()
 
@@ -230,6 +234,17 @@ class TokenService(BaseService):
 
         return token, scope_statuses
 
+    def _get_token(self, token_uuid):
+        if self._token_store:
+            return self._token_store.get(token_uuid)
+
+        token_data = self._dao.token.get(token_uuid)
+        if not token_data:
+            return None
+
+        id_ = token_data.pop('uuid')
+        return Token(id_, **token_data)
+
     def _get_acl(self, backend_name):
         # 21.14: deprecated
         policy_name = self._deprecated_backend_policies.get(backend_name)
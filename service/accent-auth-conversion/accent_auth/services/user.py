@@ -22,9 +22,10 @@ class UnknownUserHash:
 
 
 class UserService(BaseService):
-    def __init__(self, dao, tenant_service=None, encrypter=None):
+    def __init__(self, dao, tenant_service=None, encrypter=None, token_store=None):
         super().__init__(dao)
         self._tenant_service = tenant_service
+        self._token_store = token_store
         self._encrypter = encrypter or PasswordEncrypter()
         self._unknown_user_salt = os.urandom(self._encrypter._salt_len)
         # The unknown_user_hash will never be equal, whatever the user input is
@@ -100,6 +101,9 @@ class UserService(BaseService):
     def delete_user(self, scoping_tenant_uuid, user_uuid):
         self.assert_user_in_subtenant(scoping_tenant_uuid, user_uuid)
         self._dao.user.delete(user_uuid)
+        if self._token_store:
+            # Tokens bound to the user refresh tokens are deleted in cascade
+            self._token_store.evict_user(str(user_uuid))
 
     def get_acl(self, user_uuid):
         users = self._dao.user.list_(uuid=user_uuid, limit=1)
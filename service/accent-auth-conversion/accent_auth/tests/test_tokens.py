@@ -3,8 +3,21 @@
 import time
 import unittest
 import uuid
+from unittest.mock import Mock, patch
+
+from hamcrest import (
+    assert_that,
+    calling,
+    contains_exactly,
+    empty,
+    equal_to,
+    has_entries,
+    raises,
+)
 
 from accent_auth import token
+from accent_auth.database.queries.token import TokenDAO
+from accent_auth.exceptions import UnknownTokenException
 
 
 def new_uuid():
@@ -59,3 +72,261 @@ class TestToken(unittest.TestCase):
         self.token.expire_t = None
 
         self.assertFalse(self.token.is_expired())
+
+
+def new_token_data(**kwargs):
+    data = {
+        'uuid': new_uuid(),
+        'auth_id': new_uuid(),
+        'pbx_user_uuid': None,
+        'accent_uuid': None,
+        'issued_t': 1000,
+        'expire_t': 2000,
+        'acl': ['confd.#'],
+        'metadata': {'tenant_uuid': 'tenant-uuid'},
+        'session_uuid': new_uuid(),
+        'user_agent': 'user-agent',
+        'remote_addr': '127.0.0.1',
+        'refresh_token_uuid': None,
+    }
+    data.update(kwargs)
+    return data
+
+
+def new_token(**kwargs):
+    data = new_token_data(**kwargs)
+    return token.Token(data.pop('uuid'), **data)
+
+
+@patch('accent_auth.token.Session', Mock())
+class TestTokenStore(unittest.TestCase):
+    def setUp(self):
+        self.dao = Mock()
+        self.dao.token = Mock(TokenDAO)
+        self.dao.token.get.side_effect = UnknownTokenException
+        config = {
+            'token_cleanup_batch_size': 2,
+            'token_store_flush_interval': 0,
+            'debug': False,
+        }
+        self.store = token.TokenStore(config, self.dao)
+
+    def test_get_from_memory(self):
+        token_ = new_token()
+        self.store.add(token_)
+
+        result = self.store.get(token_.token)
+
+        assert_that(result, equal_to(token_))
+        self.dao.token.get.assert_not_called()
+
+    def test_get_falls_back_to_the_database(self):
+        data = new_token_data()
+        self.dao.token.get.side_effect = None
+        self.dao.token.get.return_value = dict(data)
+
+        self.store.get(data['uuid'])
+        self.store.get(data['uuid'])
+
+        self.dao.token.get.assert_called_once_with(data['uuid'])
+
+    def test_get_unknown(self):
+        assert_that(
+            calling(self.store.get).with_args('unknown'),
+            raises(UnknownTokenException),
+        )
+
+    def test_load(self):
+        data = new_token_data()
+        self.dao.token.list_unexpired.return_value = iter([[dict(data)]])
+
+        self.store.load()
+
+        assert_that(self.store.get(data['uuid']).auth_id, equal_to(data['auth_id']))
+
+    def test_remove_is_written_through(self):
+        token_ = new_token()
+        self.store.add(token_)
+
+        token_result, session_result = self.store.remove(token_.token)
+
+        assert_that(
+            token_result, equal_to({'uuid': token_.token, 'auth_id': token_.auth_id})
+        )
+        assert_that(
+            session_result,
+            equal_to({'uuid': token_.session_uuid, 'tenant_uuid': 'tenant-uuid'}),
+        )
+        self.dao.token.delete_batch.assert_called_once_with([token_.token], [])
+        assert_that(
+            calling(self.store.get).with_args(token_.token),
+            raises(UnknownTokenException),
+        )
+
+    def test_remove_keeps_session_with_other_tokens(self):
+        session_uuid = new_uuid()
+        token_ = new_token(session_uuid=session_uuid)
+        self.store.add(token_)
+        self.store.add(new_token(session_uuid=session_uuid))
+
+        _, session_result = self.store.remove(token_.token)
+
+        assert_that(session_result, equal_to({}))
+
+    def test_remove_unknown(self):
+        assert_that(self.store.remove('unknown'), equal_to(None))
+
+    def test_pop_expired(self):
+        expired = new_token(expire_t=100)
+        alive = new_token(expire_t=300)
+        self.store.add(alive)
+        self.store.add(expired)
+
+        result = self.store.pop_expired(now=200)
+
+        assert_that([t['uuid'] for t in result], equal_to([expired.token]))
+        assert_that(self.store.pop_expired(now=200), empty())
+        assert_that(self.store.get(alive.token), equal_to(alive))
+
+        self.store.flush()
+
+        self.dao.token.delete_batch.assert_called_once_with([], [expired.session_uuid])
+
+    def test_pop_expired_once_per_session(self):
+        session_uuid = new_uuid()
+        self.store.add(new_token(session_uuid=session_uuid, expire_t=100))
+        self.store.add(new_token(session_uuid=session_uuid, expire_t=150))
+
+        result = self.store.pop_expired(now=200)
+
+        assert_that(result, contains_exactly(has_entries(session_uuid=session_uuid)))
+
+    def test_pop_expired_skips_removed_tokens(self):
+        token_ = new_token(expire_t=100)
+        self.store.add(token_)
+        self.store.remove(token_.token)
+
+        assert_that(self.store.pop_expired(now=200), empty())
+
+    def test_evicted_tokens_still_expire(self):
+        token_ = new_token(expire_t=100)
+        self.store.add(token_)
+        self.store.clear()
+
+        result = self.store.pop_expired(now=200)
+
+        assert_that([t['uuid'] for t in result], equal_to([token_.token]))
+
+    def test_pop_expire_soon(self):
+        soon = new_token(expire_t=150)
+        later = new_token(expire_t=500)
+        self.store.add(soon)
+        self.store.add(later)
+
+        result = self.store.pop_expire_soon(60, now=100)
+
+        assert_that([t['uuid'] for t in result], equal_to([soon.token]))
+        assert_that(self.store.pop_expire_soon(60, now=100), empty())
+
+    def test_flush_in_batches(self):
+        for _ in range(3):
+            self.store.add(new_token(expire_t=100))
+        self.store.pop_expired(now=200)
+
+        self.store.flush()
+
+        assert_that(self.dao.token.delete_batch.call_count, equal_to(2))
+
+    def test_flush_failure_keeps_pending_writes(self):
+        token_ = new_token()
+        self.store.add(token_)
+        self.dao.token.delete_batch.side_effect = Exception
+
+        assert_that(
+            calling(self.store.remove).with_args(token_.token), raises(Exception)
+        )
+        assert_that(
+            calling(self.store.get).with_args(token_.token),
+            raises(UnknownTokenException),
+        )
+
+        self.dao.token.delete_batch.side_effect = None
+        self.store.flush()
+        self.dao.token.delete_batch.assert_called_with([token_.token], [])
+
+    def test_evict_session_falls_back_to_the_database(self):
+        token_ = new_token()
+        self.store.add(token_)
+
+        self.store.evict_session(token_.session_uuid)
+
+        assert_that(
+            calling(self.store.get).with_args(token_.token),
+            raises(UnknownTokenException),
+        )
+        self.dao.token.get.assert_called_once_with(token_.token)
+
+    def test_evicted_session_does_not_expire(self):
+        token_ = new_token(expire_t=100)
+        self.store.add(token_)
+
+        self.store.evict_session(token_.session_uuid)
+
+        assert_that(self.store.pop_expired(now=200), empty())
+        assert_that(self.store.pop_expire_soon(60, now=100), empty())
+
+    def test_evict_tenant(self):
+        token_ = new_token(expire_t=100, metadata={'tenant_uuid': 'tenant-uuid'})
+        other = new_token(expire_t=100, metadata={'tenant_uuid': 'other-uuid'})
+        self.store.add(token_)
+        self.store.add(other)
+
+        self.store.evict_tenant('tenant-uuid')
+
+        assert_that(
+            calling(self.store.get).with_args(token_.token),
+            raises(UnknownTokenException),
+        )
+        assert_that(self.store.get(other.token), equal_to(other))
+        result = self.store.pop_expired(now=200)
+        assert_that([t['uuid'] for t in result], equal_to([other.token]))
+
+
+class TestExpiredTokenRemover(unittest.TestCase):
+    def setUp(self):
+        self.dao = Mock()
+        self.dao.token = Mock(TokenDAO)
+        self.token_store = Mock(token.TokenStore)
+        self.token_store.pop_expired.return_value = []
+        self.bus_publisher = Mock()
+        config = {
+            'token_cleanup_interval': 0,
+            'token_cleanup_batch_size': 2,
+            'debug': False,
+        }
+        self.remover = token.ExpiredTokenRemover(
+            config, self.dao, self.bus_publisher, Mock(), self.token_store
+        )
+
+    @patch('accent_auth.token.Session', Mock())
+    def test_purge_the_database_once_with_a_token_store(self):
+        token_data = {
+            'uuid': new_uuid(),
+            'auth_id': new_uuid(),
+            'session_uuid': new_uuid(),
+            'metadata': {'tenant_uuid': 'tenant-uuid'},
+        }
+        session = {'uuid': token_data['session_uuid']}
+        self.dao.token.purge_expired_tokens_and_sessions.return_value = iter(
+            [([token_data], [session])]
+        )
+
+        self.remover._purge_expired_sessions()
+        self.remover._purge_expired_sessions()
+
+        self.dao.token.purge_expired_tokens_and_sessions.assert_called_once_with(2)
+        self.token_store.evict_session.assert_called_once_with(session['uuid'])
+        assert_that(self.token_store.pop_expired.call_count, equal_to(2))
+        self.bus_publisher.publish.assert_called_once()
+        event = self.bus_publisher.publish.call_args[0][0]
+        assert_that(event.content['uuid'], equal_to(session['uuid']))
@@ -1,15 +1,18 @@
 # Copyright 2023 Accent Communications
 
+import heapq
 import logging
 import os
 import threading
 import time
+from collections import defaultdict
 from datetime import datetime
 
 from accent.auth_verifier import AccessCheck
 from accent_bus.resources.auth.events import SessionDeletedEvent, SessionExpireSoonEvent
 
 from accent_auth.database.helpers import Session
+from accent_auth.exceptions import UnknownTokenException
 
 logger = logging.getLogger(__name__)
 
@@ -105,13 +108,231 @@ class Token:
         return self._access_check.matches_required_access(required_access)
 
 
+class TokenStore:
+    """In-memory index of the live tokens and sessions of this accent-auth.
+
+    Checks are answered from memory and fall back to the database on a miss.
+    Revocations are written through before ``remove`` returns, expirations are
+    applied in memory right away and written to the database in batches by
+    ``flush``. Expiration is driven by heaps ordered on ``expire_t`` instead of
+    scanning the token table.
+    """
+
+    def __init__(self, config, dao):
+        self._dao = dao
+        self._batch_size = config['token_cleanup_batch_size']
+        self._flush_interval = config['token_store_flush_interval']
+        self._debug = config['debug']
+        self._lock = threading.RLock()
+        self._tokens = {}
+        self._session_tokens = defaultdict(set)
+        self._scheduled = set()
+        self._expirations = []
+        self._expire_soon = []
+        self._deleted_tokens = set()
+        self._deleted_sessions = set()
+        self._tombstone = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name='token-store')
+        self._thread.daemon = True
+
+    def start(self):
+        if self._flush_interval > 0:
+            self._thread.start()
+
+    def stop(self):
+        if self._flush_interval > 0:
+            self._tombstone.set()
+            self._thread.join()
+            self._tombstone.clear()
+        self.flush()
+
+    def load(self):
+        count = 0
+        try:
+            for batch in self._dao.token.list_unexpired(self._batch_size):
+                for token_data in batch:
+                    self.add(Token(token_data.pop('uuid'), **token_data))
+                count += len(batch)
+        finally:
+            Session.close()
+        logger.info('Loaded %s tokens in memory', count)
+
+    def add(self, token):
+        with self._lock:
+            self._tokens[token.token] = token
+            self._session_tokens[token.session_uuid].add(token.token)
+            if token.expire_t and token.token not in self._scheduled:
+                self._scheduled.add(token.token)
+                entry = (token.expire_t, token.token, self._summary(token))
+                heapq.heappush(self._expirations, entry)
+                heapq.heappush(self._expire_soon, entry)
+
+    def get(self, token_uuid):
+        token_uuid = str(token_uuid)
+        with self._lock:
+            token = self._tokens.get(token_uuid)
+            if token is not None:
+                return token
+            if token_uuid in self._deleted_tokens:
+                raise UnknownTokenException()
+
+        token_data = self._dao.token.get(token_uuid)
+        token = Token(token_data.pop('uuid'), **token_data)
+        with self._lock:
+            if (
+                token.token in self._deleted_tokens
+                or token.session_uuid in self._deleted_sessions
+            ):
+                raise UnknownTokenException()
+            self.add(token)
+        return token
+
+    def remove(self, token_uuid):
+        token_uuid = str(token_uuid)
+        with self._lock:
+            token = self._tokens.get(token_uuid)
+            if token is None:
+                return None
+
+            session_tokens = self._session_tokens[token.session_uuid]
+            last_of_session = session_tokens == {token_uuid}
+            self._evict(token_uuid)
+            self._scheduled.discard(token_uuid)
+            self._deleted_tokens.add(token_uuid)
+
+        # A revoked token must not come back if accent-auth stops before the
+        # next periodic flush
+        self.flush()
+
+        token_result = {'uuid': token.token, 'auth_id': token.auth_id}
+        session_result = {}
+        if last_of_session:
+            session_result = {
+                'uuid': token.session_uuid,
+                'tenant_uuid': token.metadata.get('tenant_uuid'),
+            }
+        return token_result, session_result
+
+    def evict_session(self, session_uuid):
+        # The session is gone from the database, it must not expire again
+        with self._lock:
+            for token_uuid in list(self._session_tokens.get(session_uuid, ())):
+                self._evict(token_uuid)
+                self._scheduled.discard(token_uuid)
+
+    def evict_tenant(self, tenant_uuid):
+        tenant_uuid = str(tenant_uuid)
+        with self._lock:
+            for token_uuid, token in list(self._tokens.items()):
+                if token.metadata.get('tenant_uuid') == tenant_uuid:
+                    self._evict(token_uuid)
+                    self._scheduled.discard(token_uuid)
+
+    def evict_user(self, auth_id):
+        with self._lock:
+            for token_uuid, token in list(self._tokens.items()):
+                if token.auth_id == auth_id:
+                    self._evict(token_uuid)
+
+    def clear(self):
+        with self._lock:
+            self._tokens.clear()
+            self._session_tokens.clear()
+
+    def pop_expired(self, now=None):
+        now = time.time() if now is None else now
+        expired = []
+        with self._lock:
+            while self._expirations and self._expirations[0][0] <= now:
+                _, token_uuid, summary = heapq.heappop(self._expirations)
+                if token_uuid not in self._scheduled:
+                    continue
+                # The whole session goes away with its first expired token
+                session_uuid = summary['session_uuid']
+                self._scheduled.difference_update(
+                    self._session_tokens.get(session_uuid, ())
+                )
+                self._scheduled.discard(token_uuid)
+                self._deleted_sessions.add(session_uuid)
+                self.evict_session(session_uuid)
+                expired.append(summary)
+        return expired
+
+    def pop_expire_soon(self, time_remaining, now=None):
+        limit = (time.time() if now is None else now) + time_remaining
+        expiring = []
+        with self._lock:
+            while self._expire_soon and self._expire_soon[0][0] <= limit:
+                _, token_uuid, summary = heapq.heappop(self._expire_soon)
+                if token_uuid in self._scheduled:
+                    expiring.append(summary)
+        return expiring
+
+    def flush(self):
+        with self._lock:
+            token_uuids = list(self._deleted_tokens)
+            session_uuids = list(self._deleted_sessions)
+        if not token_uuids and not session_uuids:
+            return
+
+        try:
+            count = max(len(token_uuids), len(session_uuids))
+            for start in range(0, count, self._batch_size):
+                end = start + self._batch_size
+                self._dao.token.delete_batch(
+                    token_uuids[start:end], session_uuids[start:end]
+                )
+            Session.commit()
+        except Exception:
+            Session.rollback()
+            raise
+        finally:
+            Session.close()
+
+        with self._lock:
+            self._deleted_tokens.difference_update(token_uuids)
+            self._deleted_sessions.difference_update(session_uuids)
+
+    def _evict(self, token_uuid):
+        token = self._tokens.pop(token_uuid, None)
+        if token is None:
+            return
+        session_tokens = self._session_tokens.get(token.session_uuid)
+        if session_tokens is not None:
+            session_tokens.discard(token_uuid)
+            if not session_tokens:
+                del self._session_tokens[token.session_uuid]
+
+    @staticmethod
+    def _summary(token):
+        return {
+            'uuid': token.token,
+            'auth_id': token.auth_id,
+            'session_uuid': token.session_uuid,
+            'metadata': token.metadata,
+        }
+
+    def _loop(self):
+        while not self._tombstone.wait(self._flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.warning(
+                    '%s: failed to write tokens to the database',
+                    self.__class__.__name__,
+                    exc_info=self._debug,
+                )
+
+
 class ExpiredTokenRemover:
-    def __init__(self, config, dao, bus_publisher, saml_service):
+    def __init__(self, config, dao, bus_publisher, saml_service, token_store=None):
         self._dao = dao
+        self._token_store = token_store
         self._bus_publisher = bus_publisher
         self._cleanup_interval = config['token_cleanup_interval']
         self._batch_size = config['token_cleanup_batch_size']
         self._debug = config['debug']
+        self._database_purged = False
         if self._cleanup_interval < 1:
             return
 
@@ -158,6 +379,12 @@ class ExpiredTokenRemover:
                 self._tombstone.wait(self._cleanup_interval - elapsed)
 
     def _notify_expire_soon(self):
+        if self._token_store:
+            tokens = self._token_store.pop_expire_soon(self._cleanup_interval)
+            sessions = [{'uuid': token['session_uuid']} for token in tokens]
+            self._publish_events(SessionExpireSoonEvent, tokens, sessions)
+            return
+
         generator = self._dao.token.get_tokens_and_sessions_about_to_expire(
             self._cleanup_interval, self._batch_size
         )
@@ -168,6 +395,22 @@ class ExpiredTokenRemover:
             Session.close()
 
     def _purge_expired_sessions(self):
+        if not self._token_store:
+            self._purge_expired_database_sessions()
+            return
+
+        if not self._database_purged:
+            # The store only loads unexpired tokens, the ones that expired
+            # while accent-auth was stopped are only found in the database
+            self._purge_expired_database_sessions()
+            self._database_purged = True
+
+        tokens = self._token_store.pop_expired()
+        self._token_store.flush()
+        sessions = [{'uuid': token['session_uuid']} for token in tokens]
+        self._publish_events(SessionDeletedEvent, tokens, sessions)
+
+    def _purge_expired_database_sessions(self):
         try:
             for tokens, sessions in self._dao.token.purge_expired_tokens_and_sessions(
                 self._batch_size
@@ -182,6 +425,9 @@ class ExpiredTokenRemover:
                     )
                     raise
 
+                if self._token_store:
+                    for session in sessions:
+                        self._token_store.evict_session(session['uuid'])
                 self._publish_events(SessionDeletedEvent, tokens, sessions)
         finally:
             Session.close()
@@ -7,6 +7,7 @@ from pydantic import BaseModel, ConfigDict, Field, field_validator
 class LinePresence(BaseModel):
     id: int
     state: str = Field(..., description="The current state of the line.")
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UserPresence(BaseModel):
@@ -1,7 +1,7 @@
 # src/accent_chatd/api/presences/routes.py
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 
 from accent_chatd.api.presences.models import (
     PresenceList,
@@ -15,18 +15,27 @@ from accent_chatd.core.config import Settings
 from accent_chatd.dao.user import UserDAO
 from accent_chatd.core.database import get_async_session
 from accent_chatd.core.bus import get_bus, BusClient  # Import
+from accent_chatd.services.presence_engine import PresenceEngine
 from accent_chatd.services.presences import PresenceService  # Import service
 from sqlalchemy.ext.asyncio import AsyncSession
 
 presence_router = APIRouter()
 
 
+# Dependency to get the presence engine, started once on startup
+def get_presence_engine(request: Request) -> Optional[PresenceEngine]:
+    return getattr(request.app.state, "presence_engine", None)
+
+
 # Dependency to get the PresenceService instance
 async def get_presence_service(
     db: AsyncSession = Depends(get_async_session),
     bus_client: BusClient = Depends(get_bus),
+    engine: Optional[PresenceEngine] = Depends(get_presence_engine),
 ) -> PresenceService:
-    return PresenceService(UserDAO(db), bus_client)
+    return PresenceService(
+        UserDAO(db), bus_client.publisher, bus_client.consumer, engine=engine
+    )
 
 
 @presence_router.get(
@@ -0,0 +1,57 @@
+# src/accent_chatd/api/rooms/models.py
+from typing import List, Optional
+import datetime
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class RoomUser(BaseModel):
+    uuid: str
+    tenant_uuid: Optional[str] = None
+    accent_uuid: Optional[str] = None
+    model_config = ConfigDict(from_attributes=True)
+
+
+class Room(BaseModel):
+    uuid: str
+    name: Optional[str] = None
+    users: List[RoomUser] = []
+    model_config = ConfigDict(from_attributes=True)
+
+
+class RoomList(BaseModel):
+    items: List[Room]
+    filtered: int
+    total: int
+
+
+# Used for Request.
+class RoomCreate(BaseModel):
+    name: Optional[str] = None
+    users: List[RoomUser] = []
+
+
+class Message(BaseModel):
+    uuid: str
+    content: Optional[str] = None
+    alias: Optional[str] = None
+    user_uuid: str
+    tenant_uuid: str
+    accent_uuid: str
+    created_at: datetime.datetime
+    model_config = ConfigDict(from_attributes=True)
+
+
+class MessageList(BaseModel):
+    items: List[Message]
+    filtered: int
+    total: int
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Value of `after` to get the next page, null on the last page.",
+    )
+
+
+# Used for Request.
+class MessageCreate(BaseModel):
+    content: str
+    alias: Optional[str] = None
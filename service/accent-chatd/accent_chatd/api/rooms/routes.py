@@ -1,7 +1,8 @@
 # src/accent_chatd/api/rooms/routes.py
 
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from accent_chatd.api.rooms.models import (
     Message,
@@ -13,8 +14,14 @@ from accent_chatd.api.rooms.models import (
 )
 from accent_chatd.core.auth import get_current_user_uuid, verify_token
 from accent_chatd.core.config import Settings, get_settings
-from accent_chatd.core.database import get_async_session
-from accent_chatd.dao.room import RoomDAO
+from accent_chatd.core.database import async_session_maker
+from accent_chatd.core.dependencies import get_config
+from accent_chatd.dao.room import (
+    MessageCursor,
+    RoomDAO,
+    decode_message_cursor,
+    encode_message_cursor,
+)
 from accent_chatd.dao.user import UserDAO
 from accent_chatd.exceptions import UnknownRoomException
 from accent_chatd.models.room import Room as RoomModel
@@ -25,10 +32,32 @@ room_router = APIRouter()
 
 # Dependency to get the RoomService instance
 def get_room_service(
-    db: AsyncSession = Depends(get_async_session),
     settings: Settings = Depends(get_settings),
 ) -> RoomService:
-    return RoomService(RoomDAO(db), UserDAO(db), settings.uuid)
+    # The DAOs open their own sessions
+    return RoomService(
+        RoomDAO(async_session_maker), UserDAO(async_session_maker), settings.uuid
+    )
+
+
+def _message_cursor(after: Optional[str], order: str) -> Optional[MessageCursor]:
+    if after is None:
+        return None
+    if order != "created_at":
+        raise HTTPException(
+            status_code=400, detail="`after` requires the created_at order"
+        )
+    try:
+        return decode_message_cursor(after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _next_cursor(messages, limit: Optional[int], order: str) -> Optional[str]:
+    # A full page may be followed by another one
+    if order != "created_at" or not limit or len(messages) < limit:
+        return None
+    return encode_message_cursor(messages[-1])
 
 
 @room_router.post(
@@ -119,7 +148,8 @@ async def create_room_message(
 )
 async def list_user_messages(
     search: Optional[str] = Query(
-        None, description="Search term for filtering messages."
+        None,
+        description="Search term for filtering messages. Each word matches the start of a word of the messages, accents are ignored.",
     ),
     distinct: Optional[str] = Query(
         None,
@@ -129,6 +159,10 @@ async def list_user_messages(
         None, description="Maximum number of items to return."
     ),
     offset: Optional[int] = Query(None, description="Offset for pagination."),
+    after: Optional[str] = Query(
+        None,
+        description="`next_cursor` of the previous page, to get the page after it. Unlike `offset`, the pages stay consistent while messages are added. Requires the created_at order.",
+    ),
     order: str = Query("created_at", description="Field to order by."),
     direction: str = Query("desc", description="Sort order (asc or desc)."),
     service: RoomService = Depends(get_room_service),
@@ -137,10 +171,19 @@ async def list_user_messages(
 ):
     await verify_token(token, "chatd.users.me.rooms.messages.read")
     tenant_uuid = settings.auth["master_tenant_uuid"]  # Replace with get_tenant_uuid
+    cursor = _message_cursor(after, order)
 
     # Call service layer
     messages = await service.search_user_messages(
-        tenant_uuid, token, search, distinct, limit, offset, order, direction
+        tenant_uuid,
+        token,
+        search,
+        distinct,
+        limit,
+        offset,
+        order,
+        direction,
+        after=cursor,
     )
     # convert all room message to pydantic models.
     message_list = [Message.model_validate(message) for message in messages]
@@ -149,7 +192,12 @@ async def list_user_messages(
     filtered = await service.count_user_messages(
         tenant_uuid, token, search=search, distinct=distinct, limit=limit, offset=offset
     )
-    return MessageList(items=message_list, total=total, filtered=filtered)
+    return MessageList(
+        items=message_list,
+        total=total,
+        filtered=filtered,
+        next_cursor=_next_cursor(messages, limit, order),
+    )
 
 
 @room_router.get(
@@ -161,12 +209,17 @@ async def list_user_messages(
 async def list_room_messages(
     room_uuid: str,
     search: Optional[str] = Query(
-        None, description="Search term for filtering messages."
+        None,
+        description="Search term for filtering messages. Each word matches the start of a word of the messages, accents are ignored.",
     ),
     limit: Optional[int] = Query(
         None, description="Maximum number of items to return."
     ),
     offset: Optional[int] = Query(None, description="Offset for pagination."),
+    after: Optional[str] = Query(
+        None,
+        description="`next_cursor` of the previous page, to get the page after it. Unlike `offset`, the pages stay consistent while messages are added. Requires the created_at order.",
+    ),
     order: str = Query("created_at", description="Field to order by."),
     direction: str = Query("desc", description="Sort order (asc or desc)."),
     service: RoomService = Depends(get_room_service),
@@ -183,9 +236,22 @@ async def list_room_messages(
     except UnknownRoomException as e:
         raise HTTPException(status_code=404, detail=str(e))
 
-    messages = await service.list_messages(room, limit, offset, order, direction)
+    messages = await service.list_messages(
+        room,
+        limit,
+        offset,
+        order,
+        direction,
+        after=_message_cursor(after, order),
+        search=search,
+    )
     message_list = [Message.model_validate(message) for message in messages]
     total = await service.count_messages(room)
     filtered = await service.count_messages(room, search=search)
 
-    return MessageList(items=message_list, filtered=filtered, total=total)
+    return MessageList(
+        items=message_list,
+        filtered=filtered,
+        total=total,
+        next_cursor=_next_cursor(messages, limit, order),
+    )
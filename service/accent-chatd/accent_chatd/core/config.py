@@ -100,6 +100,12 @@ class EnabledPlugins(BaseModel):
 class InitializationSettings(BaseModel):
     enabled: bool = True
 
+class PresenceSettings(BaseModel):
+    # In-memory presences, persisted and notified at most once per interval
+    engine_enabled: bool = True
+    flush_interval: float = 1.0
+    flush_batch_size: int = 500
+
 class MicrosoftSettings(BaseModel):
     client_id: str
     client_secret: str
@@ -138,6 +144,7 @@ class Settings(BaseSettings):
     service_discovery: ServiceDiscoverySettings = Field(default_factory=ServiceDiscoverySettings)
     enabled_plugins: EnabledPlugins = Field(default_factory=EnabledPlugins)
     initialization: InitializationSettings = Field(default_factory=InitializationSettings)
+    presence: PresenceSettings = Field(default_factory=PresenceSettings)
     teams_presence: TeamsPresenceSettings = Field(default_factory=TeamsPresenceSettings)
 
     # new field
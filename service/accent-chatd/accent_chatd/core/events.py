@@ -5,4 +5,16 @@ from enum import Enum
 class EventType(str, Enum):
     USER_CREATED = "user_created"
     USER_DELETED = "user_deleted"
+    SESSION_CREATED = "auth_session_created"
+    SESSION_DELETED = "auth_session_deleted"
+    USER_LINE_ASSOCIATED = "user_line_associated"
+    USER_LINE_DISSOCIATED = "user_line_dissociated"
+    LINE_EDITED = "line_edited"
+    LINE_DELETED = "line_deleted"
+    DEVICE_STATE_CHANGE = "DeviceStateChange"
+    NEW_CHANNEL = "Newchannel"
+    NEW_STATE = "Newstate"
+    HANGUP = "Hangup"
+    HOLD = "Hold"
+    UNHOLD = "Unhold"
     # Add other events here.
@@ -1,19 +1,62 @@
 # src/accent_chatd/dao/room.py
 
-from typing import List, Optional
-from sqlalchemy import and_, distinct, func, select, text
+import base64
+import binascii
+import datetime
+import json
+import re
+from typing import List, Optional, Tuple
+from sqlalchemy import and_, distinct, func, select, text, tuple_
 from sqlalchemy.dialects.postgresql import array_agg
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import selectinload
 from sqlalchemy.sql.functions import ReturnTypeFromArgs
 from accent_chatd.exceptions import UnknownRoomException
 from accent_chatd.models import Room, RoomMessage, RoomUser
 from .base import BaseDAO
 
+WORD_RE = re.compile(r"\w+")
+
+# (created_at, uuid) of the last message of the previous page
+MessageCursor = Tuple[datetime.datetime, str]
+
 
 class unaccent(ReturnTypeFromArgs):  # Keep the unaccent function
     pass
 
 
+class chatd_unaccent(ReturnTypeFromArgs):  # IMMUTABLE wrapper of unaccent
+    pass
+
+
+def search_tsquery(search: str) -> Optional[str]:
+    """Return a tsquery matching the messages with words starting with each
+    word of the search, or None if the search has no word.
+    """
+    words = WORD_RE.findall(search)
+    if not words:
+        return None
+    return " & ".join(f"{word}:*" for word in words)
+
+
+def encode_message_cursor(message: RoomMessage) -> str:
+    """Return the opaque cursor of the page after this message."""
+    data = json.dumps([message.created_at.isoformat(), message.uuid])
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def decode_message_cursor(cursor: str) -> MessageCursor:
+    """Return the (created_at, uuid) of a cursor.
+
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, uuid = json.loads(data)
+        return datetime.datetime.fromisoformat(created_at), str(uuid)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise ValueError(f"Invalid cursor: {cursor!r}") from None
+
+
 class RoomDAO(BaseDAO):
     async def create(self, room: Room) -> Room:
         async with self.session() as session:
@@ -28,8 +71,7 @@ class RoomDAO(BaseDAO):
             stmt = (
                 select(Room)
                 .options(
-                    selectinload(Room.users),  # Eager load users and messages
-                    selectinload(Room.messages),
+                    selectinload(Room.users),  # Messages are paginated separately
                 )
                 .where(Room.tenant_uuid.in_(tenant_uuids), Room.uuid == room_uuid)
             )
@@ -111,7 +153,9 @@ class RoomDAO(BaseDAO):
     async def add_message(self, room: Room, message: RoomMessage) -> None:
         async with self.session() as session:
             async with session.begin():
-                room.messages.append(message)
+                # Write-only relationship, the history is never loaded
+                room = await session.merge(room, load=False)
+                room.messages.add(message)
 
     async def list_messages(self, room: Room, **filter_parameters) -> List[RoomMessage]:
         async with self.session() as session:
@@ -170,14 +214,34 @@ class RoomDAO(BaseDAO):
         offset: Optional[int] = None,
         order: str = "created_at",
         direction: str = "desc",
+        after: Optional[MessageCursor] = None,
         **ignored,
     ):
-        order_column = getattr(RoomMessage, order)
-        if direction == "asc":
-            order_column = order_column.asc()
+        if order == "created_at":
+            # Keyset pagination: uuid breaks ties between identical timestamps
+            # and the (room_uuid, created_at, uuid) index serves the seek and
+            # the ordering
+            key = tuple_(RoomMessage.created_at, RoomMessage.uuid)
+            if after is not None:
+                if direction == "asc":
+                    query = query.where(key > tuple_(*after))
+                else:
+                    query = query.where(key < tuple_(*after))
+            if direction == "asc":
+                query = query.order_by(
+                    RoomMessage.created_at.asc(), RoomMessage.uuid.asc()
+                )
+            else:
+                query = query.order_by(
+                    RoomMessage.created_at.desc(), RoomMessage.uuid.desc()
+                )
         else:
-            order_column = order_column.desc()
-        query = query.order_by(order_column)
+            order_column = getattr(RoomMessage, order)
+            if direction == "asc":
+                order_column = order_column.asc()
+            else:
+                order_column = order_column.desc()
+            query = query.order_by(order_column)
 
         if limit is not None:
             query = query.limit(limit)
@@ -202,10 +266,16 @@ class RoomDAO(BaseDAO):
                 .from_self()
             )
 
-        if search is not None:
-            words = [word for word in search.split(" ") if word]
-            pattern = f"%{'%'.join(words)}%"
-            query = query.where(unaccent(RoomMessage.content).ilike(pattern))
+        tsquery = search_tsquery(search) if search is not None else None
+        if tsquery is not None:
+            # Served by the GIN index on the generated search_vector column.
+            # Accents are ignored and each word of the search matches the
+            # start of a word of the message, not any substring of it.
+            query = query.where(
+                RoomMessage.search_vector.op("@@")(
+                    func.to_tsquery("simple", chatd_unaccent(tsquery))
+                )
+            )
 
         if from_date is not None:
             query = query.where(RoomMessage.created_at >= from_date)
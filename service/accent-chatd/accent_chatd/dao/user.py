@@ -1,11 +1,19 @@
 # src/accent_chatd/dao/user.py
 
 
-from sqlalchemy import func, select, text
+from sqlalchemy import func, select, text, update
 from sqlalchemy.orm import selectinload
 
 from accent_chatd.exceptions import UnknownUserException
-from accent_chatd.models import Line, RefreshToken, Session, User
+from accent_chatd.models import (
+    Channel,
+    Endpoint,
+    Line,
+    RefreshToken,
+    Session,
+    Tenant,
+    User,
+)
 
 from .base import BaseDAO
 
@@ -81,6 +89,54 @@ class UserDAO(BaseDAO):
             result = await session.execute(stmt)
             return result.scalar_one()
 
+    async def list_presences(self) -> list[User]:
+        # Only the presence columns, the engine does not need the relationships
+        async with self.session() as session:
+            # The uuid of the tenant, User.tenant_uuid is the id of its row
+            stmt = select(
+                User.id,
+                User.uuid,
+                Tenant.uuid.label("tenant_uuid"),
+                User.state,
+                User.status,
+                User.do_not_disturb,
+                User.last_activity,
+            ).join(Tenant, User.tenant_uuid == Tenant.id)
+            result = await session.execute(stmt)
+            return result.all()
+
+    async def list_sessions(self) -> list[tuple[str, bool, str]]:
+        async with self.session() as session:
+            stmt = select(Session.uuid, Session.mobile, User.uuid).join(
+                User, Session.user_uuid == User.id
+            )
+            result = await session.execute(stmt)
+            return result.all()
+
+    async def list_lines(self) -> list[tuple[int, str | None, str | None, str]]:
+        async with self.session() as session:
+            stmt = (
+                select(Line.id, Line.endpoint_name, Endpoint.state, User.uuid)
+                .join(User, Line.user_uuid == User.id)
+                .outerjoin(Endpoint, Line.endpoint_name == Endpoint.name)
+            )
+            result = await session.execute(stmt)
+            return result.all()
+
+    async def list_channels(self) -> list[tuple[str, str, int]]:
+        async with self.session() as session:
+            stmt = select(Channel.name, Channel.state, Channel.line_id)
+            result = await session.execute(stmt)
+            return result.all()
+
+    async def update_presences(self, rows: list[dict]) -> None:
+        # Bulk UPDATE by primary key, one statement per batch
+        if not rows:
+            return
+        async with self.session() as session:
+            async with session.begin():
+                await session.execute(update(User), rows)
+
     async def delete(self, user: User) -> None:
         async with self.session() as session:
             async with session.begin():
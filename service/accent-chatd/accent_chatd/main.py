@@ -13,6 +13,7 @@ from accent_chatd.core.exceptions import http_exception_handler
 from accent_chatd.core.middleware import ExampleMiddleware
 from accent_chatd.core.plugin import Plugin  # Import the Plugin base class
 from accent_chatd.plugins.api.plugin import Plugin as ApiPlugin
+from accent_chatd.services.presence_engine import PresenceEngine
 
 # Add to app.
 # Import plugin modules.  These imports *must* be here, after the
@@ -82,6 +83,12 @@ async def startup_event():
     await bus_consumer.connect()
     asyncio.create_task(bus_consumer.run())  # use asyncio.
 
+    # One presence engine for the plugins and the request dependencies
+    dao = DAO()
+    app.state.presence_engine = await PresenceEngine.start_from_settings(
+        settings.presence, dao.user
+    )
+
     # --- Plugin Loading ---
     # Create a dictionary of dependencies to pass to plugins
     dependencies = {
@@ -89,7 +96,8 @@ async def startup_event():
         "config": settings,
         "bus_consumer": bus_consumer,
         "bus_publisher": await get_bus_publisher(),
-        "dao": DAO(),  # Pass the DAO
+        "dao": dao,  # Pass the DAO
+        "presence_engine": app.state.presence_engine,
         # Add other dependencies as needed
     }
 
@@ -110,6 +118,8 @@ async def shutdown_event():
     if bus_consumer:
         await bus_consumer.disconnect()  # Disconnect
         bus_consumer.stop()  # Stop running.
+    if app.state.presence_engine:
+        await app.state.presence_engine.stop()
     await engine.dispose()
     logger.info("Shutdown complete.")
 
@@ -1,43 +1,87 @@
-# src/accent_chatd/models/room.py
+# src/accent_chatd/models/room_message.py
 
 from __future__ import annotations
 
+import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Column, ForeignKey, String, Text, Index, text
+from sqlalchemy import (
+    DDL,
+    Computed,
+    DateTime,
+    ForeignKey,
+    Index,
+    String,
+    Text,
+    event,
+    text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from accent_chatd.core.database import Base
 
 if TYPE_CHECKING:
-    from .room_message import RoomMessage  # prevent circular import
-    from .room_user import RoomUser  # prevent circular import
-    from .tenant import Tenant
+    from .room import Room  # prevent circular import
 
+# unaccent() is only STABLE and cannot be used by a generated column, the
+# wrapper pins the dictionary to be IMMUTABLE
+CREATE_UNACCENT_FUNCTION = DDL("""
+CREATE EXTENSION IF NOT EXISTS unaccent;
+CREATE OR REPLACE FUNCTION chatd_unaccent(text) RETURNS text
+    AS $$ SELECT public.unaccent('public.unaccent', $1) $$
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT;
+""")
+event.listen(Base.metadata, "before_create", CREATE_UNACCENT_FUNCTION)
 
-class Room(Base):
+
+class RoomMessage(Base):
     # __tablename__ defined in Base class
-    # id = Column(Integer, primary_key=True)
+    # id = Column(Integer, primary_key=True) # Defined in Base class
     uuid: Mapped[str] = mapped_column(
         String, server_default=text("gen_random_uuid()"), primary_key=True
-    )  # Use gen_random_uuid()
-    name: Mapped[str | None] = mapped_column(Text)
-    tenant_uuid: Mapped[int] = mapped_column(
-        ForeignKey("chatd_tenant.id", ondelete="CASCADE"),
+    )
+    room_uuid: Mapped[int] = mapped_column(
+        ForeignKey("chatd_room.id", ondelete="CASCADE"),
         nullable=False,  # Changed to ID.
     )
-
-    users: Mapped[list["RoomUser"]] = relationship(
-        "RoomUser", back_populates="room", cascade="all, delete-orphan"
+    content: Mapped[str | None] = mapped_column(Text)
+    alias: Mapped[str | None] = mapped_column(String(256))
+    user_uuid: Mapped[str] = mapped_column(String, nullable=False)
+    tenant_uuid: Mapped[str] = mapped_column(String, nullable=False)
+    accent_uuid: Mapped[str] = mapped_column(String, nullable=False)
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.datetime.now(datetime.timezone.utc),
+        server_default=text("(now() at time zone 'utc')"),
+        nullable=False,
     )
-    messages: Mapped[list["RoomMessage"]] = relationship(
-        "RoomMessage",
-        back_populates="room",
-        cascade="all, delete-orphan",
-        order_by="desc(RoomMessage.created_at)",
+    # Generated column, computed by Postgres on insert and update
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "to_tsvector('simple', chatd_unaccent(coalesce(content, '')))",
+            persisted=True,
+        ),
+        deferred=True,
     )
 
-    __table_args__ = (Index("chatd_room__idx__tenant_uuid", "tenant_uuid"),)
+    room: Mapped["Room"] = relationship("Room", back_populates="messages")
+
+    __table_args__ = (
+        # Keyset pagination on (created_at, uuid) within a room
+        Index(
+            "chatd_room_message__idx__room_uuid_created_at_uuid",
+            "room_uuid",
+            "created_at",
+            "uuid",
+        ),
+        Index(
+            "chatd_room_message__idx__search_vector",
+            "search_vector",
+            postgresql_using="gin",
+        ),
+    )
 
     def __repr__(self) -> str:
-        return f"Room(uuid={self.uuid!r}, name={self.name!r}, tenant_uuid={self.tenant_uuid!r})"
+        return f"RoomMessage(uuid={self.uuid!r}, room_uuid={self.room_uuid!r}, created_at={self.created_at!r})"
@@ -29,9 +29,13 @@ class Plugin(Plugin):
 
         # notifier = PresenceNotifier(bus_publisher) # Not using for now.
 
+        # Started on startup, before the plugins, and shared by the routes
+        engine = dependencies["presence_engine"]
+
         service = PresenceService(
-            dao.user, bus_publisher, bus_consumer
+            dao.user, bus_publisher, bus_consumer, engine=engine
         )  # Pass consumer
+        service.subscribe_to_events()
         # token_changed_subscribe = dependencies['token_changed_subscribe']
         # next_token_changed_subscribe = dependencies['next_token_changed_subscribe']
         auth = AuthClient(**config["auth"])
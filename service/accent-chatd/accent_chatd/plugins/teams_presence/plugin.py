@@ -25,7 +25,10 @@ class Plugin(Plugin):
         bus_publisher = dependencies["bus_publisher"]
 
         presence_service = PresenceService(
-            dao.user, bus_publisher, bus_consumer
+            dao.user,
+            bus_publisher,
+            bus_consumer,
+            engine=dependencies["presence_engine"],
         )  # Pass consumer
         auth_client = AuthClient(**config["auth"])
         confd_client = ConfdClient(**config["confd"])
@@ -0,0 +1,396 @@
+# src/accent_chatd/services/presence_engine.py
+import asyncio
+import datetime
+import logging
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from accent_chatd.dao.user import UserDAO
+from accent_chatd.exceptions import UnknownUserException
+
+logger = logging.getLogger(__name__)
+
+# Highest priority first, the user line_state is the state of its "busiest" line
+LINE_STATES = (
+    "ringing",
+    "progressing",
+    "holding",
+    "talking",
+    "available",
+    "unavailable",
+)
+PERSISTED_FIELDS = ("state", "status", "do_not_disturb", "last_activity")
+
+
+@dataclass
+class LinePresence:
+    id: int
+    endpoint_name: str | None = None
+    endpoint_state: str = "unavailable"
+    channels: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def state(self) -> str:
+        channel_states = set(self.channels.values())
+        for state in LINE_STATES[:4]:
+            if state in channel_states:
+                return state
+        if self.endpoint_state == "available":
+            return "available"
+        return "unavailable"
+
+
+@dataclass
+class PresenceState:
+    """Presence of a user, computed from its own state, lines and sessions."""
+
+    id: int | None
+    uuid: str
+    tenant_uuid: Any
+    state: str = "unavailable"
+    status: str | None = None
+    do_not_disturb: bool = False
+    last_activity: datetime.datetime | None = None
+    sessions: dict[str, bool] = field(default_factory=dict)
+    lines_by_id: dict[int, LinePresence] = field(default_factory=dict)
+
+    @property
+    def lines(self) -> list[LinePresence]:
+        # A list, as serialized by the UserPresence schema
+        return [self.lines_by_id[line_id] for line_id in sorted(self.lines_by_id)]
+
+    @property
+    def line_state(self) -> str:
+        states = {line.state for line in self.lines_by_id.values()}
+        for state in LINE_STATES:
+            if state in states:
+                return state
+        return "unavailable"
+
+    @property
+    def connected(self) -> bool:
+        return bool(self.sessions)
+
+    @property
+    def mobile(self) -> bool:
+        return any(self.sessions.values())
+
+    def snapshot(self) -> tuple:
+        return (
+            self.state,
+            self.status,
+            self.do_not_disturb,
+            self.line_state,
+            self.connected,
+            self.mobile,
+        )
+
+
+Notifier = Callable[[PresenceState], Awaitable[None]]
+
+
+class PresenceEngine:
+    """In-memory presence of every user, indexed by user and tenant.
+
+    Changes are applied in memory and only mark the user as dirty. A
+    background task writes dirty users to the database in batches and sends
+    at most one notification per user per interval, skipped when the user
+    presence flapped back to what was last notified.
+    """
+
+    def __init__(
+        self,
+        user_dao: UserDAO,
+        notifier: Notifier | None = None,
+        interval: float = 1.0,
+        batch_size: int = 500,
+    ):
+        self._user_dao = user_dao
+        self._notifier = notifier
+        self._interval = interval
+        self._batch_size = batch_size
+        self._users: dict[str, PresenceState] = {}
+        self._tenants: dict[Any, set[str]] = defaultdict(set)
+        self._line_users: dict[int, str] = {}
+        self._endpoint_lines: dict[str, int] = {}
+        self._session_users: dict[str, str] = {}
+        self._dirty: set[str] = set()
+        self._pending: set[str] = set()
+        self._notified: dict[str, tuple] = {}
+        self._task: asyncio.Task | None = None
+
+    @classmethod
+    async def start_from_settings(
+        cls, settings: Any, user_dao: UserDAO
+    ) -> "PresenceEngine | None":
+        """Load the presences in memory and start writing their changes.
+
+        Returns None when the engine is disabled in the presence settings.
+        """
+        if not settings.engine_enabled:
+            return None
+        engine = cls(
+            user_dao,
+            interval=settings.flush_interval,
+            batch_size=settings.flush_batch_size,
+        )
+        await engine.load()
+        engine.start()
+        return engine
+
+    def set_notifier(self, notifier: Notifier) -> None:
+        self._notifier = notifier
+
+    async def load(self) -> None:
+        for user in await self._user_dao.list_presences():
+            self.add_user(
+                PresenceState(
+                    id=user.id,
+                    uuid=user.uuid,
+                    tenant_uuid=user.tenant_uuid,
+                    state=user.state,
+                    status=user.status,
+                    do_not_disturb=user.do_not_disturb,
+                    last_activity=user.last_activity,
+                ),
+                notify=False,
+            )
+        for session_uuid, mobile, user_uuid in await self._user_dao.list_sessions():
+            if user_uuid in self._users:
+                self.add_session(user_uuid, session_uuid, mobile, notify=False)
+        lines = await self._user_dao.list_lines()
+        for line_id, endpoint_name, endpoint_state, user_uuid in lines:
+            if user_uuid not in self._users:
+                continue
+            self.add_line(user_uuid, line_id, endpoint_name, notify=False)
+            line = self._users[user_uuid].lines_by_id[line_id]
+            line.endpoint_state = endpoint_state or line.endpoint_state
+        for channel_name, state, line_id in await self._user_dao.list_channels():
+            presence = self._line_owner(line_id)
+            if presence is not None:
+                presence.lines_by_id[line_id].channels[channel_name] = state
+        for presence in self._users.values():
+            self._notified[presence.uuid] = presence.snapshot()
+        logger.info("Loaded presence of %s users", len(self._users))
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+        await self.notify()
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                await self.flush()
+                await self.notify()
+            except Exception:
+                logger.exception("Failed to process presence changes")
+
+    # Lookups
+
+    def get(self, tenant_uuids: list[Any] | None, user_uuid: str) -> PresenceState:
+        presence = self._users.get(str(user_uuid))
+        if presence is None:
+            raise UnknownUserException(user_uuid)
+        if tenant_uuids is not None and presence.tenant_uuid not in tenant_uuids:
+            raise UnknownUserException(user_uuid)
+        return presence
+
+    def list_(
+        self,
+        tenant_uuids: list[Any] | None = None,
+        uuids: list[str] | None = None,
+    ) -> list[PresenceState]:
+        if tenant_uuids is None:
+            user_uuids = set(self._users)
+        else:
+            user_uuids = set()
+            for tenant_uuid in tenant_uuids:
+                user_uuids.update(self._tenants.get(tenant_uuid, ()))
+        if uuids:
+            user_uuids.intersection_update(str(uuid) for uuid in uuids)
+        return [self._users[user_uuid] for user_uuid in user_uuids]
+
+    def count(self, tenant_uuids: list[Any] | None = None) -> int:
+        if tenant_uuids is None:
+            return len(self._users)
+        return sum(len(self._tenants.get(uuid, ())) for uuid in tenant_uuids)
+
+    def find_line(self, endpoint_name: str) -> int | None:
+        return self._endpoint_lines.get(endpoint_name)
+
+    # Changes
+
+    def add_user(self, presence: PresenceState, notify: bool = True) -> None:
+        self._users[presence.uuid] = presence
+        self._tenants[presence.tenant_uuid].add(presence.uuid)
+        if notify:
+            self._pending.add(presence.uuid)
+        else:
+            self._notified[presence.uuid] = presence.snapshot()
+
+    def remove_user(self, user_uuid: str) -> None:
+        presence = self._users.pop(str(user_uuid), None)
+        if presence is None:
+            return
+        self._tenants[presence.tenant_uuid].discard(presence.uuid)
+        for line_id, line in presence.lines_by_id.items():
+            self._line_users.pop(line_id, None)
+            self._forget_endpoint(line)
+        for session_uuid in presence.sessions:
+            self._session_users.pop(session_uuid, None)
+        self._dirty.discard(presence.uuid)
+        self._pending.discard(presence.uuid)
+        self._notified.pop(presence.uuid, None)
+
+    def update(self, user_uuid: str, **fields: Any) -> PresenceState:
+        presence = self.get(None, user_uuid)
+        for name, value in fields.items():
+            if name not in PERSISTED_FIELDS:
+                raise TypeError(f"Unknown presence field: {name}")
+            setattr(presence, name, value)
+        self._dirty.add(presence.uuid)
+        self._pending.add(presence.uuid)
+        return presence
+
+    def add_session(
+        self, user_uuid: str, session_uuid: str, mobile: bool, notify: bool = True
+    ) -> None:
+        presence = self.get(None, user_uuid)
+        presence.sessions[session_uuid] = mobile
+        self._session_users[session_uuid] = presence.uuid
+        if notify:
+            self._pending.add(presence.uuid)
+
+    def remove_session(self, session_uuid: str) -> None:
+        user_uuid = self._session_users.pop(session_uuid, None)
+        presence = self._users.get(user_uuid) if user_uuid else None
+        if presence is None:
+            return
+        presence.sessions.pop(session_uuid, None)
+        self._pending.add(presence.uuid)
+
+    def add_line(
+        self,
+        user_uuid: str,
+        line_id: int,
+        endpoint_name: str | None = None,
+        notify: bool = True,
+    ) -> None:
+        presence = self.get(None, user_uuid)
+        previous = self._line_owner(line_id)
+        if previous is not None and previous is not presence:
+            self.remove_line(line_id)
+        presence.lines_by_id.setdefault(line_id, LinePresence(line_id))
+        self._line_users[line_id] = presence.uuid
+        self.set_line_endpoint(line_id, endpoint_name)
+        if notify:
+            self._pending.add(presence.uuid)
+
+    def set_line_endpoint(self, line_id: int, endpoint_name: str | None) -> None:
+        presence = self._line_owner(line_id)
+        if presence is None:
+            return
+        line = presence.lines_by_id[line_id]
+        if line.endpoint_name == endpoint_name:
+            return
+        self._forget_endpoint(line)
+        line.endpoint_name = endpoint_name
+        if endpoint_name:
+            self._endpoint_lines[endpoint_name] = line_id
+
+    def remove_line(self, line_id: int) -> None:
+        presence = self._line_owner(line_id)
+        if presence is None:
+            return
+        line = presence.lines_by_id.pop(line_id, None)
+        if line is not None:
+            self._forget_endpoint(line)
+        self._line_users.pop(line_id, None)
+        self._pending.add(presence.uuid)
+
+    def set_endpoint_state(self, line_id: int, state: str) -> None:
+        presence = self._line_owner(line_id)
+        if presence is None:
+            return
+        presence.lines_by_id[line_id].endpoint_state = state
+        self._pending.add(presence.uuid)
+
+    def set_channel_state(self, line_id: int, channel_name: str, state: str) -> None:
+        presence = self._line_owner(line_id)
+        if presence is None:
+            return
+        presence.lines_by_id[line_id].channels[channel_name] = state
+        self._pending.add(presence.uuid)
+
+    def remove_channel(self, line_id: int, channel_name: str) -> None:
+        presence = self._line_owner(line_id)
+        if presence is None:
+            return
+        presence.lines_by_id[line_id].channels.pop(channel_name, None)
+        self._pending.add(presence.uuid)
+
+    # Write-behind
+
+    async def flush(self) -> None:
+        dirty, self._dirty = self._dirty, set()
+        presences = [
+            presence
+            for presence in (self._users.get(uuid) for uuid in dirty)
+            if presence is not None and presence.id is not None
+        ]
+        for start in range(0, len(presences), self._batch_size):
+            batch = presences[start : start + self._batch_size]
+            rows = [
+                {
+                    "id": presence.id,
+                    **{name: getattr(presence, name) for name in PERSISTED_FIELDS},
+                }
+                for presence in batch
+            ]
+            try:
+                await self._user_dao.update_presences(rows)
+            except Exception:
+                # Keep the remaining users dirty, they will be retried
+                self._dirty.update(presence.uuid for presence in presences[start:])
+                raise
+
+    async def notify(self) -> None:
+        pending, self._pending = self._pending, set()
+        for user_uuid in pending:
+            presence = self._users.get(user_uuid)
+            if presence is None:
+                continue
+            snapshot = presence.snapshot()
+            if self._notified.get(user_uuid) == snapshot:
+                continue
+            if self._notifier:
+                try:
+                    await self._notifier(presence)
+                except Exception:
+                    # The other users are still notified, this one is retried
+                    # at the next interval
+                    logger.exception("Failed to notify presence of %s", user_uuid)
+                    self._pending.add(user_uuid)
+                    continue
+            self._notified[user_uuid] = snapshot
+
+    def _forget_endpoint(self, line: LinePresence) -> None:
+        if (
+            line.endpoint_name
+            and self._endpoint_lines.get(line.endpoint_name) == line.id
+        ):
+            del self._endpoint_lines[line.endpoint_name]
+
+    def _line_owner(self, line_id: int) -> PresenceState | None:
+        user_uuid = self._line_users.get(line_id)
+        return self._users.get(user_uuid) if user_uuid else None
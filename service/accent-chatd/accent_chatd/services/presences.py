@@ -8,7 +8,8 @@ from accent_chatd.dao.user import UserDAO
 from accent_chatd.core.bus import BusPublisher, BusConsumer
 from accent_chatd.core.events import EventType
 from accent_chatd.exceptions import UnknownUserException  # Import
-from accent_chatd.schemas.presence import UserPresence
+from accent_chatd.services.presence_engine import PresenceEngine, PresenceState
+from accent_chatd.api.presences.models import UserPresence
 from accent_chatd.models import User, Tenant
 
 import logging
@@ -27,29 +28,58 @@ PRESENCES_MAP = {
     "PresenceUnknown": "unavailable",
 }
 
+# Asterisk device states of an unreachable endpoint, the others are available
+UNAVAILABLE_DEVICE_STATES = {"UNAVAILABLE", "INVALID", "UNKNOWN"}
+
+CHANNEL_STATE_MAP = {
+    "Ring": "progressing",
+    "Ringing": "ringing",
+    "Up": "talking",
+}
+
 
 class PresenceService:
     def __init__(
-        self, user_dao: UserDAO, bus_publisher: BusPublisher, bus_consumer: BusConsumer
+        self,
+        user_dao: UserDAO,
+        bus_publisher: BusPublisher,
+        bus_consumer: BusConsumer,
+        engine: PresenceEngine | None = None,
     ):
         self._user_dao = user_dao
         self._bus_publisher = bus_publisher
         self._bus_consumer = bus_consumer  # Add consumer.
-        self.subscribe_to_events()
+        # When set, presences are served from memory and written behind
+        self._engine = engine
 
     async def list_(self, tenant_uuids: List[str], **filter_parameters) -> List[User]:
+        if self._engine:
+            return self._engine.list_(tenant_uuids, **filter_parameters)
         return await self._user_dao.list_(tenant_uuids, **filter_parameters)
 
     async def count(self, tenant_uuids: List[str], **filter_parameters) -> int:
+        if self._engine:
+            return self._engine.count(tenant_uuids)
         return await self._user_dao.count(tenant_uuids, **filter_parameters)
 
     async def get(self, tenant_uuids: List[str], user_uuid: str) -> User:
+        if self._engine:
+            return self._engine.get(tenant_uuids, user_uuid)
         return await self._user_dao.get(tenant_uuids, user_uuid)
 
     async def update(self, user: User) -> User:
         user.last_activity = datetime.datetime.now(
             datetime.timezone.utc
         )  # Use timezone-aware now
+        if self._engine:
+            # Persisted and notified by the engine, once per interval
+            return self._engine.update(
+                user.uuid,
+                state=user.state,
+                status=user.status,
+                do_not_disturb=user.do_not_disturb,
+                last_activity=user.last_activity,
+            )
         await self._user_dao.update(user)
         await self._notify_updated(user)  # Call notification
         return user
@@ -74,6 +104,7 @@ class PresenceService:
         try:
             user_uuid = payload["uuid"]
             tenant_uuid = payload["tenant_uuid"]
+            created = None
             # Create tenant and user.
             async with self._user_dao.session() as session:
                 async with session.begin():
@@ -93,9 +124,19 @@ class PresenceService:
                     if not existing_user:
                         user = User(uuid=user_uuid, tenant=tenant, state="unavailable")
                         session.add(user)
+                        await session.flush()
+                        created = PresenceState(
+                            id=user.id,
+                            uuid=user.uuid,
+                            tenant_uuid=tenant.uuid,
+                            state=user.state,
+                        )
                         logger.info(f"Created user {user_uuid} in tenant {tenant_uuid}")
                     else:
                         logger.info(f"User {user_uuid} already exists.")
+            # Only known by the engine once committed
+            if created and self._engine:
+                self._engine.add_user(created)
         except Exception:
             logger.exception(
                 f"Failed to create user {user_uuid} in tenant {tenant_uuid}"
@@ -111,6 +152,8 @@ class PresenceService:
                 async with session.begin():
                     user = await self._user_dao.get([tenant_uuid], user_uuid)
                     await self._user_dao.delete(user)
+            if self._engine:
+                self._engine.remove_user(user_uuid)
         except UnknownUserException:
             logger.warning(f"user with uuid {user_uuid} does not exist.")
         except Exception:
@@ -118,15 +161,103 @@ class PresenceService:
                 f"Failed to delete user {user_uuid} in tenant {tenant_uuid}"
             )
 
+    # Engine event handlers, the sessions, lines and calls of the users
+
+    async def _on_session_created(self, payload: dict):
+        try:
+            self._engine.add_session(
+                payload["user_uuid"], payload["uuid"], payload.get("mobile", False)
+            )
+        except UnknownUserException:
+            logger.debug(f"session of unknown user {payload['user_uuid']} ignored")
+
+    async def _on_session_deleted(self, payload: dict):
+        self._engine.remove_session(payload["uuid"])
+
+    async def _on_user_line_associated(self, payload: dict):
+        line = payload["line"]
+        try:
+            self._engine.add_line(
+                payload["user"]["uuid"], line["id"], _endpoint_name(line)
+            )
+        except UnknownUserException:
+            logger.debug(f"line of unknown user {payload['user']['uuid']} ignored")
+
+    async def _on_user_line_dissociated(self, payload: dict):
+        self._engine.remove_line(payload["line"]["id"])
+
+    async def _on_line_edited(self, payload: dict):
+        self._engine.set_line_endpoint(payload["id"], _endpoint_name(payload))
+
+    async def _on_line_deleted(self, payload: dict):
+        self._engine.remove_line(payload["id"])
+
+    async def _on_device_state_change(self, payload: dict):
+        line_id = self._engine.find_line(payload["Device"])
+        if line_id is None:
+            return
+        if payload["State"] in UNAVAILABLE_DEVICE_STATES:
+            state = "unavailable"
+        else:
+            state = "available"
+        self._engine.set_endpoint_state(line_id, state)
+
+    async def _on_channel_state(self, payload: dict):
+        line_id = self._channel_line(payload["Channel"])
+        if line_id is None:
+            return
+        state = CHANNEL_STATE_MAP.get(payload["ChannelStateDesc"], "undefined")
+        self._engine.set_channel_state(line_id, payload["Channel"], state)
+
+    async def _on_hangup(self, payload: dict):
+        line_id = self._channel_line(payload["Channel"])
+        if line_id is not None:
+            self._engine.remove_channel(line_id, payload["Channel"])
+
+    async def _on_hold(self, payload: dict):
+        line_id = self._channel_line(payload["Channel"])
+        if line_id is not None:
+            self._engine.set_channel_state(line_id, payload["Channel"], "holding")
+
+    async def _on_unhold(self, payload: dict):
+        line_id = self._channel_line(payload["Channel"])
+        if line_id is not None:
+            self._engine.set_channel_state(line_id, payload["Channel"], "talking")
+
+    def _channel_line(self, channel_name: str) -> int | None:
+        # PJSIP/abcdef-00000001 is a channel of the endpoint PJSIP/abcdef
+        return self._engine.find_line(channel_name.rsplit("-", 1)[0])
+
     def subscribe_to_events(self):
-        """Subscribe to bus events."""
+        """Subscribe to bus events and publish the presences of the engine.
+
+        Called once on startup, the services built for a request share the
+        engine without replacing its handlers.
+        """
+        if self._engine:
+            self._engine.set_notifier(self._notify_updated)
         events = [
             (EventType.USER_CREATED, self._on_user_created),
             (EventType.USER_DELETED, self._on_user_deleted),
         ]
+        if self._engine:
+            events += [
+                (EventType.SESSION_CREATED, self._on_session_created),
+                (EventType.SESSION_DELETED, self._on_session_deleted),
+                (EventType.USER_LINE_ASSOCIATED, self._on_user_line_associated),
+                (EventType.USER_LINE_DISSOCIATED, self._on_user_line_dissociated),
+                (EventType.LINE_EDITED, self._on_line_edited),
+                (EventType.LINE_DELETED, self._on_line_deleted),
+                (EventType.DEVICE_STATE_CHANGE, self._on_device_state_change),
+                (EventType.NEW_CHANNEL, self._on_channel_state),
+                (EventType.NEW_STATE, self._on_channel_state),
+                (EventType.HANGUP, self._on_hangup),
+                (EventType.HOLD, self._on_hold),
+                (EventType.UNHOLD, self._on_unhold),
+            ]
 
         for event, handler in events:
-            self._bus_client.consumer.subscribe(event, handler)
+            self._bus_consumer.subscribe(event, handler)
 
     # Add this new method
     async def update_presence_from_teams(self, user_uuid: str, availability: str):
@@ -155,3 +286,11 @@ class PresenceService:
             logger.warning(f"User {user_uuid} not found.  Cannot update presence.")
         except Exception:
             logger.exception(f"Failed to update presence for user {user_uuid}")
+
+
+def _endpoint_name(line: dict) -> str | None:
+    if line.get("endpoint_sip"):
+        return f"PJSIP/{line['name']}"
+    if line.get("endpoint_sccp"):
+        return f"SCCP/{line['name']}"
+    return None
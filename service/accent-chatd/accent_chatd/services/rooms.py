@@ -0,0 +1,117 @@
+# src/accent_chatd/services/rooms.py
+from typing import List, Optional
+
+from accent_chatd.api.rooms.models import MessageCreate, RoomCreate
+from accent_chatd.dao.room import MessageCursor, RoomDAO
+from accent_chatd.dao.user import UserDAO
+from accent_chatd.models import Room, RoomMessage, RoomUser
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class RoomService:
+    def __init__(self, room_dao: RoomDAO, user_dao: UserDAO, accent_uuid: str):
+        self._room_dao = room_dao
+        self._user_dao = user_dao
+        self._accent_uuid = accent_uuid
+
+    async def create_room(
+        self, tenant_uuid: str, room_create: RoomCreate, user_uuid: str
+    ) -> Room:
+        users = [
+            RoomUser(
+                uuid=user.uuid,
+                tenant_uuid=user.tenant_uuid or tenant_uuid,
+                accent_uuid=user.accent_uuid or self._accent_uuid,
+            )
+            for user in room_create.users
+            if user.uuid != user_uuid
+        ]
+        users.append(
+            RoomUser(
+                uuid=user_uuid, tenant_uuid=tenant_uuid, accent_uuid=self._accent_uuid
+            )
+        )
+        room = Room(name=room_create.name, tenant_uuid=tenant_uuid, users=users)
+        return await self._room_dao.create(room)
+
+    async def list_rooms(
+        self, tenant_uuids: List[str], **filter_parameters
+    ) -> List[Room]:
+        return await self._room_dao.list_(tenant_uuids, **filter_parameters)
+
+    async def get_room(self, tenant_uuids: List[str], room_uuid: str) -> Room:
+        return await self._room_dao.get(tenant_uuids, room_uuid)
+
+    async def create_message(
+        self,
+        room: Room,
+        message_create: MessageCreate,
+        user_uuid: str,
+        tenant_uuid: str,
+    ) -> RoomMessage:
+        message = RoomMessage(
+            content=message_create.content,
+            alias=message_create.alias,
+            user_uuid=user_uuid,
+            tenant_uuid=tenant_uuid,
+            accent_uuid=self._accent_uuid,
+        )
+        await self._room_dao.add_message(room, message)
+        return message
+
+    async def list_messages(
+        self,
+        room: Room,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        order: str = "created_at",
+        direction: str = "desc",
+        after: Optional[MessageCursor] = None,
+        **filter_parameters,
+    ) -> List[RoomMessage]:
+        return await self._room_dao.list_messages(
+            room,
+            limit=limit,
+            offset=offset,
+            order=order,
+            direction=direction,
+            after=after,
+            **filter_parameters,
+        )
+
+    async def count_messages(self, room: Room, **filter_parameters) -> int:
+        return await self._room_dao.count_messages(room, **filter_parameters)
+
+    async def search_user_messages(
+        self,
+        tenant_uuid: str,
+        user_uuid: str,
+        search: Optional[str] = None,
+        distinct: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        order: str = "created_at",
+        direction: str = "desc",
+        after: Optional[MessageCursor] = None,
+    ) -> List[RoomMessage]:
+        return await self._room_dao.list_user_messages(
+            tenant_uuid,
+            user_uuid,
+            search=search,
+            distinct=distinct,
+            limit=limit,
+            offset=offset,
+            order=order,
+            direction=direction,
+            after=after,
+        )
+
+    async def count_user_messages(
+        self, tenant_uuid: str, user_uuid: str, **filter_parameters
+    ) -> int:
+        return await self._room_dao.count_user_messages(
+            tenant_uuid, user_uuid, **filter_parameters
+        )
@@ -0,0 +1,126 @@
+# Copyright 2023 Accent Communications
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime
+import random
+import time
+import uuid
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from accent_chatd.core.database import Base
+from accent_chatd.dao.room import (
+    RoomDAO,
+    decode_message_cursor,
+    encode_message_cursor,
+)
+from accent_chatd.models import Room, RoomMessage, Tenant
+
+WORDS = (
+    "meeting",
+    "deploy",
+    "invoice",
+    "lunch",
+    "release",
+    "customer",
+    "ticket",
+    "outage",
+    "review",
+    "holiday",
+)
+BATCH_SIZE = 10000
+
+
+def _timed(label, start):
+    print(f"{label:<40} {(time.perf_counter() - start) * 1000:10.2f} ms")
+
+
+async def seed(session_maker, count):
+    async with session_maker() as session:
+        async with session.begin():
+            tenant = Tenant(uuid=str(uuid.uuid4()))
+            session.add(tenant)
+            await session.flush()
+            room = Room(name="benchmark", tenant_uuid=tenant.id)
+            session.add(room)
+            await session.flush()
+            room_id, room_uuid = room.id, room.uuid
+
+    start = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(
+        seconds=count
+    )
+    user_uuid = str(uuid.uuid4())
+    for offset in range(0, count, BATCH_SIZE):
+        rows = [
+            {
+                "uuid": str(uuid.uuid4()),
+                "room_uuid": room_id,
+                "content": " ".join(random.choices(WORDS, k=8)),
+                "user_uuid": user_uuid,
+                "tenant_uuid": str(tenant.uuid),
+                "accent_uuid": user_uuid,
+                "created_at": start + datetime.timedelta(seconds=i),
+            }
+            for i in range(offset, min(offset + BATCH_SIZE, count))
+        ]
+        async with session_maker() as session:
+            async with session.begin():
+                await session.execute(insert(RoomMessage), rows)
+    return tenant.id, room_uuid
+
+
+async def main(uri, count, page_size):
+    engine = create_async_engine(uri)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    dao = RoomDAO(session_maker)
+
+    try:
+        start = time.perf_counter()
+        tenant_id, room_uuid = await seed(session_maker, count)
+        _timed(f"seed {count} messages", start)
+
+        start = time.perf_counter()
+        room = await dao.get([tenant_id], room_uuid)
+        _timed("get room", start)
+
+        start = time.perf_counter()
+        await dao.list_messages(room, limit=page_size)
+        _timed("first page", start)
+
+        deep = count // 2
+        start = time.perf_counter()
+        await dao.list_messages(room, limit=page_size, offset=deep)
+        _timed(f"page at offset {deep} (OFFSET)", start)
+
+        messages = await dao.list_messages(room, limit=1, offset=deep - 1)
+        after = decode_message_cursor(encode_message_cursor(messages[0]))
+        start = time.perf_counter()
+        await dao.list_messages(room, limit=page_size, after=after)
+        _timed(f"page at offset {deep} (keyset)", start)
+
+        start = time.perf_counter()
+        await dao.list_messages(room, limit=page_size, search="deplo outage")
+        _timed("search first page", start)
+
+        start = time.perf_counter()
+        await dao.count_messages(room, search="deplo outage")
+        _timed("search count", start)
+    finally:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("uri")
+    parser.add_argument("--messages", type=int, default=1000000)
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.uri, args.messages, args.page_size))
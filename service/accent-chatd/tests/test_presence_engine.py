@@ -0,0 +1,179 @@
+# tests/test_presence_engine.py
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from hamcrest import (
+    assert_that,
+    calling,
+    contains_exactly,
+    contains_inanyorder,
+    empty,
+    equal_to,
+    has_entries,
+    raises,
+)
+
+from accent_chatd.api.presences.models import UserPresence
+from accent_chatd.exceptions import UnknownUserException
+from accent_chatd.services.presence_engine import PresenceEngine, PresenceState
+
+TENANT_UUID = "00000000-0000-4000-a000-000000000001"
+USER_UUID = "00000000-0000-4000-a000-000000000101"
+OTHER_USER_UUID = "00000000-0000-4000-a000-000000000102"
+
+
+@pytest.fixture
+def user_dao():
+    return Mock(update_presences=AsyncMock())
+
+
+@pytest.fixture
+def notifier():
+    return AsyncMock()
+
+
+@pytest.fixture
+def engine(user_dao, notifier):
+    engine = PresenceEngine(user_dao, notifier=notifier, batch_size=1)
+    engine.add_user(PresenceState(1, USER_UUID, TENANT_UUID), notify=False)
+    engine.add_user(PresenceState(2, OTHER_USER_UUID, TENANT_UUID), notify=False)
+    return engine
+
+
+class TestUpdate:
+    @pytest.mark.asyncio
+    async def test_update_is_written_behind(self, engine, user_dao):
+        engine.update(USER_UUID, state="available", status="working")
+        user_dao.update_presences.assert_not_called()
+
+        await engine.flush()
+
+        (rows,), _ = user_dao.update_presences.call_args
+        assert_that(
+            rows,
+            contains_exactly(has_entries(id=1, state="available", status="working")),
+        )
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_the_users_dirty(self, engine, user_dao):
+        engine.update(USER_UUID, state="available")
+        engine.update(OTHER_USER_UUID, state="away")
+        user_dao.update_presences.side_effect = [Exception("down"), None, None]
+
+        with pytest.raises(Exception):
+            await engine.flush()
+        await engine.flush()
+
+        written = [
+            rows[0]["id"] for (rows,), _ in user_dao.update_presences.call_args_list
+        ]
+        assert_that(written[1:], contains_inanyorder(1, 2))
+
+    def test_unknown_field(self, engine):
+        assert_that(
+            calling(engine.update).with_args(USER_UUID, lines=[]),
+            raises(TypeError),
+        )
+
+    def test_unknown_user(self, engine):
+        assert_that(
+            calling(engine.update).with_args("unknown", state="available"),
+            raises(UnknownUserException),
+        )
+
+
+class TestLines:
+    def test_line_state(self, engine):
+        engine.add_line(USER_UUID, 10, "PJSIP/abc")
+        engine.set_endpoint_state(engine.find_line("PJSIP/abc"), "available")
+        presence = engine.get(None, USER_UUID)
+        assert_that(presence.line_state, equal_to("available"))
+
+        engine.set_channel_state(10, "PJSIP/abc-00000001", "ringing")
+        engine.add_line(USER_UUID, 11, "PJSIP/def")
+        engine.set_channel_state(11, "PJSIP/def-00000002", "talking")
+        assert_that(presence.line_state, equal_to("ringing"))
+
+        engine.remove_channel(10, "PJSIP/abc-00000001")
+        assert_that(presence.line_state, equal_to("talking"))
+
+    def test_removed_line_forgets_its_endpoint(self, engine):
+        engine.add_line(USER_UUID, 10, "PJSIP/abc")
+
+        engine.remove_line(10)
+
+        assert_that(engine.find_line("PJSIP/abc"), equal_to(None))
+        assert_that(engine.get(None, USER_UUID).lines, empty())
+
+    def test_renamed_endpoint(self, engine):
+        engine.add_line(USER_UUID, 10, "PJSIP/abc")
+
+        engine.set_line_endpoint(10, "PJSIP/def")
+
+        assert_that(engine.find_line("PJSIP/abc"), equal_to(None))
+        assert_that(engine.find_line("PJSIP/def"), equal_to(10))
+
+
+class TestNotify:
+    @pytest.mark.asyncio
+    async def test_one_notification_per_interval(self, engine, notifier):
+        engine.update(USER_UUID, state="available")
+        engine.update(USER_UUID, state="away")
+
+        await engine.notify()
+        await engine.notify()
+
+        notifier.assert_awaited_once_with(engine.get(None, USER_UUID))
+
+    @pytest.mark.asyncio
+    async def test_flapping_back_is_not_notified(self, engine, notifier):
+        engine.update(USER_UUID, state="available")
+        engine.update(USER_UUID, state="unavailable")
+
+        await engine.notify()
+
+        notifier.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_failed_notification_does_not_lose_the_others(self, engine, notifier):
+        failures = [Exception("bus down")]
+        notified = []
+
+        async def notify(presence):
+            if presence.uuid == USER_UUID and failures:
+                raise failures.pop()
+            notified.append(presence.uuid)
+
+        notifier.side_effect = notify
+        engine.update(USER_UUID, state="available")
+        engine.update(OTHER_USER_UUID, state="away")
+
+        await engine.notify()
+        assert_that(notified, contains_exactly(OTHER_USER_UUID))
+
+        await engine.notify()
+        assert_that(notified, contains_exactly(OTHER_USER_UUID, USER_UUID))
+
+
+class TestSerialization:
+    def test_user_presence(self, engine):
+        engine.update(USER_UUID, state="available", do_not_disturb=True)
+        engine.add_line(USER_UUID, 10, "PJSIP/abc")
+        engine.set_channel_state(10, "PJSIP/abc-00000001", "talking")
+        engine.add_session(USER_UUID, "session-uuid", mobile=True)
+
+        payload = UserPresence.model_validate(engine.get(None, USER_UUID)).model_dump()
+
+        assert_that(
+            payload,
+            has_entries(
+                uuid=USER_UUID,
+                tenant_uuid=TENANT_UUID,
+                state="available",
+                do_not_disturb=True,
+                line_state="talking",
+                connected=True,
+                mobile=True,
+                lines=contains_exactly({"id": 10, "state": "talking"}),
+            ),
+        )
@@ -0,0 +1,56 @@
+# tests/test_presence_routes.py
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from accent_chatd.api.presences.models import PresenceUpdateRequest
+from accent_chatd.api.presences.routes import (
+    get_presence_engine,
+    get_presence_service,
+    update_user_presence,
+)
+from accent_chatd.services.presence_engine import PresenceEngine, PresenceState
+
+TENANT_UUID = "00000000-0000-4000-a000-000000000001"
+USER_UUID = "00000000-0000-4000-a000-000000000101"
+
+
+@pytest.fixture
+def user_dao():
+    return Mock(update=AsyncMock(), update_presences=AsyncMock())
+
+
+@pytest.fixture
+def engine(user_dao):
+    engine = PresenceEngine(user_dao)
+    engine.add_user(PresenceState(1, USER_UUID, TENANT_UUID), notify=False)
+    return engine
+
+
+@pytest.mark.asyncio
+async def test_rest_update_goes_through_the_engine(engine, user_dao):
+    request = Mock()
+    request.app.state.presence_engine = engine
+    with patch("accent_chatd.api.presences.routes.UserDAO", return_value=user_dao):
+        service = await get_presence_service(
+            db=Mock(), bus_client=Mock(), engine=get_presence_engine(request)
+        )
+
+    with patch("accent_chatd.api.presences.routes.verify_token", AsyncMock()):
+        await update_user_presence(
+            USER_UUID,
+            PresenceUpdateRequest(state="away", status="lunch"),
+            token="token",
+            current_user_uuid=USER_UUID,
+            settings=Mock(auth={"master_tenant_uuid": TENANT_UUID}),
+            service=service,
+        )
+
+    user_dao.update.assert_not_called()
+    presence = engine.get([TENANT_UUID], USER_UUID)
+    assert (presence.state, presence.status) == ("away", "lunch")
+
+    await engine.flush()
+
+    (rows,), _ = user_dao.update_presences.call_args
+    assert [(row["id"], row["state"]) for row in rows] == [(1, "away")]
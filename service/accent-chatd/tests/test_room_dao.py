@@ -0,0 +1,243 @@
+# tests/test_room_dao.py
+import datetime
+import uuid
+
+import pytest
+from hamcrest import (
+    assert_that,
+    calling,
+    contains_exactly,
+    contains_string,
+    equal_to,
+    has_entries,
+    is_not,
+    raises,
+)
+from sqlalchemy import create_engine, insert, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from accent_chatd.dao.room import (
+    RoomDAO,
+    decode_message_cursor,
+    encode_message_cursor,
+    search_tsquery,
+)
+from accent_chatd.models import Room, RoomMessage
+
+EPOCH = datetime.datetime(2024, 1, 1)
+
+
+def _sql(query):
+    return str(
+        query.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+
+
+class TestPaginate:
+    def setup_method(self):
+        self.dao = RoomDAO(None)
+        self.query = select(RoomMessage)
+
+    def test_created_at_ties_are_ordered_by_uuid(self):
+        sql = _sql(self.dao._paginate(self.query, limit=10, offset=20))
+
+        assert_that(
+            sql,
+            contains_string(
+                "ORDER BY chatd_roommessage.created_at DESC, chatd_roommessage.uuid DESC"
+            ),
+        )
+        assert_that(sql, contains_string("LIMIT 10 OFFSET 20"))
+
+    def test_ascending(self):
+        sql = _sql(self.dao._paginate(self.query, direction="asc"))
+
+        assert_that(
+            sql,
+            contains_string(
+                "ORDER BY chatd_roommessage.created_at ASC, chatd_roommessage.uuid ASC"
+            ),
+        )
+
+    def test_other_order(self):
+        sql = _sql(self.dao._paginate(self.query, order="alias"))
+
+        assert_that(sql, contains_string("ORDER BY chatd_roommessage.alias DESC"))
+
+
+class TestKeyset:
+    def setup_method(self):
+        self.dao = RoomDAO(None)
+        self.query = select(RoomMessage)
+        self.after = (EPOCH, "uuid")
+
+    def test_descending_seeks_before_the_cursor(self):
+        sql = _sql(self.dao._paginate(self.query, limit=10, after=self.after))
+
+        assert_that(
+            sql,
+            contains_string(
+                "WHERE (chatd_roommessage.created_at, chatd_roommessage.uuid) < "
+            ),
+        )
+        assert_that(sql, contains_string("LIMIT 10"))
+        assert_that(sql, is_not(contains_string("OFFSET")))
+
+    def test_ascending_seeks_after_the_cursor(self):
+        sql = _sql(self.dao._paginate(self.query, direction="asc", after=self.after))
+
+        assert_that(
+            sql,
+            contains_string(
+                "WHERE (chatd_roommessage.created_at, chatd_roommessage.uuid) > "
+            ),
+        )
+
+    def test_cursor(self):
+        message = RoomMessage(uuid="message-uuid", created_at=EPOCH)
+
+        cursor = encode_message_cursor(message)
+
+        assert_that(decode_message_cursor(cursor), equal_to((EPOCH, "message-uuid")))
+        assert_that(
+            calling(decode_message_cursor).with_args("not-a-cursor"),
+            raises(ValueError),
+        )
+
+
+class _SyncSession:
+    """Async facade of a sync session, to run the DAO queries on SQLite."""
+
+    def __init__(self, engine):
+        self._session = Session(engine)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self._session.close()
+
+    async def execute(self, query):
+        return self._session.execute(query)
+
+
+class TestKeysetWalk:
+    def setup_method(self):
+        self.engine = create_engine("sqlite://")
+        with self.engine.begin() as conn:
+            conn.execute(
+                text(
+                    "CREATE TABLE chatd_roommessage (id INTEGER, uuid VARCHAR,"
+                    " room_uuid INTEGER, content TEXT, alias VARCHAR,"
+                    " user_uuid VARCHAR, tenant_uuid VARCHAR, accent_uuid VARCHAR,"
+                    " created_at DATETIME)"
+                )
+            )
+        self.dao = RoomDAO(lambda: _SyncSession(self.engine))
+        self.room = Room(uuid="room")
+        self.seconds = 0
+        self.ids = 0
+
+    def _add(self, count, same_time=False):
+        messages = []
+        for _ in range(count):
+            if not same_time:
+                self.seconds += 1
+            self.ids += 1
+            message = {
+                "id": self.ids,
+                "uuid": str(uuid.uuid4()),
+                "room_uuid": self.room.uuid,
+                "user_uuid": "user",
+                "tenant_uuid": "tenant",
+                "accent_uuid": "accent",
+                "created_at": EPOCH + datetime.timedelta(seconds=self.seconds),
+            }
+            messages.append(message)
+        with self.engine.begin() as conn:
+            conn.execute(insert(RoomMessage.__table__), messages)
+        return messages
+
+    async def _walk(self, direction):
+        seen = []
+        after = None
+        for _ in range(20):
+            page = await self.dao.list_messages(
+                self.room, limit=3, direction=direction, after=after
+            )
+            seen.extend(message.uuid for message in page)
+            if len(page) < 3:
+                return seen
+            after = decode_message_cursor(encode_message_cursor(page[-1]))
+            # New messages arrive between the pages
+            self._add(2)
+        raise AssertionError("the pages never end")
+
+    @pytest.mark.asyncio
+    async def test_pages_skip_nothing_while_messages_are_added(self):
+        existing = self._add(4) + self._add(4, same_time=True) + self._add(3)
+        expected = sorted(
+            existing, key=lambda m: (m["created_at"], m["uuid"]), reverse=True
+        )
+
+        seen = await self._walk("desc")
+
+        assert_that(seen, contains_exactly(*[m["uuid"] for m in expected]))
+
+    @pytest.mark.asyncio
+    async def test_ascending_pages_reach_the_added_messages(self):
+        self._add(5)
+        self._add(3, same_time=True)
+
+        seen = await self._walk("asc")
+
+        with Session(self.engine) as session:
+            every = session.execute(
+                select(RoomMessage.uuid).order_by(
+                    RoomMessage.created_at, RoomMessage.uuid
+                )
+            ).scalars()
+            assert_that(seen, contains_exactly(*every))
+
+
+class TestSearch:
+    def setup_method(self):
+        self.dao = RoomDAO(None)
+        self.query = select(RoomMessage)
+
+    def test_search_tsquery(self):
+        assert_that(search_tsquery("Déplo  outage!"), equal_to("Déplo:* & outage:*"))
+        assert_that(search_tsquery("a & (b | !c)"), equal_to("a:* & b:* & c:*"))
+        assert_that(search_tsquery(" ' "), equal_to(None))
+
+    def test_search_matches_the_unaccented_vector(self):
+        query = self.dao._list_filter(self.query, search="Déplo outage")
+        compiled = query.compile(dialect=postgresql.dialect())
+
+        assert_that(
+            str(compiled),
+            contains_string(
+                "chatd_roommessage.search_vector @@ "
+                "to_tsquery(%(to_tsquery_1)s::REGCONFIG, chatd_unaccent(%(chatd_unaccent_1)s::VARCHAR))"
+            ),
+        )
+        assert_that(
+            compiled.params,
+            has_entries(to_tsquery_1="simple", chatd_unaccent_1="Déplo:* & outage:*"),
+        )
+
+    def test_search_without_words(self):
+        sql = _sql(self.dao._list_filter(self.query, search="  "))
+
+        assert_that(sql, is_not(contains_string("@@")))
+
+    def test_search_vector_is_unaccented(self):
+        computed = RoomMessage.__table__.c.search_vector.computed
+
+        assert_that(
+            str(computed.sqltext),
+            equal_to("to_tsvector('simple', chatd_unaccent(coalesce(content, '')))"),
+        )
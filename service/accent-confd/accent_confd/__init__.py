@@ -2,7 +2,12 @@
 
 from werkzeug.local import LocalProxy as Proxy
 
-from .http_server import get_bus_publisher, get_sysconfd_publisher
+from .http_server import (
+    get_bus_publisher,
+    get_reprovision_collector,
+    get_sysconfd_publisher,
+)
 
 bus = Proxy(get_bus_publisher)
 sysconfd = Proxy(get_sysconfd_publisher)
+reprovision = Proxy(get_reprovision_collector)
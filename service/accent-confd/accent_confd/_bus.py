@@ -23,6 +23,11 @@ class FlushMixin:
             event, extra_headers = self.__deque.popleft()
             self.publish(event, headers=extra_headers)
 
+    def drain(self):
+        events = list(self.__deque)
+        self.__deque.clear()
+        return events
+
     def rollback(self):
         self.__deque.clear()
 
@@ -0,0 +1,173 @@
+# Copyright 2023 Accent Communications
+
+import logging
+import threading
+from collections import OrderedDict
+
+from accent_dao.helpers.db_utils import session_scope
+from accent_provd_client.exceptions import ProvdError
+from requests import RequestException
+
+logger = logging.getLogger(__name__)
+
+RETRIABLE_ERRORS = (ProvdError, RequestException)
+
+
+class ReprovisionCollector:
+    """Collect the devices to reprovision during a request.
+
+    A device affected several times by the same request is only reprovisioned
+    once. The devices are submitted to the queue after the commit, so that the
+    configurations are generated from the committed changes.
+    """
+
+    def __init__(self, queue):
+        self.queue = queue
+        self._devices = OrderedDict()
+
+    def add(self, device_id, tenant_uuid, updater):
+        self._devices[device_id] = (tenant_uuid, updater)
+
+    def flush(self):
+        devices, self._devices = self._devices, OrderedDict()
+        if self.queue:
+            self.queue.submit(devices)
+            return
+
+        for device_id, (tenant_uuid, updater) in devices.items():
+            updater(device_id, tenant_uuid=tenant_uuid)
+
+    def rollback(self):
+        self._devices.clear()
+
+
+class ReprovisionQueue:
+    """Reprovision the devices in the background, with bounded concurrency.
+
+    A device already waiting in the queue is not added twice. A device that is
+    being reprovisioned is queued again, since its configuration may have been
+    generated before the last changes. Provd errors are retried per device
+    with an exponential backoff, up to `max_attempts`.
+    """
+
+    def __init__(
+        self, workers=4, max_attempts=5, retry_interval=1, retry_interval_max=30
+    ):
+        self._workers = workers
+        self._max_attempts = max_attempts
+        self._retry_interval = retry_interval
+        self._retry_interval_max = retry_interval_max
+        self._condition = threading.Condition()
+        self._pending = OrderedDict()
+        self._in_progress = set()
+        self._requeued = {}
+        self._stopped = threading.Event()
+        self._threads = []
+        self._completed = 0
+        self._failed = 0
+        self._retried = 0
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(**config['reprovision'])
+
+    def start(self):
+        for i in range(self._workers):
+            thread = threading.Thread(target=self._run, name=f'reprovision-{i}')
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stopped.set()
+        with self._condition:
+            if self._pending:
+                logger.warning(
+                    'stopping with %s devices left to reprovision', len(self._pending)
+                )
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def submit(self, devices):
+        with self._condition:
+            for device_id, job in devices.items():
+                if device_id in self._in_progress:
+                    self._requeued[device_id] = job
+                else:
+                    self._pending[device_id] = job
+            self._condition.notify_all()
+
+    def status(self):
+        with self._condition:
+            return {
+                'pending': len(self._pending) + len(self._requeued),
+                'in_progress': len(self._in_progress),
+                'completed': self._completed,
+                'failed': self._failed,
+                'retried': self._retried,
+            }
+
+    def _next(self):
+        with self._condition:
+            while not self._pending and not self._stopped.is_set():
+                self._condition.wait()
+            if self._stopped.is_set():
+                return None
+            device_id, job = self._pending.popitem(last=False)
+            self._in_progress.add(device_id)
+            return device_id, job
+
+    def _done(self, device_id, succeeded):
+        with self._condition:
+            self._in_progress.discard(device_id)
+            if succeeded:
+                self._completed += 1
+            else:
+                self._failed += 1
+            job = self._requeued.pop(device_id, None)
+            if job:
+                self._pending[device_id] = job
+                self._condition.notify()
+
+    def _run(self):
+        while True:
+            item = self._next()
+            if item is None:
+                return
+            device_id, (tenant_uuid, updater) = item
+            self._done(device_id, self._reprovision(device_id, tenant_uuid, updater))
+
+    def _reprovision(self, device_id, tenant_uuid, updater):
+        for attempt in range(1, self._max_attempts + 1):
+            try:
+                with session_scope(read_only=True):
+                    updater(device_id, tenant_uuid=tenant_uuid)
+                return True
+            except RETRIABLE_ERRORS as e:
+                if attempt == self._max_attempts:
+                    logger.error(
+                        'device %s: reprovisioning failed after %s attempts: %s',
+                        device_id,
+                        attempt,
+                        e,
+                    )
+                    return False
+                delay = min(
+                    self._retry_interval * 2 ** (attempt - 1), self._retry_interval_max
+                )
+                logger.warning(
+                    'device %s: reprovisioning failed, retrying in %ss: %s',
+                    device_id,
+                    delay,
+                    e,
+                )
+                with self._condition:
+                    self._retried += 1
+                if self._stopped.wait(delay):
+                    return False
+            except Exception:
+                logger.exception('device %s: reprovisioning failed', device_id)
+                return False
+        return False
@@ -129,8 +129,8 @@ class SysconfdPublisher:
         if response.status_code != 200:
             raise SysconfdError(response.status_code, response.text)
 
-    def add_request(self, *args, **kwargs):
-        self.requests.append(lambda session: session.request(*args, **kwargs))
+    def add_request(self, method, url, **kwargs):
+        self.requests.append((method, url, kwargs))
 
     def flush(self):
         session = self._session()
@@ -141,17 +141,45 @@ class SysconfdPublisher:
     def flush_handlers(self, session):
         if len(self.handlers) > 0:
             url = "{}/exec_request_handlers".format(self.base_url)
-            body = {key: tuple(commands) for key, commands in self.handlers.items()}
-            if self.handlers_contexts:
-                body['context'] = self.handlers_contexts
-            response = session.request('POST', url, json=body)
+            response = session.request('POST', url, json=self._handlers_body())
             self.check_for_errors(response)
 
     def flush_requests(self, session):
-        for request_applicator in self.requests:
-            response = request_applicator(session)
+        for method, url, kwargs in self.requests:
+            response = session.request(method, url, **kwargs)
             self.check_for_errors(response)
 
+    def drain(self):
+        # The requests are returned relative to the base URL, in the order
+        # flush would have sent them, so that they can be stored and sent later
+        requests = []
+        if len(self.handlers) > 0:
+            requests.append(
+                {
+                    'method': 'POST',
+                    'path': '/exec_request_handlers',
+                    'kwargs': {'json': self._handlers_body()},
+                }
+            )
+        for method, url, kwargs in self.requests:
+            path = url[len(self.base_url) :]
+            requests.append({'method': method, 'path': path, 'kwargs': kwargs})
+        self._reset()
+        return requests
+
+    def send(self, request):
+        url = "{}{}".format(self.base_url, request['path'])
+        response = self._session().request(
+            request['method'], url, **request['kwargs']
+        )
+        self.check_for_errors(response)
+
+    def _handlers_body(self):
+        body = {key: tuple(commands) for key, commands in self.handlers.items()}
+        if self.handlers_contexts:
+            body['context'] = self.handlers_contexts
+        return body
+
     def rollback(self):
         self._reset()
 
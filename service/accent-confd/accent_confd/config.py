@@ -53,6 +53,29 @@ DEFAULT_CONFIG = {
     },
     'provd': {'host': 'localhost', 'port': 8666, 'prefix': None, 'https': False},
     'sysconfd': {'host': 'localhost', 'port': '8668'},
+    'outbox': {
+        'enabled': True,
+        'poll_interval': 5,
+        'batch_size': 100,
+        'max_attempts': 10,
+        'retry_interval': 1,
+        'retry_interval_max': 60,
+        'retention_days': 7,
+    },
+    'user_import': {
+        'chunk_size': 100,
+        'auth_concurrency': 10,
+        'poll_interval': 60,
+    },
+    'user_export': {
+        'page_size': 1000,
+    },
+    'reprovision': {
+        'workers': 4,
+        'max_attempts': 5,
+        'retry_interval': 1,
+        'retry_interval_max': 30,
+    },
     'enabled_plugins': {
         'access_feature': True,
         'agent': True,
@@ -109,6 +132,7 @@ DEFAULT_CONFIG = {
         'meeting': True,
         'meeting_authorization': True,
         'moh': True,
+        'outbox': True,
         'outcall': True,
         'outcall_call_permission': True,
         'outcall_extension': True,
@@ -11,13 +11,16 @@ from accent.consul_helpers import ServiceCatalogRegistration
 from accent.status import StatusAggregator, TokenStatus
 from accent.token_renewer import TokenRenewer
 from accent_auth_client import Client as AuthClient
+from accent_dao.helpers.cache import CacheInvalidator
 
 from accent_confd.helpers.asterisk import PJSIPDoc
 from accent_confd.helpers.middleware import MiddleWareHandle
 
 from . import auth
 from ._bus import BusConsumer, BusPublisher
+from ._reprovision import ReprovisionQueue
 from .http_server import HTTPServer, api, app
+from .outbox import OutboxRelay
 from .service_discovery import self_check
 
 logger = logging.getLogger(__name__)
@@ -29,6 +32,12 @@ class Controller:
         self._bus_consumer = BusConsumer.from_config(config['bus'])
         self._bus_publisher = BusPublisher.from_config(config['uuid'], config['bus'])
         self._bus_publisher.set_as_reference()
+        self._reprovision_queue = ReprovisionQueue.from_config(config)
+        app.extensions['reprovision_queue'] = self._reprovision_queue
+        self._outbox_relay = None
+        if config['outbox']['enabled']:
+            self._outbox_relay = OutboxRelay.from_config(config)
+            app.extensions['outbox_relay'] = self._outbox_relay
         self.status_aggregator = StatusAggregator()
         self.token_status = TokenStatus()
         self._service_discovery_args = [
@@ -70,6 +79,9 @@ class Controller:
                 'status_aggregator': self.status_aggregator,
             },
         )
+        # Once the plugins imported the DAOs, all their cache regions exist
+        CacheInvalidator().subscribe(self._bus_consumer)
+        self._user_import_job_runner = app.extensions.get('user_import_job_runner')
 
     def run(self):
         logger.info('accent-confd starting...')
@@ -77,6 +89,12 @@ class Controller:
         signal.signal(signal.SIGTERM, partial(_signal_handler, self))
         signal.signal(signal.SIGINT, partial(_signal_handler, self))
 
+        self._reprovision_queue.start()
+        if self._outbox_relay:
+            self._outbox_relay.start()
+        if self._user_import_job_runner:
+            self._user_import_job_runner.start()
+
         try:
             with self.token_renewer:
                 with self._bus_consumer:
@@ -85,6 +103,11 @@ class Controller:
         finally:
             if self._stopping_thread:
                 self._stopping_thread.join()
+            if self._user_import_job_runner:
+                self._user_import_job_runner.stop()
+            if self._outbox_relay:
+                self._outbox_relay.stop()
+            self._reprovision_queue.stop()
 
     def stop(self, reason):
         logger.warning('Stopping accent-confd: %s', reason)
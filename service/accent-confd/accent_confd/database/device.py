@@ -87,3 +87,48 @@ def template_has_sccp_device(template_id):
     )
 
     return Session.query(exists_query).scalar()
+
+
+def _devices_of_lines(query):
+    return (
+        query.filter(LineFeatures.device_id.isnot(None))
+        .with_entities(LineFeatures.device_id, LineFeatures.tenant_uuid)
+        .distinct()
+        .all()
+    )
+
+
+def devices_for_user(user_id):
+    query = (
+        Session.query(LineFeatures)
+        .join(UserLine, UserLine.line_id == LineFeatures.id)
+        .filter(UserLine.user_id == user_id)
+    )
+    return _devices_of_lines(query)
+
+
+def devices_for_func_key_templates(template_ids):
+    if not template_ids:
+        return []
+
+    query = (
+        Session.query(LineFeatures)
+        .join(UserLine, UserLine.line_id == LineFeatures.id)
+        .join(UserFeatures, UserFeatures.id == UserLine.user_id)
+        .filter(
+            or_(
+                UserFeatures.func_key_template_id.in_(template_ids),
+                UserFeatures.func_key_private_template_id.in_(template_ids),
+            )
+        )
+    )
+    return _devices_of_lines(query)
+
+
+def devices_for_extension(extension_id):
+    query = (
+        Session.query(LineFeatures)
+        .join(LineExtension, LineExtension.line_id == LineFeatures.id)
+        .filter(LineExtension.extension_id == extension_id)
+    )
+    return _devices_of_lines(query)
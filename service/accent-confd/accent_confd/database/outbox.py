@@ -0,0 +1,76 @@
+# Copyright 2023 Accent Communications
+
+from accent_dao.alchemy.outbox import OutboxMessage
+from accent_dao.helpers.db_manager import Session
+from sqlalchemy import func
+
+
+def add(kind, body):
+    message = OutboxMessage(kind=kind, body=body)
+    Session.add(message)
+    return message
+
+
+def find_pending(max_attempts, limit):
+    # Locking the head of the outbox keeps the messages in order when several
+    # relays run against the same database
+    return (
+        Session.query(OutboxMessage)
+        .filter(OutboxMessage.published_at.is_(None))
+        .filter(OutboxMessage.attempts < max_attempts)
+        .order_by(OutboxMessage.id)
+        .limit(limit)
+        .with_for_update()
+        .all()
+    )
+
+
+def mark_published(message):
+    message.published_at = func.now()
+    message.last_error = None
+    Session.flush()
+
+
+def mark_failed(message, error):
+    message.attempts += 1
+    message.last_error = error
+    Session.flush()
+
+
+def count_pending(max_attempts):
+    query = Session.query(OutboxMessage).filter(OutboxMessage.published_at.is_(None))
+    return {
+        'pending': query.filter(OutboxMessage.attempts < max_attempts).count(),
+        'failed': query.filter(OutboxMessage.attempts >= max_attempts).count(),
+    }
+
+
+def reset(kind, since=None, from_id=None):
+    # sysconfd requests are not idempotent, never replay the whole outbox
+    if since is None and from_id is None:
+        raise ValueError('since or from_id is required')
+    query = Session.query(OutboxMessage).filter(OutboxMessage.kind == kind)
+    if since is not None:
+        query = query.filter(OutboxMessage.created_at >= since)
+    if from_id is not None:
+        query = query.filter(OutboxMessage.id >= from_id)
+    count = query.update(
+        {
+            OutboxMessage.published_at: None,
+            OutboxMessage.attempts: 0,
+            OutboxMessage.last_error: None,
+        },
+        synchronize_session=False,
+    )
+    Session.flush()
+    return count
+
+
+def purge_published(before):
+    count = (
+        Session.query(OutboxMessage)
+        .filter(OutboxMessage.published_at < before)
+        .delete(synchronize_session=False)
+    )
+    Session.flush()
+    return count
@@ -186,3 +186,9 @@ def export_query(tenant_uuid, separator=";"):
     )
 
     return COLUMNS, query
+
+
+def stream_export_query(tenant_uuid, page_size, separator=";"):
+    """Same as `export_query`, with the rows fetched by a server-side cursor."""
+    columns, query = export_query(tenant_uuid, separator)
+    return columns, query.order_by(User.id).yield_per(page_size)
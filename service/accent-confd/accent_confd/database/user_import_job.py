@@ -0,0 +1,48 @@
+# Copyright 2023 Accent Communications
+
+from accent_dao.alchemy.user_import_job import UserImportJob
+from accent_dao.helpers import errors
+from accent_dao.helpers.db_manager import Session
+
+
+def create(tenant_uuid, rows):
+    job = UserImportJob(tenant_uuid=tenant_uuid, rows=rows, status='pending')
+    Session.add(job)
+    Session.flush()
+    return job
+
+
+def get(uuid, tenant_uuids=None):
+    query = Session.query(UserImportJob).filter(UserImportJob.uuid == uuid)
+    if tenant_uuids is not None:
+        query = query.filter(UserImportJob.tenant_uuid.in_(tenant_uuids))
+    job = query.first()
+    if not job:
+        raise errors.not_found('UserImportJob', uuid=uuid)
+    return job
+
+
+def find_unfinished():
+    return (
+        Session.query(UserImportJob.uuid)
+        .filter(UserImportJob.status.in_(('pending', 'running')))
+        .order_by(UserImportJob.created_at)
+        .all()
+    )
+
+
+def checkpoint(job, processed_rows, created, errors):
+    # The lists are reassigned for the JSONB columns to be written
+    job.status = 'running'
+    job.processed_rows = processed_rows
+    job.created = job.created + created
+    job.errors = job.errors + errors
+    if processed_rows >= job.total_rows:
+        job.status = 'completed'
+    Session.flush()
+
+
+def fail(job, error):
+    job.status = 'failed'
+    job.errors = job.errors + [error]
+    Session.flush()
@@ -67,6 +67,10 @@ def rollback():
     if bus:
         bus.rollback()
 
+    reprovision = g.get('reprovision_collector')
+    if reprovision:
+        reprovision.rollback()
+
 
 def decode_and_log_error(error, exc_info=False):
     error_message = str(error)
@@ -23,6 +23,8 @@ class ListSchema(BaseSchema):
     offset = fields.Integer(validate=validate.Range(min=0))
     search = fields.String()
     recurse = fields.Boolean()
+    cursor = fields.String()
+    count = fields.String(validate=validate.OneOf(['exact', 'estimate', 'skip']))
 
     class Meta:
         unknown = marshmallow.INCLUDE
@@ -79,8 +81,16 @@ class ListResource(ConfdResource):
         if tenant_uuids is not None:
             kwargs['tenant_uuids'] = tenant_uuids
 
-        total, items = self.service.search(params, **kwargs)
-        return {'total': total, 'items': self.schema().dump(items, many=True)}
+        result = self.service.search(params, **kwargs)
+        total, items = result
+        return self.build_list(result, total, self.schema().dump(items, many=True))
+
+    def build_list(self, result, total, items):
+        response = {'total': total, 'items': items}
+        next_cursor = getattr(result, 'next_cursor', None)
+        if next_cursor:
+            response['next_cursor'] = next_cursor
+        return response
 
     def search_params(self):
         return ListSchema().load(request.args)
@@ -15,7 +15,9 @@ from sqlalchemy.exc import SQLAlchemyError
 from werkzeug.middleware.profiler import ProfilerMiddleware
 from werkzeug.middleware.proxy_fix import ProxyFix
 
+from . import outbox
 from ._bus import BusPublisher
+from ._reprovision import ReprovisionCollector
 from ._sysconfd import SysconfdPublisher
 from .helpers.converter import FilenameConverter
 
@@ -39,17 +41,41 @@ def get_sysconfd_publisher():
     return publisher
 
 
+def get_reprovision_collector():
+    collector = g.get('reprovision_collector')
+    if not collector:
+        collector = g.reprovision_collector = ReprovisionCollector(
+            app.extensions.get('reprovision_queue')
+        )
+    return collector
+
+
 def log_requests():
     return http_helpers.log_before_request()
 
 
 def after_request(response):
-    commit_database()
-    flush_sysconfd()
-    flush_bus()
+    commit_changes()
     return http_helpers.log_request(response)
 
 
+def commit_changes():
+    relay = app.extensions.get('outbox_relay')
+    if relay:
+        stage_outbox()
+        commit_database()
+        relay.wake()
+    else:
+        commit_database()
+        flush_sysconfd()
+        flush_bus()
+    flush_reprovision()
+
+
+def stage_outbox():
+    outbox.stage(g.get('bus_publisher'), g.get('sysconfd_publisher'))
+
+
 def commit_database():
     try:
         Session.commit()
@@ -72,6 +98,12 @@ def flush_bus():
         publisher.flush()
 
 
+def flush_reprovision():
+    collector = g.get('reprovision_collector')
+    if collector:
+        collector.flush()
+
+
 def load_uuid():
     with session_scope():
         app.config['uuid'] = info_dao.get().uuid
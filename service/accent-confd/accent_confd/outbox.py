@@ -0,0 +1,223 @@
+# Copyright 2023 Accent Communications
+
+import asyncio
+import datetime
+import logging
+import threading
+import time
+
+from accent_dao.helpers.db_utils import session_scope
+
+from ._bus import BusPublisher
+from ._sysconfd import SysconfdPublisher
+from .database import outbox as outbox_db
+
+logger = logging.getLogger(__name__)
+
+DEDUPLICATION_HEADER = 'deduplication_id'
+PURGE_INTERVAL = 3600
+
+
+class OutboxEvent:
+    """A bus event rebuilt from its outbox message."""
+
+    def __init__(self, body):
+        self.name = body['name']
+        self.routing_key = body['routing_key']
+        self.headers = body['headers']
+        self.content = body['content']
+
+    def marshal(self):
+        return self.content
+
+
+def stage(bus_publisher, sysconfd_publisher):
+    """Write the pending bus events and sysconfd requests to the outbox.
+
+    The messages are added to the current session, so they are committed or
+    rolled back with the changes that caused them. The sysconfd requests are
+    written first, as they used to be flushed before the bus events.
+    """
+    if sysconfd_publisher:
+        for request in sysconfd_publisher.drain():
+            outbox_db.add('sysconfd', request)
+    if bus_publisher:
+        for event, extra_headers in bus_publisher.drain():
+            outbox_db.add('bus', _event_body(event, extra_headers))
+
+
+def _event_body(event, extra_headers):
+    headers = dict(extra_headers or {})
+    headers.update(getattr(event, 'headers', {}))
+    if hasattr(event, 'required_access'):
+        headers['required_access'] = event.required_access
+    return {
+        'name': event.name,
+        'routing_key': getattr(event, 'routing_key', None),
+        'headers': headers,
+        'content': event.marshal(),
+    }
+
+
+class OutboxRelay:
+    """Send the outbox messages in order once their transaction is committed.
+
+    A message that fails blocks the ones after it, and is retried with an
+    exponential backoff until it reaches `max_attempts`. It is then left in
+    the outbox, where it can be replayed, and the next messages are sent.
+
+    The bus publisher is asynchronous: the relay owns its publisher and runs
+    it on an event loop of its own, each message being published and
+    confirmed by the broker before it is marked as published.
+    """
+
+    def __init__(
+        self,
+        bus_publisher,
+        sysconfd_publisher,
+        poll_interval=5,
+        batch_size=100,
+        max_attempts=10,
+        retry_interval=1,
+        retry_interval_max=60,
+        retention_days=7,
+    ):
+        self._bus_publisher = bus_publisher
+        self._sysconfd_publisher = sysconfd_publisher
+        self._poll_interval = poll_interval
+        self._batch_size = batch_size
+        self._max_attempts = max_attempts
+        self._retry_interval = retry_interval
+        self._retry_interval_max = retry_interval_max
+        self._retention = datetime.timedelta(days=retention_days)
+        self._last_purge = None
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._loop = None
+
+    @classmethod
+    def from_config(cls, config):
+        outbox_config = dict(config['outbox'])
+        outbox_config.pop('enabled', None)
+        # The publisher is connected on the loop of the relay thread, it is
+        # not shared with the request handlers
+        return cls(
+            BusPublisher.from_config(config['uuid'], config['bus']),
+            SysconfdPublisher.from_config(config),
+            **outbox_config,
+        )
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='outbox-relay')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def wake(self):
+        self._wakeup.set()
+
+    def _run(self):
+        logger.info('outbox relay started')
+        failures = 0
+        while not self._stopped.is_set():
+            self._wakeup.clear()
+            try:
+                with session_scope():
+                    self.purge()
+                    sent, failed = self.relay()
+            except Exception:
+                logger.exception('outbox relay failed')
+                sent, failed = 0, True
+
+            if failed:
+                failures += 1
+                timeout = min(
+                    self._retry_interval * 2 ** (failures - 1),
+                    self._retry_interval_max,
+                )
+            else:
+                failures = 0
+                timeout = 0 if sent == self._batch_size else self._poll_interval
+
+            if timeout:
+                self._wakeup.wait(timeout)
+        self.close()
+        logger.info('outbox relay stopped')
+
+    def close(self):
+        if self._loop is None:
+            return
+        try:
+            self._loop.run_until_complete(self._close_publisher())
+        except Exception:
+            logger.exception('failed to close the outbox bus publisher')
+        finally:
+            self._loop.close()
+            self._loop = None
+
+    def relay(self):
+        """Send the pending messages, stopping at the first failure.
+
+        Returns the number of messages sent and whether one failed.
+        """
+        sent = 0
+        for message in outbox_db.find_pending(self._max_attempts, self._batch_size):
+            try:
+                self._send(message)
+            except Exception as e:
+                logger.warning(
+                    'outbox message %s (%s) failed: %s', message.id, message.kind, e
+                )
+                outbox_db.mark_failed(message, str(e))
+                if message.attempts >= self._max_attempts:
+                    logger.error(
+                        'outbox message %s (%s) abandoned after %s attempts',
+                        message.id,
+                        message.kind,
+                        message.attempts,
+                    )
+                return sent, True
+            outbox_db.mark_published(message)
+            sent += 1
+        return sent, False
+
+    def purge(self):
+        now = time.monotonic()
+        if self._last_purge is not None and now - self._last_purge < PURGE_INTERVAL:
+            return
+        self._last_purge = now
+        before = datetime.datetime.now(datetime.timezone.utc) - self._retention
+        outbox_db.purge_published(before)
+
+    def _send(self, message):
+        if message.kind == 'sysconfd':
+            self._sysconfd_publisher.send(message.body)
+        else:
+            self._run_coroutine(
+                self._publish(
+                    OutboxEvent(message.body),
+                    headers={DEDUPLICATION_HEADER: message.uuid},
+                )
+            )
+
+    def _run_coroutine(self, coroutine):
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(coroutine)
+
+    async def _publish(self, event, headers):
+        if not await self._bus_publisher.publisher_connected():
+            await self._bus_publisher.connect()
+        # Returns once the broker confirmed the message
+        await self._bus_publisher.publish(event, headers=headers)
+
+    async def _close_publisher(self):
+        if await self._bus_publisher.publisher_connected():
+            await self._bus_publisher.close()
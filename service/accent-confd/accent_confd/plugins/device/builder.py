@@ -7,7 +7,7 @@ from accent_dao.resources.line_extension import dao as line_extension_dao
 from accent_dao.resources.user import dao as user_dao
 from accent_dao.resources.user_line import dao as user_line_dao
 
-from accent_confd import bus, sysconfd
+from accent_confd import bus, reprovision, sysconfd
 from accent_confd.database import (
     device as device_db,
 )
@@ -70,12 +70,13 @@ def build_device_updater(provd_client):
     generator = build_generators(device_dao, registrar_dao)
     provd_updater = ProvdUpdater(device_dao, generator, line_dao)
     return DeviceUpdater(
-        user_dao,
         line_dao,
         user_line_dao,
         line_extension_dao,
         func_key_template_db,
+        device_db,
         provd_updater,
+        reprovision,
     )
 
 
@@ -8,6 +8,7 @@ from .resource import (
     DeviceAutoprov,
     DeviceItem,
     DeviceList,
+    DeviceReprovisioning,
     DeviceSynchronize,
     UnallocatedDeviceItem,
     UnallocatedDeviceList,
@@ -54,6 +55,8 @@ class Plugin:
             resource_class_args=(service,),
         )
 
+        api.add_resource(DeviceReprovisioning, '/devices/reprovisioning')
+
         api.add_resource(
             UnallocatedDeviceList,
             '/devices/unallocated',
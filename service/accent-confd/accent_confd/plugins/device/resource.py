@@ -1,9 +1,9 @@
 # Copyright 2023 Accent Communications
 
 from accent.tenant_flask_helpers import Tenant
-from flask import request, url_for
+from flask import current_app, request, url_for
 
-from accent_confd.auth import required_acl
+from accent_confd.auth import required_acl, required_master_tenant
 from accent_confd.helpers.restful import (
     ConfdResource,
     ItemResource,
@@ -114,3 +114,19 @@ class DeviceSynchronize(SingleTenantConfdResource):
         device = self.service.get(id, **kwargs)
         self.service.synchronize(device, tenant_uuid=kwargs['tenant_uuid'])
         return ('', 204)
+
+
+class DeviceReprovisioning(ConfdResource):
+    @required_master_tenant()
+    @required_acl('confd.devices.reprovisioning.read')
+    def get(self):
+        queue = current_app.extensions.get('reprovision_queue')
+        if not queue:
+            return {
+                'pending': 0,
+                'in_progress': 0,
+                'completed': 0,
+                'failed': 0,
+                'retried': 0,
+            }
+        return queue.status()
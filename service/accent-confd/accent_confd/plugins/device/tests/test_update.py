@@ -0,0 +1,83 @@
+# Copyright 2023 Accent Communications
+
+from unittest import TestCase
+from unittest.mock import Mock, call
+
+from hamcrest import assert_that, equal_to
+
+from ..update import DeviceUpdater
+
+
+class TestDeviceUpdater(TestCase):
+    def setUp(self):
+        self.line_dao = Mock()
+        self.user_line_dao = Mock()
+        self.line_extension_dao = Mock()
+        self.func_key_template_db = Mock()
+        self.device_db = Mock()
+        self.provd_updater = Mock()
+        self.reprovision = Mock()
+        self.updater = DeviceUpdater(
+            self.line_dao,
+            self.user_line_dao,
+            self.line_extension_dao,
+            self.func_key_template_db,
+            self.device_db,
+            self.provd_updater,
+            self.reprovision,
+        )
+
+    def test_update_for_template_queues_the_devices(self):
+        self.device_db.devices_for_func_key_templates.return_value = [
+            ('device-1', 'tenant'),
+            ('device-2', 'tenant'),
+        ]
+
+        self.updater.update_for_template(Mock(id=42))
+
+        self.device_db.devices_for_func_key_templates.assert_called_once_with([42])
+        assert_that(
+            self.reprovision.add.call_args_list,
+            equal_to(
+                [
+                    call('device-1', 'tenant', self.provd_updater.update),
+                    call('device-2', 'tenant', self.provd_updater.update),
+                ]
+            ),
+        )
+        self.provd_updater.update.assert_not_called()
+
+    def test_update_for_user_queues_the_devices(self):
+        self.device_db.devices_for_user.return_value = [('device-1', 'tenant')]
+
+        self.updater.update_for_user(Mock(id=12))
+
+        self.device_db.devices_for_user.assert_called_once_with(12)
+        self.reprovision.add.assert_called_once_with(
+            'device-1', 'tenant', self.provd_updater.update
+        )
+
+    def test_update_for_extension_queues_the_devices_of_the_templates(self):
+        self.device_db.devices_for_extension.return_value = [('device-1', 'tenant')]
+        self.device_db.devices_for_func_key_templates.return_value = [
+            ('device-2', 'tenant')
+        ]
+        self.user_line_dao.find_by.return_value = Mock(user_id=12)
+        self.func_key_template_db.find_all_dst_user.return_value = [Mock(id=42)]
+
+        self.updater.update_for_extension(Mock(id=5))
+
+        self.device_db.devices_for_extension.assert_called_once_with(5)
+        self.func_key_template_db.find_all_dst_user.assert_called_once_with(12)
+        self.device_db.devices_for_func_key_templates.assert_called_once_with([42])
+        assert_that(self.reprovision.add.call_count, equal_to(2))
+
+    def test_update_for_line_is_synchronous(self):
+        line = Mock(device_id='device-1', tenant_uuid='tenant')
+
+        self.updater.update_for_line(line)
+
+        self.provd_updater.update.assert_called_once_with(
+            'device-1', tenant_uuid='tenant'
+        )
+        self.reprovision.add.assert_not_called()
@@ -2,39 +2,40 @@
 
 
 class DeviceUpdater:
+    """Update the devices affected by a change.
+
+    The devices of a template, extension or user change can be many, they are
+    collected and reprovisioned in the background once the request is
+    committed. The single device updates are still done within the request.
+    """
+
     def __init__(
         self,
-        user_dao,
         line_dao,
         user_line_dao,
         line_extension_dao,
         func_key_template_db,
+        device_db,
         provd_updater,
+        reprovision,
     ):
-        self.user_dao = user_dao
         self.line_dao = line_dao
         self.user_line_dao = user_line_dao
         self.line_extension_dao = line_extension_dao
         self.func_key_template_db = func_key_template_db
+        self.device_db = device_db
         self.provd_updater = provd_updater
+        self.reprovision = reprovision
 
     def update_for_template(self, template):
-        private_users = self.user_dao.find_all_by(
-            func_key_private_template_id=template.id
-        )
-        public_users = self.user_dao.find_all_by(func_key_template_id=template.id)
-        for user in private_users + public_users:
-            self.update_for_user(user)
+        self._reprovision(self.device_db.devices_for_func_key_templates([template.id]))
 
     def update_for_extension(self, extension):
-        line_extensions = self.line_extension_dao.find_all_by(extension_id=extension.id)
-        for line_extension in line_extensions:
-            line = self.line_dao.get(line_extension.line_id)
-            self.update_for_line(line)
+        self._reprovision(self.device_db.devices_for_extension(extension.id))
 
-        func_key_templates = self._find_all_fk_templates_by_extension(extension)
-        for func_key_template in func_key_templates:
-            self.update_for_template(func_key_template)
+        templates = self._find_all_fk_templates_by_extension(extension)
+        template_ids = [template.id for template in templates]
+        self._reprovision(self.device_db.devices_for_func_key_templates(template_ids))
 
     def _find_all_fk_templates_by_extension(self, extension):
         user_id = self._find_user_id_by_extension(extension)
@@ -51,9 +52,11 @@ class DeviceUpdater:
             return user_line.user_id if user_line else None
 
     def update_for_user(self, user):
-        for user_line in self.user_line_dao.find_all_by_user_id(user.id):
-            line = self.line_dao.get(user_line.line_id)
-            self.update_for_line(line)
+        self._reprovision(self.device_db.devices_for_user(user.id))
+
+    def _reprovision(self, devices):
+        for device_id, tenant_uuid in devices:
+            self.reprovision.add(device_id, tenant_uuid, self.provd_updater.update)
 
     def update_for_endpoint_sip(self, sip):
         line = self.line_dao.find_by(endpoint_sip_uuid=sip.uuid)
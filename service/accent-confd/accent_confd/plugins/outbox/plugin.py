@@ -0,0 +1,16 @@
+# Copyright 2023 Accent Communications
+
+from .resource import OutboxReplayResource
+from .service import build_service
+
+
+class Plugin:
+    def load(self, dependencies):
+        api = dependencies['api']
+        service = build_service()
+
+        api.add_resource(
+            OutboxReplayResource,
+            '/outbox/replay',
+            resource_class_args=(service,),
+        )
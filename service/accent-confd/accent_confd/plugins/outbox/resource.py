@@ -0,0 +1,22 @@
+# Copyright 2023 Accent Communications
+
+from flask import request
+
+from accent_confd.auth import required_acl, required_master_tenant
+from accent_confd.helpers.restful import ConfdResource
+
+from .schema import OutboxReplaySchema
+
+
+class OutboxReplayResource(ConfdResource):
+    schema = OutboxReplaySchema
+
+    def __init__(self, service):
+        super().__init__()
+        self.service = service
+
+    @required_master_tenant()
+    @required_acl('confd.outbox.replay.create')
+    def post(self):
+        form = self.schema().load(request.get_json(silent=True) or {})
+        return self.service.replay(form), 200
@@ -0,0 +1,17 @@
+# Copyright 2023 Accent Communications
+
+from marshmallow import ValidationError, fields, validates_schema
+from marshmallow.validate import OneOf, Range
+
+from accent_confd.helpers.mallow import BaseSchema
+
+
+class OutboxReplaySchema(BaseSchema):
+    kind = fields.String(validate=OneOf(['bus', 'sysconfd']), required=True)
+    since = fields.DateTime(missing=None)
+    from_id = fields.Integer(validate=Range(min=1), missing=None)
+
+    @validates_schema
+    def validate_bound(self, data, **kwargs):
+        if data.get('since') is None and data.get('from_id') is None:
+            raise ValidationError('Either since or from_id is required')
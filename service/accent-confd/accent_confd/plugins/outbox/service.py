@@ -0,0 +1,23 @@
+# Copyright 2023 Accent Communications
+
+from flask import current_app
+
+from accent_confd.database import outbox as outbox_dao
+
+
+class OutboxService:
+    def __init__(self, dao):
+        self.dao = dao
+
+    def replay(self, form):
+        count = self.dao.reset(
+            kind=form['kind'], since=form['since'], from_id=form['from_id']
+        )
+        relay = current_app.extensions.get('outbox_relay')
+        if relay:
+            relay.wake()
+        return {'replayed': count}
+
+
+def build_service():
+    return OutboxService(outbox_dao)
@@ -0,0 +1,33 @@
+# Copyright 2023 Accent Communications
+
+import unittest
+
+from accent_test_helpers.hamcrest.raises import raises
+from hamcrest import assert_that, calling, has_entries, has_key, has_property
+from marshmallow import ValidationError
+
+from ..schema import OutboxReplaySchema
+
+
+class TestOutboxReplaySchema(unittest.TestCase):
+    def setUp(self):
+        self.schema = OutboxReplaySchema(handle_error=False)
+
+    def test_load(self):
+        result = self.schema.load({'kind': 'bus', 'from_id': 42})
+
+        assert_that(result, has_entries(kind='bus', from_id=42, since=None))
+
+    def test_kind_is_required(self):
+        assert_that(
+            calling(self.schema.load).with_args({'from_id': 42}),
+            raises(ValidationError).matching(has_property('messages', has_key('kind'))),
+        )
+
+    def test_a_bound_is_required(self):
+        assert_that(
+            calling(self.schema.load).with_args({'kind': 'sysconfd'}),
+            raises(ValidationError).matching(
+                has_property('messages', has_key('_schema'))
+            ),
+        )
@@ -47,7 +47,8 @@ class UserList(ListResource):
         view = params.get('view')
         schema = self.view_schemas.get(view, UserSchema)
         result = self.service.search_collated(params, tenant_uuids)
-        return {'total': result.total, 'items': schema().dump(result.items, many=True)}
+        items = schema().dump(result.items, many=True)
+        return self.build_list(result, result.total, items)
 
 
 class UserItem(ItemResource):
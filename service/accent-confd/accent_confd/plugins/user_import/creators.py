@@ -61,6 +61,8 @@ class UserCreator(Creator):
         if fields:
             form = self.schema_nullable(handle_error=False).load(fields)
             form['tenant_uuid'] = tenant_uuid
+            if fields.get('uuid'):
+                form['uuid'] = fields['uuid']
             return self.service.create(User(**form))
 
 
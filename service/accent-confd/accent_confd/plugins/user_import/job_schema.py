@@ -0,0 +1,17 @@
+# Copyright 2023 Accent Communications
+
+from marshmallow import fields
+
+from accent_confd.helpers.mallow import BaseSchema
+
+
+class UserImportJobSchema(BaseSchema):
+    uuid = fields.String(dump_only=True)
+    tenant_uuid = fields.String(dump_only=True)
+    status = fields.String(dump_only=True)
+    total_rows = fields.Integer(dump_only=True)
+    processed_rows = fields.Integer(dump_only=True)
+    created = fields.List(fields.Dict(), dump_only=True)
+    errors = fields.List(fields.Dict(), dump_only=True)
+    created_at = fields.DateTime(dump_only=True)
+    updated_at = fields.DateTime(dump_only=True)
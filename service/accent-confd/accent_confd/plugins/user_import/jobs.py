@@ -0,0 +1,284 @@
+# Copyright 2023 Accent Communications
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from accent_dao import tenant_dao
+from accent_dao.helpers import errors
+from accent_dao.helpers.db_manager import Session
+from accent_dao.helpers.exception import ServiceError
+from marshmallow import ValidationError
+
+from accent_confd.helpers.common import rollback
+from accent_confd.http_server import app, commit_changes
+from accent_confd.plugins.user.schema import UserSchemaNullable
+from accent_confd.plugins.voicemail.schema import VoicemailSchema
+
+from .accent_user_schema import AccentUserSchema
+from .accent_user_service import AccentUserService
+from .auth_client import AuthClientProxy
+from .constants import VALID_ENDPOINT_TYPES
+from .csvparse import CsvRow
+
+logger = logging.getLogger(__name__)
+
+
+class RowValidator:
+    """Validate the rows of an import before creating anything.
+
+    The fields are checked without the database, along with the resources
+    that would be created twice by the same file.
+    """
+
+    def validate(self, rows):
+        seen = {}
+        valid = []
+        errors_ = []
+        for row in rows:
+            try:
+                self.validate_row(row, seen)
+            except (ServiceError, ValidationError) as e:
+                errors_.append(row.format_error(e))
+            else:
+                valid.append(row)
+        return valid, errors_
+
+    def validate_row(self, row, seen):
+        entry = row.parse()
+        if entry['user']:
+            UserSchemaNullable(handle_error=False).load(entry['user'])
+        AccentUserSchema(handle_error=False).load(entry['accent_user'])
+
+        voicemail = entry['voicemail']
+        if voicemail.get('number') or voicemail.get('context'):
+            VoicemailSchema(handle_error=False).load(voicemail)
+
+        endpoint = entry['line'].get('endpoint')
+        if endpoint and endpoint not in VALID_ENDPOINT_TYPES:
+            raise errors.invalid_choice('line_protocol', sorted(VALID_ENDPOINT_TYPES))
+
+        self._check_unique(seen, 'User', uuid=entry['user'].get('uuid'))
+        username = entry['accent_user'].get('username')
+        self._check_unique(seen, 'AccentUser', username=username)
+        for resource in ('extension', 'incall'):
+            exten = entry[resource].get('exten')
+            if exten:
+                context = entry[resource].get('context')
+                self._check_unique(seen, 'Extension', exten=exten, context=context)
+
+    def _check_unique(self, seen, resource, **criteria):
+        if None in criteria.values():
+            return
+        key = (resource,) + tuple(criteria.items())
+        if key in seen:
+            raise errors.resource_exists(resource, **criteria)
+        seen[key] = True
+
+
+class ImportJobService:
+    def __init__(self, job_dao, validator, runner):
+        self.job_dao = job_dao
+        self.validator = validator
+        self.runner = runner
+
+    def create(self, parser, tenant_uuid):
+        tenant_dao.find_or_create_tenant(tenant_uuid)
+        rows = list(parser)
+        if not rows:
+            error = errors.missing('rows')
+            return None, [{'message': str(error), 'timestamp': int(time.time())}]
+
+        valid, errors_ = self.validator.validate(rows)
+        if errors_:
+            return None, errors_
+
+        # The users UUID are chosen now, so that a job resumed after a crash
+        # does not create the accent-auth users twice
+        for row in valid:
+            if not row.fields.get('uuid'):
+                row.fields['uuid'] = str(uuid.uuid4())
+        job = self.job_dao.create(tenant_uuid, [row.fields for row in valid])
+        self.runner.wake()
+        return job, []
+
+    def get(self, uuid, tenant_uuids):
+        return self.job_dao.get(uuid, tenant_uuids=tenant_uuids)
+
+
+class ChunkError(Exception):
+    def __init__(self, row, error):
+        super().__init__(str(error))
+        self.row = row
+        self.error = error
+
+
+class ImportJobRunner:
+    """Import the users of the jobs in the background.
+
+    The rows are imported by chunks. Each chunk is committed along with the
+    job checkpoint, so that a job interrupted by a restart resumes after the
+    last committed chunk. The accent-auth users of a chunk are created
+    concurrently once its other resources are created.
+
+    When a row of a chunk fails, the chunk is rolled back and its rows are
+    imported one by one, so that only the failing rows are reported.
+    """
+
+    def __init__(
+        self,
+        job_dao,
+        entry_creator,
+        entry_associator,
+        auth_config,
+        chunk_size=100,
+        auth_concurrency=10,
+        poll_interval=60,
+    ):
+        self.job_dao = job_dao
+        self.entry_creator = entry_creator
+        self.entry_associator = entry_associator
+        self.auth_config = auth_config
+        self.chunk_size = chunk_size
+        self.auth_concurrency = auth_concurrency
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread:
+                return
+            self._thread = threading.Thread(target=self._run, name='user-import')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self):
+        # The job is resumed from its last imported chunk on the next start
+        self._stopped.set()
+        self._wakeup.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread:
+            thread.join()
+
+    def wake(self):
+        self._wakeup.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.clear()
+            try:
+                with app.app_context():
+                    self.run_pending()
+            except Exception:
+                logger.exception('user import failed')
+            self._wakeup.wait(self.poll_interval)
+
+    def run_pending(self):
+        job_uuids = [job_uuid for job_uuid, in self.job_dao.find_unfinished()]
+        Session.remove()
+        for job_uuid in job_uuids:
+            try:
+                self.run_job(job_uuid)
+            except Exception as e:
+                # A job retried forever would block the jobs queued after it
+                logger.exception('import of job %s failed', job_uuid)
+                self._fail_job(job_uuid, e)
+
+    def _fail_job(self, job_uuid, error):
+        rollback()
+        Session.remove()
+        job = self.job_dao.get(job_uuid)
+        self.job_dao.fail(job, {'message': str(error), 'timestamp': int(time.time())})
+        commit_changes()
+        Session.remove()
+
+    def run_job(self, job_uuid):
+        logger.info('importing users of job %s', job_uuid)
+        while True:
+            if self._stopped.is_set():
+                logger.info('import of job %s interrupted', job_uuid)
+                return
+            job = self.job_dao.get(job_uuid)
+            if job.status == 'completed':
+                Session.remove()
+                break
+            start = job.processed_rows
+            rows = [
+                CsvRow(fields, position + 1)
+                for position, fields in enumerate(
+                    job.rows[start : start + self.chunk_size], start
+                )
+            ]
+            self.import_rows(job_uuid, job.tenant_uuid, rows)
+        logger.info('users of job %s imported', job_uuid)
+
+    def import_rows(self, job_uuid, tenant_uuid, rows):
+        try:
+            self._import_chunk(job_uuid, tenant_uuid, rows)
+        except ChunkError as e:
+            if len(rows) > 1:
+                for row in rows:
+                    self.import_rows(job_uuid, tenant_uuid, [row])
+                return
+            logger.warning('Error importing CSV row %s: %s', e.row.position, e)
+            job = self.job_dao.get(job_uuid)
+            row_error = e.row.format_error(e.error)
+            self.job_dao.checkpoint(job, e.row.position, [], [row_error])
+            commit_changes()
+
+    def _import_chunk(self, job_uuid, tenant_uuid, rows):
+        auth_client = AuthClientProxy.from_config(**self.auth_config)
+        try:
+            entries = [self._create_entry(row, tenant_uuid) for row in rows]
+            self._create_accent_users(auth_client, rows, entries)
+            job = self.job_dao.get(job_uuid)
+            created = [entry.extract_ids() for entry in entries]
+            self.job_dao.checkpoint(job, rows[-1].position, created, [])
+            commit_changes()
+        except Exception:
+            rollback()
+            Session.remove()
+            auth_client.rollback()
+            raise
+
+    def _create_entry(self, row, tenant_uuid):
+        try:
+            entry = self.entry_creator.create(row, tenant_uuid)
+            self.entry_associator.associate(entry)
+            return entry
+        except (ServiceError, ValidationError) as e:
+            raise ChunkError(row, e)
+        except Exception as e:
+            logger.exception('Unexpected error importing CSV row %s', row.position)
+            raise ChunkError(row, e)
+
+    def _create_accent_users(self, auth_client, rows, entries):
+        accent_user_service = AccentUserService(auth_client)
+
+        def create(entry):
+            accent_user = dict(entry.accent_user, uuid=entry.user.uuid)
+            try:
+                accent_user_service.create(accent_user)
+            except ServiceError as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=self.auth_concurrency) as executor:
+            results = list(executor.map(create, entries))
+
+        for row, entry, error in zip(rows, entries, results):
+            if error and not self._accent_user_exists(auth_client, entry.user.uuid):
+                raise ChunkError(row, error)
+
+    def _accent_user_exists(self, auth_client, user_uuid):
+        # The user may have been created before the job was interrupted
+        try:
+            auth_client.users.get(user_uuid)
+        except Exception:
+            return False
+        return True
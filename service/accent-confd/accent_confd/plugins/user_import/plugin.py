@@ -17,6 +17,8 @@ from accent_dao.resources.voicemail import dao as voicemail_dao
 from accent_provd_client import Client as ProvdClient
 
 from accent_confd.database import user_export as user_export_dao
+from accent_confd.database import user_import_job as user_import_job_dao
+from accent_confd.http_server import app
 from accent_confd.plugins.call_permission.service import (
     build_service as build_call_permission_service,
 )
@@ -81,7 +83,13 @@ from .creators import (
     WebRTCCreator,
 )
 from .entry import EntryAssociator, EntryCreator, EntryFinder, EntryUpdater
-from .resource import UserExportResource, UserImportResource
+from .jobs import ImportJobRunner, ImportJobService, RowValidator
+from .resource import (
+    UserExportResource,
+    UserImportJobItem,
+    UserImportJobList,
+    UserImportResource,
+)
 from .service import ExportService, ImportService
 
 
@@ -180,7 +188,35 @@ class Plugin:
             UserImportResource, '/users/import', resource_class_args=(import_service,)
         )
 
-        export_service = ExportService(user_export_dao, auth_client)
+        # The accent-auth users are created in bulk by the jobs
+        job_associators = OrderedDict(
+            (name, associator)
+            for name, associator in associators.items()
+            if name != 'accent_user'
+        )
+        job_runner = ImportJobRunner(
+            user_import_job_dao,
+            entry_creator,
+            EntryAssociator(job_associators),
+            config['auth'],
+            **config['user_import'],
+        )
+        app.extensions['user_import_job_runner'] = job_runner
+        job_service = ImportJobService(user_import_job_dao, RowValidator(), job_runner)
+        api.add_resource(
+            UserImportJobList,
+            '/users/import/jobs',
+            resource_class_args=(job_service,),
+        )
+        api.add_resource(
+            UserImportJobItem,
+            '/users/import/jobs/<uuid:uuid>',
+            resource_class_args=(job_service,),
+        )
+
+        export_service = ExportService(
+            user_export_dao, auth_client, **config['user_export']
+        )
         api.add_resource(
             UserExportResource, '/users/export', resource_class_args=(export_service,)
         )
@@ -2,14 +2,16 @@
 
 from accent.tenant_flask_helpers import Tenant
 from accent_dao.helpers.db_manager import Session
+from flask import Response, stream_with_context
 
 from accent_confd import bus, sysconfd
 from accent_confd.auth import required_acl
 from accent_confd.helpers.restful import ConfdResource
-from accent_confd.representations.csv_ import output_csv
+from accent_confd.representations.csv_ import generate_csv, output_csv
 
 from . import csvparse
 from .auth_client import auth_client
+from .job_schema import UserImportJobSchema
 
 
 class UserImportResource(ConfdResource):
@@ -56,6 +58,37 @@ class UserImportResource(ConfdResource):
         auth_client.rollback()
 
 
+class UserImportJobList(ConfdResource):
+    schema = UserImportJobSchema
+
+    def __init__(self, service):
+        self.service = service
+
+    @required_acl('confd.users.import.create')
+    def post(self):
+        tenant = Tenant.autodetect()
+
+        parser = csvparse.parse()
+        job, errors = self.service.create(parser, tenant.uuid)
+        if errors:
+            return {'errors': errors}, 400
+
+        return self.schema().dump(job), 202
+
+
+class UserImportJobItem(ConfdResource):
+    schema = UserImportJobSchema
+
+    def __init__(self, service):
+        self.service = service
+
+    @required_acl('confd.users.import.read')
+    def get(self, uuid):
+        tenant = Tenant.autodetect()
+        job = self.service.get(str(uuid), tenant_uuids=[tenant.uuid])
+        return self.schema().dump(job)
+
+
 class UserExportResource(ConfdResource):
     representations = {'text/csv; charset=utf-8': output_csv}
 
@@ -66,4 +99,7 @@ class UserExportResource(ConfdResource):
     def get(self):
         tenant = Tenant.autodetect()
         csv_header, users = self.service.export(tenant.uuid)
-        return {'headers': csv_header, 'content': users}
+        return Response(
+            stream_with_context(generate_csv(csv_header, users)),
+            content_type='text/csv; charset=utf-8',
+        )
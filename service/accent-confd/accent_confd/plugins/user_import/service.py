@@ -3,6 +3,7 @@
 import logging
 
 from accent_dao import tenant_dao
+from accent_dao.helpers.db_utils import session_scope
 from accent_dao.helpers.exception import ServiceError
 from marshmallow import ValidationError
 
@@ -55,29 +56,53 @@ class ImportService:
 
 
 class ExportService:
-    def __init__(self, user_export_dao, auth_client):
+    """Export the users of a tenant as CSV rows.
+
+    The users are read with a server-side cursor and yielded one by one, so
+    the export does not hold the whole tenant in memory. The accent-auth
+    users are listed by pages before the export starts, keeping only their
+    username.
+    """
+
+    def __init__(self, user_export_dao, auth_client, page_size=1000):
         self._user_export_dao = user_export_dao
         self._auth_client = auth_client
+        self._page_size = page_size
 
     def export(self, tenant_uuid):
-        csv_header, users = self._user_export_dao.export_query(tenant_uuid)
-        users = list(self._format_users(csv_header, users))
-
-        accent_users = self._auth_client.users.list(tenant_uuid=tenant_uuid)['items']
-        accent_users = {user['uuid']: user for user in accent_users}
-        for user in users:
-            if user['uuid'] in accent_users:
-                accent_user = accent_users[user['uuid']]
-                user['username'] = accent_user['username']
-            else:
-                logger.warning(
-                    "User '%s' has no accent-auth user associated. Please create one with same uuid",
-                    user['uuid'],
-                )
-
-        csv_header = csv_header + ('username',)
-
-        return csv_header, users
+        usernames = self._find_usernames(tenant_uuid)
+        csv_header = self._user_export_dao.COLUMNS + ('username',)
+        return csv_header, self._export_users(tenant_uuid, usernames)
+
+    def _find_usernames(self, tenant_uuid):
+        usernames = {}
+        offset = 0
+        while True:
+            accent_users = self._auth_client.users.list(
+                tenant_uuid=tenant_uuid, limit=self._page_size, offset=offset
+            )['items']
+            for accent_user in accent_users:
+                usernames[accent_user['uuid']] = accent_user['username']
+            if len(accent_users) < self._page_size:
+                return usernames
+            offset += len(accent_users)
+
+    def _export_users(self, tenant_uuid, usernames):
+        # The response is streamed once the request is over, so the users are
+        # read in their own transaction
+        with session_scope(read_only=True):
+            csv_header, users = self._user_export_dao.stream_export_query(
+                tenant_uuid, self._page_size
+            )
+            for user in self._format_users(csv_header, users):
+                if user['uuid'] in usernames:
+                    user['username'] = usernames[user['uuid']]
+                else:
+                    logger.warning(
+                        "User '%s' has no accent-auth user associated. Please create one with same uuid",
+                        user['uuid'],
+                    )
+                yield user
 
     def _format_users(self, header, users):
         for user in users:
@@ -0,0 +1,174 @@
+# Copyright 2023 Accent Communications
+
+from unittest import TestCase
+from unittest.mock import ANY, Mock, patch
+
+from accent_dao.helpers.exception import ServiceError
+from hamcrest import assert_that, contains_exactly, equal_to, has_entries, has_length
+
+from ..csvparse import CsvRow
+from ..jobs import ImportJobRunner, ImportJobService, RowValidator
+
+
+def row(position, **fields):
+    fields.setdefault('firstname', f'user{position}')
+    return CsvRow(fields, position)
+
+
+class TestRowValidator(TestCase):
+    def setUp(self):
+        self.validator = RowValidator()
+
+    def test_valid_rows(self):
+        rows = [row(1, exten='1001', context='default'), row(2)]
+
+        valid, errors = self.validator.validate(rows)
+
+        assert_that(valid, equal_to(rows))
+        assert_that(errors, equal_to([]))
+
+    def test_all_the_invalid_rows_are_reported(self):
+        rows = [
+            row(1, enabled='yes'),
+            row(2, line_protocol='iax'),
+            row(3),
+        ]
+
+        valid, errors = self.validator.validate(rows)
+
+        assert_that(valid, contains_exactly(rows[2]))
+        assert_that(
+            errors,
+            contains_exactly(
+                has_entries(details=has_entries(row_number=1)),
+                has_entries(details=has_entries(row_number=2)),
+            ),
+        )
+
+    def test_duplicate_extensions_in_the_file(self):
+        rows = [
+            row(1, exten='1001', context='default'),
+            row(2, exten='1001', context='default'),
+        ]
+
+        valid, errors = self.validator.validate(rows)
+
+        assert_that(valid, contains_exactly(rows[0]))
+        assert_that(errors, has_length(1))
+
+
+@patch('accent_confd.plugins.user_import.jobs.tenant_dao', Mock())
+class TestImportJobService(TestCase):
+    def setUp(self):
+        self.job_dao = Mock()
+        self.validator = Mock()
+        self.runner = Mock()
+        self.service = ImportJobService(self.job_dao, self.validator, self.runner)
+
+    def test_users_uuid_are_assigned(self):
+        rows = [row(1), row(2, uuid='2b3c')]
+        self.validator.validate.return_value = (rows, [])
+
+        job, errors = self.service.create(rows, 'tenant')
+
+        (tenant_uuid, fields), _ = self.job_dao.create.call_args
+        assert_that(fields[0]['uuid'], has_length(36))
+        assert_that(fields[1]['uuid'], equal_to('2b3c'))
+        assert_that(job, equal_to(self.job_dao.create.return_value))
+        self.runner.wake.assert_called_once_with()
+
+    def test_no_job_is_created_with_invalid_rows(self):
+        self.validator.validate.return_value = ([], [{'message': 'invalid'}])
+
+        job, errors = self.service.create([row(1)], 'tenant')
+
+        assert_that(errors, equal_to([{'message': 'invalid'}]))
+        self.job_dao.create.assert_not_called()
+
+    def test_no_job_is_created_without_rows(self):
+        job, errors = self.service.create([], 'tenant')
+
+        assert_that(job, equal_to(None))
+        assert_that(errors, contains_exactly(has_entries(message=ANY)))
+        self.validator.validate.assert_not_called()
+        self.job_dao.create.assert_not_called()
+
+
+@patch('accent_confd.plugins.user_import.jobs.Session', Mock())
+@patch('accent_confd.plugins.user_import.jobs.rollback')
+@patch('accent_confd.plugins.user_import.jobs.commit_changes')
+@patch('accent_confd.plugins.user_import.jobs.AuthClientProxy')
+class TestImportJobRunner(TestCase):
+    def setUp(self):
+        self.job_dao = Mock()
+        self.entry_creator = Mock()
+        self.entry_associator = Mock()
+        self.entry_creator.create.return_value = Mock(accent_user={})
+        self.runner = ImportJobRunner(
+            self.job_dao, self.entry_creator, self.entry_associator, {}, chunk_size=2
+        )
+
+    def test_chunk_is_committed_with_its_checkpoint(self, AuthClient, commit, _):
+        rows = [row(1), row(2)]
+
+        self.runner.import_rows('job', 'tenant', rows)
+
+        job = self.job_dao.get.return_value
+        self.job_dao.checkpoint.assert_called_once_with(job, 2, [ANY] * 2, [])
+        commit.assert_called_once_with()
+        auth_client = AuthClient.from_config.return_value
+        assert_that(auth_client.new_user.call_count, equal_to(2))
+
+    def test_failing_row_is_isolated(self, AuthClient, commit, rollback):
+        rows = [row(1), row(2)]
+        entry = Mock(accent_user={})
+        self.entry_creator.create.side_effect = [
+            entry,
+            ServiceError('invalid'),
+            entry,
+            ServiceError('invalid'),
+        ]
+
+        self.runner.import_rows('job', 'tenant', rows)
+
+        checkpoints = [c.args[1:] for c in self.job_dao.checkpoint.call_args_list]
+        assert_that(checkpoints[0], equal_to((1, [entry.extract_ids()], [])))
+        assert_that(checkpoints[1][0], equal_to(2))
+        assert_that(checkpoints[1][2], has_length(1))
+        assert_that(rollback.call_count, equal_to(2))
+        auth_client = AuthClient.from_config.return_value
+        assert_that(auth_client.rollback.call_count, equal_to(2))
+
+    def test_existing_accent_user_is_not_an_error(self, AuthClient, commit, _):
+        auth_client = AuthClient.from_config.return_value
+        auth_client.new_user.side_effect = ServiceError('exists')
+
+        self.runner.import_rows('job', 'tenant', [row(1)])
+
+        (job, position, created, errors), _ = self.job_dao.checkpoint.call_args
+        assert_that(errors, equal_to([]))
+        auth_client.users.get.assert_called_once()
+
+    def test_failing_job_does_not_block_the_next_ones(self, AuthClient, commit, _):
+        self.job_dao.find_unfinished.return_value = [('broken',), ('next',)]
+        jobs = {
+            'broken': Mock(status='running', processed_rows=0, rows=[]),
+            'next': Mock(status='completed'),
+        }
+        self.job_dao.get.side_effect = jobs.get
+
+        self.runner.run_pending()
+
+        (job, error), _ = self.job_dao.fail.call_args
+        assert_that(job, equal_to(jobs['broken']))
+        assert_that(error, has_entries(message='list index out of range'))
+        commit.assert_called_once_with()
+        self.job_dao.get.assert_called_with('next')
+
+    def test_stopped_runner_leaves_the_job_to_the_next_start(self, AuthClient, *_):
+        self.runner.stop()
+
+        self.runner.run_job('job')
+
+        self.job_dao.get.assert_not_called()
+        AuthClient.from_config.assert_not_called()
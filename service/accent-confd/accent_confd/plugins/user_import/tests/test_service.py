@@ -0,0 +1,73 @@
+# Copyright 2023 Accent Communications
+
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from hamcrest import assert_that, contains_exactly, equal_to, has_entries, has_key, not_
+
+from ..service import ExportService
+
+TENANT_UUID = '00000000-0000-4000-8000-000000000001'
+
+
+class TestExportService(TestCase):
+    def setUp(self):
+        self.user_export_dao = Mock(COLUMNS=('uuid', 'firstname'))
+        self.user_export_dao.stream_export_query.return_value = (
+            ('uuid', 'firstname'),
+            iter([('uuid-1', 'Alice'), ('uuid-2', None), ('uuid-3', 'Charlie')]),
+        )
+        self.auth_client = Mock()
+        self.auth_client.users.list.side_effect = [
+            {
+                'items': [
+                    {'uuid': 'uuid-1', 'username': 'alice'},
+                    {'uuid': 'uuid-2', 'username': 'bob'},
+                ]
+            },
+            {'items': []},
+        ]
+        self.service = ExportService(
+            self.user_export_dao, self.auth_client, page_size=2
+        )
+
+    @patch('accent_confd.plugins.user_import.service.session_scope')
+    def test_export(self, session_scope):
+        csv_header, users = self.service.export(TENANT_UUID)
+
+        assert_that(csv_header, equal_to(('uuid', 'firstname', 'username')))
+        assert_that(
+            list(users),
+            contains_exactly(
+                {'uuid': 'uuid-1', 'firstname': 'Alice', 'username': 'alice'},
+                {'uuid': 'uuid-2', 'firstname': '', 'username': 'bob'},
+                has_entries(uuid='uuid-3', firstname='Charlie'),
+            ),
+        )
+        self.user_export_dao.stream_export_query.assert_called_once_with(TENANT_UUID, 2)
+
+    @patch('accent_confd.plugins.user_import.service.session_scope')
+    def test_export_lists_the_accent_users_by_pages(self, session_scope):
+        self.service.export(TENANT_UUID)
+
+        assert_that(
+            self.auth_client.users.list.call_args_list,
+            contains_exactly(
+                ((), {'tenant_uuid': TENANT_UUID, 'limit': 2, 'offset': 0}),
+                ((), {'tenant_uuid': TENANT_UUID, 'limit': 2, 'offset': 2}),
+            ),
+        )
+
+    @patch('accent_confd.plugins.user_import.service.session_scope')
+    def test_export_reads_the_users_when_the_rows_are_consumed(self, session_scope):
+        _, users = self.service.export(TENANT_UUID)
+
+        self.user_export_dao.stream_export_query.assert_not_called()
+        next(users)
+        session_scope.assert_called_once_with(read_only=True)
+
+    @patch('accent_confd.plugins.user_import.service.session_scope')
+    def test_user_without_accent_user_has_no_username(self, session_scope):
+        _, users = self.service.export(TENANT_UUID)
+
+        assert_that(list(users)[2], not_(has_key('username')))
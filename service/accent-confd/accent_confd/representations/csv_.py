@@ -24,3 +24,19 @@ def output_csv(data, code, http_headers=None):
     response = make_response(csv_text.getvalue(), code)
     response.headers.extend(http_headers or {})
     return response
+
+
+def generate_csv(csv_headers, csv_entries, chunk_size=1000):
+    """Render the same document as `output_csv`, `chunk_size` entries at a time."""
+    csv_text = StringIO()
+    writer = csv.DictWriter(csv_text, csv_headers)
+    writer.writeheader()
+
+    for position, entry in enumerate(csv_entries, 1):
+        writer.writerow(entry)
+        if position % chunk_size == 0:
+            yield csv_text.getvalue()
+            csv_text.seek(0)
+            csv_text.truncate()
+
+    yield csv_text.getvalue()
@@ -2,9 +2,9 @@
 
 from unittest import TestCase
 
-from hamcrest import assert_that, equal_to, has_entry
+from hamcrest import assert_that, contains_exactly, equal_to, has_entry
 
-from ..csv_ import output_csv
+from ..csv_ import generate_csv, output_csv
 
 SOME_STATUS_CODE = 200
 SOME_INPUT = {'headers': [], 'content': []}
@@ -43,3 +43,19 @@ class TestCSVRepresentation(TestCase):
 
         assert_that(result.status_code, equal_to(200))
         assert_that(result.headers, has_entry('my-header', 'my-value'))
+
+
+class TestGenerateCSV(TestCase):
+    def test_csv_strings(self):
+        body = [{'a': '1', 'b': '2', 'c': '3'}, {'a': '4', 'b': 'é'}]
+
+        result = ''.join(generate_csv(['a', 'b', 'c'], iter(body)))
+
+        assert_that(result, equal_to('a,b,c\r\n1,2,3\r\n4,é,\r\n'))
+
+    def test_chunks(self):
+        body = [{'a': '1'}, {'a': '2'}, {'a': '3'}]
+
+        result = generate_csv(['a'], body, chunk_size=2)
+
+        assert_that(list(result), contains_exactly('a\r\n1\r\n2\r\n', '3\r\n'))
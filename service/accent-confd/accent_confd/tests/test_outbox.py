@@ -0,0 +1,152 @@
+# Copyright 2023 Accent Communications
+
+from unittest import TestCase
+from unittest.mock import AsyncMock, Mock, call, patch
+
+from hamcrest import assert_that, equal_to
+
+from .. import outbox
+from ..outbox import OutboxRelay
+
+
+class TestStage(TestCase):
+    def setUp(self):
+        patcher = patch('accent_confd.outbox.outbox_db')
+        self.outbox_db = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_sysconfd_requests_are_written_before_bus_events(self):
+        request = {'method': 'GET', 'path': '/commonconf_apply', 'kwargs': {}}
+        sysconfd = Mock(drain=Mock(return_value=[request]))
+        event = Mock(
+            routing_key='config.users.edited',
+            headers={'tenant_uuid': 'abc'},
+            required_access='event.config.users.edited',
+            marshal=Mock(return_value={'id': 42}),
+        )
+        event.name = 'user_edited'
+        bus = Mock(drain=Mock(return_value=[(event, {'extra': 'header'})]))
+
+        outbox.stage(bus, sysconfd)
+
+        expected_event = {
+            'name': 'user_edited',
+            'routing_key': 'config.users.edited',
+            'headers': {
+                'extra': 'header',
+                'tenant_uuid': 'abc',
+                'required_access': 'event.config.users.edited',
+            },
+            'content': {'id': 42},
+        }
+        assert_that(
+            self.outbox_db.add.call_args_list,
+            equal_to([call('sysconfd', request), call('bus', expected_event)]),
+        )
+
+    def test_no_publisher(self):
+        outbox.stage(None, None)
+
+        self.outbox_db.add.assert_not_called()
+
+
+class TestOutboxRelay(TestCase):
+    def setUp(self):
+        patcher = patch('accent_confd.outbox.outbox_db')
+        self.outbox_db = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.bus = Mock(
+            publish=AsyncMock(),
+            publisher_connected=AsyncMock(return_value=True),
+            connect=AsyncMock(),
+            close=AsyncMock(),
+        )
+        self.sysconfd = Mock()
+        self.relay = OutboxRelay(self.bus, self.sysconfd, max_attempts=2)
+        self.addCleanup(self.relay.close)
+
+    def _message(self, id_, kind, body, attempts=0):
+        return Mock(id=id_, uuid=f'uuid-{id_}', kind=kind, body=body, attempts=attempts)
+
+    def test_messages_are_sent_in_order(self):
+        event_body = {
+            'name': 'user_edited',
+            'routing_key': 'config.users.edited',
+            'headers': {},
+            'content': {'id': 42},
+        }
+        request = {'method': 'GET', 'path': '/commonconf_apply', 'kwargs': {}}
+        messages = [
+            self._message(1, 'sysconfd', request),
+            self._message(2, 'bus', event_body),
+        ]
+        self.outbox_db.find_pending.return_value = messages
+
+        result = self.relay.relay()
+
+        assert_that(result, equal_to((2, False)))
+        self.sysconfd.send.assert_called_once_with(request)
+        self.bus.publish.assert_awaited_once()
+        (event,), kwargs = self.bus.publish.await_args
+        assert_that(event.name, equal_to('user_edited'))
+        assert_that(event.marshal(), equal_to({'id': 42}))
+        assert_that(kwargs, equal_to({'headers': {'deduplication_id': 'uuid-2'}}))
+        assert_that(
+            self.outbox_db.mark_published.call_args_list,
+            equal_to([call(messages[0]), call(messages[1])]),
+        )
+
+    def test_failed_message_blocks_the_next_ones(self):
+        request = {'method': 'GET', 'path': '/commonconf_apply', 'kwargs': {}}
+        messages = [
+            self._message(1, 'sysconfd', request),
+            self._message(2, 'sysconfd', request),
+        ]
+        self.outbox_db.find_pending.return_value = messages
+        self.sysconfd.send.side_effect = Exception('unavailable')
+
+        result = self.relay.relay()
+
+        assert_that(result, equal_to((0, True)))
+        self.sysconfd.send.assert_called_once_with(request)
+        self.outbox_db.mark_failed.assert_called_once_with(messages[0], 'unavailable')
+        self.outbox_db.mark_published.assert_not_called()
+
+    def test_failed_publish_is_not_marked_as_published(self):
+        event_body = {
+            'name': 'user_edited',
+            'routing_key': 'config.users.edited',
+            'headers': {},
+            'content': {'id': 42},
+        }
+        message = self._message(1, 'bus', event_body)
+        self.outbox_db.find_pending.return_value = [message]
+        self.bus.publish.side_effect = Exception('nack')
+
+        result = self.relay.relay()
+
+        assert_that(result, equal_to((0, True)))
+        self.bus.publish.assert_awaited_once()
+        self.outbox_db.mark_failed.assert_called_once_with(message, 'nack')
+        self.outbox_db.mark_published.assert_not_called()
+
+    def test_publisher_is_connected_before_publishing(self):
+        event_body = {
+            'name': 'user_edited',
+            'routing_key': 'config.users.edited',
+            'headers': {},
+            'content': {'id': 42},
+        }
+        self.outbox_db.find_pending.return_value = [self._message(1, 'bus', event_body)]
+        self.bus.publisher_connected.return_value = False
+
+        self.relay.relay()
+
+        self.bus.connect.assert_awaited_once_with()
+        self.bus.publish.assert_awaited_once()
+
+    def test_purge_is_throttled(self):
+        self.relay.purge()
+        self.relay.purge()
+
+        self.outbox_db.purge_published.assert_called_once()
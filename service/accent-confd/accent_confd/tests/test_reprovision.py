@@ -0,0 +1,117 @@
+# Copyright 2023 Accent Communications
+
+import threading
+from unittest import TestCase
+from unittest.mock import Mock, call, patch
+
+from accent_provd_client.exceptions import ProvdError
+from hamcrest import assert_that, equal_to, has_entries
+
+from .._reprovision import ReprovisionCollector, ReprovisionQueue
+
+
+class TestReprovisionCollector(TestCase):
+    def setUp(self):
+        self.queue = Mock()
+        self.collector = ReprovisionCollector(self.queue)
+        self.updater = Mock()
+
+    def test_devices_are_deduplicated(self):
+        self.collector.add('device-1', 'tenant', self.updater)
+        self.collector.add('device-2', 'tenant', self.updater)
+        self.collector.add('device-1', 'tenant', self.updater)
+
+        self.collector.flush()
+
+        (devices,), _ = self.queue.submit.call_args
+        assert_that(list(devices), equal_to(['device-1', 'device-2']))
+
+    def test_rollback(self):
+        self.collector.add('device-1', 'tenant', self.updater)
+
+        self.collector.rollback()
+        self.collector.flush()
+
+        self.queue.submit.assert_called_once_with({})
+
+    def test_without_queue_the_devices_are_updated_synchronously(self):
+        collector = ReprovisionCollector(None)
+        collector.add('device-1', 'tenant', self.updater)
+
+        collector.flush()
+
+        self.updater.assert_called_once_with('device-1', tenant_uuid='tenant')
+
+
+@patch('accent_confd._reprovision.session_scope')
+class TestReprovisionQueue(TestCase):
+    def setUp(self):
+        self.queue = ReprovisionQueue(
+            workers=1, max_attempts=3, retry_interval=0, retry_interval_max=0
+        )
+
+    def _process(self, count):
+        for _ in range(count):
+            device_id, (tenant_uuid, updater) = self.queue._next()
+            succeeded = self.queue._reprovision(device_id, tenant_uuid, updater)
+            self.queue._done(device_id, succeeded)
+
+    def test_pending_devices_are_deduplicated(self, _):
+        updater = Mock()
+        self.queue.submit({'device-1': ('tenant', updater)})
+        self.queue.submit({'device-1': ('tenant', updater)})
+
+        assert_that(self.queue.status(), has_entries(pending=1))
+
+        self._process(1)
+
+        updater.assert_called_once_with('device-1', tenant_uuid='tenant')
+        assert_that(self.queue.status(), has_entries(pending=0, completed=1))
+
+    def test_device_in_progress_is_queued_again(self, _):
+        updater = Mock()
+        self.queue.submit({'device-1': ('tenant', updater)})
+        device_id, _ = self.queue._next()
+
+        self.queue.submit({'device-1': ('tenant', updater)})
+        self.queue._done(device_id, True)
+
+        assert_that(self.queue.status(), has_entries(pending=1, completed=1))
+
+    def test_provd_errors_are_retried(self, _):
+        updater = Mock(side_effect=[ProvdError('unavailable'), None])
+        self.queue.submit({'device-1': ('tenant', updater)})
+
+        self._process(1)
+
+        assert_that(updater.call_count, equal_to(2))
+        assert_that(self.queue.status(), has_entries(completed=1, retried=1))
+
+    def test_device_fails_after_max_attempts(self, _):
+        updater = Mock(side_effect=ProvdError('unavailable'))
+        self.queue.submit({'device-1': ('tenant', updater)})
+
+        self._process(1)
+
+        expected = [call('device-1', tenant_uuid='tenant')] * 3
+        assert_that(updater.call_args_list, equal_to(expected))
+        assert_that(self.queue.status(), has_entries(completed=0, failed=1))
+
+    def test_other_errors_are_not_retried(self, _):
+        updater = Mock(side_effect=Exception('bug'))
+        self.queue.submit({'device-1': ('tenant', updater)})
+
+        self._process(1)
+
+        updater.assert_called_once_with('device-1', tenant_uuid='tenant')
+        assert_that(self.queue.status(), has_entries(failed=1))
+
+    def test_workers(self, _):
+        done = threading.Event()
+        self.queue.submit({'device-1': ('tenant', lambda *_, **__: done.set())})
+
+        self.queue.start()
+        try:
+            assert_that(done.wait(5), equal_to(True))
+        finally:
+            self.queue.stop()
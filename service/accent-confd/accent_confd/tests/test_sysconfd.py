@@ -212,3 +212,39 @@ class TestSysconfdClient(TestCase):
         self.session.request.assert_called_once_with(
             'DELETE', url, params={'name': moh_name}
         )
+
+    def test_drain(self):
+        self.dao.is_live_reload_enabled.return_value = True
+
+        self.client.delete_moh('moh')
+        self.client.exec_request_handlers({'ipbx': ['module reload']})
+
+        requests = self.client.drain()
+
+        assert_that(
+            requests,
+            equal_to(
+                [
+                    {
+                        'method': 'POST',
+                        'path': '/exec_request_handlers',
+                        'kwargs': {'json': {'ipbx': ('module reload',)}},
+                    },
+                    {
+                        'method': 'DELETE',
+                        'path': '/moh',
+                        'kwargs': {'params': {'name': 'moh'}},
+                    },
+                ]
+            ),
+        )
+        assert_that(self.client.drain(), equal_to([]))
+
+    def test_send(self):
+        self.session.request.return_value = Mock(status_code=200)
+        request = {'method': 'DELETE', 'path': '/moh', 'kwargs': {'params': {}}}
+
+        self.client.send(request)
+
+        url = "http://localhost:8668/moh"
+        self.session.request.assert_called_once_with('DELETE', url, params={})
@@ -1,15 +1,19 @@
 # Copyright 2023 Accent Communications
 
 import logging
+from threading import Thread
 
 import accent_dao
 from accent import accent_logging
+from accent_dao.helpers.cache import CacheInvalidator
 from twisted.application import internet, service
 from twisted.internet import reactor
 from twisted.python import log
 
+from accent_confgend.bus import BusConsumer
 from accent_confgend.confgen import ConfgendFactory
 from accent_confgend.config import load as load_config
+from accent_confgend.regeneration import DEFAULT_DEPENDENCIES, RegenerationCache
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +26,7 @@ def main():
     )
 
     accent_dao.init_db(config['db_uri'])
-    f = ConfgendFactory(config['cache'], config)
+    f = _new_factory(config)
 
     logger.info(
         "Listening to TCP port %s on address %s",
@@ -42,7 +46,7 @@ def twisted_application():
     )
 
     accent_dao.init_db(config['db_uri'])
-    f = ConfgendFactory(config['cache'], config)
+    f = _new_factory(config)
 
     application = service.Application('confgend')
 
@@ -54,6 +58,23 @@ def twisted_application():
     return application
 
 
+def _new_factory(config):
+    cache_config = config['regeneration_cache']
+    regeneration_cache = None
+    if cache_config['enabled']:
+        dependencies = dict(DEFAULT_DEPENDENCIES, **cache_config['dependencies'])
+        regeneration_cache = RegenerationCache(dependencies, cache_config['max_age'])
+
+    # The cached DAO queries are evicted even without the regeneration cache
+    bus_consumer = BusConsumer(config['bus'], regeneration_cache, CacheInvalidator())
+    bus_consumer_thread = Thread(
+        target=bus_consumer.run, name='bus_consumer_thread', daemon=True
+    )
+    reactor.callWhenRunning(bus_consumer_thread.start)
+    reactor.addSystemEventTrigger('before', 'shutdown', bus_consumer.stop)
+    return ConfgendFactory(config['cache'], config, regeneration_cache)
+
+
 # given in command line to redirect logs to standard logging
 def twistd_logs():
     return log.PythonLoggingObserver().emit
@@ -0,0 +1,61 @@
+# Copyright 2023 Accent Communications
+
+from __future__ import annotations
+
+import logging
+
+from accent.config_events import ConfigEventConsumer, config_event_names
+from accent_dao.helpers.cache import CacheInvalidator
+
+from accent_confgend.regeneration import RegenerationCache
+
+logger = logging.getLogger(__name__)
+
+
+class BusConsumer(ConfigEventConsumer):
+    """Evict what is built from the entities confd modifies.
+
+    The generated files depending on an entity are marked dirty, and the
+    cached DAO queries using it are evicted.
+    """
+
+    def __init__(
+        self,
+        bus_config,
+        regeneration_cache: RegenerationCache | None = None,
+        cache_invalidator: CacheInvalidator | None = None,
+    ):
+        self._regeneration_cache = regeneration_cache
+        self._cache_invalidator = cache_invalidator
+        self._cached_events = (
+            dict(cache_invalidator.event_names()) if cache_invalidator else {}
+        )
+        super().__init__(bus_config, self._event_names())
+
+    def _event_names(self):
+        names = set(self._cached_events)
+        if self._regeneration_cache:
+            names.update(config_event_names(self._regeneration_cache.entity_types))
+        return names
+
+    def on_consume_ready(self, connection, channel, consumers, **kwargs):
+        super().on_consume_ready(connection, channel, consumers, **kwargs)
+        # events may have been missed while the queue was not bound
+        if self._cache_invalidator:
+            self._cache_invalidator.clear()
+        if self._regeneration_cache:
+            self._regeneration_cache.invalidate()
+            self._regeneration_cache.enable()
+
+    def on_consume_end(self, connection, channel):
+        super().on_consume_end(connection, channel)
+        if self._regeneration_cache:
+            self._regeneration_cache.disable()
+
+    def on_config_event(self, event_name, entity_type, payload):
+        if entity_type and self._regeneration_cache:
+            self._regeneration_cache.mark_dirty(entity_type)
+        if event_name in self._cached_events:
+            self._cache_invalidator.on_entity_event(
+                self._cached_events[event_name], payload
+            )
@@ -20,6 +20,7 @@ from accent_confgend.handler import (
     PluginHandlerFactory,
 )
 from accent_confgend.phoned import PhonedFrontend
+from accent_confgend.regeneration import content_hash
 from accent_confgend.template import new_template_helper
 
 logger = logging.getLogger(__name__)
@@ -73,7 +74,7 @@ class Confgen(Protocol):
 class ConfgendFactory(ServerFactory):
     protocol = Confgen
 
-    def __init__(self, cachedir, config):
+    def __init__(self, cachedir, config, regeneration_cache=None):
         tpl_helper = new_template_helper()
         dependencies = {
             'config': config,
@@ -85,6 +86,7 @@ class ConfgendFactory(ServerFactory):
             'accent': AccentFrontend(),
         }
         self._cache = cache.FileCache(cachedir)
+        self._regeneration_cache = regeneration_cache
         self._handler_factory = MultiHandlerFactory(
             [
                 CachedHandlerFactoryDecorator(
@@ -105,23 +107,44 @@ class ConfgendFactory(ServerFactory):
         cache_key = f'{resource}/{filename}'
         if 'invalidate' in args:
             self._cache.invalidate(cache_key)
-        elif 'cached' in args:
-            return self._get_cached_content(cache_key) or self._generate_and_cache(
+            if self._regeneration_cache is not None:
+                self._regeneration_cache.invalidate(cache_key)
+            return
+
+        if 'cached' in args:
+            content = self._get_cached_content(cache_key) or self._generate_and_cache(
                 cache_key, resource, filename
             )
         else:
-            return self._generate_and_cache(
+            content = self._generate_and_cache(
                 cache_key, resource, filename
             ) or self._get_cached_content(cache_key)
 
+        if 'hash' in args:
+            # lets the callers skip reloading a file that did not change
+            return content_hash(content) if content else None
+        return content
+
     def _generate_and_cache(self, cache_key, resource, filename):
+        if self._regeneration_cache is not None:
+            entry = self._regeneration_cache.get(cache_key)
+            if entry:
+                logger.debug("serving %s from memory", cache_key)
+                return entry.content
+            version = self._regeneration_cache.version(cache_key)
+
         handler = self._handler_factory.get(resource, filename)
         with session_scope(read_only=True):
             try:
                 content = handler()
-                return self._encode_and_cache(cache_key, content)
+                encoded_content = self._encode_and_cache(cache_key, content)
             except Exception:
                 logger.error('unexpected error raised by handler', exc_info=True)
+                return
+
+        if self._regeneration_cache is not None and encoded_content:
+            self._regeneration_cache.put(cache_key, encoded_content, version)
+        return encoded_content
 
     def _get_cached_content(self, cache_key):
         try:
@@ -0,0 +1,300 @@
+# Copyright 2023 Accent Communications
+
+"""In-memory cache of the generated configuration files.
+
+Generating a file like pjsip.conf or extensions.conf reads most of the
+database, yet the result rarely changes between two reloads of Asterisk.
+Each generated file is kept in memory until one of the entities it depends
+on is created, edited, deleted, associated or dissociated, as announced by
+the confd events on the bus.
+
+Files without known dependencies are never kept and are generated on every
+request.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterable, Mapping
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+_LINES = (
+    'line',
+    'line_application',
+    'line_device',
+    'line_endpoint_custom',
+    'line_endpoint_sccp',
+    'line_endpoint_sip',
+    'line_extension',
+    'user',
+    'user_line',
+    'user_line_extension',
+)
+
+DEFAULT_DEPENDENCIES: dict[str, tuple[str, ...]] = {
+    'asterisk/confbridge.conf': (
+        'confbridge_accent_default_bridge',
+        'confbridge_accent_default_user',
+        'conference',
+    ),
+    'asterisk/extensions.conf': _LINES
+    + (
+        'application',
+        'call_filter',
+        'call_filter_fallback',
+        'call_filter_recipient_users',
+        'call_filter_surrogate_users',
+        'call_permission',
+        'conference',
+        'conference_extension',
+        'context',
+        'contexts',
+        'extension',
+        'extension_feature',
+        'func_key_template',
+        'group',
+        'group_call_permission',
+        'group_extension',
+        'group_fallback',
+        'group_member_extensions',
+        'group_member_users',
+        'group_schedule',
+        'incall',
+        'incall_extension',
+        'incall_schedule',
+        'ivr',
+        'meeting',
+        'outcall',
+        'outcall_call_permission',
+        'outcall_extension',
+        'outcall_schedule',
+        'outcall_trunks',
+        'paging',
+        'paging_caller_users',
+        'paging_member_users',
+        'parking_lot',
+        'parking_lot_extension',
+        'queue',
+        'queue_extension',
+        'queue_fallback',
+        'queue_schedule',
+        'schedule',
+        'trunk',
+        'user_call_permission',
+        'user_fallback',
+        'user_groups',
+        'user_schedule',
+        'user_voicemail',
+        'voicemail',
+    ),
+    'asterisk/features.conf': (
+        'features_applicationmap',
+        'features_featuremap',
+        'features_general',
+    ),
+    'asterisk/hep.conf': ('hep_general',),
+    'asterisk/iax.conf': (
+        'iax_callnumberlimits',
+        'iax_endpoint',
+        'iax_general',
+        'register_iax',
+        'trunk',
+        'trunk_endpoint_iax',
+        'trunk_register_iax',
+    ),
+    'asterisk/musiconhold.conf': ('moh',),
+    'asterisk/pjsip.conf': _LINES
+    + (
+        'application',
+        'context',
+        'extension',
+        'meeting',
+        'pjsip_global',
+        'pjsip_system',
+        'register_sip',
+        'registrar',
+        'sip_endpoint',
+        'sip_endpoint_template',
+        'sip_general',
+        'sip_transport',
+        'trunk',
+        'trunk_endpoint_sip',
+        'user_voicemail',
+        'voicemail',
+    ),
+    'asterisk/queues.conf': (
+        'agent',
+        'group',
+        'group_member_extensions',
+        'group_member_users',
+        'line',
+        'queue',
+        'queue_general',
+        'queue_member_agent',
+        'queue_member_user',
+        'user',
+        'user_groups',
+        'user_line',
+    ),
+    'asterisk/queueskillrules.conf': ('skill_rule',),
+    'asterisk/queueskills.conf': ('agent', 'agent_skill', 'skill'),
+    'asterisk/res_parking.conf': (
+        'extension',
+        'parking_lot',
+        'parking_lot_extension',
+    ),
+    'asterisk/rtp.conf': ('rtp_general', 'rtp_ice_host_candidates'),
+    'asterisk/sccp.conf': _LINES
+    + (
+        'call_pickup',
+        'call_pickup_interceptor_groups',
+        'call_pickup_interceptor_users',
+        'call_pickup_target_groups',
+        'call_pickup_target_users',
+        'context',
+        'device',
+        'extension',
+        'func_key_template',
+        'sccp_endpoint',
+        'sccp_general',
+        'user_voicemail',
+        'voicemail',
+    ),
+    'asterisk/voicemail.conf': (
+        'context',
+        'user',
+        'user_voicemail',
+        'voicemail',
+        'voicemail_general',
+        'voicemail_zonemessages',
+    ),
+}
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class Entry(NamedTuple):
+    content: str
+    generated_at: float
+
+
+class RegenerationCache:
+    """Cache of generated files, keyed by resource/filename.
+
+    The cache is shared between the reactor thread, which generates the
+    files, and the bus consumer thread, which marks them dirty. It is only
+    used while the events are received: it starts disabled and is disabled
+    again, and emptied, when the connection to the bus is lost.
+    """
+
+    def __init__(
+        self,
+        dependencies: Mapping[str, Iterable[str]] | None = None,
+        max_age: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        dependencies -- the entity types each resource/filename depends on,
+          defaults to DEFAULT_DEPENDENCIES
+        max_age -- the number of seconds after which a file is generated
+          again even if no event was received, or None to keep it forever
+        """
+        if dependencies is None:
+            dependencies = DEFAULT_DEPENDENCIES
+        self._dependents: dict[str, set[str]] = {}
+        for key, entity_types in dependencies.items():
+            for entity_type in entity_types:
+                self._dependents.setdefault(entity_type, set()).add(key)
+        self._keys = frozenset(dependencies)
+        self._max_age = max_age
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._enabled = False
+        self._entries: dict[str, Entry] = {}
+        self._versions: dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def entity_types(self) -> set[str]:
+        return set(self._dependents)
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def enable(self) -> None:
+        with self._lock:
+            self._enabled = True
+
+    def disable(self) -> None:
+        self.invalidate()
+        with self._lock:
+            self._enabled = False
+
+    def get(self, key: str) -> Entry | None:
+        with self._lock:
+            if not self._enabled:
+                return None
+            entry = self._entries.get(key)
+            if entry is not None and self._is_expired(entry):
+                del self._entries[key]
+                entry = None
+            if key in self._keys:
+                if entry is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+            return entry
+
+    def version(self, key: str) -> int:
+        """Return a token to give back to put once the file is generated.
+
+        A file generated while one of its dependencies was being modified
+        may already be stale, put will discard it.
+        """
+        with self._lock:
+            return self._versions.get(key, 0)
+
+    def put(self, key: str, content: str, version: int) -> Entry | None:
+        if not self._enabled or key not in self._keys:
+            return None
+        entry = Entry(content, self._clock())
+        with self._lock:
+            if self._versions.get(key, 0) != version:
+                logger.debug('%s modified during generation, not caching', key)
+                return None
+            self._entries[key] = entry
+        return entry
+
+    def mark_dirty(self, entity_type: str) -> None:
+        keys = self._dependents.get(entity_type)
+        if not keys:
+            return
+        with self._lock:
+            for key in keys:
+                self._invalidate(key)
+        logger.debug('%s modified, marked dirty: %s', entity_type, sorted(keys))
+
+    def invalidate(self, key: str | None = None) -> None:
+        """Mark a file dirty, or every file if key is None."""
+        keys = self._keys if key is None else [key]
+        with self._lock:
+            for key_ in keys:
+                self._invalidate(key_)
+
+    def _invalidate(self, key: str) -> None:
+        self._entries.pop(key, None)
+        self._versions[key] = self._versions.get(key, 0) + 1
+
+    def _is_expired(self, entry: Entry) -> bool:
+        if self._max_age is None:
+            return False
+        return self._clock() - entry.generated_at >= self._max_age
@@ -6,9 +6,10 @@ import tempfile
 import unittest
 from unittest.mock import Mock
 
-from hamcrest import assert_that, calling, equal_to, raises
+from hamcrest import assert_that, calling, equal_to, none, raises
 
 from ..confgen import Confgen, ConfgendFactory
+from ..regeneration import RegenerationCache, content_hash
 
 
 def sample_unicode_string(length):
@@ -149,3 +150,54 @@ class TestConfgendFactory(unittest.TestCase):
 
         assert_that(result, equal_to(None))
         self.cache.invalidate.assert_called_once_with('test/myfile.yml')
+
+    def test_the_hash_argument_returns_the_content_hash(self):
+        self.handler.return_value = 'some content'
+
+        result = self.factory.generate('test', 'myfile.yml', 'hash')
+
+        assert_that(result, equal_to(content_hash('some content')))
+
+
+class TestConfgendFactoryRegenerationCache(unittest.TestCase):
+    def setUp(self):
+        config = {
+            'templates': {'contextsconf': ''},
+            'plugins': {},
+        }
+        self.regeneration_cache = RegenerationCache({'test/myfile.yml': ['user']})
+        self.regeneration_cache.enable()
+
+        self.factory = ConfgendFactory(
+            tempfile.gettempdir(), config, self.regeneration_cache
+        )
+        self.factory._handler_factory = self.handler_factory = Mock()
+        self.handler = self.handler_factory.get.return_value
+        self.handler.return_value = 'some content'
+        self.factory._cache = Mock()
+
+    def test_unchanged_file_is_served_from_memory(self):
+        self.factory.generate('test', 'myfile.yml')
+        self.handler.return_value = 'new content'
+
+        result = self.factory.generate('test', 'myfile.yml')
+
+        assert_that(result, equal_to('some content'))
+        self.handler.assert_called_once_with()
+
+    def test_dirty_file_is_generated(self):
+        self.factory.generate('test', 'myfile.yml')
+        self.handler.return_value = 'new content'
+        self.regeneration_cache.mark_dirty('user')
+
+        result = self.factory.generate('test', 'myfile.yml')
+
+        assert_that(result, equal_to('new content'))
+
+    def test_the_invalidate_command(self):
+        self.factory.generate('test', 'myfile.yml')
+
+        result = self.factory.generate('test', 'myfile.yml', 'invalidate')
+
+        assert_that(result, none())
+        assert_that(self.regeneration_cache.get('test/myfile.yml'), none())
@@ -0,0 +1,197 @@
+# Copyright 2023 Accent Communications
+
+import unittest
+from unittest.mock import Mock
+
+from accent_dao.helpers.cache import CacheInvalidator, CacheRegistry
+from hamcrest import assert_that, equal_to, none, not_none
+
+from ..bus import BusConsumer
+from ..regeneration import RegenerationCache, content_hash
+
+BUS_CONFIG = {
+    'username': 'guest',
+    'password': 'guest',
+    'host': 'localhost',
+    'port': 5672,
+    'subscribe_exchange_name': 'accent-headers',
+    'subscribe_exchange_type': 'headers',
+}
+
+
+class TestRegenerationCache(unittest.TestCase):
+    def setUp(self):
+        self.now = 0
+        self.cache = RegenerationCache(
+            {'asterisk/pjsip.conf': ['user', 'line'], 'asterisk/sccp.conf': ['line']},
+            max_age=60,
+            clock=lambda: self.now,
+        )
+        self.cache.enable()
+
+    def _put(self, key, content):
+        return self.cache.put(key, content, self.cache.version(key))
+
+    def test_get(self):
+        self._put('asterisk/pjsip.conf', 'content')
+
+        entry = self.cache.get('asterisk/pjsip.conf')
+
+        assert_that(entry.content, equal_to('content'))
+        assert_that((self.cache.hits, self.cache.misses), equal_to((1, 0)))
+
+    def test_files_without_dependencies_are_not_cached(self):
+        self._put('provd/network.yml', 'content')
+
+        assert_that(self.cache.get('provd/network.yml'), none())
+
+    def test_mark_dirty_only_invalidates_the_dependent_files(self):
+        self._put('asterisk/pjsip.conf', 'pjsip')
+        self._put('asterisk/sccp.conf', 'sccp')
+
+        self.cache.mark_dirty('user')
+
+        assert_that(self.cache.get('asterisk/pjsip.conf'), none())
+        assert_that(self.cache.get('asterisk/sccp.conf'), not_none())
+
+    def test_mark_dirty_unknown_entity_type(self):
+        self._put('asterisk/pjsip.conf', 'pjsip')
+
+        self.cache.mark_dirty('moh')
+
+        assert_that(self.cache.get('asterisk/pjsip.conf'), not_none())
+
+    def test_file_modified_during_generation_is_not_cached(self):
+        version = self.cache.version('asterisk/pjsip.conf')
+        self.cache.mark_dirty('line')
+
+        self.cache.put('asterisk/pjsip.conf', 'stale', version)
+
+        assert_that(self.cache.get('asterisk/pjsip.conf'), none())
+
+    def test_invalidate_all(self):
+        self._put('asterisk/pjsip.conf', 'pjsip')
+        self._put('asterisk/sccp.conf', 'sccp')
+
+        self.cache.invalidate()
+
+        assert_that(self.cache.get('asterisk/pjsip.conf'), none())
+        assert_that(self.cache.get('asterisk/sccp.conf'), none())
+
+    def test_max_age(self):
+        self._put('asterisk/pjsip.conf', 'pjsip')
+
+        self.now = 59
+        assert_that(self.cache.get('asterisk/pjsip.conf'), not_none())
+        self.now = 60
+        assert_that(self.cache.get('asterisk/pjsip.conf'), none())
+
+    def test_disabled(self):
+        self._put('asterisk/pjsip.conf', 'pjsip')
+
+        self.cache.disable()
+        assert_that(self.cache.get('asterisk/pjsip.conf'), none())
+        assert_that(self._put('asterisk/pjsip.conf', 'pjsip'), none())
+
+        self.cache.enable()
+        assert_that(self.cache.get('asterisk/pjsip.conf'), none())
+
+    def test_content_hash(self):
+        assert_that(content_hash('a'), equal_to(content_hash('a')))
+        assert_that(content_hash('a') != content_hash('b'))
+
+
+class TestBusConsumer(unittest.TestCase):
+    def setUp(self):
+        self.cache = RegenerationCache({'asterisk/pjsip.conf': ['user']})
+        self.consumer = BusConsumer(BUS_CONFIG, self.cache)
+        self.message = Mock()
+
+    def test_bindings(self):
+        names = {binding.arguments['name'] for binding in self.consumer._queue.bindings}
+
+        assert_that('user_edited' in names)
+        assert_that('user_deleted' in names)
+        assert_that('line_edited' not in names)
+
+    def test_event_marks_dirty(self):
+        self.consumer.on_consume_ready(Mock(), Mock(), [])
+        self.cache.put(
+            'asterisk/pjsip.conf', 'content', self.cache.version('asterisk/pjsip.conf')
+        )
+
+        self.consumer._on_bus_message({'name': 'user_edited'}, self.message)
+
+        assert_that(self.cache.get('asterisk/pjsip.conf'), none())
+        self.message.ack.assert_called_once_with()
+
+    def test_call_pickup_event_marks_sccp_dirty(self):
+        cache = RegenerationCache()
+        consumer = BusConsumer(BUS_CONFIG, cache)
+        consumer.on_consume_ready(Mock(), Mock(), [])
+        for name in (
+            'call_pickup_edited',
+            'call_pickup_interceptor_users_associated',
+            'call_pickup_interceptor_groups_associated',
+            'call_pickup_target_users_associated',
+            'call_pickup_target_groups_associated',
+        ):
+            cache.put(
+                'asterisk/sccp.conf', 'content', cache.version('asterisk/sccp.conf')
+            )
+
+            consumer._on_bus_message({'name': name}, self.message)
+
+            assert_that(cache.get('asterisk/sccp.conf'), none(), name)
+
+    def test_invalid_message_is_acked(self):
+        self.consumer._on_bus_message({}, self.message)
+
+        self.message.ack.assert_called_once_with()
+
+    def test_cache_is_only_enabled_while_consuming(self):
+        assert_that(self.cache.enabled, equal_to(False))
+
+        self.consumer.on_consume_ready(Mock(), Mock(), [])
+        assert_that(self.cache.enabled, equal_to(True))
+
+        self.consumer.on_consume_end(Mock(), Mock())
+        assert_that(self.cache.enabled, equal_to(False))
+
+
+class TestBusConsumerCacheInvalidation(unittest.TestCase):
+    def setUp(self):
+        self.registry = CacheRegistry()
+        self.region = self.registry.region('subnets', depends_on=['access_feature'])
+        self.region.set('key', Mock(id=1))
+        self.consumer = BusConsumer(
+            BUS_CONFIG, cache_invalidator=CacheInvalidator(self.registry)
+        )
+        self.message = Mock()
+
+    def test_bindings_without_regeneration_cache(self):
+        names = {binding.arguments['name'] for binding in self.consumer._queue.bindings}
+
+        assert_that(
+            names,
+            equal_to(
+                {
+                    'access_feature_created',
+                    'access_feature_edited',
+                    'access_feature_deleted',
+                }
+            ),
+        )
+
+    def test_event_evicts_the_cached_queries(self):
+        self.consumer._on_bus_message(
+            {'name': 'access_feature_edited', 'data': {'id': 1}}, self.message
+        )
+
+        assert_that(self.region.get('key')[0], equal_to(False))
+        self.message.ack.assert_called_once_with()
+
+    def test_cached_queries_are_evicted_when_consuming_starts(self):
+        self.consumer.on_consume_ready(Mock(), Mock(), [])
+
+        assert_that(self.region.get('key')[0], equal_to(False))
@@ -81,6 +81,7 @@ class Config(TypedDict, total=False):
     log_filename: str
     rest_api: RestAPIConfig
     services: dict[str, dict]
+    source_executor: dict
     user: str
     bus: BusConfig
     consul: ConsulConfig
@@ -133,6 +134,7 @@ _DEFAULT_CONFIG: Config = {
             'csv_ws_backend': True,
             'default_json': True,
             'displays_view': True,
+            'metrics_view': True,
             'google_view': True,
             'graphql_view': True,
             'headers_view': True,
@@ -169,6 +171,17 @@ _DEFAULT_CONFIG: Config = {
             'services': {},
         }
     },
+    'source_executor': {
+        'max_concurrency': 5,
+        'max_pending': 20,
+        'latency_budget': 3.0,
+        'hedge_delay': 1.0,
+        'max_attempts': 2,
+        'failure_threshold': 5,
+        'reset_timeout': 30,
+        'backends': {},
+        'sources': {},
+    },
     'user': 'www-data',
     'bus': {
         'enabled': True,
@@ -16,6 +16,7 @@ from .config import Config
 from .database.helpers import init_db
 from .http_server import CoreRestApi
 from .service_discovery import self_check
+from .source_executor import SourceExecutors
 from .source_manager import SourceManager
 
 logger = logging.getLogger(__name__)
@@ -28,6 +29,7 @@ class Controller:
     auth_client: AuthClient
     token_renewer: TokenRenewer
     status_aggregator: StatusAggregator
+    source_executors: SourceExecutors
 
     def __init__(self, config: Config):
         self.config = config
@@ -43,6 +45,8 @@ class Controller:
         self.token_renewer.subscribe_to_token_change(self.auth_client.set_token)
         self.status_aggregator = StatusAggregator()
         self.status_aggregator.add_provider(auth.provide_status)
+        self.source_executors = SourceExecutors(self.config['source_executor'])
+        self.status_aggregator.add_provider(self.source_executors.provide_status)
         self._service_registration_params = [
             'accent-dird',
             self.config.get('uuid'),
@@ -56,6 +60,7 @@ class Controller:
             self.config,
             self.auth_client,
             self.token_renewer,
+            self.source_executors,
         )
 
     def run(self):
@@ -75,6 +80,7 @@ class Controller:
             self.auth_client,
             self.status_aggregator,
             self.rest_api,
+            self.source_executors,
         )
         self._source_manager.set_source_service(self.services['source'])
         self.status_aggregator.add_provider(self.bus.provide_status)
@@ -86,6 +92,7 @@ class Controller:
                 plugin_manager.unload_views()
                 plugin_manager.unload_services()
                 self._source_manager.unload_sources()
+                self.source_executors.stop()
                 if self._stopping_thread:
                     self._stopping_thread.join()
 
@@ -19,6 +19,7 @@ if TYPE_CHECKING:
     from accent_dird.controller import Controller
     from accent_dird.helpers import BaseService
     from accent_dird.http_server import CoreRestApi
+    from accent_dird.source_executor import SourceExecutors
     from accent_dird.source_manager import SourceManager
 
 
@@ -79,6 +80,7 @@ class ViewDependencies(TypedDict):
     api: Api
     flask_app: Flask
     status_aggregator: StatusAggregator
+    source_executors: SourceExecutors
 
 
 def load_views(
@@ -88,6 +90,7 @@ def load_views(
     auth_client: AuthClient,
     status_aggregator: StatusAggregator,
     rest_api: CoreRestApi,
+    source_executors: SourceExecutors,
 ):
     global views_extension_manager
     dependencies: ViewDependencies = {
@@ -97,6 +100,7 @@ def load_views(
         'api': rest_api.api,
         'flask_app': rest_api.app,
         'status_aggregator': status_aggregator,
+        'source_executors': source_executors,
     }
     views_extension_manager, views = _load_plugins(
         'accent_dird.views', enabled_views, dependencies
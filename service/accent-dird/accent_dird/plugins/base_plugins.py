@@ -72,6 +72,7 @@ class BaseSourcePlugin(metaclass=abc.ABCMeta):
 
     name: str
     backend: str
+    uuid: str
 
     @abc.abstractmethod
     def load(self, args: SourcePluginDependencies):
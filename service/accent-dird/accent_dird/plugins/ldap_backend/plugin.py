@@ -4,9 +4,13 @@ import itertools
 import logging
 import re
 import threading
+import time
 import uuid
+from collections import OrderedDict
+from functools import partial
 
 import ldap
+from ldap.controls import SimplePagedResultsControl
 from ldap.filter import escape_filter_chars
 
 from accent_dird import BaseSourcePlugin, make_result_class
@@ -27,7 +31,6 @@ class LDAPPlugin(BaseSourcePlugin):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.ldap_factory = _LDAPFactory()
-        self._lock = threading.Lock()
 
     def load(self, args):
         self._ldap_config = self.ldap_factory.new_ldap_config(args['config'])
@@ -72,18 +75,17 @@ class LDAPPlugin(BaseSourcePlugin):
             return []
 
         filter_str = self._ldap_config.build_list_filter(uids)
+        raw_results = self._ldap_client.search_paged(filter_str)
 
-        return self._search_and_format(filter_str)
+        return self._ldap_result_formatter.format(raw_results)
 
     def _search_and_format(self, filter_str):
-        with self._lock:
-            raw_results = self._ldap_client.search(filter_str)
+        raw_results = self._ldap_client.search(filter_str)
 
         return self._ldap_result_formatter.format(raw_results)
 
     def _first_match_and_format(self, filter_str):
-        with self._lock:
-            raw_results = self._ldap_client.search(filter_str, 1)
+        raw_results = self._ldap_client.search(filter_str, 1)
 
         if not raw_results:
             return None
@@ -94,8 +96,7 @@ class LDAPPlugin(BaseSourcePlugin):
         return self._ldap_result_formatter.format_one_result(attrs)
 
     def _match_all_and_format(self, filter_str):
-        with self._lock:
-            raw_results = self._ldap_client.search(filter_str)
+        raw_results = self._ldap_client.search(filter_str)
 
         results = []
         for dn, attrs in raw_results:
@@ -122,6 +123,10 @@ class _LDAPConfig:
     DEFAULT_LDAP_PASSWORD = ''
     DEFAULT_LDAP_NETWORK_TIMEOUT = 0.3
     DEFAULT_LDAP_TIMEOUT = 1.0
+    DEFAULT_LDAP_POOL_SIZE = 4
+    DEFAULT_LDAP_PAGE_SIZE = 500
+    DEFAULT_LDAP_CACHE_SIZE = 1000
+    DEFAULT_LDAP_CACHE_TTL = 60.0
 
     def __init__(self, config):
         if not config.get('ldap_custom_filter') and not config.get(BaseSourcePlugin.SEARCHED_COLUMNS):
@@ -167,6 +172,18 @@ class _LDAPConfig:
     def ldap_timeout(self):
         return self._config.get('ldap_timeout', self.DEFAULT_LDAP_TIMEOUT)
 
+    def ldap_pool_size(self):
+        return self._config.get('ldap_pool_size', self.DEFAULT_LDAP_POOL_SIZE)
+
+    def ldap_page_size(self):
+        return self._config.get('ldap_page_size', self.DEFAULT_LDAP_PAGE_SIZE)
+
+    def ldap_cache_size(self):
+        return self._config.get('ldap_cache_size', self.DEFAULT_LDAP_CACHE_SIZE)
+
+    def ldap_cache_ttl(self):
+        return self._config.get('ldap_cache_ttl', self.DEFAULT_LDAP_CACHE_TTL)
+
     def attributes(self):
         format_columns = self._config.get(BaseSourcePlugin.FORMAT_COLUMNS)
         if not format_columns:
@@ -261,32 +278,245 @@ class _LDAPConfig:
         return ''.join(c for byte in zip(itertools.repeat('\\'), uid[::2], uid[1::2]) for c in byte)
 
 
-class _LDAPClient:
-    def __init__(self, ldap_config, ldap_obj_factory=ldap.initialize):
+def normalize_filter(filter_str):
+    """Return a canonical form of an LDAP filter, to use as a cache key.
+
+    The attribute descriptions are case insensitive and the operands of an
+    AND or an OR can be in any order, so that equivalent filters built from
+    different configurations or terms share the same form. The assertion
+    values are kept as is, since their matching rule is not known. A filter
+    that cannot be parsed is returned unchanged.
+    """
+    try:
+        return render_filter(parse_filter(filter_str))
+    except ValueError:
+        return filter_str
+
+
+def parse_filter(filter_str):
+    """Parse an RFC 4515 filter into a tree of tuples:
+    ('&', [...]), ('|', [...]), ('!', child) or ('item', attribute, operator, value)
+    """
+    filter_str = filter_str.strip()
+    node, end = _parse_filter(filter_str, 0)
+    if end != len(filter_str):
+        raise ValueError(f'trailing characters in filter: {filter_str}')
+    return node
+
+
+def _parse_filter(filter_str, i):
+    try:
+        if filter_str[i] != '(':
+            raise ValueError(f'expected "(" at {i}: {filter_str}')
+        i += 1
+        operator = filter_str[i]
+        if operator in '&|':
+            i += 1
+            children = []
+            while filter_str[i] == '(':
+                child, i = _parse_filter(filter_str, i)
+                children.append(child)
+            node = (operator, children)
+        elif operator == '!':
+            child, i = _parse_filter(filter_str, i + 1)
+            node = ('!', child)
+        else:
+            # The parentheses of the assertion values are escaped
+            end = filter_str.index(')', i)
+            node = _parse_item(filter_str[i:end])
+            i = end
+        if filter_str[i] != ')':
+            raise ValueError(f'expected ")" at {i}: {filter_str}')
+    except IndexError:
+        raise ValueError(f'unterminated filter: {filter_str}')
+    return node, i + 1
+
+
+def _parse_item(item):
+    attribute, equal, value = item.partition('=')
+    if not equal or not attribute:
+        raise ValueError(f'invalid filter item: {item}')
+    operator = '='
+    if attribute[-1] in '~<>':
+        attribute, operator = attribute[:-1], attribute[-1] + '='
+    return ('item', attribute.strip().lower(), operator, value)
+
+
+def render_filter(node):
+    if node[0] in '&|':
+        children = sorted({render_filter(child) for child in node[1]})
+        return '({}{})'.format(node[0], ''.join(children))
+    if node[0] == '!':
+        return f'(!{render_filter(node[1])})'
+    _, attribute, operator, value = node
+    return f'({attribute}{operator}{value})'
+
+
+class _LDAPResultCache:
+    """Bounded cache of the entries returned by the searches of a source.
+
+    Only the requested attributes of the entries are kept, keyed by the
+    normalized filter, so that the same reverse lookup repeated by every
+    incoming call is not sent to the directory again until `ttl` elapses.
+    The least recently used searches are dropped beyond `size`.
+    """
+
+    def __init__(self, size, ttl, clock=time.monotonic):
+        self._size = size
+        self._ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return self._size > 0 and self._ttl > 0
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None or item[0] <= self._clock():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key, results):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + self._ttl, results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class _LDAPConnectionPool:
+    """Bound connections to the LDAP server of a source, shared by the lookup threads.
+
+    A connection is created when no idle connection is left, up to `size`
+    connections. An idle connection unused for HEALTH_CHECK_INTERVAL is
+    checked before being reused. After a failed bind, no connection is
+    attempted until the backoff elapses, doubling up to RECONNECT_BACKOFF_MAX,
+    so that a server that is down is not hammered by every lookup.
+    """
+
+    HEALTH_CHECK_INTERVAL = 30.0
+    RECONNECT_BACKOFF_MIN = 1.0
+    RECONNECT_BACKOFF_MAX = 60.0
+
+    def __init__(self, ldap_config, ldap_obj_factory, clock=time.monotonic):
         self._ldap_config = ldap_config
         self._ldap_obj_factory = ldap_obj_factory
-        self._ldap_obj = None
-        self._name = self._ldap_config.name()
-        self._base_dn = self._ldap_config.ldap_base_dn()
-        self._attributes = self._ldap_config.attributes()
+        self._clock = clock
+        self._name = ldap_config.name()
+        self._size = max(ldap_config.ldap_pool_size(), 1)
+        self._condition = threading.Condition()
+        self._idle = []
+        self._connections = 0
+        self._backoff = 0.0
+        self._retry_at = 0.0
+
+    @property
+    def connections(self):
+        with self._condition:
+            return self._connections
+
+    def fill(self):
+        with self._condition:
+            if self._connections:
+                return
+            self._connections += 1
+        ldap_obj = self._open()
+        if ldap_obj:
+            self.release(ldap_obj)
+
+    def acquire(self):
+        """Return a bound connection, or None if none can be obtained in time."""
+        deadline = self._clock() + self._ldap_config.ldap_timeout()
+        with self._condition:
+            while True:
+                if self._idle:
+                    ldap_obj, last_used = self._idle.pop()
+                    break
+                if self._connections < self._size:
+                    if self._clock() < self._retry_at:
+                        return None
+                    self._connections += 1
+                    ldap_obj = None
+                    break
+                remaining = deadline - self._clock()
+                if remaining <= 0:
+                    logger.warning('LDAP "%s": no connection available', self._name)
+                    return None
+                self._condition.wait(remaining)
+
+        if ldap_obj and self._clock() - last_used >= self.HEALTH_CHECK_INTERVAL:
+            if not self._is_healthy(ldap_obj):
+                self._unbind(ldap_obj)
+                ldap_obj = None
+        if not ldap_obj:
+            ldap_obj = self._open()
+        return ldap_obj
 
-    def close(self):
-        if self._is_set_up():
-            self._tear_down()
+    def release(self, ldap_obj, broken=False):
+        if broken:
+            self._unbind(ldap_obj)
+            self._discard()
+            return
+        with self._condition:
+            self._idle.append((ldap_obj, self._clock()))
+            self._condition.notify()
 
-    def set_up(self):
-        # This is an optional method. The main interest is that it will raise an exception
-        # if the ldap_obj can't be initialized properly. This can be useful if you want to
-        # fail early.
-        if not self._is_set_up():
-            self._set_up()
-
-    def _is_set_up(self):
-        return self._ldap_obj is not None
+    def close(self):
+        with self._condition:
+            idle, self._idle = self._idle, []
+            self._connections -= len(idle)
+        for ldap_obj, _ in idle:
+            self._unbind(ldap_obj)
+
+    def _discard(self):
+        with self._condition:
+            self._connections -= 1
+            self._condition.notify()
+
+    def _open(self):
+        # Opens the connection counted by the caller, or discounts it
+        try:
+            ldap_obj = self._connect()
+        except Exception:
+            self._discard()
+            raise
+        if not ldap_obj:
+            self._discard()
+        return ldap_obj
 
-    def _set_up(self):
-        self._ldap_obj = self._new_ldap_obj()
-        self._bind()
+    def _connect(self):
+        ldap_obj = self._new_ldap_obj()
+        try:
+            ldap_obj.simple_bind_s(self._ldap_config.ldap_username(), self._ldap_config.ldap_password())
+        except ldap.LDAPError as e:
+            with self._condition:
+                self._backoff = min(max(self._backoff * 2, self.RECONNECT_BACKOFF_MIN), self.RECONNECT_BACKOFF_MAX)
+                self._retry_at = self._clock() + self._backoff
+                backoff = self._backoff
+            logger.error('LDAP "%s": bind error, retrying in %ss: %r', self._name, backoff, e)
+            self._unbind(ldap_obj)
+            return None
+        with self._condition:
+            self._backoff = 0.0
+            self._retry_at = 0.0
+        return ldap_obj
 
     def _new_ldap_obj(self):
         ldap_obj = self._ldap_obj_factory(self._ldap_config.ldap_uri())
@@ -295,61 +525,125 @@ class _LDAPClient:
         ldap_obj.set_option(ldap.OPT_TIMEOUT, self._ldap_config.ldap_timeout())
         return ldap_obj
 
-    def _bind(self):
+    def _is_healthy(self, ldap_obj):
         try:
-            self._ldap_obj.simple_bind_s(self._ldap_config.ldap_username(), self._ldap_config.ldap_password())
+            ldap_obj.whoami_s()
         except ldap.LDAPError as e:
-            logger.error('LDAP "%s": bind error: %r', self._name, e)
-            self._tear_down()
+            logger.info('LDAP "%s": dropping a stale connection: %r', self._name, e)
+            return False
+        return True
+
+    def _unbind(self, ldap_obj):
+        try:
+            ldap_obj.unbind_s()
+        except ldap.LDAPError:
+            pass
 
-    def _tear_down(self):
-        self._ldap_obj.unbind_s()
-        self._ldap_obj = None
+
+class _LDAPClient:
+    def __init__(self, ldap_config, ldap_obj_factory=ldap.initialize, clock=time.monotonic):
+        self._ldap_config = ldap_config
+        self._name = self._ldap_config.name()
+        self._base_dn = self._ldap_config.ldap_base_dn()
+        self._attributes = self._ldap_config.attributes()
+        self._page_size = self._ldap_config.ldap_page_size()
+        self._pool = _LDAPConnectionPool(ldap_config, ldap_obj_factory, clock)
+        self._cache = _LDAPResultCache(
+            self._ldap_config.ldap_cache_size(),
+            self._ldap_config.ldap_cache_ttl(),
+            clock,
+        )
+
+    def close(self):
+        self._pool.close()
+        self._cache.clear()
+
+    def set_up(self):
+        # This is an optional method. The main interest is that it will raise an exception
+        # if the ldap_obj can't be initialized properly. This can be useful if you want to
+        # fail early.
+        self._pool.fill()
 
     def search(self, filter_str, limit=-1):
-        if self._is_set_up():
-            retry = True
-        else:
-            self._set_up()
-            if not self._is_set_up():
+        key = (normalize_filter(filter_str), limit)
+        return self._cached_search(key, partial(self._search, limit=limit), filter_str)
+
+    def search_paged(self, filter_str):
+        """Search with the RFC 2696 paged results control, for the searches
+        that can return many entries, e.g. the favorites of a user."""
+        key = (normalize_filter(filter_str), 'paged')
+        return self._cached_search(key, self._search_paged, filter_str)
+
+    def _cached_search(self, key, search, filter_str):
+        results = self._cache.get(key)
+        if results is not None:
+            return results
+
+        # A connection found broken is replaced once
+        for _ in range(2):
+            ldap_obj = self._pool.acquire()
+            if not ldap_obj:
                 return []
-            retry = False
-
-        results = self._search(filter_str, limit)
-        if not self._is_set_up() and retry:
-            self._set_up()
-            if not self._is_set_up():
+            try:
+                results = search(ldap_obj, filter_str)
+            except ldap.LDAPError as e:
+                if self._handle_error(filter_str, e):
+                    self._pool.release(ldap_obj, broken=True)
+                    continue
+                self._pool.release(ldap_obj)
                 return []
-            results = self._search(filter_str, limit)
-
-        return results
+            self._pool.release(ldap_obj)
+            self._cache.set(key, results)
+            return results
+        return []
+
+    def _handle_error(self, filter_str, error):
+        # Returns whether the connection is broken
+        if isinstance(error, ldap.FILTER_ERROR):
+            logger.warning('LDAP "%s": search error: invalid filter "%s"', self._name, filter_str)
+        elif isinstance(error, ldap.NO_SUCH_OBJECT):
+            logger.warning('LDAP "%s": search error: no such object "%s"', self._name, self._base_dn)
+        elif isinstance(error, ldap.TIMEOUT):
+            logger.warning('LDAP "%s": search error: timed out', self._name)
+        else:
+            logger.error('LDAP "%s": search error: %r', self._name, error)
+            return True
+        return False
+
+    def _search(self, ldap_obj, filter_str, limit):
+        return ldap_obj.search_ext_s(
+            self._base_dn,
+            ldap.SCOPE_SUBTREE,
+            filter_str,
+            self._attributes,
+            sizelimit=limit,
+        )
 
-    def _search(self, filter_str, limit):
+    def _search_paged(self, ldap_obj, filter_str):
+        # The control is not critical, a server that does not support it
+        # returns every entry at once
+        control = SimplePagedResultsControl(criticality=False, size=self._page_size, cookie='')
         results = []
-
-        try:
-            results = self._ldap_obj.search_ext_s(
+        while True:
+            msgid = ldap_obj.search_ext(
                 self._base_dn,
                 ldap.SCOPE_SUBTREE,
                 filter_str,
                 self._attributes,
-                sizelimit=limit,
+                serverctrls=[control],
             )
-        except ldap.FILTER_ERROR:
-            logger.warning('LDAP "%s": search error: invalid filter "%s"', self._name, filter_str)
-        except ldap.NO_SUCH_OBJECT:
-            logger.warning(
-                'LDAP "%s": search error: no such object "%s"',
-                self._name,
-                self._ldap_config.ldap_base_dn(),
+            _, data, _, response_controls = ldap_obj.result3(
+                msgid,
+                resp_ctrl_classes={SimplePagedResultsControl.controlType: SimplePagedResultsControl},
             )
-        except ldap.TIMEOUT:
-            logger.warning('LDAP "%s": search error: timed out', self._name)
-        except ldap.LDAPError as e:
-            logger.error('LDAP "%s": search error: %r', self._name, e)
-            self._tear_down()
-
-        return results
+            results.extend(data)
+            cookie = next(
+                (c.cookie for c in response_controls if c.controlType == SimplePagedResultsControl.controlType),
+                None,
+            )
+            if not cookie:
+                return results
+            control.cookie = cookie
 
 
 class _LDAPResultFormatter:
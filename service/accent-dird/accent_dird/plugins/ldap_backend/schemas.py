@@ -15,6 +15,10 @@ class SourceSchema(BaseSourceSchema):
     ldap_custom_filter = fields.String(validate=Length(min=1, max=1024), missing=None)
     ldap_network_timeout = fields.Float(validate=Range(min=0), default=0.3)
     ldap_timeout = fields.Float(validate=Range(min=0), default=1.0)
+    ldap_pool_size = fields.Integer(validate=Range(min=1, max=100), default=4)
+    ldap_page_size = fields.Integer(validate=Range(min=1), default=500)
+    ldap_cache_size = fields.Integer(validate=Range(min=0), default=1000)
+    ldap_cache_ttl = fields.Float(validate=Range(min=0), default=60.0)
     unique_column = fields.String(validate=Length(min=1, max=128), allow_none=True, missing=None)
     unique_column_format = fields.String(validate=OneOf(['string', 'binary_uuid']), missing='string')
 
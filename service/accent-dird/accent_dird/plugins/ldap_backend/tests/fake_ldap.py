@@ -0,0 +1,191 @@
+# Copyright 2023 Accent Communications
+
+"""In-process fake LDAP server for the ldap backend tests.
+
+`FakeLDAPServer` holds a directory of entries and hands out `FakeLDAPObject`
+connections, in place of `ldap.initialize`. The connections implement the
+part of python-ldap's `LDAPObject` used by the backend: simple binds,
+searches with a size limit, searches with the paged results control, whoami
+and unbind. The filters are evaluated with case insensitive matching.
+
+The server counts the binds, searches and pages it served, and can be taken
+down or made to drop its connections to test the reconnections.
+"""
+
+import itertools
+import re
+import threading
+
+import ldap
+from ldap.controls import SimplePagedResultsControl
+
+from ..plugin import parse_filter
+
+
+class FakeLDAPServer:
+    def __init__(self, username='', password=''):
+        self.username = username
+        self.password = password
+        self.entries = {}
+        self.down = False
+        self.supports_paging = True
+        # A barrier that every search waits on, to check concurrent searches
+        self.barrier = None
+        self.binds = 0
+        self.searches = 0
+        self.pages = 0
+        self.connections = []
+        self._lock = threading.Lock()
+
+    def add(self, dn, **attributes):
+        self.entries[dn] = {
+            name: [value if isinstance(value, bytes) else value.encode('utf-8') for value in _as_list(values)]
+            for name, values in attributes.items()
+        }
+
+    def connect(self, uri):
+        connection = FakeLDAPObject(self, uri)
+        with self._lock:
+            self.connections.append(connection)
+        return connection
+
+    def drop_connections(self):
+        with self._lock:
+            for connection in self.connections:
+                connection.dropped = True
+
+    def count_page(self):
+        with self._lock:
+            self.pages += 1
+
+    @property
+    def open_connections(self):
+        with self._lock:
+            return sum(1 for c in self.connections if c.bound and not c.dropped)
+
+    def bind(self, who, cred):
+        with self._lock:
+            self.binds += 1
+        if self.down:
+            raise ldap.SERVER_DOWN({'desc': "Can't contact LDAP server"})
+        if (who, cred) != (self.username, self.password):
+            raise ldap.INVALID_CREDENTIALS({'desc': 'Invalid credentials'})
+
+    def search(self, base_dn, filter_str, attributes, sizelimit=0):
+        with self._lock:
+            self.searches += 1
+        if self.down:
+            raise ldap.SERVER_DOWN({'desc': "Can't contact LDAP server"})
+        if self.barrier:
+            self.barrier.wait()
+        try:
+            node = parse_filter(filter_str)
+        except ValueError:
+            raise ldap.FILTER_ERROR({'desc': 'Bad search filter'})
+
+        results = []
+        for dn, entry in sorted(self.entries.items()):
+            if not dn.lower().endswith(base_dn.lower()) or not _matches(node, entry):
+                continue
+            if attributes is not None:
+                wanted = {attribute.lower() for attribute in attributes}
+                entry = {name: values for name, values in entry.items() if name.lower() in wanted}
+            results.append((dn, entry))
+        if sizelimit and sizelimit > 0:
+            results = results[:sizelimit]
+        return results
+
+
+class FakeLDAPObject:
+    def __init__(self, server, uri):
+        self.server = server
+        self.uri = uri
+        self.options = {}
+        self.bound = False
+        self.dropped = False
+        self._msgids = itertools.count(1)
+        self._results = {}
+
+    def set_option(self, option, value):
+        self.options[option] = value
+
+    def simple_bind_s(self, who='', cred=''):
+        self.server.bind(who, cred)
+        self.bound = True
+
+    def whoami_s(self):
+        self._check()
+        return f'dn:{self.server.username}'
+
+    def unbind_s(self):
+        self.bound = False
+
+    def search_ext_s(self, base, scope, filterstr='(objectClass=*)', attrlist=None, sizelimit=0):
+        self._check()
+        return self.server.search(base, filterstr, attrlist, sizelimit)
+
+    def search_ext(self, base, scope, filterstr='(objectClass=*)', attrlist=None, serverctrls=None):
+        self._check()
+        results = self.server.search(base, filterstr, attrlist)
+        controls = []
+        paging = next(
+            (c for c in serverctrls or [] if c.controlType == SimplePagedResultsControl.controlType),
+            None,
+        )
+        if paging and self.server.supports_paging:
+            start = int(paging.cookie or 0)
+            end = start + paging.size
+            cookie = str(end).encode() if end < len(results) else b''
+            results = results[start:end]
+            controls.append(SimplePagedResultsControl(criticality=False, size=0, cookie=cookie))
+        msgid = next(self._msgids)
+        self._results[msgid] = (results, controls)
+        return msgid
+
+    def result3(self, msgid, all=1, timeout=None, resp_ctrl_classes=None):
+        self._check()
+        self.server.count_page()
+        results, controls = self._results.pop(msgid)
+        return ldap.RES_SEARCH_RESULT, results, msgid, controls
+
+    def _check(self):
+        if self.dropped or self.server.down:
+            raise ldap.SERVER_DOWN({'desc': "Can't contact LDAP server"})
+
+
+def _as_list(values):
+    return values if isinstance(values, list) else [values]
+
+
+def _matches(node, entry):
+    if node[0] == '&':
+        return all(_matches(child, entry) for child in node[1])
+    if node[0] == '|':
+        return any(_matches(child, entry) for child in node[1])
+    if node[0] == '!':
+        return not _matches(node[1], entry)
+
+    _, attribute, operator, value = node
+    values = [
+        v.decode('utf-8', 'replace').lower() for name, vs in entry.items() if name.lower() == attribute for v in vs
+    ]
+    if operator == '=' and value == '*':
+        return bool(values)
+    if operator == '=' and '*' in value:
+        parts = [re.escape(_unescape(part).lower()) for part in value.split('*')]
+        pattern = re.compile('^' + '.*'.join(parts) + '$', re.DOTALL)
+        return any(pattern.match(v) for v in values)
+    value = _unescape(value).lower()
+    if operator == '>=':
+        return any(v >= value for v in values)
+    if operator == '<=':
+        return any(v <= value for v in values)
+    return value in values
+
+
+def _unescape(value):
+    return re.sub(
+        rb'\\([0-9a-fA-F]{2})',
+        lambda m: bytes([int(m.group(1), 16)]),
+        value.encode('utf-8'),
+    ).decode('utf-8', 'replace')
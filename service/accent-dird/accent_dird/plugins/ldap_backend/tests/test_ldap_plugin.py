@@ -1,12 +1,13 @@
 # Copyright 2023 Accent Communications
 
 import os
+import threading
 import unittest
 import uuid
 from unittest.mock import ANY, Mock, call, sentinel
 
 import ldap
-from hamcrest import assert_that, contains_inanyorder
+from hamcrest import assert_that, contains_inanyorder, equal_to, has_length
 from ldap.ldapobject import LDAPObject
 
 from accent_dird.plugins.base_plugins import BaseSourcePlugin
@@ -17,8 +18,11 @@ from ..plugin import (
     _LDAPClient,
     _LDAPConfig,
     _LDAPFactory,
+    _LDAPResultCache,
     _LDAPResultFormatter,
+    normalize_filter,
 )
+from .fake_ldap import FakeLDAPServer
 
 
 class TestLDAPPlugin(unittest.TestCase):
@@ -126,14 +130,14 @@ class TestLDAPPlugin(unittest.TestCase):
     def test_list_with_uids(self):
         uids = ['123', '456']
         self.ldap_config.build_list_filter.return_value = sentinel.filter
-        self.ldap_client.search.return_value = sentinel.search_result
+        self.ldap_client.search_paged.return_value = sentinel.search_result
         self.ldap_result_formatter.format.return_value = sentinel.format_result
 
         self.ldap_plugin.load(self.config)
         result = self.ldap_plugin.list(uids)
 
         self.ldap_config.build_list_filter.assert_called_once_with(uids)
-        self.ldap_client.search.assert_called_once_with(sentinel.filter)
+        self.ldap_client.search_paged.assert_called_once_with(sentinel.filter)
         self.ldap_result_formatter.format.assert_called_once_with(sentinel.search_result)
         self.assertIs(result, sentinel.format_result)
 
@@ -160,6 +164,7 @@ class TestLDAPFactory(unittest.TestCase):
 
     def test_ldap_client(self):
         ldap_config = Mock()
+        ldap_config.ldap_pool_size.return_value = 4
         ldap_client = self.ldap_factory.new_ldap_client(ldap_config)
 
         self.assertIsInstance(ldap_client, _LDAPClient)
@@ -451,6 +456,11 @@ class TestLDAPClient(unittest.TestCase):
         self.ldap_config.attributes.return_value = self.attributes
         self.ldap_config.ldap_username.return_value = self.username
         self.ldap_config.ldap_password.return_value = self.password
+        self.ldap_config.ldap_timeout.return_value = 1.0
+        self.ldap_config.ldap_pool_size.return_value = 4
+        self.ldap_config.ldap_page_size.return_value = 500
+        self.ldap_config.ldap_cache_size.return_value = 1000
+        self.ldap_config.ldap_cache_ttl.return_value = 60.0
         self.ldap_obj = Mock(LDAPObject)
         self.ldap_obj_factory = Mock()
         self.ldap_obj_factory.return_value = self.ldap_obj
@@ -520,6 +530,243 @@ class TestLDAPClient(unittest.TestCase):
         self.assertEqual(1, self.ldap_obj.simple_bind_s.call_count)
         self.assertEqual(3, self.ldap_obj.search_ext_s.call_count)
 
+    def test_search_results_are_cached(self):
+        self.ldap_obj.search_ext_s.return_value = [('dn', {})]
+
+        self.ldap_client.search('(|(cn=foo)(sn=foo))')
+        result = self.ldap_client.search('(|(SN=foo)(cn=foo))')
+
+        self.assertEqual([('dn', {})], result)
+        self.assertEqual(1, self.ldap_obj.search_ext_s.call_count)
+
+    def test_search_errors_are_not_cached(self):
+        self.ldap_obj.search_ext_s.side_effect = [ldap.TIMEOUT('moo'), [('dn', {})]]
+
+        self.ldap_client.search('foo')
+        result = self.ldap_client.search('foo')
+
+        self.assertEqual([('dn', {})], result)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestNormalizeFilter(unittest.TestCase):
+    def test_operands_order_and_attribute_case(self):
+        assert_that(
+            normalize_filter('(|(telephoneNumber=1234)(Mobile=1234))'),
+            equal_to(normalize_filter('(|(mobile=1234)(telephonenumber=1234))')),
+        )
+
+    def test_nested(self):
+        assert_that(
+            normalize_filter('(&(l=Québec)(|(sn=*a\\29*)(cn=*a\\29*))(!(ou=x)))'),
+            equal_to('(&(!(ou=x))(l=Québec)(|(cn=*a\\29*)(sn=*a\\29*)))'),
+        )
+
+    def test_values_are_kept(self):
+        assert_that(normalize_filter('(cn=Alice)'), equal_to('(cn=Alice)'))
+        assert_that(normalize_filter('(cn>=Alice)'), equal_to('(cn>=Alice)'))
+
+    def test_invalid_filter_is_unchanged(self):
+        assert_that(normalize_filter('(|(cn=foo)'), equal_to('(|(cn=foo)'))
+        assert_that(normalize_filter('cn=foo'), equal_to('cn=foo'))
+
+
+class TestLDAPResultCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.cache = _LDAPResultCache(size=2, ttl=60, clock=self.clock)
+
+    def test_ttl(self):
+        self.cache.set('key', sentinel.results)
+        self.clock.now = 59
+        assert_that(self.cache.get('key'), equal_to(sentinel.results))
+
+        self.clock.now = 60
+
+        assert_that(self.cache.get('key'), equal_to(None))
+
+    def test_least_recently_used_are_dropped(self):
+        self.cache.set('a', sentinel.a)
+        self.cache.set('b', sentinel.b)
+        self.cache.get('a')
+
+        self.cache.set('c', sentinel.c)
+
+        assert_that(self.cache.get('a'), equal_to(sentinel.a))
+        assert_that(self.cache.get('b'), equal_to(None))
+        assert_that(self.cache.get('c'), equal_to(sentinel.c))
+
+    def test_disabled(self):
+        cache = _LDAPResultCache(size=0, ttl=60)
+
+        cache.set('key', sentinel.results)
+
+        assert_that(cache.get('key'), equal_to(None))
+
+
+class _FakeLDAPFactory(_LDAPFactory):
+    def __init__(self, server, clock):
+        self.server = server
+        self.clock = clock
+
+    def new_ldap_client(self, ldap_config):
+        return _LDAPClient(ldap_config, self.server.connect, self.clock)
+
+
+class TestLDAPPluginWithFakeServer(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeLDAPServer(username='cn=admin,dc=example,dc=org', password='secret')
+        for i in range(5):
+            self.server.add(
+                f'uid=user{i},ou=people,dc=example,dc=org',
+                uid=f'user{i}',
+                givenName=f'Alice{i}',
+                sn='Smith',
+                telephoneNumber=f'100{i}',
+            )
+        self.clock = Clock()
+        self.config = {
+            'name': 'ldap',
+            'ldap_uri': 'ldap://example.org',
+            'ldap_base_dn': 'ou=people,dc=example,dc=org',
+            'ldap_username': 'cn=admin,dc=example,dc=org',
+            'ldap_password': 'secret',
+            'ldap_pool_size': 3,
+            'ldap_page_size': 2,
+            BaseSourcePlugin.SEARCHED_COLUMNS: ['givenName', 'sn'],
+            BaseSourcePlugin.FIRST_MATCHED_COLUMNS: ['telephoneNumber'],
+            BaseSourcePlugin.UNIQUE_COLUMN: 'uid',
+            BaseSourcePlugin.FORMAT_COLUMNS: {'number': '{telephoneNumber}'},
+        }
+
+    def load(self, **config):
+        plugin = LDAPPlugin()
+        plugin.ldap_factory = _FakeLDAPFactory(self.server, self.clock)
+        plugin.load({'config': dict(self.config, **config)})
+        self.addCleanup(plugin.unload)
+        return plugin
+
+    def test_search(self):
+        plugin = self.load()
+
+        results = plugin.search('alice3')
+
+        assert_that([r.fields['uid'] for r in results], equal_to(['user3']))
+
+    def test_reverse_lookups_are_cached(self):
+        plugin = self.load()
+
+        plugin.first_match('1002')
+        result = plugin.first_match('1002')
+
+        assert_that(result.fields['uid'], equal_to('user2'))
+        assert_that(self.server.searches, equal_to(1))
+
+    def test_cache_expires(self):
+        plugin = self.load(ldap_cache_ttl=10)
+        plugin.match_all(['1001', '1002'])
+
+        self.clock.now = 10
+        result = plugin.match_all(['1001', '1002'])
+
+        assert_that(result, has_length(2))
+        assert_that(self.server.searches, equal_to(2))
+
+    def test_list_is_paged(self):
+        plugin = self.load()
+        uids = [f'user{i}' for i in range(5)]
+
+        results = plugin.list(uids)
+
+        assert_that([r.fields['uid'] for r in results], contains_inanyorder(*uids))
+        assert_that(self.server.pages, equal_to(3))
+
+    def test_list_without_paging_support(self):
+        self.server.supports_paging = False
+        plugin = self.load()
+
+        results = plugin.list(['user0', 'user1', 'user2'])
+
+        assert_that(results, has_length(3))
+        assert_that(self.server.pages, equal_to(1))
+
+    def test_concurrent_lookups_use_their_own_connection(self):
+        plugin = self.load()
+        self.server.barrier = threading.Barrier(3, timeout=5)
+        results = {}
+
+        def lookup(term):
+            results[term] = plugin.search(term)
+
+        threads = [threading.Thread(target=lookup, args=(f'alice{i}',)) for i in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert_that(self.server.barrier.broken, equal_to(False))
+        assert_that([len(r) for r in results.values()], equal_to([1, 1, 1]))
+        assert_that(self.server.open_connections, equal_to(3))
+
+    def test_reconnect_backoff(self):
+        self.server.down = True
+        plugin = self.load()
+        assert_that(self.server.binds, equal_to(1))
+
+        assert_that(plugin.search('alice1'), equal_to([]))
+        assert_that(self.server.binds, equal_to(1))
+
+        self.clock.now = 1
+        self.server.down = False
+        results = plugin.search('alice1')
+
+        assert_that(results, has_length(1))
+        assert_that(self.server.binds, equal_to(2))
+
+    def test_backoff_doubles(self):
+        self.server.down = True
+        plugin = self.load()
+
+        self.clock.now = 1
+        plugin.search('alice1')
+        assert_that(self.server.binds, equal_to(2))
+        self.clock.now = 2.5
+        plugin.search('alice1')
+        assert_that(self.server.binds, equal_to(2))
+        self.clock.now = 3
+        plugin.search('alice1')
+
+        assert_that(self.server.binds, equal_to(3))
+
+    def test_dropped_connection_is_replaced(self):
+        plugin = self.load()
+        self.server.drop_connections()
+
+        results = plugin.search('alice1')
+
+        assert_that(results, has_length(1))
+        assert_that(self.server.binds, equal_to(2))
+
+    def test_idle_connection_health_check(self):
+        plugin = self.load()
+        plugin.search('alice1')
+        self.server.drop_connections()
+        self.clock.now = 30
+
+        results = plugin.search('alice2')
+
+        assert_that(results, has_length(1))
+        assert_that(self.server.binds, equal_to(2))
+        # The stale connection was not used for the search
+        assert_that(self.server.searches, equal_to(2))
+
 
 class TestLDAPResultFormatter(unittest.TestCase):
     def setUp(self):
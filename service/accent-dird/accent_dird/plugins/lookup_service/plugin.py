@@ -1,7 +1,7 @@
 # Copyright 2023 Accent Communications
 
 import logging
-from concurrent.futures import ALL_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import ALL_COMPLETED, wait
 
 from accent_dird import BaseServicePlugin, helpers
 
@@ -35,16 +35,14 @@ class LookupServicePlugin(BaseServicePlugin):
 class _LookupService(helpers.BaseService):
     _service_name = 'lookup'
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self._executor = ThreadPoolExecutor(max_workers=10)
-
     def stop(self):
-        self._executor.shutdown()
+        # The source executors are shared with the other services and
+        # stopped by the controller
+        pass
 
     def _async_search(self, source, term, args):
-        raise_stopper = helpers.RaiseStopper(return_on_raise=[])
-        future = self._executor.submit(raise_stopper.execute, source.search, term, args)
+        executor = self._controller.source_executors.get(source)
+        future = executor.submit(source.search, term, args, default=[])
         future.name = source.name
         return future
 
@@ -0,0 +1,18 @@
+# Copyright 2023 Accent Communications
+
+from flask import make_response
+
+from accent_dird.auth import required_acl
+from accent_dird.http import AuthResource
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class MetricsResource(AuthResource):
+    def __init__(self, source_executors):
+        self.source_executors = source_executors
+
+    @required_acl('dird.metrics.read')
+    def get(self):
+        metrics = self.source_executors.render_metrics()
+        return make_response(metrics, 200, {'Content-Type': PROMETHEUS_CONTENT_TYPE})
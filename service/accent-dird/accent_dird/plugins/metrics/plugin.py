@@ -0,0 +1,13 @@
+# Copyright 2023 Accent Communications
+
+from accent_dird import BaseViewPlugin
+
+from .http import MetricsResource
+
+
+class MetricsViewPlugin(BaseViewPlugin):
+    def load(self, dependencies):
+        api = dependencies['api']
+        source_executors = dependencies['source_executors']
+
+        api.add_resource(MetricsResource, '/metrics', resource_class_args=[source_executors])
@@ -1,7 +1,7 @@
 # Copyright 2023 Accent Communications
 
 import logging
-from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed
+from concurrent.futures import TimeoutError, as_completed
 
 from accent_dird import BaseServicePlugin, helpers
 
@@ -35,12 +35,10 @@ class ReverseServicePlugin(BaseServicePlugin):
 class _ReverseService(helpers.BaseService):
     _service_name = 'reverse'
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self._executor = ThreadPoolExecutor(max_workers=10)
-
     def stop(self):
-        self._executor.shutdown()
+        # The source executors are shared with the other services and
+        # stopped by the controller
+        pass
 
     def reverse_many(self, profile_config, extens, profile, args=None, user_uuid=None, token=None):
         args = args or {}
@@ -70,16 +68,14 @@ class _ReverseService(helpers.BaseService):
                 if future.result():
                     results.update(future.result())
                     if all(result is not None for result in results.values()):
-                        for other_future in futures:
-                            other_future.cancel()
                         break
         except TimeoutError:
             logger.info('Timeout on reverse many lookup for extens: %s', extens)
         return list(results.values())
 
     def _async_reverse_many(self, source, extens, args):
-        raise_stopper = helpers.RaiseStopper(return_on_raise=None)
-        future = self._executor.submit(raise_stopper.execute, source.match_all, extens, args)
+        executor = self._controller.source_executors.get(source)
+        future = executor.submit(source.match_all, extens, args, default=None)
         future.name = source.name
         return future
 
@@ -108,14 +104,12 @@ class _ReverseService(helpers.BaseService):
         try:
             for future in as_completed(futures, **params):
                 if future.result() is not None:
-                    for other_future in futures:
-                        other_future.cancel()
                     return future.result()
         except TimeoutError:
             logger.info('Timeout on reverse lookup for exten: %s', exten)
 
     def _async_reverse(self, source, exten, args):
-        raise_stopper = helpers.RaiseStopper(return_on_raise=None)
-        future = self._executor.submit(raise_stopper.execute, source.first_match, exten, args)
+        executor = self._controller.source_executors.get(source)
+        future = executor.submit(source.first_match, exten, args, default=None)
         future.name = source.name
         return future
@@ -0,0 +1,556 @@
+# Copyright 2023 Accent Communications
+
+"""Per-source execution of the directory queries.
+
+A lookup or a reverse lookup queries every source of the profile at once.
+Each source gets its own small pool of threads, so that a slow LDAP server
+only delays its own results instead of holding the workers needed by the
+other sources. On top of this pool, each source has:
+
+- a latency budget: a query that takes longer is given up and its source
+  answers with no result;
+- hedged retries: a query still running after the hedge delay, or a query
+  that failed early, is sent once more and the first answer wins;
+- a circuit breaker: after a number of failed or timed out queries in a row,
+  the source is skipped without being queried until the reset timeout
+  elapses. A single probe query is then let through, which closes the
+  circuit if it succeeds and opens it again otherwise.
+
+The counters of each source are exposed in the Prometheus text format.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Any, TypedDict
+
+from accent.status import Status
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+HALF_OPEN = 'half_open'
+OPEN = 'open'
+_CIRCUIT_STATES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+OUTCOMES = ('success', 'error', 'timeout', 'short_circuited', 'rejected')
+ATTEMPT_KINDS = ('first', 'hedge', 'retry')
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class ExecutionConfig(TypedDict, total=False):
+    max_concurrency: int
+    max_pending: int
+    latency_budget: float
+    hedge_delay: float | None
+    max_attempts: int
+    failure_threshold: int
+    reset_timeout: float
+
+
+class SourceExecutorConfig(ExecutionConfig, total=False):
+    backends: dict[str, ExecutionConfig]
+    sources: dict[str, ExecutionConfig]
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def allow(self) -> bool:
+        """Return whether a query may be sent to the source."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if self._clock() - self._opened_at < self._reset_timeout:
+                    return False
+                self._state = HALF_OPEN
+                self._probing = False
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            if self._state == OPEN:
+                return
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self._failure_threshold:
+                self._state = OPEN
+                self._opened_at = self._clock()
+                self._failures = 0
+                self._probing = False
+                self.opened += 1
+
+
+class _Timer:
+    """Run callbacks after a delay, from a single thread shared by the sources."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._queue: list[tuple[float, int, Callable[[], Any]]] = []
+        self._counter = itertools.count()
+        self._thread: threading.Thread | None = None
+        self._stopped = False
+
+    def schedule(self, delay: float, callback: Callable[[], Any]) -> None:
+        with self._condition:
+            if self._stopped:
+                return
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='source-timer')
+                self._thread.daemon = True
+                self._thread.start()
+            deadline = time.monotonic() + delay
+            heapq.heappush(self._queue, (deadline, next(self._counter), callback))
+            self._condition.notify()
+
+    def stop(self) -> None:
+        with self._condition:
+            self._stopped = True
+            self._queue = []
+            self._condition.notify()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while True:
+                    if self._stopped:
+                        return
+                    if not self._queue:
+                        self._condition.wait()
+                        continue
+                    remaining = self._queue[0][0] - time.monotonic()
+                    if remaining <= 0:
+                        _, _, callback = heapq.heappop(self._queue)
+                        break
+                    self._condition.wait(remaining)
+            try:
+                callback()
+            except Exception:
+                logger.exception('source timer callback failed')
+
+
+class SourceExecutor:
+    """Run the queries of a single source.
+
+    `submit` never raises and its future always completes within the latency
+    budget, with the result of the query or with `default` when the source
+    failed, was too slow, is saturated or has its circuit open.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        backend: str,
+        timer: _Timer,
+        max_concurrency: int = 5,
+        max_pending: int = 20,
+        latency_budget: float = 3.0,
+        hedge_delay: float | None = 1.0,
+        max_attempts: int = 2,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.backend = backend
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout, clock)
+        self.latency_budget = latency_budget
+        self.hedge_delay = hedge_delay
+        self.max_attempts = max_attempts
+        self._timer = timer
+        self._clock = clock
+        self._max_pending = max(max_pending, max_concurrency)
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix=f'source-{name}'
+        )
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._requests = dict.fromkeys(OUTCOMES, 0)
+        self._attempts = dict.fromkeys(ATTEMPT_KINDS, 0)
+        self._buckets = [0] * len(LATENCY_BUCKETS)
+        self._latency_count = 0
+        self._latency_sum = 0.0
+
+    def submit(
+        self, function: Callable[..., Any], *args, default: Any = None
+    ) -> Future:
+        future: Future = Future()
+        # A running future cannot be cancelled by the services once they have
+        # their answer, the queries left running still complete it
+        future.set_running_or_notify_cancel()
+
+        if not self._acquire():
+            self._count('rejected')
+            future.set_result(default)
+            return future
+        if not self.breaker.allow():
+            self._release()
+            self._count('short_circuited')
+            future.set_result(default)
+            return future
+
+        _Call(self, function, args, default, future).start()
+        return future
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False)
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                'requests': dict(self._requests),
+                'attempts': dict(self._attempts),
+                'latency_buckets': list(self._buckets),
+                'latency_count': self._latency_count,
+                'latency_sum': self._latency_sum,
+                'in_flight': self._pending,
+                'circuit': self.breaker.state,
+                'circuit_opened': self.breaker.opened,
+            }
+
+    def _acquire(self) -> bool:
+        with self._lock:
+            if self._pending >= self._max_pending:
+                return False
+            self._pending += 1
+            return True
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _count(self, outcome: str) -> None:
+        with self._lock:
+            self._requests[outcome] += 1
+
+    def _count_attempt(self, kind: str) -> None:
+        with self._lock:
+            self._attempts[kind] += 1
+
+    def _observe(self, latency: float) -> None:
+        with self._lock:
+            self._latency_count += 1
+            self._latency_sum += latency
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if latency <= bound:
+                    self._buckets[i] += 1
+
+
+class _Call:
+    """A query sent to a source, with its hedged and retried attempts."""
+
+    def __init__(
+        self,
+        executor: SourceExecutor,
+        function: Callable[..., Any],
+        args: tuple,
+        default: Any,
+        future: Future,
+    ):
+        self._executor = executor
+        self._function = function
+        self._args = args
+        self._default = default
+        self._future = future
+        self._lock = threading.Lock()
+        self._done = False
+        self._attempts = 0
+        self._running = 0
+        self._started = executor._clock()
+
+    def start(self) -> None:
+        executor = self._executor
+        with self._lock:
+            self._attempts += 1
+            self._running += 1
+        executor._timer.schedule(executor.latency_budget, self._expire)
+        hedge_delay = executor.hedge_delay
+        if (
+            executor.max_attempts > 1
+            and hedge_delay is not None
+            and hedge_delay < executor.latency_budget
+        ):
+            executor._timer.schedule(hedge_delay, self._hedge)
+        self._submit('first')
+
+    def _try_launch(self, kind: str, require_running: bool) -> None:
+        executor = self._executor
+        with self._lock:
+            if self._done or self._attempts >= executor.max_attempts:
+                return
+            if require_running and not self._running:
+                return
+            if not executor._acquire():
+                return
+            self._attempts += 1
+            self._running += 1
+        self._submit(kind)
+
+    def _submit(self, kind: str) -> None:
+        self._executor._count_attempt(kind)
+        started = self._executor._clock()
+        try:
+            attempt = self._executor._pool.submit(self._function, *self._args)
+        except RuntimeError as e:
+            # The pool is shut down
+            attempt = Future()
+            attempt.set_exception(e)
+        attempt.add_done_callback(partial(self._attempt_done, started))
+
+    def _hedge(self) -> None:
+        self._try_launch('hedge', require_running=True)
+
+    def _expire(self) -> None:
+        with self._lock:
+            if self._done:
+                return
+            self._done = True
+        executor = self._executor
+        logger.info(
+            'source %s: no answer within the latency budget of %ss',
+            executor.name,
+            executor.latency_budget,
+        )
+        self._finish('timeout', self._default)
+
+    def _attempt_done(self, started: float, attempt: Future) -> None:
+        executor = self._executor
+        executor._release()
+        error = attempt.exception()
+        if error is None:
+            executor._observe(executor._clock() - started)
+        else:
+            logger.error(
+                'source %s: %s failed: %s',
+                executor.name,
+                getattr(self._function, '__name__', self._function),
+                error,
+                exc_info=error,
+            )
+
+        retry = False
+        with self._lock:
+            self._running -= 1
+            if self._done:
+                return
+            if error is None:
+                self._done = True
+            elif self._running:
+                return
+            elif (
+                self._attempts < executor.max_attempts
+                and executor._clock() - self._started < executor.latency_budget
+            ):
+                retry = True
+            else:
+                self._done = True
+
+        if retry:
+            self._try_launch('retry', require_running=False)
+            with self._lock:
+                if self._running or self._done:
+                    return
+                self._done = True
+            self._finish('error', self._default)
+        elif error is None:
+            self._finish('success', attempt.result())
+        else:
+            self._finish('error', self._default)
+
+    def _finish(self, outcome: str, result: Any) -> None:
+        executor = self._executor
+        if outcome == 'success':
+            executor.breaker.record_success()
+        else:
+            executor.breaker.record_failure()
+        executor._count(outcome)
+        self._future.set_result(result)
+
+
+class SourceExecutors:
+    """The executors of the loaded sources, shared by the services.
+
+    The execution settings of a source are the defaults of the
+    `source_executor` configuration section, overridden by the settings of
+    its backend, then by the settings of the source itself, by name.
+    """
+
+    def __init__(self, config: SourceExecutorConfig):
+        self._config = config
+        self._lock = threading.Lock()
+        self._executors: dict[str, SourceExecutor] = {}
+        self._timer = _Timer()
+
+    def get(self, source) -> SourceExecutor:
+        key = getattr(source, 'uuid', None) or source.name
+        with self._lock:
+            executor = self._executors.get(key)
+            if executor is None:
+                executor = SourceExecutor(
+                    source.name, source.backend, self._timer, **self._settings(source)
+                )
+                self._executors[key] = executor
+            return executor
+
+    def remove(self, source_uuid: str) -> None:
+        with self._lock:
+            executor = self._executors.pop(source_uuid, None)
+        if executor:
+            executor.shutdown()
+
+    def stop(self) -> None:
+        with self._lock:
+            executors, self._executors = self._executors, {}
+        for executor in executors.values():
+            executor.shutdown()
+        self._timer.stop()
+
+    def _settings(self, source) -> ExecutionConfig:
+        settings = {
+            key: value
+            for key, value in self._config.items()
+            if key not in ('backends', 'sources')
+        }
+        settings.update(self._config.get('backends', {}).get(source.backend) or {})
+        settings.update(self._config.get('sources', {}).get(source.name) or {})
+        return settings
+
+    def _snapshot(self) -> list[tuple[str, SourceExecutor]]:
+        with self._lock:
+            return sorted(self._executors.items(), key=lambda item: item[1].name)
+
+    def provide_status(self, status) -> None:
+        for key, executor in self._snapshot():
+            circuit = executor.breaker.state
+            status['sources'][key]['name'] = executor.name
+            status['sources'][key]['circuit'] = circuit
+            status['sources'][key]['status'] = (
+                Status.fail if circuit == OPEN else Status.ok
+            )
+
+    def render_metrics(self) -> str:
+        """Return the metrics of the sources in the Prometheus text format."""
+        requests, attempts, histogram, in_flight, circuit, opened = (
+            [] for _ in range(6)
+        )
+        for key, executor in self._snapshot():
+            labels = {
+                'source_uuid': key,
+                'source': executor.name,
+                'backend': executor.backend,
+            }
+            metrics = executor.metrics()
+            for outcome, value in metrics['requests'].items():
+                requests.append((_labels(labels, outcome=outcome), value))
+            for kind, value in metrics['attempts'].items():
+                attempts.append((_labels(labels, kind=kind), value))
+            # The buckets are already cumulative
+            for bound, value in zip(LATENCY_BUCKETS, metrics['latency_buckets']):
+                histogram.append(('_bucket', _labels(labels, le=repr(bound)), value))
+            histogram.append(
+                ('_bucket', _labels(labels, le='+Inf'), metrics['latency_count'])
+            )
+            histogram.append(('_sum', _labels(labels), metrics['latency_sum']))
+            histogram.append(('_count', _labels(labels), metrics['latency_count']))
+            in_flight.append((_labels(labels), metrics['in_flight']))
+            circuit.append((_labels(labels), _CIRCUIT_STATES[metrics['circuit']]))
+            opened.append((_labels(labels), metrics['circuit_opened']))
+
+        lines: list[str] = []
+        _family(
+            lines,
+            'dird_source_requests_total',
+            'counter',
+            'Queries sent to the sources, by outcome.',
+            requests,
+        )
+        _family(
+            lines,
+            'dird_source_attempts_total',
+            'counter',
+            'Attempts of the queries, by kind.',
+            attempts,
+        )
+        lines.append(
+            '# HELP dird_source_latency_seconds Latency of the successful attempts.'
+        )
+        lines.append('# TYPE dird_source_latency_seconds histogram')
+        for suffix, label_text, value in histogram:
+            lines.append(f'dird_source_latency_seconds{suffix}{label_text} {value}')
+        _family(
+            lines,
+            'dird_source_in_flight',
+            'gauge',
+            'Attempts running or waiting for a worker.',
+            in_flight,
+        )
+        _family(
+            lines,
+            'dird_source_circuit_state',
+            'gauge',
+            'Circuit state: 0 closed, 1 half-open, 2 open.',
+            circuit,
+        )
+        _family(
+            lines,
+            'dird_source_circuit_opened_total',
+            'counter',
+            'Times the circuit was opened.',
+            opened,
+        )
+        return '\n'.join(lines) + '\n'
+
+
+def _family(lines: list[str], name: str, type_: str, help_: str, samples: list) -> None:
+    lines.append(f'# HELP {name} {help_}')
+    lines.append(f'# TYPE {name} {type_}')
+    for label_text, value in samples:
+        lines.append(f'{name}{label_text} {value}')
+
+
+def _labels(labels: dict[str, str], **extra: str) -> str:
+    pairs = ','.join(
+        f'{key}="{_escape(value)}"' for key, value in {**labels, **extra}.items()
+    )
+    return f'{{{pairs}}}'
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -20,6 +20,7 @@ from accent_dird.plugins.base_plugins import (
     SourceConfig,
     SourcePluginDependencies,
 )
+from accent_dird.source_executor import SourceExecutors
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +39,7 @@ class SourceManager:
         config: MainConfig,
         auth_client: AuthClient,
         token_renewer: TokenRenewer,
+        source_executors: SourceExecutors | None = None,
     ):
         self._enabled_backends = enabled_backends
         self._main_config = config
@@ -47,6 +49,7 @@ class SourceManager:
         self._token_renewer = token_renewer
         self._source_service: SourceServiceProtocol | None = None
         self._source_lock = threading.Lock()
+        self._source_executors = source_executors
 
     def get(self, source_uuid: str) -> BaseSourcePlugin | None:
         with self._source_lock:
@@ -59,6 +62,9 @@ class SourceManager:
     def invalidate(self, source_uuid: str):
         with self._source_lock:
             self._sources.pop(source_uuid, None)
+        # The edited source starts over with a closed circuit
+        if self._source_executors:
+            self._source_executors.remove(source_uuid)
 
     def _load_source(self, source_uuid: str) -> BaseSourcePlugin | None:
         assert self._source_service
@@ -109,6 +115,7 @@ class SourceManager:
             source: BaseSourcePlugin = extension.plugin()
             source.name = name
             source.backend = extension.name
+            source.uuid = config['uuid']
             dependencies = SourcePluginDependencies(
                 {
                     'auth_client': self._auth_client,
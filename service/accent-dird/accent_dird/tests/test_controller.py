@@ -87,6 +87,7 @@ class TestController(TestCase):
             controller.auth_client,
             controller.status_aggregator,
             controller.rest_api,
+            controller.source_executors,
         )
 
     def _create_config(self, **kwargs):
@@ -98,6 +99,7 @@ class TestController(TestCase):
         config['enabled_plugins'].setdefault('services', {})
         config['enabled_plugins'].setdefault('views', {})
         config.setdefault('sources', {})
+        config.setdefault('source_executor', {})
         config.setdefault(
             'rest_api',
             {
@@ -0,0 +1,244 @@
+# Copyright 2023 Accent Communications
+
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+
+from hamcrest import (
+    assert_that,
+    contains_string,
+    equal_to,
+    has_entries,
+    is_not,
+)
+
+from ..source_executor import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    SourceExecutor,
+    SourceExecutors,
+    _Timer,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=self.clock)
+
+    def test_opens_after_consecutive_failures(self):
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        assert_that(self.breaker.state, equal_to(CLOSED))
+
+        self.breaker.record_failure()
+
+        assert_that(self.breaker.state, equal_to(OPEN))
+        assert_that(self.breaker.allow(), equal_to(False))
+        assert_that(self.breaker.opened, equal_to(1))
+
+    def test_half_open_lets_a_single_probe_through(self):
+        self._open()
+        self.clock.now = 10
+
+        assert_that(self.breaker.allow(), equal_to(True))
+        assert_that(self.breaker.state, equal_to(HALF_OPEN))
+        assert_that(self.breaker.allow(), equal_to(False))
+
+        self.breaker.record_success()
+
+        assert_that(self.breaker.state, equal_to(CLOSED))
+        assert_that(self.breaker.allow(), equal_to(True))
+
+    def test_failed_probe_opens_the_circuit_again(self):
+        self._open()
+        self.clock.now = 10
+        self.breaker.allow()
+
+        self.breaker.record_failure()
+
+        assert_that(self.breaker.state, equal_to(OPEN))
+        self.clock.now = 19
+        assert_that(self.breaker.allow(), equal_to(False))
+        self.clock.now = 20
+        assert_that(self.breaker.allow(), equal_to(True))
+
+    def _open(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+
+
+class TestSourceExecutor(unittest.TestCase):
+    def setUp(self):
+        self.timer = _Timer()
+
+    def tearDown(self):
+        self.timer.stop()
+
+    def executor(self, **kwargs):
+        kwargs.setdefault('latency_budget', 1.0)
+        kwargs.setdefault('hedge_delay', None)
+        executor = SourceExecutor('my-source', 'ldap', self.timer, **kwargs)
+        self.addCleanup(executor.shutdown)
+        return executor
+
+    def test_result(self):
+        executor = self.executor()
+
+        future = executor.submit(lambda term: [term], 'alice', default=[])
+
+        assert_that(future.result(timeout=1), equal_to(['alice']))
+        assert_that(
+            executor.metrics(),
+            has_entries(requests=has_entries(success=1), latency_count=1, in_flight=0),
+        )
+
+    def test_error_is_retried_once(self):
+        executor = self.executor(max_attempts=2)
+        function = Mock(side_effect=[Exception('down'), ['alice']])
+
+        future = executor.submit(function, default=[])
+
+        assert_that(future.result(timeout=1), equal_to(['alice']))
+        assert_that(executor.metrics()['attempts'], has_entries(first=1, retry=1))
+
+    def test_error_returns_the_default(self):
+        executor = self.executor(max_attempts=1)
+
+        future = executor.submit(Mock(side_effect=Exception('down')), default=[])
+
+        assert_that(future.result(timeout=1), equal_to([]))
+        assert_that(executor.metrics()['requests'], has_entries(error=1))
+
+    def test_latency_budget(self):
+        executor = self.executor(latency_budget=0.05, max_attempts=1)
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        start = time.monotonic()
+        future = executor.submit(release.wait, default=None)
+
+        assert_that(future.result(timeout=1), equal_to(None))
+        assert_that(time.monotonic() - start < 0.5, equal_to(True))
+        assert_that(executor.metrics()['requests'], has_entries(timeout=1))
+
+    def test_hedged_attempt_wins(self):
+        executor = self.executor(hedge_delay=0.01, latency_budget=1.0)
+        release = threading.Event()
+        self.addCleanup(release.set)
+        calls = []
+
+        def search():
+            calls.append(None)
+            if len(calls) == 1:
+                release.wait()
+                return ['slow']
+            return ['fast']
+
+        future = executor.submit(search, default=[])
+
+        assert_that(future.result(timeout=1), equal_to(['fast']))
+        assert_that(executor.metrics()['attempts'], has_entries(first=1, hedge=1))
+
+    def test_open_circuit_skips_the_source(self):
+        executor = self.executor(max_attempts=1, failure_threshold=1)
+        function = Mock(side_effect=Exception('down'))
+        executor.submit(function, default=[]).result(timeout=1)
+
+        future = executor.submit(function, default=[])
+
+        assert_that(future.result(timeout=1), equal_to([]))
+        function.assert_called_once_with()
+        assert_that(executor.metrics(), has_entries(circuit=OPEN))
+        assert_that(executor.metrics()['requests'], has_entries(short_circuited=1))
+
+    def test_saturated_source_is_rejected(self):
+        executor = self.executor(max_concurrency=1, max_pending=1, max_attempts=1)
+        release = threading.Event()
+        self.addCleanup(release.set)
+        executor.submit(release.wait)
+
+        future = executor.submit(Mock(), default=[])
+
+        assert_that(future.result(timeout=1), equal_to([]))
+        assert_that(executor.metrics()['requests'], has_entries(rejected=1))
+
+    def test_future_cannot_be_cancelled(self):
+        executor = self.executor()
+
+        future = executor.submit(lambda: 'result')
+
+        assert_that(future.cancel(), equal_to(False))
+        assert_that(future.result(timeout=1), equal_to('result'))
+
+
+class TestSourceExecutors(unittest.TestCase):
+    def setUp(self):
+        config = {
+            'latency_budget': 3.0,
+            'hedge_delay': None,
+            'backends': {'ldap': {'latency_budget': 2.0}},
+            'sources': {'slow-ldap': {'latency_budget': 5.0}},
+        }
+        self.executors = SourceExecutors(config)
+        self.addCleanup(self.executors.stop)
+
+    def test_settings(self):
+        ldap = Mock(uuid='1', backend='ldap')
+        ldap.name = 'ldap'
+        slow = Mock(uuid='2', backend='ldap')
+        slow.name = 'slow-ldap'
+        csv = Mock(uuid='3', backend='csv')
+        csv.name = 'csv'
+
+        assert_that(self.executors.get(ldap).latency_budget, equal_to(2.0))
+        assert_that(self.executors.get(slow).latency_budget, equal_to(5.0))
+        assert_that(self.executors.get(csv).latency_budget, equal_to(3.0))
+
+    def test_one_executor_per_source(self):
+        source = Mock(uuid='1', backend='csv')
+        source.name = 'csv'
+        executor = self.executors.get(source)
+
+        assert_that(self.executors.get(source), equal_to(executor))
+        self.executors.remove('1')
+        assert_that(self.executors.get(source), is_not(equal_to(executor)))
+
+    def test_render_metrics(self):
+        source = Mock(uuid='1', backend='csv')
+        source.name = 'my "csv"'
+        self.executors.get(source).submit(lambda: []).result(timeout=1)
+
+        text = self.executors.render_metrics()
+
+        labels = 'source_uuid="1",source="my \\"csv\\"",backend="csv"'
+        assert_that(
+            text,
+            contains_string(f'dird_source_requests_total{{{labels},outcome="success"}} 1'),
+        )
+        assert_that(
+            text, contains_string(f'dird_source_latency_seconds_bucket{{{labels},le="+Inf"}} 1')
+        )
+        assert_that(text, contains_string(f'dird_source_circuit_state{{{labels}}} 0'))
+
+    def test_provide_status(self):
+        source = Mock(uuid='1', backend='csv')
+        source.name = 'csv'
+        self.executors.get(source)
+        status = {'sources': {'1': {}}}
+
+        self.executors.provide_status(status)
+
+        assert_that(status['sources']['1'], has_entries(name='csv', circuit=CLOSED, status='ok'))
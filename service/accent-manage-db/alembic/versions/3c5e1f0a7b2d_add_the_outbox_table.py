@@ -0,0 +1,52 @@
+"""add the outbox table
+
+Revision ID: 3c5e1f0a7b2d
+Revises: b8a823cde2fc
+
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '3c5e1f0a7b2d'
+down_revision = 'b8a823cde2fc'
+
+
+def upgrade():
+    op.create_table(
+        'outbox',
+        sa.Column('id', sa.BigInteger, primary_key=True),
+        sa.Column(
+            'uuid',
+            sa.String(38),
+            server_default=sa.text('uuid_generate_v4()'),
+            nullable=False,
+            unique=True,
+        ),
+        sa.Column('kind', sa.String(16), nullable=False),
+        sa.Column('body', JSONB, nullable=False),
+        sa.Column(
+            'created_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.text('now()'),
+            nullable=False,
+        ),
+        sa.Column('published_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('attempts', sa.Integer, server_default='0', nullable=False),
+        sa.Column('last_error', sa.Text, nullable=True),
+        sa.CheckConstraint("kind in ('bus', 'sysconfd')", name='outbox_kind_check'),
+    )
+    op.create_index(
+        'outbox__idx__pending',
+        'outbox',
+        ['id'],
+        postgresql_where=sa.text('published_at IS NULL'),
+    )
+    op.create_index('outbox__idx__published_at', 'outbox', ['published_at'])
+
+
+def downgrade():
+    op.drop_table('outbox')
@@ -0,0 +1,71 @@
+"""add the user_import_job table
+
+Revision ID: 5d2a9c4e8f61
+Revises: 3c5e1f0a7b2d
+
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '5d2a9c4e8f61'
+down_revision = '3c5e1f0a7b2d'
+
+
+def upgrade():
+    op.create_table(
+        'user_import_job',
+        sa.Column(
+            'uuid',
+            sa.String(38),
+            server_default=sa.text('uuid_generate_v4()'),
+            primary_key=True,
+        ),
+        sa.Column(
+            'tenant_uuid',
+            sa.String(36),
+            sa.ForeignKey('tenant.uuid', ondelete='CASCADE'),
+            nullable=False,
+        ),
+        sa.Column('status', sa.String(16), server_default='pending', nullable=False),
+        sa.Column('rows', JSONB, nullable=False),
+        sa.Column('processed_rows', sa.Integer, server_default='0', nullable=False),
+        sa.Column(
+            'created', JSONB, server_default=sa.text("'[]'::jsonb"), nullable=False
+        ),
+        sa.Column(
+            'errors', JSONB, server_default=sa.text("'[]'::jsonb"), nullable=False
+        ),
+        sa.Column(
+            'created_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.text('now()'),
+            nullable=False,
+        ),
+        sa.Column(
+            'updated_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.text('now()'),
+            nullable=False,
+        ),
+        sa.CheckConstraint(
+            "status in ('pending', 'running', 'completed', 'failed')",
+            name='user_import_job_status_check',
+        ),
+    )
+    op.create_index(
+        'user_import_job__idx__tenant_uuid', 'user_import_job', ['tenant_uuid']
+    )
+    op.create_index(
+        'user_import_job__idx__unfinished',
+        'user_import_job',
+        ['created_at'],
+        postgresql_where=sa.text("status in ('pending', 'running')"),
+    )
+
+
+def downgrade():
+    op.drop_table('user_import_job')
@@ -30,6 +30,7 @@ from accent_provd.persist.common import ID_KEY
 from accent_provd.persist.common import InvalidIdError as PersistInvalidIdError
 from accent_provd.persist.common import NonDeletableError as PersistNonDeletableError
 from accent_provd.plugins import PluginManager, PluginNotLoadedError
+from accent_provd.reconfigure import DEFAULT_MAX_WORKERS, MassReconfigurator
 from accent_provd.rest.server import auth
 from accent_provd.rest.server.helpers.tenants import Tenant, tenant_helpers
 from accent_provd.services import (
@@ -246,11 +247,17 @@ class ProvisioningApplication:
         logger.info('Using base raw config %s', self._base_raw_config)
         _check_common_raw_config_validity(self._base_raw_config)
         self._rw_lock = DeferredRWLock()
+        # incremented on every config change, see MassReconfigurator
+        self.cfg_version = 0
+        self._reconfigurator = MassReconfigurator(
+            self, config['general'].get('reconfigure_workers', DEFAULT_MAX_WORKERS)
+        )
         self._pg_load_all(True)
 
     @_wlock
     def close(self) -> None:
         logger.info('Closing provisioning application...')
+        self._reconfigurator.close()
         self.pg_mgr.close()
         logger.info('Provisioning application closed')
 
@@ -646,7 +653,22 @@ class ProvisioningApplication:
             raise InvalidIdError(f'Invalid config ID "{config_id}"')
         defer.returnValue(config)
 
-    @_wlock
+    def _cfg_reconfigure_devices(
+        self, config_ids: set[str], label: str = 'reconfigure'
+    ) -> tuple[Deferred, OperationInProgress]:
+        # Reconfigure, outside the write lock, every device having a direct
+        # dependency on one of the config ids
+        selector = {'config': {'$in': sorted(config_ids)}}
+        return self._reconfigurator.reconfigure(selector, label)
+
+    @defer.inlineCallbacks
+    def _cfg_get_affected_ids(self, config_id: str):
+        # Return a deferred that will fire with the set of ID of the config
+        # and of the configs depending on it
+        affected_cfg_ids = yield self._cfg_collection.get_descendants(config_id)
+        affected_cfg_ids.add(config_id)
+        defer.returnValue(affected_cfg_ids)
+
     @defer.inlineCallbacks
     def cfg_insert(self, config: ConfigDict):
         """Insert a new config into the provisioning application.
@@ -664,6 +686,15 @@ class ProvisioningApplication:
         successfully inserted.
 
         """
+        config_id, affected_cfg_ids = yield self._cfg_insert(config)
+        # configure each device that depend on the newly inserted config
+        deferred, _ = self._cfg_reconfigure_devices(affected_cfg_ids)
+        yield deferred
+        defer.returnValue(config_id)
+
+    @_wlock
+    @defer.inlineCallbacks
+    def _cfg_insert(self, config: ConfigDict):
         logger.info('Inserting config %s', config.get(ID_KEY))
         try:
             try:
@@ -671,43 +702,13 @@ class ProvisioningApplication:
             except PersistInvalidIdError as e:
                 raise InvalidIdError(e)
             else:
-                # configure each device that depend on the newly inserted config
-                # 1. get the set of affected configs
-                affected_cfg_ids = yield self._cfg_collection.get_descendants(config_id)
-                affected_cfg_ids.add(config_id)
-                # 2. get the raw_config of every affected config
-                raw_configs = {}
-                for affected_cfg_id in affected_cfg_ids:
-                    raw_configs[
-                        affected_cfg_id
-                    ] = yield self._cfg_collection.get_raw_config(
-                        affected_cfg_id, self._base_raw_config
-                    )
-                # 3. reconfigure/deconfigure each affected devices
-                affected_devices = yield self._dev_collection.find(
-                    {'config': {'$in': list(affected_cfg_ids)}}
-                )
-                for device in affected_devices:
-                    plugin = self._dev_get_plugin(device)
-                    if plugin is not None:
-                        raw_config = raw_configs[device['config']]
-                        assert raw_config is not None
-                        # deconfigure
-                        if device['configured']:
-                            self._dev_deconfigure(device, plugin)
-                        # configure
-                        configured = self._dev_configure(device, plugin, raw_config)
-                        # update device if it has changed
-                        if device['configured'] != configured:
-                            device['configured'] = configured
-                            yield self._dev_collection.update(device)
-                # 4. return the device id
-                defer.returnValue(config_id)
+                self.cfg_version += 1
+                affected_cfg_ids = yield self._cfg_get_affected_ids(config_id)
+                defer.returnValue((config_id, affected_cfg_ids))
         except Exception:
             logger.error('Error while inserting config', exc_info=True)
             raise
 
-    @_wlock
     @defer.inlineCallbacks
     def cfg_update(self, config):
         """Update the config.
@@ -723,6 +724,16 @@ class ProvisioningApplication:
         Note that device might be reconfigured.
 
         """
+        affected_cfg_ids = yield self._cfg_update(config)
+        if affected_cfg_ids:
+            deferred, _ = self._cfg_reconfigure_devices(affected_cfg_ids)
+            yield deferred
+
+    @_wlock
+    @defer.inlineCallbacks
+    def _cfg_update(self, config):
+        # Return a deferred that will fire with the set of affected config
+        # ids, empty if the config has not changed
         try:
             try:
                 config_id = config[ID_KEY]
@@ -733,42 +744,15 @@ class ProvisioningApplication:
             old_config = yield self._cfg_get_or_raise(config_id)
             if old_config == config:
                 logger.info('config has not changed, ignoring update')
-            else:
-                yield self._cfg_collection.update(config)
-                affected_cfg_ids = yield self._cfg_collection.get_descendants(config_id)
-                affected_cfg_ids.add(config_id)
-                # 2. get the raw_config of every affected config
-                raw_configs = {}
-                for affected_cfg_id in affected_cfg_ids:
-                    raw_configs[
-                        affected_cfg_id
-                    ] = yield self._cfg_collection.get_raw_config(
-                        affected_cfg_id, self._base_raw_config
-                    )
-                # 3. reconfigure each device having a direct dependency on
-                #    one of the affected cfg id
-                affected_devices = yield self._dev_collection.find(
-                    {'config': {'$in': list(affected_cfg_ids)}}
-                )
-                for device in affected_devices:
-                    plugin = self._dev_get_plugin(device)
-                    if plugin is not None:
-                        raw_config = raw_configs[device['config']]
-                        assert raw_config is not None
-                        # deconfigure
-                        if device['configured']:
-                            self._dev_deconfigure(device, plugin)
-                        # configure
-                        configured = self._dev_configure(device, plugin, raw_config)
-                        # update device if it has changed
-                        if device['configured'] != configured:
-                            device['configured'] = configured
-                            yield self._dev_collection.update(device)
+                defer.returnValue(set())
+            yield self._cfg_collection.update(config)
+            self.cfg_version += 1
+            affected_cfg_ids = yield self._cfg_get_affected_ids(config_id)
+            defer.returnValue(affected_cfg_ids)
         except Exception:
             logger.error('Error while updating config', exc_info=True)
             raise
 
-    @_wlock
     @defer.inlineCallbacks
     def cfg_delete(self, config_id):
         """Delete the config with the given ID. Does not delete any reference
@@ -784,7 +768,15 @@ class ProvisioningApplication:
         automatically reconfigured if needed.
 
         """
-        config_id = decode_bytes(config_id)
+        affected_cfg_ids = yield self._cfg_delete(decode_bytes(config_id))
+        # devices using the deleted config are deconfigured, the others are
+        # reconfigured
+        deferred, _ = self._cfg_reconfigure_devices(affected_cfg_ids)
+        yield deferred
+
+    @_wlock
+    @defer.inlineCallbacks
+    def _cfg_delete(self, config_id: str):
         logger.info('Deleting config %s', config_id)
         try:
             try:
@@ -794,47 +786,51 @@ class ProvisioningApplication:
             except PersistNonDeletableError as e:
                 raise NonDeletableError(e)
             else:
-                # 1. get the set of affected configs
-                affected_cfg_ids = yield self._cfg_collection.get_descendants(config_id)
-                affected_cfg_ids.add(config_id)
-                # 2. get the raw_config of every affected config
-                raw_configs = {}
-                for affected_cfg_id in affected_cfg_ids:
-                    raw_configs[
-                        affected_cfg_id
-                    ] = yield self._cfg_collection.get_raw_config(
-                        affected_cfg_id, self._base_raw_config
-                    )
-                # 3. reconfigure/deconfigure each affected devices
-                affected_devices = yield self._dev_collection.find(
-                    {'config': {'$in': list(affected_cfg_ids)}}
-                )
-                for device in affected_devices:
-                    plugin = self._dev_get_plugin(device)
-                    if plugin is not None:
-                        raw_config = raw_configs[device['config']]
-                        # deconfigure
-                        if device['configured']:
-                            self._dev_deconfigure(device, plugin)
-                        # configure if device config is not the deleted config
-                        if device['config'] == config_id:
-                            assert raw_config is None
-                            # update device if it has changed
-                            if device['configured']:
-                                device['configured'] = False
-                                yield self._dev_collection.update(device)
-                        else:
-                            assert raw_config is not None
-                            configured = yield self._dev_configure(
-                                device, plugin, raw_config
-                            )
-                            # update device if it has changed
-                            if device['configured'] != configured:
-                                yield self._dev_collection.update(device)
+                self.cfg_version += 1
+                affected_cfg_ids = yield self._cfg_get_affected_ids(config_id)
+                defer.returnValue(affected_cfg_ids)
         except Exception:
             logger.error('Error while deleting config', exc_info=True)
             raise
 
+    def cfg_reconfigure(self, config_id: str) -> tuple[Deferred, OperationInProgress]:
+        """Reconfigure every device depending directly or indirectly on the
+        config with the given ID, for example after a template change.
+
+        Return a tuple (deferred, operation in progress). The deferred fires
+        with a tuple (configured, failed) once every device is reconfigured.
+
+        Devices are reconfigured in parallel and the provisioning requests
+        are still served during the operation.
+
+        """
+        logger.info('Reconfiguring devices depending on config %s', config_id)
+        oip = OperationInProgress('reconfigure', OIP_PROGRESS)
+
+        @defer.inlineCallbacks
+        def reconfigure():
+            affected_cfg_ids = yield self._rw_lock.read_lock.run(
+                self._cfg_get_affected_ids, config_id
+            )
+            deferred, reconfigure_oip = self._cfg_reconfigure_devices(
+                affected_cfg_ids, 'devices'
+            )
+            oip.sub_oips.append(reconfigure_oip)
+            result = yield deferred
+            defer.returnValue(result)
+
+        def callback(result):
+            oip.state = OIP_SUCCESS
+            return result
+
+        def errback(err):
+            oip.state = OIP_FAIL
+            return err
+
+        deferred = reconfigure()
+        deferred.addCallbacks(callback, errback)
+        return deferred, oip
+
     def cfg_retrieve(self, config_id):
         """Return a deferred that fire with the config with the given ID, or
         fire with None if there's no such document.
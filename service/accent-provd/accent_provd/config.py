@@ -25,6 +25,8 @@ The following parameters are defined:
         tftp_port
         verbose
         sync_service_type
+        reconfigure_workers
+            The number of devices reconfigured in parallel after a config change
         asterisk_ami_servers
         advertised_http_url
             The HTTP URL advertised to phones
@@ -45,6 +47,7 @@ The following parameters are defined:
         generator
         ensure_common_indexes
         json_db_dir
+        sqlite_db_file
     plugin_config:
         *
             *
@@ -112,6 +115,7 @@ class GeneralConfig(TypedDict):
     tftp_port: int
     verbose: bool
     sync_service_type: str
+    reconfigure_workers: int
     syncdb: SyncDbConfigDict
     http_auth_strategy: Union[Literal['url_key'], None]
 
@@ -137,6 +141,7 @@ class DatabaseConfigDict(TypedDict):
     generator: Literal['default', 'numeric', 'uuid']
     ensure_common_indexes: bool
     json_db_dir: str
+    sqlite_db_file: str
 
 
 class AmidConfigDict(TypedDict):
@@ -193,6 +198,7 @@ _DEFAULT_CONFIG: ProvdConfigDict = {
         'http_proxied_trusted_proxies_count': 1,
         'verbose': False,
         'sync_service_type': 'none',
+        'reconfigure_workers': 4,
         'syncdb': {
             'interval_sec': 86400,
             'start_sec': 60,
@@ -218,6 +224,7 @@ _DEFAULT_CONFIG: ProvdConfigDict = {
         'generator': 'default',
         'ensure_common_indexes': True,
         'json_db_dir': 'jsondb',
+        'sqlite_db_file': 'provd.sqlite',
     },
     'amid': {
         'host': 'localhost',
@@ -327,12 +334,13 @@ def _update_general_base_raw_config(app_raw_config: dict[str, Any]) -> None:
 def _post_update_raw_config(raw_config: dict[str, Any]) -> None:
     # Update raw config after transformation/check
     _update_general_base_raw_config(raw_config)
-    # update json_db_dir to absolute dir
-    if 'json_db_dir' in raw_config['database']:
-        raw_config['database']['json_db_dir'] = os.path.join(
-            raw_config['general']['base_storage_dir'],
-            raw_config['database']['json_db_dir'],
-        )
+    # update json_db_dir and sqlite_db_file to absolute paths
+    for key in ('json_db_dir', 'sqlite_db_file'):
+        if key in raw_config['database']:
+            raw_config['database'][key] = os.path.join(
+                raw_config['general']['base_storage_dir'],
+                raw_config['database'][key],
+            )
 
 
 def _load_key_file(config: dict[str, Any]) -> AuthKeyFileDict:
@@ -23,6 +23,7 @@ from accent_provd.devices import ident, pgasso
 from accent_provd.devices.config import ConfigCollection
 from accent_provd.devices.device import DeviceCollection
 from accent_provd.persist.json_backend import JsonDatabaseFactory
+from accent_provd.persist.sqlite_backend import SqliteDatabaseFactory
 from accent_provd.rest.api.resource import ResponseFile
 from accent_provd.rest.server import auth
 from accent_provd.rest.server.server import new_authenticated_server_resource
@@ -61,6 +62,7 @@ class ProvisioningService(Service):
 
     _DB_FACTORIES = {
         'json': JsonDatabaseFactory(),
+        'sqlite': SqliteDatabaseFactory(),
     }
 
     def __init__(self, config: ProvdConfigDict) -> None:
@@ -0,0 +1,39 @@
+# Copyright 2023 Accent Communications
+
+"""Import a JSON database directory into an SQLite database.
+
+Usage: python -m accent_provd.persist.migrate JSON_DB_DIR SQLITE_DB_FILE
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+
+from accent_provd.persist.id import get_id_generator_factory
+from accent_provd.persist.sqlite_backend import SqliteDatabase, migrate_json_directory
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('json_db_dir', help='directory of the JSON database')
+    parser.add_argument('sqlite_db_file', help='SQLite database file')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    database = SqliteDatabase(args.sqlite_db_file, get_id_generator_factory('default'))
+    try:
+        counts = migrate_json_directory(
+            args.json_db_dir, database, batch_size=args.batch_size
+        )
+    finally:
+        database.close()
+    for collection_id, count in counts.items():
+        print(f'{collection_id}: {count} documents')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,316 @@
+# Copyright 2023 Accent Communications
+
+"""SQLite persistence backend.
+
+Every collection is a table of the same SQLite database, opened in WAL mode,
+with one row per document: the document itself is stored as JSON and the
+values of the commonly searched keys (mac, ip, sn, config and plugin) are
+copied to indexed columns. Selectors on these keys are pushed down to SQL
+and the candidate rows are then checked with the regular matchers, so find
+has the same semantic as with the JSON backend.
+
+Documents are decoded from their JSON representation on every read, which
+gives the caller its own copy without the deepcopy done by the JSON backend.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from collections.abc import Generator, Iterable
+from typing import Any, Literal
+
+from accent_provd.persist.common import (
+    ID_KEY,
+    AbstractBackend,
+    AbstractDatabase,
+    AbstractDatabaseFactory,
+)
+from accent_provd.persist.id import GeneratorFactory, get_id_generator_factory
+from accent_provd.persist.util import (
+    SimpleBackendDocumentCollection,
+    _contains_operator,
+    _create_pred_from_selector,
+)
+from twisted.internet import defer
+
+logger = logging.getLogger(__name__)
+
+INDEXED_KEYS = ('mac', 'ip', 'sn', 'config', 'plugin')
+
+_SCALAR_TYPES = (str, int, float)
+_COLLECTION_ID_REGEX = re.compile(r'^\w+$')
+
+
+def _encode(document: dict[str, Any]) -> str:
+    return json.dumps(document, separators=(',', ':'))
+
+
+def _column_values(document: dict[str, Any]) -> tuple[list[Any], int]:
+    # Return the values of the indexed columns, and 1 if one of the indexed
+    # keys has a value that can't be matched in SQL (e.g. a list)
+    values = []
+    irregular = 0
+    for key in INDEXED_KEYS:
+        value = document.get(key)
+        if value is None or isinstance(value, _SCALAR_TYPES):
+            values.append(value)
+        else:
+            values.append(None)
+            irregular = 1
+    return values, irregular
+
+
+class SqliteBackend(AbstractBackend):
+    """Mapping of document ID to document, stored in a table."""
+
+    def __init__(
+        self, connection: sqlite3.Connection, lock: threading.RLock, table: str
+    ) -> None:
+        if not _COLLECTION_ID_REGEX.match(table):
+            raise ValueError(f'invalid collection id "{table}"')
+        self._connection = connection
+        self._lock = lock
+        self._table = table
+        self.closed = False
+        self._create_table()
+
+    def _create_table(self) -> None:
+        columns = ', '.join(INDEXED_KEYS)
+        with self._lock, self._connection:
+            self._connection.execute(
+                f'CREATE TABLE IF NOT EXISTS {self._table} ('
+                f'id TEXT PRIMARY KEY, {columns}, '
+                'irregular INTEGER NOT NULL DEFAULT 0, '
+                'document TEXT NOT NULL)'
+            )
+            for key in INDEXED_KEYS:
+                self._connection.execute(
+                    f'CREATE INDEX IF NOT EXISTS {self._table}_{key}_idx '
+                    f'ON {self._table} ({key})'
+                )
+            self._connection.execute(
+                f'CREATE INDEX IF NOT EXISTS {self._table}_irregular_idx '
+                f'ON {self._table} (irregular) WHERE irregular = 1'
+            )
+
+    def close(self) -> None:
+        self.closed = True
+
+    def __getitem__(self, document_id: str) -> dict[str, Any]:
+        with self._lock:
+            row = self._connection.execute(
+                f'SELECT document FROM {self._table} WHERE id = ?', (document_id,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(document_id)
+        return json.loads(row[0])
+
+    def __setitem__(self, document_id: str, document: dict[str, Any]) -> None:
+        self.put_many([(document_id, document)])
+
+    def put_many(self, documents: Iterable[tuple[str, dict[str, Any]]]) -> None:
+        """Insert or replace several documents in one transaction."""
+        rows = []
+        for document_id, document in documents:
+            values, irregular = _column_values(document)
+            rows.append((document_id, *values, irregular, _encode(document)))
+        placeholders = ', '.join('?' * (len(INDEXED_KEYS) + 3))
+        columns = ', '.join(INDEXED_KEYS)
+        with self._lock, self._connection:
+            self._connection.executemany(
+                f'INSERT OR REPLACE INTO {self._table} '
+                f'(id, {columns}, irregular, document) VALUES ({placeholders})',
+                rows,
+            )
+
+    def __delitem__(self, document_id: str) -> None:
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                f'DELETE FROM {self._table} WHERE id = ?', (document_id,)
+            )
+        if not cursor.rowcount:
+            raise KeyError(document_id)
+
+    def __contains__(self, document_id: str) -> bool:
+        with self._lock:
+            row = self._connection.execute(
+                f'SELECT 1 FROM {self._table} WHERE id = ?', (document_id,)
+            ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute(
+                f'SELECT count(*) FROM {self._table}'
+            ).fetchone()[0]
+
+    def select(
+        self, where: str = '', parameters: Iterable[Any] = ()
+    ) -> list[dict[str, Any]]:
+        """Return the documents of the rows matching a WHERE clause."""
+        query = f'SELECT document FROM {self._table}'
+        if where:
+            query = f'{query} WHERE {where}'
+        with self._lock:
+            rows = self._connection.execute(query, tuple(parameters)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def values(self) -> Generator[dict[str, Any], None, None]:
+        yield from self.select()
+
+    def items(self) -> Generator[tuple[str, dict[str, Any]], None, None]:
+        for document in self.select():
+            yield document[ID_KEY], document
+
+
+class SqliteDocumentCollection(SimpleBackendDocumentCollection):
+    """Document collection pushing selectors on indexed keys down to SQL."""
+
+    _backend: SqliteBackend
+
+    def _new_iterator_over_matching_documents(self, selector):
+        clauses = []
+        parameters: list[Any] = []
+        for key, value in selector.items():
+            if key not in INDEXED_KEYS:
+                continue
+            if not _contains_operator(value):
+                if isinstance(value, _SCALAR_TYPES):
+                    clauses.append(f'({key} = ? OR irregular = 1)')
+                    parameters.append(value)
+            elif list(value) == ['$in'] and isinstance(value['$in'], list):
+                in_values = value['$in']
+                if in_values and all(isinstance(v, _SCALAR_TYPES) for v in in_values):
+                    placeholders = ', '.join('?' * len(in_values))
+                    clauses.append(f'({key} IN ({placeholders}) OR irregular = 1)')
+                    parameters.extend(in_values)
+        if not clauses:
+            return super()._new_iterator_over_matching_documents(selector)
+
+        documents = self._backend.select(' AND '.join(clauses), parameters)
+        # SQL only narrows the candidates, the matchers give the exact result
+        pred = _create_pred_from_selector(selector)
+        return (document for document in documents if pred(document))
+
+    def ensure_index(self, complex_key: str):
+        if complex_key in INDEXED_KEYS:
+            # backed by an SQL index
+            return defer.succeed(None)
+        return super().ensure_index(complex_key)
+
+
+class SqliteDatabase(AbstractDatabase):
+    def __init__(self, filename: str, generator_factory: GeneratorFactory) -> None:
+        self._filename = filename
+        self._generator_factory = generator_factory
+        self._collections: dict[str, SqliteDocumentCollection] = {}
+        self._lock = threading.RLock()
+        self._connection = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self._filename)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        connection = sqlite3.connect(self._filename, check_same_thread=False)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        return connection
+
+    def close(self) -> None:
+        for collection in self._collections.values():
+            collection.close()
+        self._collections = {}
+        with self._lock:
+            self._connection.close()
+
+    def backend(self, collection_id: str) -> SqliteBackend:
+        return SqliteBackend(self._connection, self._lock, collection_id)
+
+    def _new_collection(self, collection_id: str) -> SqliteDocumentCollection:
+        try:
+            backend = self.backend(collection_id)
+        except (ValueError, sqlite3.Error) as e:
+            # could not create collection
+            raise ValueError(e)
+        return SqliteDocumentCollection(backend, self._generator_factory())
+
+    def collection(self, collection_id: str) -> SqliteDocumentCollection:
+        if (
+            collection_id not in self._collections
+            or self._collections[collection_id].closed
+        ):
+            self._collections[collection_id] = self._new_collection(collection_id)
+        return self._collections[collection_id]
+
+
+def _read_json_directory(
+    directory: str,
+) -> Generator[tuple[str, dict[str, Any]], None, None]:
+    for rel_filename in sorted(os.listdir(directory)):
+        abs_filename = os.path.join(directory, rel_filename)
+        try:
+            with open(abs_filename) as f:
+                document = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning('Could not load JSON document %s: %s', abs_filename, e)
+        else:
+            yield rel_filename, document
+
+
+def migrate_json_directory(
+    json_db_dir: str, database: SqliteDatabase, batch_size: int = 1000
+) -> dict[str, int]:
+    """Import the collections of a JSON backend directory.
+
+    Every subdirectory of json_db_dir is a collection and every file in it a
+    document named by its ID. Documents already in the database are
+    replaced. Return the number of imported documents by collection.
+    """
+    counts = {}
+    for collection_id in sorted(os.listdir(json_db_dir)):
+        directory = os.path.join(json_db_dir, collection_id)
+        if not os.path.isdir(directory):
+            continue
+        backend = database.backend(collection_id)
+        count = 0
+        batch = []
+        for document_id, document in _read_json_directory(directory):
+            batch.append((document_id, document))
+            if len(batch) >= batch_size:
+                backend.put_many(batch)
+                count += len(batch)
+                batch = []
+        backend.put_many(batch)
+        count += len(batch)
+        counts[collection_id] = count
+        logger.info('Migrated %s documents of collection %s', count, collection_id)
+    return counts
+
+
+class SqliteDatabaseFactory(AbstractDatabaseFactory):
+    @staticmethod
+    def new_database(
+        db_type: str, generator: Literal['default', 'numeric', 'uuid'], **kwargs: Any
+    ) -> SqliteDatabase:
+        if db_type != 'sqlite':
+            raise ValueError(f'unrecognised type "{db_type}"')
+        try:
+            filename = kwargs['sqlite_db_file']
+        except KeyError:
+            raise ValueError(f'missing "sqlite_db_file" arguments in "{kwargs}"')
+
+        generator_factory = get_id_generator_factory(generator)
+        is_new = not os.path.exists(filename)
+        database = SqliteDatabase(filename, generator_factory)
+
+        # first start after switching from the JSON backend
+        json_db_dir = kwargs.get('json_db_dir')
+        if is_new and json_db_dir and os.path.isdir(json_db_dir):
+            logger.info('Importing JSON database %s into %s', json_db_dir, filename)
+            migrate_json_directory(json_db_dir, database)
+        return database
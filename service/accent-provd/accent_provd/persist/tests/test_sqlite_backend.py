@@ -0,0 +1,180 @@
+# Copyright 2023 Accent Communications
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from typing import Any
+
+from accent_provd.persist.common import InvalidIdError
+from accent_provd.persist.id import numeric_id_generator
+from accent_provd.persist.json_backend import new_json_collection
+from accent_provd.persist.sqlite_backend import (
+    SqliteDatabase,
+    SqliteDatabaseFactory,
+    migrate_json_directory,
+)
+from twisted.internet.defer import Deferred
+
+
+def _result(deferred: Deferred) -> Any:
+    results = []
+    deferred.addBoth(results.append)
+    return results[0]
+
+
+DEVICES = [
+    {'id': 'd1', 'mac': '00:11:22:33:44:01', 'ip': '10.0.0.1', 'plugin': 'p1'},
+    {'id': 'd2', 'mac': '00:11:22:33:44:02', 'ip': '10.0.0.2', 'plugin': 'p1'},
+    {'id': 'd3', 'mac': '00:11:22:33:44:03', 'config': 'c1', 'plugin': 'p2'},
+    {'id': 'd4', 'ip': ['10.0.0.4', '10.0.0.5'], 'vendor': 'Aastra'},
+    {'id': 'd5', 'mac': '00:11:22:33:44:05', 'config': 'c1', 'configured': True},
+]
+
+SELECTORS: list[dict[str, Any]] = [
+    {},
+    {'mac': '00:11:22:33:44:02'},
+    {'ip': '10.0.0.4'},
+    {'plugin': 'p1', 'ip': '10.0.0.1'},
+    {'plugin': {'$in': ['p1', 'p2']}},
+    {'config': 'c1', 'configured': True},
+    {'mac': {'$exists': False}},
+    {'plugin': {'$ne': 'p1'}},
+    {'vendor': 'Aastra'},
+    {'mac': 'unknown'},
+]
+
+
+class TestSqliteBackend(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.mkdtemp()
+        self.database = SqliteDatabase(
+            os.path.join(self.tmp_dir, 'provd.sqlite'), numeric_id_generator
+        )
+        self.collection = self.database.collection('devices')
+
+    def tearDown(self) -> None:
+        self.database.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_insert_retrieve_update_delete(self) -> None:
+        document = {'mac': '00:11:22:33:44:55', 'ip': '10.0.0.1'}
+
+        document_id = _result(self.collection.insert(document))
+        retrieved = _result(self.collection.retrieve(document_id))
+
+        self.assertEqual(retrieved, {'id': document_id, **document})
+
+        retrieved['ip'] = '10.0.0.2'
+        self.assertEqual(
+            _result(self.collection.retrieve(document_id))['ip'], '10.0.0.1'
+        )
+        _result(self.collection.update(retrieved))
+        self.assertEqual(
+            _result(self.collection.find_one({'ip': '10.0.0.2'}))['id'], document_id
+        )
+
+        _result(self.collection.delete(document_id))
+        self.assertIsNone(_result(self.collection.retrieve(document_id)))
+
+    def test_insert_existing_id(self) -> None:
+        self.collection.insert({'id': 'a'})
+
+        self.assertRaises(InvalidIdError, self.collection.insert, {'id': 'a'})
+
+    def test_update_unknown_id(self) -> None:
+        failure = _result(self.collection.update({'id': 'unknown'}))
+
+        self.assertIsInstance(failure.value, InvalidIdError)
+
+    def test_find_is_the_same_as_json_backend(self) -> None:
+        json_collection = new_json_collection(
+            os.path.join(self.tmp_dir, 'json'), numeric_id_generator()
+        )
+        for device in DEVICES:
+            self.collection.insert(dict(device))
+            json_collection.insert(dict(device))
+
+        for selector in SELECTORS:
+            expected = _result(json_collection.find(selector, sort=('id', 1)))
+            result = _result(self.collection.find(selector, sort=('id', 1)))
+            self.assertEqual(list(result), list(expected), selector)
+
+    def test_find_uses_sql_index(self) -> None:
+        plan = self.database._connection.execute(
+            'EXPLAIN QUERY PLAN SELECT document FROM devices '
+            'WHERE (mac = ? OR irregular = 1)',
+            ('00:11:22:33:44:01',),
+        ).fetchall()
+
+        self.assertNotIn('SCAN devices', ' '.join(row[-1] for row in plan))
+
+    def test_find_fields_skip_limit(self) -> None:
+        for device in DEVICES:
+            self.collection.insert(dict(device))
+
+        result = _result(
+            self.collection.find(
+                {'plugin': 'p1'}, fields=['mac'], skip=1, limit=1, sort=('id', 1)
+            )
+        )
+
+        self.assertEqual(list(result), [{'id': 'd2', 'mac': '00:11:22:33:44:02'}])
+
+    def test_persisted_across_connections(self) -> None:
+        self.collection.insert({'id': 'a', 'mac': 'x'})
+        self.database.close()
+
+        self.database = SqliteDatabase(
+            os.path.join(self.tmp_dir, 'provd.sqlite'), numeric_id_generator
+        )
+        collection = self.database.collection('devices')
+
+        self.assertEqual(_result(collection.find_one({'mac': 'x'}))['id'], 'a')
+
+
+class TestMigration(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.mkdtemp()
+        self.json_db_dir = os.path.join(self.tmp_dir, 'jsondb')
+        for collection_id, documents in (('devices', DEVICES), ('configs', [])):
+            directory = os.path.join(self.json_db_dir, collection_id)
+            os.makedirs(directory)
+            for document in documents:
+                with open(os.path.join(directory, document['id']), 'w') as f:
+                    json.dump(document, f)
+        with open(os.path.join(self.json_db_dir, 'devices', 'broken'), 'w') as f:
+            f.write('{')
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.tmp_dir)
+
+    def test_migrate_json_directory(self) -> None:
+        database = SqliteDatabase(
+            os.path.join(self.tmp_dir, 'provd.sqlite'), numeric_id_generator
+        )
+
+        counts = migrate_json_directory(self.json_db_dir, database, batch_size=2)
+
+        self.assertEqual(counts, {'configs': 0, 'devices': len(DEVICES)})
+        collection = database.collection('devices')
+        self.assertEqual(
+            _result(collection.retrieve('d3')), DEVICES[2]
+        )
+        database.close()
+
+    def test_factory_imports_json_database_on_creation(self) -> None:
+        database = SqliteDatabaseFactory.new_database(
+            'sqlite',
+            'default',
+            sqlite_db_file=os.path.join(self.tmp_dir, 'provd.sqlite'),
+            json_db_dir=self.json_db_dir,
+        )
+
+        device = _result(database.collection('devices').find_one({'ip': '10.0.0.2'}))
+
+        self.assertEqual(device['id'], 'd2')
+        database.close()
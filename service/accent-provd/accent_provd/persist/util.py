@@ -288,7 +288,7 @@ class SimpleBackendDocumentCollection(AbstractDocumentCollection):
         key_fun = _new_key_fun_from_key(key)
         reverse = self._reverse_from_direction(direction)
         documents.sort(key=key_fun, reverse=reverse)
-        documents = list(self._new_skip_iterator(skip, documents))
+        documents = self._new_skip_iterator(skip, documents)
         documents = list(self._new_limit_iterator(limit, documents))
         return iter(documents)
 
@@ -9,6 +9,7 @@ import operator
 import os
 import shutil
 import tarfile
+import threading
 from abc import ABCMeta, abstractmethod
 from binascii import a2b_hex
 from collections.abc import Callable
@@ -519,9 +520,16 @@ class TemplatePluginHelper:
 
     def dump(self, template, context, filename, encoding='UTF-8', errors='strict'):
         logger.info('Writing template to file "%s"', filename)
-        tmp_filename = filename + '.tmp'
-        template.stream(context).dump(tmp_filename, encoding, errors)
-        os.rename(tmp_filename, filename)
+        # devices can be configured in parallel threads: the temporary file
+        # is unique so that a file is always replaced by a complete one
+        tmp_filename = f'{filename}.{threading.get_ident()}.tmp'
+        try:
+            template.stream(context).dump(tmp_filename, encoding, errors)
+            os.replace(tmp_filename, filename)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_filename)
+            raise
 
     def render(self, template, context, encoding='UTF-8', errors='replace'):
         return template.render(context).encode(encoding, errors)
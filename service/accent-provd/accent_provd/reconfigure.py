@@ -0,0 +1,192 @@
+# Copyright 2023 Accent Communications
+
+"""Reconfiguration of many devices at once.
+
+A change to a config affects every device using this config or one of its
+descendants. Instead of reconfiguring them one after the other while holding
+the application write lock, the devices are reconfigured by a bounded pool
+of worker threads, each device under the shared read lock only. Writers,
+like the device updates done by the provisioning requests, are privileged by
+the lock and only wait for the devices being reconfigured, not for the
+whole run.
+
+Each device is reconfigured from its current state, so a device updated or
+deleted during the run is never configured with stale data.
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+from collections.abc import Callable
+from copy import deepcopy
+from typing import TYPE_CHECKING, Any
+
+from accent_provd.operation import (
+    OIP_FAIL,
+    OIP_PROGRESS,
+    OIP_SUCCESS,
+    OperationInProgress,
+)
+from accent_provd.persist.common import ID_KEY
+from twisted.internet import defer, reactor, threads
+from twisted.internet.defer import Deferred
+from twisted.python.threadpool import ThreadPool
+
+if TYPE_CHECKING:
+    from .app import ProvisioningApplication
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 4
+
+
+class MassReconfigurator:
+    """Reconfigure the devices matching a selector in parallel."""
+
+    def __init__(
+        self,
+        app: ProvisioningApplication,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        run_in_thread: Callable[..., Deferred] | None = None,
+    ) -> None:
+        """
+        run_in_thread -- a function calling a blocking function and returning
+          a deferred firing with its result, defaults to a dedicated thread
+          pool of max_workers threads
+        """
+        self._app = app
+        self._max_workers = max(1, max_workers)
+        self._pool: ThreadPool | None = None
+        self._run_in_thread = run_in_thread or self._run_in_pool
+        self._raw_configs: dict[str, Any] = {}
+        self._raw_configs_version = -1
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.stop()
+            self._pool = None
+
+    def _run_in_pool(self, fun: Callable, *args: Any) -> Deferred:
+        if self._pool is None:
+            self._pool = ThreadPool(0, self._max_workers, 'provd-reconfigure')
+            self._pool.start()
+        return threads.deferToThreadPool(reactor, self._pool, fun, *args)
+
+    def reconfigure(
+        self, selector: dict[str, Any], label: str = 'reconfigure'
+    ) -> tuple[Deferred, OperationInProgress]:
+        """Reconfigure every device matching the selector.
+
+        Return a tuple (deferred, operation in progress). The deferred fires
+        with a (configured, failed) tuple, the number of devices successfully
+        configured and the number of devices that could not be configured.
+
+        The current step of the operation in progress is the number of
+        reconfigured devices.
+
+        """
+        oip = OperationInProgress(label, OIP_PROGRESS, current=0)
+        deferred = self._reconfigure(selector, oip)
+
+        def callback(result: tuple[int, int]) -> tuple[int, int]:
+            oip.state = OIP_SUCCESS
+            return result
+
+        def errback(err):
+            oip.state = OIP_FAIL
+            logger.error('Error while reconfiguring devices: %s', err.value)
+            return err
+
+        deferred.addCallbacks(callback, errback)
+        return deferred, oip
+
+    @defer.inlineCallbacks
+    def _reconfigure(self, selector: dict[str, Any], oip: OperationInProgress):
+        devices = yield self._app._rw_lock.read_lock.run(
+            self._app._dev_collection.find, selector, fields=[ID_KEY]
+        )
+        device_ids = [device[ID_KEY] for device in devices]
+        oip.end = len(device_ids)
+        logger.info('Reconfiguring %d devices', len(device_ids))
+
+        results = {True: 0, False: 0}
+        semaphore = defer.DeferredSemaphore(self._max_workers)
+
+        def on_done(configured: bool | None) -> None:
+            oip.current += 1
+            if configured is not None:
+                results[configured] += 1
+
+        deferreds = []
+        for device_id in device_ids:
+            d = semaphore.run(
+                self._app._rw_lock.read_lock.run, self._reconfigure_one, device_id
+            )
+            d.addCallback(on_done)
+            deferreds.append(d)
+        yield defer.gatherResults(deferreds, consumeErrors=True)
+
+        logger.info(
+            'Reconfigured %d devices, %d could not be configured',
+            results[True],
+            results[False],
+        )
+        defer.returnValue((results[True], results[False]))
+
+    def _get_raw_config(self, config_id: str | None) -> Deferred:
+        # Raw configs are shared by every device of a run, as long as no
+        # config has been modified since they were computed
+        if config_id is None:
+            return defer.succeed(None)
+        if self._raw_configs_version != self._app.cfg_version:
+            self._raw_configs = {}
+            self._raw_configs_version = self._app.cfg_version
+        if config_id in self._raw_configs:
+            return defer.succeed(self._raw_configs[config_id])
+
+        def callback(raw_config: dict[str, Any] | None) -> dict[str, Any] | None:
+            self._raw_configs[config_id] = raw_config
+            return raw_config
+
+        d = self._app.cfg_retrieve_raw_config(config_id)
+        d.addCallback(callback)
+        return d
+
+    @defer.inlineCallbacks
+    def _reconfigure_one(self, device_id: str):
+        # Return a deferred firing with True if the device has been
+        # configured, False if it could not be configured or None if it was
+        # skipped. Must be called with the read lock acquired.
+        device = yield self._app._dev_collection.retrieve(device_id)
+        if device is None:
+            # deleted since the start of the run
+            defer.returnValue(None)
+        plugin = self._app._dev_get_plugin(device)
+        if plugin is None:
+            defer.returnValue(None)
+        raw_config = yield self._get_raw_config(device.get('config'))
+
+        try:
+            configured = yield self._run_in_thread(
+                functools.partial(self._configure, device, plugin, raw_config)
+            )
+        except Exception:
+            logger.error(
+                'Error while reconfiguring device %s', device_id, exc_info=True
+            )
+            configured = False
+        if device['configured'] != configured:
+            device['configured'] = configured
+            yield self._app._dev_collection.update(device)
+        defer.returnValue(configured)
+
+    def _configure(self, device, plugin, raw_config: dict[str, Any] | None) -> bool:
+        # Called in a worker thread: the plugin renders and writes the device
+        # files. The raw config is copied since plugins are free to modify it.
+        if device['configured']:
+            self._app._dev_deconfigure(device, plugin)
+        if raw_config is None:
+            # the config of the device has been deleted
+            return False
+        return self._app._dev_configure(device, plugin, deepcopy(raw_config))
@@ -1058,6 +1058,7 @@ class ConfigManagerResource(IntermediaryResource):
         links = [
             ('cfg.configs', 'configs', ConfigsResource(app)),
             ('cfg.autocreate', 'autocreate', AutocreateConfigResource(app)),
+            ('cfg.reconfigure', 'reconfigure', ConfigReconfigureResource(app)),
         ]
         super().__init__(links)
 
@@ -1088,6 +1089,25 @@ class AutocreateConfigResource(AuthResource):
         return NOT_DONE_YET
 
 
+class ConfigReconfigureResource(_OipInstallResource):
+    def __init__(self, app: ProvisioningApplication) -> None:
+        super().__init__()
+        self._app = app
+
+    @json_request_entity
+    @required_acl('provd.cfg_mgr.reconfigure.create')
+    def render_POST(self, request: Request, content: dict[str, Any]):
+        try:
+            config_id = content['id']
+        except KeyError:
+            return respond_bad_json_entity(request, 'Missing "id" key')
+        else:
+            deferred, oip = self._app.cfg_reconfigure(config_id)
+            _ignore_deferred_error(deferred)
+            location = self._add_new_oip(oip, request)
+            return respond_created_no_content(request, location)
+
+
 class ConfigsResource(AuthResource):
     def __init__(self, app: ProvisioningApplication) -> None:
         super().__init__()
@@ -11,10 +11,14 @@ Things to note:
   request (WRQ) as for now.
 - netascii mode is not supported -- only octet mode is.
 - mail mode is, of course, not supported, since it's deprecated.
-- support the blksize option (RFC2348).
+- support the blksize (RFC2348), timeout and tsize (RFC2349) and
+  windowsize (RFC7440) options.
 - use zero-based wraparound when transferring files taking more than
   65535 blocks to transfer.
-- it's not using an adaptive timeout.
+- the retransmission timeout adapts to the measured round-trip time,
+  unless the client asked for a fixed one with the timeout option.
+- the content of the served files is shared by the transfers through a
+  read cache.
 - although it would be theorically possible to run the TFTP service on
   a different datagram service than UDP, currently it is not because
   of a hard-coded call to reactor.listenUDP in the code after a request
@@ -23,6 +27,7 @@ Things to note:
 """
 
 
+from accent_provd.servers.tftp.cache import SHARED_READ_CACHE, ReadCache
 from accent_provd.servers.tftp.proto import TFTPProtocol
 from accent_provd.servers.tftp.service import (
     TFTPFileService,
@@ -34,6 +39,8 @@ from accent_provd.servers.tftp.service import (
 )
 
 __all__ = [
+    'ReadCache',
+    'SHARED_READ_CACHE',
     'TFTPRequest',
     'TFTPNullService',
     'TFTPStringService',
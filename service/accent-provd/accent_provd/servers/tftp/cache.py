@@ -0,0 +1,97 @@
+# Copyright 2023 Accent Communications
+
+"""Cache of the content of the files served over TFTP.
+
+During a boot storm, thousands of devices download the same firmware and
+configuration files. The content of these files is read once and then
+shared by every transfer: each transfer gets its own file object over the
+same bytes object, without copying it.
+
+"""
+from __future__ import annotations
+
+import logging
+import os
+from collections import OrderedDict
+from io import BytesIO
+from typing import BinaryIO, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry(NamedTuple):
+    mtime_ns: int
+    size: int
+    content: bytes
+
+
+class ReadCache:
+    """A LRU cache of file contents, bounded by their total size.
+
+    Files are checked for modification (mtime and size) every time they are
+    opened, so a file modified on disk is never served stale.
+
+    """
+
+    def __init__(
+        self, max_size: int = 128 * 1024 * 1024, max_file_size: int = 64 * 1024 * 1024
+    ) -> None:
+        """
+        max_size -- the maximum total size of the cached contents, in bytes
+        max_file_size -- files bigger than this are read from disk every time
+
+        """
+        self.max_size = max_size
+        self.max_file_size = min(max_file_size, max_size)
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def open(self, filename: str) -> BinaryIO:
+        """Return a binary file object over the content of a file.
+
+        Raise an OSError if the file can't be read.
+
+        """
+        stat = os.stat(filename)
+        if stat.st_size > self.max_file_size:
+            return open(filename, 'rb')
+
+        entry = self._entries.get(filename)
+        if entry is not None and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+            self.hits += 1
+            self._entries.move_to_end(filename)
+            return BytesIO(entry.content)
+
+        self.misses += 1
+        with open(filename, 'rb') as fobj:
+            content = fobj.read()
+        self._put(filename, _Entry(stat.st_mtime_ns, len(content), content))
+        return BytesIO(content)
+
+    def invalidate(self, filename: str | None = None) -> None:
+        """Remove a file from the cache, or every file if filename is None."""
+        if filename is None:
+            self._entries.clear()
+            self.size = 0
+        elif (entry := self._entries.pop(filename, None)) is not None:
+            self.size -= entry.size
+
+    def _put(self, filename: str, entry: _Entry) -> None:
+        self.invalidate(filename)
+        if entry.size > self.max_file_size:
+            return
+        self._entries[filename] = entry
+        self.size += entry.size
+        while self.size > self.max_size:
+            evicted_filename, evicted = self._entries.popitem(last=False)
+            self.size -= evicted.size
+            logger.debug('Evicted %s from the TFTP read cache', evicted_filename)
+
+
+SHARED_READ_CACHE = ReadCache()
+"""The read cache used by default by the file services."""
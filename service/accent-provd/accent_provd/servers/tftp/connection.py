@@ -5,7 +5,8 @@ from __future__ import annotations
 
 import logging
 import struct
-from typing import BinaryIO
+from collections import deque
+from typing import TYPE_CHECKING, BinaryIO
 
 from accent_provd.servers.tftp.packet import (
     ERR_ILL,
@@ -23,7 +24,8 @@ from accent_provd.servers.tftp.packet import (
 from twisted.internet import reactor
 from twisted.internet.protocol import DatagramProtocol
 
-# TODO RFC1122 says we must use an adaptive timeout...
+if TYPE_CHECKING:
+    from twisted.internet.interfaces import IDelayedCall, IReactorTime
 
 
 logger = logging.getLogger(__name__)
@@ -45,13 +47,63 @@ def _unpack_to_uint16(data: bytes) -> int:
     return _UINT16_STRUCT.unpack(data)[0]
 
 
+class RetransmissionTimer:
+    """Compute the retransmission timeout from the measured round-trip times.
+
+    The estimation is the one used by TCP (RFC6298): the timeout is the
+    smoothed round-trip time plus four times its variation, bounded by
+    min_timeout and max_timeout, and doubled on every expiration.
+
+    """
+
+    alpha = 1 / 8
+    beta = 1 / 4
+
+    def __init__(
+        self, initial_timeout: float, min_timeout: float, max_timeout: float
+    ) -> None:
+        self.timeout = initial_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.srtt: float | None = None
+        self.rttvar = 0.0
+
+    def add_sample(self, rtt: float) -> None:
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = (1 - self.beta) * self.rttvar + self.beta * abs(
+                self.srtt - rtt
+            )
+            self.srtt = (1 - self.alpha) * self.srtt + self.alpha * rtt
+        self.timeout = self._bound(self.srtt + 4 * self.rttvar)
+
+    def backoff(self) -> None:
+        self.timeout = self._bound(self.timeout * 2)
+
+    def _bound(self, timeout: float) -> float:
+        return min(max(timeout, self.min_timeout), self.max_timeout)
+
+
+class _SentDgram:
+    __slots__ = ('blk_no', 'dgram', 'sent_at', 'retransmitted')
+
+    def __init__(self, blk_no: int, dgram: bytes, sent_at: float) -> None:
+        # blk_no is the block number without wraparound
+        self.blk_no = blk_no
+        self.dgram = dgram
+        self.sent_at = sent_at
+        self.retransmitted = False
+
+
 class _AbstractConnection(DatagramProtocol):
     """Represent a connection from the point of view of the server.
 
     The '_blk_no' instance attribute MUST be supplied in derived class.
-    This value should be equal to the first value of the block number field.
-    This value should be modified by the derived class such that it always
-    reflect the block number we are waiting in the next ACK packet.
+    This value should be equal to the number of the block preceding the
+    first datagram, i.e. -1 if the first datagram is an OACK packet (whose
+    acknowledgement is for block 0), else 0.
 
     The '_next_dgram' method MUST be overridden in derived class. It should
     return the next datagram to send to the client. This is usually a DATA
@@ -60,26 +112,54 @@ class _AbstractConnection(DatagramProtocol):
     The '_close' method MAY be overridden in derived class. It will be called
     once after the connection is closed, in any circumstances.
 
+    Up to 'windowsize' DATA packets are sent before waiting for an
+    acknowledgement (RFC7440). Unless 'adaptive_timeout' is false, the
+    retransmission timeout adapts to the measured round-trip time, starting
+    from 'timeout'. The connection is closed once 'max_retries' consecutive
+    retransmissions went unanswered for at least 'max_retries' times
+    'timeout' seconds.
+
     """
 
     _blk_no: int
     blksize = 512
-    timeout = 4
+    windowsize = 1
+    timeout: float = 4
+    adaptive_timeout = True
+    min_timeout = 0.05
+    max_timeout = 8.0
     max_retries = 4
 
-    def __init__(self, addr: str) -> None:
+    def __init__(self, addr: str, clock: IReactorTime | None = None) -> None:
         """Create a new connection with a remote host.
 
         addr is the address of the remote host.
 
         """
         self._addr = addr
+        self._clock = clock or reactor
         self._closed = False
         self._dup_ack = False
-        self._last_dgram: bytes = None  # type: ignore[assignment]
+        self._eof = False
+        self._unacked: deque[_SentDgram] = deque()
         self._last_blk_no: int | None = None
+        self._last_progress_at = 0.0
         self._retry_cnt = 0
-        self._timeout_timer = None
+        self._timeout_timer: IDelayedCall | None = None
+        self._rto: RetransmissionTimer | None = None
+
+    @property
+    def retransmission_timer(self) -> RetransmissionTimer:
+        if self._rto is None:
+            if self.adaptive_timeout:
+                self._rto = RetransmissionTimer(
+                    self.timeout, self.min_timeout, self.max_timeout
+                )
+            else:
+                self._rto = RetransmissionTimer(
+                    self.timeout, self.timeout, self.timeout
+                )
+        return self._rto
 
     def _close(self) -> None:
         """Close this connection.
@@ -102,41 +182,92 @@ class _AbstractConnection(DatagramProtocol):
             self._cancel_timeout()
             self._close()
             self._closed = True
-            self.transport.stopListening()
+            if self.transport is not None:
+                # None when the port is already being closed
+                self.transport.stopListening()
 
     def _cancel_timeout(self) -> None:
         if self._timeout_timer:
-            self._retry_cnt = 0
             self._timeout_timer.cancel()
             self._timeout_timer = None
 
     def _set_timeout(self) -> None:
-        self._timeout_timer = reactor.callLater(self.timeout, self._timeout_expired)
+        self._cancel_timeout()
+        self._timeout_timer = self._clock.callLater(
+            self.retransmission_timer.timeout, self._timeout_expired
+        )
 
     def _timeout_expired(self) -> None:
         logger.info('Timeout has expired with current retry count %s', self._retry_cnt)
         self._timeout_timer = None
         self._retry_cnt += 1
-        if self._retry_cnt >= self.max_retries:
+        idle_time = self._clock.seconds() - self._last_progress_at
+        if (
+            self._retry_cnt >= self.max_retries
+            and idle_time >= self.max_retries * self.timeout
+        ):
             self.__do_close()
         else:
-            self._send_last_dgram()
+            self.retransmission_timer.backoff()
+            self._resend_unacked()
 
     def _send_dgram(self, dgram: bytes) -> None:
         self.transport.write(dgram, self._addr)
-        self._set_timeout()
 
-    def _send_next_dgram(self) -> None:
-        try:
-            dgram = self._next_dgram()
-        except _NoMoreDatagramError:
-            self.__do_close()
+    def _fill_window(self) -> None:
+        while len(self._unacked) < self.windowsize and not self._eof:
+            if self._unacked and self._unacked[-1].blk_no == 0:
+                # wait for the acknowledgement of the OACK
+                break
+            try:
+                dgram = self._next_dgram()
+            except _NoMoreDatagramError:
+                self._eof = True
+            else:
+                self._send_dgram(dgram)
+                self._unacked.append(
+                    _SentDgram(self._blk_no, dgram, self._clock.seconds())
+                )
+
+        if self._unacked:
+            self._set_timeout()
         else:
-            self._send_dgram(dgram)
-            self._last_dgram = dgram
+            self.__do_close()
+
+    def _resend_unacked(self) -> None:
+        now = self._clock.seconds()
+        for sent in self._unacked:
+            sent.retransmitted = True
+            sent.sent_at = now
+            self._send_dgram(sent.dgram)
+        self._set_timeout()
 
-    def _send_last_dgram(self) -> None:
-        self._send_dgram(self._last_dgram)
+    def _find_unacked(self, blk_no: int) -> int | None:
+        for i, sent in enumerate(self._unacked):
+            if sent.blk_no % 65536 == blk_no:
+                return i
+        return None
+
+    def _send_dgram_after_ack(self, index: int) -> None:
+        acked = self._unacked[index]
+        if not acked.retransmitted:
+            # Karn's algorithm: the round-trip time of retransmitted blocks
+            # is ambiguous
+            self.retransmission_timer.add_sample(self._clock.seconds() - acked.sent_at)
+        for _ in range(index + 1):
+            self._unacked.popleft()
+        self._last_blk_no = acked.blk_no % 65536
+        self._last_progress_at = self._clock.seconds()
+        self._dup_ack = False
+        self._retry_cnt = 0
+        if self._unacked:
+            # the remote host did not receive the whole window
+            self._resend_unacked()
+        self._fill_window()
+
+    def _send_next_dgram(self) -> None:
+        self._last_progress_at = self._clock.seconds()
+        self._fill_window()
 
     def _handle_wrong_tid(self, addr: str) -> None:
         dgram = build_dgram(err_packet(ERR_UNKNWN_TID, b'Unknown TID'))
@@ -155,16 +286,18 @@ class _AbstractConnection(DatagramProtocol):
 
     def _handle_ack(self, pkt: AckPacket) -> None:
         blk_no = _unpack_to_uint16(pkt['blkno'])
-        if blk_no == self._blk_no:
-            self._last_blk_no = blk_no
-            self._dup_ack = False
-            self._cancel_timeout()
-            self._send_next_dgram()
+        index = self._find_unacked(blk_no)
+        if index is not None:
+            self._send_dgram_after_ack(index)
         elif blk_no == self._last_blk_no:
+            # the remote host timed out waiting for the next block; answer
+            # only the first duplicate to avoid the Sorcerer's Apprentice bug
             if not self._dup_ack:
                 self._dup_ack = True
-                self._cancel_timeout()
-                self._send_last_dgram()
+                self._resend_unacked()
+        elif self.windowsize > 1:
+            # acknowledgement of a block of a previous window received late
+            logger.debug('Ignoring acknowledgement of block %s', blk_no)
         else:
             self._handle_illegal_pkt(b'Illegal block number')
 
@@ -200,7 +333,9 @@ class _AbstractConnection(DatagramProtocol):
 
 
 class RFC1350Connection(_AbstractConnection):
-    def __init__(self, addr: str, fobj: BinaryIO) -> None:
+    def __init__(
+        self, addr: str, fobj: BinaryIO, clock: IReactorTime | None = None
+    ) -> None:
         """Create a new RFC1350 connection.
 
         addr -- the address of the remote host.
@@ -208,7 +343,7 @@ class RFC1350Connection(_AbstractConnection):
                 This object will call its close method.
 
         """
-        super().__init__(addr)
+        super().__init__(addr, clock)
         self._fobj = fobj
         self._blk_no = 0
         self._last_buf: bytes | None = None
@@ -217,26 +352,25 @@ class RFC1350Connection(_AbstractConnection):
         self._fobj.close()
 
     def _next_dgram(self) -> bytes:
-        buf = self._fobj.read(self.blksize)
-        if (
-            not buf
-            and self._blk_no != 0
-            and (self._last_buf and len(self._last_buf) != self.blksize)
-        ):
-            # no more datagram if:
-            # - there's no more content to be read from the file (not buf)
-            # - at least one datagram has been sent (self._blk_no != 0)
-            # - the last block we sent was not the size of blksize
+        if self._last_buf is not None and len(self._last_buf) != self.blksize:
+            # no more datagram if the last block we sent was not the size of
+            # blksize; an empty file is sent as one empty block
             raise _NoMoreDatagramError()
-        else:
-            self._last_buf = buf
-            self._blk_no = (self._blk_no + 1) % 65536
-            dgram = build_dgram(data_packet(_pack_from_uint16(self._blk_no), buf))
-            return dgram
+
+        buf = self._fobj.read(self.blksize)
+        self._last_buf = buf
+        self._blk_no += 1
+        return build_dgram(data_packet(_pack_from_uint16(self._blk_no % 65536), buf))
 
 
 class RFC2347Connection(_AbstractConnection):
-    def __init__(self, addr: str, fobj: BinaryIO, oack_dgram: bytes) -> None:
+    def __init__(
+        self,
+        addr: str,
+        fobj: BinaryIO,
+        oack_dgram: bytes,
+        clock: IReactorTime | None = None,
+    ) -> None:
         """Create a new RFC2347 connection.
 
         addr -- the address of the remote host.
@@ -245,7 +379,7 @@ class RFC2347Connection(_AbstractConnection):
         oack_dgram -- an option acknowledgement datagram
 
         """
-        super().__init__(addr)
+        super().__init__(addr, clock)
         self._fobj = fobj
         self._oack_dgram = oack_dgram
         self._blk_no = -1
@@ -259,15 +393,12 @@ class RFC2347Connection(_AbstractConnection):
             self._blk_no += 1
             return self._oack_dgram
 
-        buf = self._fobj.read(self.blksize)
-        if not buf and self._blk_no != 0 and len(self._last_buf or '') != self.blksize:
-            # no more datagram if:
-            # - there's no more content to be read from the file (not buf)
-            # - at least one datagram has been sent (self._blk_no != 0)
-            # - the last block we sent was not the size of blksize
+        if self._last_buf is not None and len(self._last_buf) != self.blksize:
+            # no more datagram if the last block we sent was not the size of
+            # blksize; an empty file is sent as one empty block
             raise _NoMoreDatagramError()
 
+        buf = self._fobj.read(self.blksize)
         self._last_buf = buf
-        self._blk_no = (self._blk_no + 1) % 65536
-        dgram = build_dgram(data_packet(_pack_from_uint16(self._blk_no), buf))
-        return dgram
+        self._blk_no += 1
+        return build_dgram(data_packet(_pack_from_uint16(self._blk_no % 65536), buf))
@@ -7,10 +7,11 @@ A packet is a dictionary object. A dgram (datagram) is a string object.
 """
 from __future__ import annotations
 
+import logging
 from collections.abc import Callable
 from typing import TypedDict, Union
 
-from accent_provd.app import logger
+logger = logging.getLogger(__name__)
 
 PacketOptions = dict[bytes, Union[bytes, int]]
 
@@ -72,19 +73,32 @@ class PacketError(Exception):
     pass
 
 
-def _parse_option_blksize(string: bytes) -> int:
-    try:
-        blksize = int(string)
-    except ValueError:
-        raise PacketError('invalid blksize value - not a number')
+def _new_int_option_parser(
+    name: str, min_value: int, max_value: int
+) -> Callable[[bytes], int]:
+    def parse(string: bytes) -> int:
+        try:
+            value = int(string)
+        except ValueError:
+            raise PacketError(f'invalid {name} value - not a number')
+
+        if value < min_value or value > max_value:
+            raise PacketError(f'invalid {name} value - out of range')
+        return value
+
+    return parse
 
-    if blksize < 8 or blksize > 65464:
-        raise PacketError('invalid blksize value - out of range')
-    return blksize
 
+_parse_option_blksize = _new_int_option_parser('blksize', 8, 65464)  # RFC2348
+_parse_option_timeout = _new_int_option_parser('timeout', 1, 255)  # RFC2349
+_parse_option_tsize = _new_int_option_parser('tsize', 0, 2**63)  # RFC2349
+_parse_option_windowsize = _new_int_option_parser('windowsize', 1, 65535)  # RFC7440
 
 _PARSE_OPT_MAP: dict[bytes, Callable[[bytes], int]] = {
     b'blksize': _parse_option_blksize,
+    b'timeout': _parse_option_timeout,
+    b'tsize': _parse_option_tsize,
+    b'windowsize': _parse_option_windowsize,
 }
 
 
@@ -115,12 +129,6 @@ def _parse_request(opcode: bytes, dgram: bytes) -> RequestPacket:
             raise PacketError('same option specified more than once')
         opt_fct = _PARSE_OPT_MAP.get(opt, lambda x: x)
         options[opt] = opt_fct(val)
-        logger.error(
-            'Filename: %s, mode: %s, Options: %s',
-            tokens[0],
-            tokens[1].lower(),
-            options,
-        )
     return {
         'filename': tokens[0],
         'mode': tokens[1].lower(),
@@ -211,20 +219,21 @@ def _build_error(packet: ErrorPacket) -> bytes:
     return packet['errcode'] + packet['errmsg'] + b'\x00'
 
 
-def _build_oack(packet: ByteOptionAckPacket) -> bytes:
+def _build_oack(packet: OptionAckPacket) -> bytes:
+    elems = []
     for opt, val in packet['options'].items():
+        if isinstance(val, int):
+            val = str(val).encode('ascii')
         if b'\x00' in opt or b'\x00' in val:
             raise PacketError('null byte in option/value')
-    return (
-        b'\x00'.join(elem for pair in packet['options'].items() for elem in pair)
-        + b'\x00'
-    )
+        elems.extend((opt, val))
+    return b'\x00'.join(elems) + b'\x00'
 
 
 BuildCallbacks = Union[
     Callable[[DataPacket], bytes],
     Callable[[ErrorPacket], bytes],
-    Callable[[ByteOptionAckPacket], bytes],
+    Callable[[OptionAckPacket], bytes],
 ]
 
 _BUILD_MAP: dict[bytes, BuildCallbacks] = {
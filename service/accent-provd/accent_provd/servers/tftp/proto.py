@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import logging
+import os
 from collections.abc import Callable
 from typing import TYPE_CHECKING, BinaryIO, Union
 
@@ -12,6 +13,7 @@ from accent_provd.servers.tftp.packet import (
     OP_RRQ,
     OP_WRQ,
     PacketError,
+    PacketOptions,
     RequestPacket,
     build_dgram,
     err_packet,
@@ -30,6 +32,46 @@ logger = logging.getLogger(__name__)
 AcceptCallback = Callable[[Union[BinaryIO]], None]
 RejectCallback = Callable[[bytes, Union[str, bytes]], None]
 
+MAX_BLKSIZE = 65464
+MAX_WINDOWSIZE = 64
+
+
+def _file_size(fobj: BinaryIO) -> int | None:
+    # Return the size of the file, or None if it can't be known
+    try:
+        position = fobj.tell()
+        size = fobj.seek(0, os.SEEK_END)
+        fobj.seek(position)
+    except (AttributeError, OSError, ValueError):
+        return None
+    return size - position
+
+
+def negotiate_options(
+    options: PacketOptions,
+    fobj: BinaryIO,
+    max_blksize: int = MAX_BLKSIZE,
+    max_windowsize: int = MAX_WINDOWSIZE,
+) -> dict[bytes, int]:
+    """Return the options accepted for the transfer of a file.
+
+    The blksize (RFC2348), timeout and tsize (RFC2349) and windowsize
+    (RFC7440) options are supported, unknown options are ignored. The block
+    and window sizes requested by the client can be reduced.
+
+    """
+    accepted: dict[bytes, int] = {}
+    if b'blksize' in options:
+        accepted[b'blksize'] = min(int(options[b'blksize']), max_blksize)
+    if b'timeout' in options:
+        accepted[b'timeout'] = int(options[b'timeout'])
+    if b'tsize' in options:
+        if (size := _file_size(fobj)) is not None:
+            accepted[b'tsize'] = size
+    if b'windowsize' in options:
+        accepted[b'windowsize'] = min(int(options[b'windowsize']), max_windowsize)
+    return accepted
+
 
 class _Response:
     def __init__(self, freject: RejectCallback, faccept: AcceptCallback) -> None:
@@ -88,12 +130,19 @@ class TFTPProtocol(DatagramProtocol):
 
             def on_accept(fobj: BinaryIO) -> None:
                 logger.info('TFTP read request accepted')
-                if 'blksize' in pkt['options']:
-                    blksize: int = pkt['options']['blksize']  # type: ignore
-                    logger.debug('Using TFTP blksize of %s', blksize)
-                    oack_dgram = build_dgram(oack_packet({b'blksize': blksize}))
+                connection: RFC1350Connection | RFC2347Connection
+                if options := negotiate_options(pkt['options'], fobj):
+                    logger.debug('Using TFTP options %s', options)
+                    oack_dgram = build_dgram(oack_packet(options))  # type: ignore
                     connection = RFC2347Connection(addr, fobj, oack_dgram)
-                    connection.blksize = blksize
+                    connection.blksize = options.get(b'blksize', connection.blksize)
+                    connection.windowsize = options.get(
+                        b'windowsize', connection.windowsize
+                    )
+                    if b'timeout' in options:
+                        # the client asked for a fixed timeout
+                        connection.timeout = options[b'timeout']
+                        connection.adaptive_timeout = False
                 else:
                     connection = RFC1350Connection(addr, fobj)
                 reactor.listenUDP(0, connection)
@@ -7,8 +7,9 @@ import os
 from abc import ABCMeta
 from collections.abc import Callable
 from io import BytesIO
-from typing import TYPE_CHECKING, TypedDict
+from typing import TYPE_CHECKING, BinaryIO, TypedDict
 
+from ...servers.tftp.cache import SHARED_READ_CACHE, ReadCache
 from ...servers.tftp.packet import ERR_FNF, RequestPacket
 
 if TYPE_CHECKING:
@@ -82,10 +83,19 @@ class TFTPFileService(AbstractTFTPReadService):
     once normalized. For example, a request for filename 'bar/../../foo.txt'
     will be rejected even if 'foo.txt' exist in the parent directory.
 
+    Files are read through a read cache, shared by default by every file
+    service, unless cache is None.
+
     """
 
-    def __init__(self, path: str) -> None:
+    def __init__(self, path: str, cache: ReadCache | None = SHARED_READ_CACHE) -> None:
         self._path = os.path.abspath(path)
+        self._cache = cache
+
+    def _open(self, filename: str) -> BinaryIO:
+        if self._cache is None:
+            return open(filename, 'rb')
+        return self._cache.open(filename)
 
     def handle_read_request(self, request: TFTPRequest, response: _Response) -> None:
         rq_orig_path = request['packet']['filename'].decode('ascii')
@@ -95,7 +105,7 @@ class TFTPFileService(AbstractTFTPReadService):
             response.reject(ERR_FNF, b'Invalid filename')
         else:
             try:
-                fobj = open(rq_final_path, 'rb')
+                fobj = self._open(rq_final_path)
             except OSError:
                 response.reject(ERR_FNF, b'File not found')
             else:
@@ -2,9 +2,25 @@
 
 from __future__ import annotations
 
+import os
+import shutil
+import struct
+import tempfile
 import unittest
+from io import BytesIO
+from unittest.mock import Mock
 
-from accent_provd.servers.tftp.packet import OP_RRQ, PacketError, parse_dgram
+from accent_provd.servers.tftp.cache import ReadCache
+from accent_provd.servers.tftp.connection import RFC2347Connection
+from accent_provd.servers.tftp.packet import (
+    OP_RRQ,
+    PacketError,
+    build_dgram,
+    oack_packet,
+    parse_dgram,
+)
+from accent_provd.servers.tftp.proto import negotiate_options
+from twisted.internet import task
 
 
 class TestTFTP(unittest.TestCase):
@@ -24,3 +40,208 @@ class TestTFTP(unittest.TestCase):
         datagram = b'\x00\x05\x00\x01'
 
         self.assertRaises(PacketError, parse_dgram, datagram)
+
+    def test_parse_rrq_options(self) -> None:
+        pkt = parse_dgram(
+            b'\x00\x01fname\x00octet\x00BLKSIZE\x001428\x00tsize\x000\x00'
+            b'timeout\x002\x00windowsize\x0016\x00foo\x00bar\x00'
+        )
+
+        self.assertEqual(
+            pkt['options'],  # type: ignore[typeddict-item]
+            {
+                b'blksize': 1428,
+                b'tsize': 0,
+                b'timeout': 2,
+                b'windowsize': 16,
+                b'foo': b'bar',
+            },
+        )
+
+    def test_parse_rrq_invalid_options(self) -> None:
+        for option in (b'blksize\x004', b'timeout\x000', b'windowsize\x00x'):
+            self.assertRaises(
+                PacketError, parse_dgram, b'\x00\x01f\x00octet\x00' + option + b'\x00'
+            )
+
+    def test_build_oack_dgram(self) -> None:
+        dgram = build_dgram(oack_packet({b'blksize': 1428, b'foo': b'bar'}))
+
+        self.assertEqual(dgram, b'\x00\x06blksize\x001428\x00foo\x00bar\x00')
+
+
+class TestNegotiateOptions(unittest.TestCase):
+    def test_no_options(self) -> None:
+        self.assertEqual(negotiate_options({b'foo': b'bar'}, BytesIO(b'')), {})
+
+    def test_options(self) -> None:
+        options = negotiate_options(
+            {b'blksize': 1428, b'tsize': 0, b'timeout': 3, b'windowsize': 1000},
+            BytesIO(b'x' * 5000),
+            max_windowsize=32,
+        )
+
+        self.assertEqual(
+            options,
+            {b'blksize': 1428, b'tsize': 5000, b'timeout': 3, b'windowsize': 32},
+        )
+
+    def test_tsize_of_unseekable_file(self) -> None:
+        fobj = Mock(spec=['read', 'close'])
+
+        self.assertEqual(negotiate_options({b'tsize': 0}, fobj), {})
+
+
+def _ack(blk_no: int) -> bytes:
+    return b'\x00\x04' + struct.pack('!H', blk_no)
+
+
+def _blk_nos(dgrams: list[bytes]) -> list[int]:
+    return [struct.unpack('!H', dgram[2:4])[0] for dgram in dgrams]
+
+
+class TestConnection(unittest.TestCase):
+    addr = ('127.0.0.1', 5000)
+
+    def setUp(self) -> None:
+        self.clock = task.Clock()
+        self.sent: list[bytes] = []
+        self.transport = Mock()
+        self.transport.write.side_effect = lambda dgram, addr: self.sent.append(dgram)
+
+    def _connect(self, content: bytes, windowsize: int = 1, blksize: int = 512):
+        connection = RFC2347Connection(
+            self.addr, BytesIO(content), b'\x00\x06oack\x00', clock=self.clock
+        )
+        connection.windowsize = windowsize
+        connection.blksize = blksize
+        connection.transport = self.transport
+        connection.startProtocol()
+        self.assertEqual(self.sent.pop(0), b'\x00\x06oack\x00')
+        return connection
+
+    def _receive(self, connection, dgram: bytes) -> None:
+        connection.datagramReceived(dgram, self.addr)
+
+    def test_windowed_transfer(self) -> None:
+        connection = self._connect(b'x' * 40, windowsize=4, blksize=8)
+
+        self._receive(connection, _ack(0))
+        self.assertEqual(_blk_nos(self.sent), [1, 2, 3, 4])
+        self.sent.clear()
+        self._receive(connection, _ack(4))
+        self.assertEqual(_blk_nos(self.sent), [5, 6])
+        self.assertEqual(self.sent[-1], b'\x00\x03\x00\x06')
+        self._receive(connection, _ack(6))
+
+        self.transport.stopListening.assert_called_once_with()
+
+    def test_partial_window_ack_resends_the_rest(self) -> None:
+        connection = self._connect(b'x' * 40, windowsize=4, blksize=8)
+        self._receive(connection, _ack(0))
+        self.sent.clear()
+
+        self._receive(connection, _ack(2))
+
+        self.assertEqual(_blk_nos(self.sent), [3, 4, 5, 6])
+
+    def test_block_number_wraparound(self) -> None:
+        connection = self._connect(b'x' * 65540, windowsize=8, blksize=1)
+        blk_no = 0
+        acks = 0
+        while not self.transport.stopListening.called:
+            if self.sent:
+                blk_no = _blk_nos(self.sent)[-1]
+                self.sent.clear()
+            self._receive(connection, _ack(blk_no))
+            acks += 1
+
+        # 65540 full blocks and an empty one
+        self.assertEqual(blk_no, 65541 % 65536)
+        self.assertEqual(acks, 1 + 65541 // 8 + 1)
+
+    def test_timeout_adapts_to_round_trip_time(self) -> None:
+        connection = self._connect(b'x' * 4096)
+        self.clock.advance(0.01)
+        self._receive(connection, _ack(0))
+
+        self.assertLess(connection.retransmission_timer.timeout, 0.1)
+        self.sent.clear()
+        self.clock.advance(0.1)
+
+        self.assertEqual(_blk_nos(self.sent), [1])
+
+    def test_fixed_timeout(self) -> None:
+        connection = RFC2347Connection(self.addr, BytesIO(b''), b'oack', self.clock)
+        connection.timeout = 2
+        connection.adaptive_timeout = False
+        connection.transport = self.transport
+        connection.startProtocol()
+        self.clock.advance(0.01)
+        self._receive(connection, _ack(0))
+        self.sent.clear()
+
+        self.clock.advance(1.9)
+        self.assertEqual(self.sent, [])
+        self.clock.advance(0.1)
+        self.assertEqual(self.sent, [b'\x00\x03\x00\x01'])
+
+    def test_close_after_retries(self) -> None:
+        connection = self._connect(b'x' * 4096)
+        self._receive(connection, _ack(0))
+
+        self.clock.pump([1] * 4 * connection.max_retries * int(connection.timeout))
+
+        self.transport.stopListening.assert_called_once_with()
+        self.assertGreater(len(self.sent), connection.max_retries)
+
+
+class TestReadCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.tmp_dir)
+
+    def _write(self, name: str, content: bytes) -> str:
+        filename = os.path.join(self.tmp_dir, name)
+        with open(filename, 'wb') as f:
+            f.write(content)
+        return filename
+
+    def test_content_is_shared(self) -> None:
+        cache = ReadCache()
+        filename = self._write('a', b'content')
+
+        self.assertEqual(cache.open(filename).read(), b'content')
+        self.assertEqual(cache.open(filename).read(), b'content')
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_modified_file_is_reloaded(self) -> None:
+        cache = ReadCache()
+        filename = self._write('a', b'content')
+        cache.open(filename)
+
+        self._write('a', b'new content')
+
+        self.assertEqual(cache.open(filename).read(), b'new content')
+
+    def test_least_recently_used_files_are_evicted(self) -> None:
+        cache = ReadCache(max_size=10)
+        filenames = [self._write(name, b'12345') for name in 'abc']
+
+        for filename in filenames:
+            cache.open(filename)
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.size, 10)
+        cache.open(filenames[0])
+        self.assertEqual(cache.misses, 4)
+
+    def test_big_files_are_not_cached(self) -> None:
+        cache = ReadCache(max_size=100, max_file_size=4)
+        fobj = cache.open(self._write('a', b'12345'))
+
+        self.assertEqual(fobj.read(), b'12345')
+        self.assertEqual(len(cache), 0)
+        fobj.close()
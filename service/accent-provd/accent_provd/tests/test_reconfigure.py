@@ -0,0 +1,155 @@
+# Copyright 2023 Accent Communications
+
+from __future__ import annotations
+
+import unittest
+from typing import Any
+from unittest.mock import Mock, sentinel
+
+from accent_provd.operation import OIP_PROGRESS, OIP_SUCCESS
+from accent_provd.persist.id import numeric_id_generator
+from accent_provd.persist.sqlite_backend import SqliteDatabase
+from accent_provd.reconfigure import MassReconfigurator
+from accent_provd.synchro import DeferredRWLock
+from twisted.internet import defer
+from twisted.internet.defer import Deferred
+
+
+def _result(deferred: Deferred) -> Any:
+    results = []
+    deferred.addBoth(results.append)
+    return results[0]
+
+
+class TestMassReconfigurator(unittest.TestCase):
+    def setUp(self) -> None:
+        self.database = SqliteDatabase(':memory:', numeric_id_generator)
+        self.dev_collection = self.database.collection('devices')
+        self.raw_configs: dict[str, Any] = {'c1': {'k': 'v1'}, 'c2': {'k': 'v2'}}
+        self.app = Mock()
+        self.app._rw_lock = DeferredRWLock()
+        self.app._dev_collection = self.dev_collection
+        self.app.cfg_version = 0
+        self.app.cfg_retrieve_raw_config.side_effect = lambda config_id: (
+            defer.succeed(self.raw_configs.get(config_id))
+        )
+        self.app._dev_get_plugin.return_value = sentinel.plugin
+        self.app._dev_configure.return_value = True
+        self.reconfigurator = MassReconfigurator(
+            self.app, max_workers=2, run_in_thread=defer.maybeDeferred
+        )
+
+    def tearDown(self) -> None:
+        self.database.close()
+
+    def _insert_devices(self, *devices: dict[str, Any]) -> None:
+        for device in devices:
+            self.dev_collection.insert(device)
+
+    def _device(self, device_id: str) -> dict[str, Any]:
+        return _result(self.dev_collection.retrieve(device_id))
+
+    def test_reconfigure_matching_devices(self) -> None:
+        self._insert_devices(
+            {'id': 'd1', 'config': 'c1', 'configured': True},
+            {'id': 'd2', 'config': 'c2', 'configured': False},
+            {'id': 'd3', 'config': 'other', 'configured': False},
+        )
+
+        deferred, oip = self.reconfigurator.reconfigure(
+            {'config': {'$in': ['c1', 'c2']}}
+        )
+
+        self.assertEqual(_result(deferred), (2, 0))
+        self.assertEqual((oip.state, oip.current, oip.end), (OIP_SUCCESS, 2, 2))
+        self.app._dev_deconfigure.assert_called_once()
+        self.assertEqual(self.app._dev_configure.call_count, 2)
+        self.assertTrue(self._device('d2')['configured'])
+        self.assertFalse(self._device('d3')['configured'])
+
+    def test_raw_config_is_copied_for_each_device(self) -> None:
+        self._insert_devices(
+            {'id': 'd1', 'config': 'c1', 'configured': False},
+            {'id': 'd2', 'config': 'c1', 'configured': False},
+        )
+
+        _result(self.reconfigurator.reconfigure({'config': 'c1'})[0])
+
+        (_, _, raw_config_1), (_, _, raw_config_2) = (
+            call.args for call in self.app._dev_configure.call_args_list
+        )
+        self.assertEqual(raw_config_1, {'k': 'v1'})
+        self.assertIsNot(raw_config_1, raw_config_2)
+        self.app.cfg_retrieve_raw_config.assert_called_once_with('c1')
+
+    def test_raw_configs_are_recomputed_after_config_change(self) -> None:
+        self._insert_devices({'id': 'd1', 'config': 'c1', 'configured': False})
+        _result(self.reconfigurator.reconfigure({'config': 'c1'})[0])
+
+        self.raw_configs['c1'] = {'k': 'new'}
+        self.app.cfg_version += 1
+        _result(self.reconfigurator.reconfigure({'config': 'c1'})[0])
+
+        self.assertEqual(self.app._dev_configure.call_args.args[2], {'k': 'new'})
+
+    def test_device_of_deleted_config_is_deconfigured(self) -> None:
+        self._insert_devices({'id': 'd1', 'config': 'deleted', 'configured': True})
+
+        deferred, _ = self.reconfigurator.reconfigure({'config': 'deleted'})
+
+        self.assertEqual(_result(deferred), (0, 1))
+        self.app._dev_deconfigure.assert_called_once()
+        self.app._dev_configure.assert_not_called()
+        self.assertFalse(self._device('d1')['configured'])
+
+    def test_device_without_plugin_is_skipped(self) -> None:
+        self._insert_devices({'id': 'd1', 'config': 'c1', 'configured': False})
+        self.app._dev_get_plugin.return_value = None
+
+        deferred, oip = self.reconfigurator.reconfigure({'config': 'c1'})
+
+        self.assertEqual(_result(deferred), (0, 0))
+        self.assertEqual(oip.current, 1)
+        self.app._dev_configure.assert_not_called()
+
+    def test_error_in_plugin_does_not_stop_the_run(self) -> None:
+        self._insert_devices(
+            {'id': 'd1', 'config': 'c1', 'configured': True},
+            {'id': 'd2', 'config': 'c1', 'configured': False},
+        )
+        self.app._dev_configure.side_effect = [Exception('boom'), True]
+
+        deferred, oip = self.reconfigurator.reconfigure({'config': 'c1'})
+
+        self.assertEqual(_result(deferred), (1, 1))
+        self.assertEqual(oip.state, OIP_SUCCESS)
+        self.assertFalse(self._device('d1')['configured'])
+
+    def test_writers_are_not_blocked_by_the_whole_run(self) -> None:
+        self._insert_devices(
+            *({'id': f'd{i}', 'config': 'c1', 'configured': False} for i in range(3))
+        )
+        pending: list[Deferred] = []
+
+        def run_in_thread(fun):
+            d = Deferred()
+            d.addCallback(lambda _: fun())
+            pending.append(d)
+            return d
+
+        reconfigurator = MassReconfigurator(
+            self.app, max_workers=1, run_in_thread=run_in_thread
+        )
+        deferred, oip = reconfigurator.reconfigure({'config': 'c1'})
+        written = []
+        self.app._rw_lock.write_lock.run(
+            lambda: written.append(self.app._dev_configure.call_count)
+        )
+
+        pending.pop(0).callback(None)
+
+        self.assertEqual(written, [1])
+        self.assertEqual(oip.state, OIP_PROGRESS)
+        while pending:
+            pending.pop(0).callback(None)
+        self.assertEqual(_result(deferred), (3, 0))
@@ -0,0 +1,143 @@
+#!/usr/bin/python3
+# Copyright 2023 Accent Communications
+
+"""Measure the TFTP server throughput on the loopback interface.
+
+The server and the clients run in the same process: the clients download a
+file of random content from a TFTPFileService, with several window sizes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import struct
+import tempfile
+import time
+
+from accent_provd.servers.tftp.proto import TFTPProtocol
+from accent_provd.servers.tftp.service import TFTPFileService
+from twisted.internet import defer, task
+from twisted.internet.protocol import DatagramProtocol
+
+FILENAME = 'firmware.bin'
+
+
+class _Service:
+    # Stand-in for the request processing service of provd
+    def __init__(self, tftp_service):
+        self._tftp_service = tftp_service
+
+    def handle_read_request(self, request, response):
+        self._tftp_service.handle_read_request(request, response)
+
+
+class Client(DatagramProtocol):
+    """Download a file, acknowledging every window (RFC7440)."""
+
+    def __init__(self, server_addr, blksize, windowsize):
+        self.server_addr = server_addr
+        self.blksize = blksize
+        self.windowsize = windowsize
+        self.received = 0
+        self.acks = 0
+        self.done = defer.Deferred()
+        self._blk_no = 0
+        self._in_window = 0
+
+    def startProtocol(self):
+        options = {
+            b'blksize': self.blksize,
+            b'tsize': 0,
+            b'windowsize': self.windowsize,
+        }
+        rrq = b'\x00\x01' + FILENAME.encode() + b'\x00octet\x00'
+        for option, value in options.items():
+            rrq += option + b'\x00' + str(value).encode() + b'\x00'
+        self.transport.write(rrq, self.server_addr)
+
+    def _ack(self, addr, blk_no):
+        self.acks += 1
+        self.transport.write(b'\x00\x04' + struct.pack('!H', blk_no), addr)
+
+    def datagramReceived(self, dgram, addr):
+        opcode = dgram[:2]
+        if opcode == b'\x00\x06':
+            self._ack(addr, 0)
+        elif opcode == b'\x00\x03':
+            blk_no = struct.unpack('!H', dgram[2:4])[0]
+            if blk_no != (self._blk_no + 1) % 65536:
+                # lost or reordered block, acknowledge the last one in order
+                self._in_window = 0
+                self._ack(addr, self._blk_no)
+                return
+            self._blk_no = blk_no
+            self._in_window += 1
+            data = dgram[4:]
+            self.received += len(data)
+            if len(data) < self.blksize:
+                self._ack(addr, blk_no)
+                self.transport.stopListening()
+                self.done.callback(self)
+            elif self._in_window == self.windowsize:
+                self._in_window = 0
+                self._ack(addr, blk_no)
+        elif opcode == b'\x00\x05':
+            self.transport.stopListening()
+            self.done.errback(Exception(f'TFTP error {dgram[4:-1]!r}'))
+
+
+@defer.inlineCallbacks
+def run(reactor, parsed_args):
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        with open(os.path.join(tmp_dir, FILENAME), 'wb') as f:
+            f.write(os.urandom(parsed_args.size * 1024 * 1024))
+
+        protocol = TFTPProtocol()
+        protocol.set_tftp_request_processing_service(
+            _Service(TFTPFileService(tmp_dir))
+        )
+        port = reactor.listenUDP(0, protocol, interface='127.0.0.1')
+        server_addr = ('127.0.0.1', port.getHost().port)
+
+        print(f'{parsed_args.size} MiB file, {parsed_args.clients} client(s)')
+        print('windowsize   time (s)   MiB/s   acks')
+        for windowsize in parsed_args.windowsizes:
+            clients = [
+                Client(server_addr, parsed_args.blksize, windowsize)
+                for _ in range(parsed_args.clients)
+            ]
+            start = time.perf_counter()
+            for client in clients:
+                reactor.listenUDP(0, client, interface='127.0.0.1')
+            yield defer.gatherResults([client.done for client in clients])
+            duration = time.perf_counter() - start
+            received = sum(client.received for client in clients) / 1024 / 1024
+            acks = sum(client.acks for client in clients)
+            print(
+                f'{windowsize:>10} {duration:>10.2f} {received / duration:>7.1f} '
+                f'{acks:>6}'
+            )
+        port.stopListening()
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=8, help='file size in MiB')
+    parser.add_argument('--blksize', type=int, default=1428, help='block size')
+    parser.add_argument(
+        '--clients', type=int, default=1, help='number of simultaneous clients'
+    )
+    parser.add_argument(
+        'windowsizes', type=int, nargs='*', default=[1, 2, 4, 8, 16, 32, 64]
+    )
+    parsed_args = parser.parse_args()
+    task.react(run, [parsed_args])
+
+
+if __name__ == '__main__':
+    main()
@@ -5,7 +5,7 @@ from datetime import timedelta
 
 from accent_dao import queue_log_dao, stat_agent_periodic_dao, stat_dao
 
-from accent_stat import time_utils
+from accent_stat.buckets import IntervalBuckets
 
 logger = logging.getLogger(__name__)
 
@@ -51,8 +51,25 @@ def insert_periodic_stat(dao_sess, start, end):
         periodic_stats_wrapup,
     )
 
-    for period, stats in periodic_stats.items():
-        stat_agent_periodic_dao.insert_stats(dao_sess, stats, period)
+    stat_agent_periodic_dao.insert_periodic_stats(dao_sess, periodic_stats)
+    dao_sess.flush()
+
+
+def insert_periodic_stat_incremental(dao_sess, tracker, end, start=None):
+    events = queue_log_dao.get_agent_events_after(dao_sess, tracker.last_id, end)
+    first_period, periodic_stats_intervals = tracker.run(events, end, start)
+    periodic_stats_wrapup = queue_log_dao.get_wrapup_times(
+        dao_sess, first_period, end, INTERVAL
+    )
+    remove_after_start(dao_sess, first_period)
+    dao_sess.flush()
+
+    periodic_stats = _merge_update_agent_statistics(
+        periodic_stats_intervals,
+        periodic_stats_wrapup,
+    )
+
+    stat_agent_periodic_dao.insert_periodic_stats(dao_sess, periodic_stats)
     dao_sess.flush()
 
 
@@ -66,7 +83,6 @@ class AgentTimeComputer:
         self.start = start
         self.end = end
         self.interval_size = interval_size
-        self.possible_intervals = list(time_utils.gen_time(start, end, interval_size))
 
     def compute_login_time_in_period(self, sessions_by_agent):
         return self._compute_time_in_period('login_time', sessions_by_agent)
@@ -75,28 +91,13 @@ class AgentTimeComputer:
         return self._compute_time_in_period('pause_time', sessions_by_agent)
 
     def _compute_time_in_period(self, time_type, sessions_by_agent):
-        results = {}
+        buckets = IntervalBuckets(self.start, self.end, self.interval_size)
 
         for agent, sessions in sessions_by_agent.items():
             for time_start, time_end in sessions:
-                if not time_end:
-                    time_end = self.end
-                touched_periods = time_utils.get_period_start_for_time_range(
-                    self.possible_intervals, time_start, time_end
-                )
-
-                for period_start in touched_periods:
-                    if period_start not in results:
-                        results[period_start] = {}
-                    period_end = period_start + self.interval_size
-                    end_in_interval = min(time_end, period_end)
-                    start_in_interval = max(time_start, period_start)
-                    delta = end_in_interval - start_in_interval
-                    self._add_time_to_agent_in_period(
-                        results[period_start], agent, time_type, delta
-                    )
-
-        return results
+                buckets.add(agent, time_type, time_start, time_end or self.end)
+
+        return buckets.results()
 
     def _add_time_to_agent_in_period(self, period, agent, time_type, duration):
         if agent not in period:
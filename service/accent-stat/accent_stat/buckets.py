@@ -0,0 +1,62 @@
+# Copyright 2023 Accent Communications
+
+from array import array
+from bisect import bisect_right
+from datetime import timedelta
+
+from accent_stat import time_utils
+
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+class IntervalBuckets:
+    """Durations of intervals split across fixed-size periods.
+
+    Period boundaries are computed once and sorted, each interval is located
+    with a bisect and its duration is accumulated, in microseconds, in one
+    array per (key, time type) with an element per period.
+    """
+
+    def __init__(self, start, end, interval_size):
+        self.interval_size = interval_size
+        self.periods = list(time_utils.gen_time(start, end, interval_size))
+        self._limit = self.periods[-1] + interval_size if self.periods else start
+        self._durations = {}
+
+    def add(self, key, time_type, start, end):
+        if not self.periods:
+            return
+        start = max(start, self.periods[0])
+        end = min(end, self._limit)
+        if start >= end:
+            return
+
+        durations = self._durations.get((key, time_type))
+        if durations is None:
+            durations = array('q', bytes(8 * len(self.periods)))
+            self._durations[(key, time_type)] = durations
+
+        first = bisect_right(self.periods, start) - 1
+        last = bisect_right(self.periods, end - ONE_MICROSECOND) - 1
+        if first == last:
+            durations[first] += (end - start) // ONE_MICROSECOND
+            return
+
+        durations[first] += (self.periods[first + 1] - start) // ONE_MICROSECOND
+        full_period = self.interval_size // ONE_MICROSECOND
+        for index in range(first + 1, last):
+            durations[index] += full_period
+        durations[last] += (end - self.periods[last]) // ONE_MICROSECOND
+
+    def results(self):
+        """Return {period_start: {key: {time_type: timedelta}}}, without zeros."""
+        results = {}
+        for (key, time_type), durations in self._durations.items():
+            for index, duration in enumerate(durations):
+                if not duration:
+                    continue
+                period = results.setdefault(self.periods[index], {})
+                period.setdefault(key, {})[time_type] = timedelta(
+                    microseconds=duration
+                )
+        return results
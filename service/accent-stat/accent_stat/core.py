@@ -16,6 +16,12 @@ from accent_dao import (
 from accent_dao.helpers.db_utils import session_scope
 
 from accent_stat import agent, queue
+from accent_stat.incremental import (
+    AgentIntervalTracker,
+    StateFile,
+    queue_start_time,
+)
+from accent_stat.time_utils import hour_start
 
 logger = logging.getLogger(__name__)
 
@@ -23,10 +29,6 @@ _ERASE_TIME_WHEN_STARTING = datetime.timedelta(hours=8)
 DELTA_1HOUR = datetime.timedelta(hours=1)
 
 
-def hour_start(t):
-    return datetime.datetime(t.year, t.month, t.day, t.hour, tzinfo=t.tzinfo)
-
-
 def end_of_previous_hour(t):
     return hour_start(t) - datetime.timedelta(microseconds=1)
 
@@ -42,8 +44,18 @@ def get_start_time(dao_sess):
     return start - _ERASE_TIME_WHEN_STARTING
 
 
-def update_db(config, end_date, start_date=None):
-    if start_date is None:
+def update_db(config, end_date, start_date=None, incremental=False):
+    state_file = state = None
+    if incremental:
+        state_file = StateFile(config['incremental']['state_file'])
+        state = state_file.load()
+
+    if start_date is None and state and state.get('queue'):
+        start = queue_start_time(
+            datetime.datetime.fromisoformat(state['queue']['last_end']),
+            _ERASE_TIME_WHEN_STARTING,
+        )
+    elif start_date is None:
         try:
             with session_scope() as dao_sess:
                 start = get_start_time(dao_sess)
@@ -73,12 +85,17 @@ def update_db(config, end_date, start_date=None):
         dao_sess.flush()
 
         queue.remove_between(dao_sess, start, end)
-        agent.remove_after_start(dao_sess, start)
+        if not incremental:
+            agent.remove_after_start(dao_sess, start)
         queue.fill_simple_calls(dao_sess, start, end)
         dao_sess.flush()
 
         logger.info('Inserting agent periodic stat')
-        agent.insert_periodic_stat(dao_sess, start, end)
+        if incremental:
+            tracker = AgentIntervalTracker(state.get('agent'))
+            agent.insert_periodic_stat_incremental(dao_sess, tracker, end, start)
+        else:
+            agent.insert_periodic_stat(dao_sess, start, end)
 
         logger.info('Inserting queue periodic stat')
         for period_start in queue_log_dao.hours_with_calls(dao_sess, start, end):
@@ -90,8 +107,16 @@ def update_db(config, end_date, start_date=None):
             queue.fill_calls(dao_sess, period_start, period_end)
             queue.insert_periodic_stat(dao_sess, period_start, period_end)
 
+    if incremental:
+        # Saved once the transaction is committed
+        state_file.save(
+            {'agent': tracker.state(), 'queue': {'last_end': end.isoformat()}}
+        )
+
 
-def clean_db():
+def clean_db(config=None):
+    if config and config.get('incremental'):
+        StateFile(config['incremental']['state_file']).remove()
     with session_scope() as dao_sess:
         stat_call_on_queue_dao.clean_table(dao_sess)
         stat_agent_periodic_dao.clean_table(dao_sess)
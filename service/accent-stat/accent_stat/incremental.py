@@ -0,0 +1,194 @@
+# Copyright 2023 Accent Communications
+
+import datetime
+import json
+import logging
+import os
+import tempfile
+
+from accent_stat.agent import INTERVAL, _merge_update_agent_statistics
+from accent_stat.buckets import IntervalBuckets
+from accent_stat.time_utils import hour_start
+
+logger = logging.getLogger(__name__)
+
+ONE_MICROSECOND = datetime.timedelta(microseconds=1)
+
+LOGIN = 'login_time'
+PAUSE = 'pause_time'
+
+
+def queue_start_time(last_end, look_back):
+    """Start of the queue_log window of a run following a run ending at last_end.
+
+    The calls still in a queue at the end of the previous run are only filled
+    by this run, from queue_log rows written before its end.
+    """
+    return hour_start(last_end) - look_back
+
+
+def _copy(stats):
+    return {
+        period: {agent: dict(times) for agent, times in agents.items()}
+        for period, agents in stats.items()
+    }
+
+
+class StateFile:
+    """JSON file holding the incremental state between runs."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            logger.warning('Ignoring invalid incremental state in %s', self.path)
+            return {}
+
+    def save(self, state):
+        directory = os.path.dirname(self.path) or '.'
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.stat-state')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+    def remove(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class AgentIntervalTracker:
+    """Login and pause time of agents, computed from new queue_log rows only.
+
+    Each run is fed the agent events added since the previous run. Logins
+    and pauses still open at the end of a run are carried to the next one,
+    as are the totals of closed intervals in the last, still open, hour.
+    A run returns the totals of every hour from the hour of the previous
+    run end, which replace the stored rows of those hours.
+    """
+
+    def __init__(self, state=None):
+        state = state or {}
+        self.last_id = state.get('last_id', 0)
+        last_end = state.get('last_end')
+        self.last_end = datetime.datetime.fromisoformat(last_end) if last_end else None
+        self._open = {
+            time_type: {
+                int(agent): datetime.datetime.fromisoformat(start)
+                for agent, start in state.get('open', {}).get(time_type, {}).items()
+            }
+            for time_type in (LOGIN, PAUSE)
+        }
+        self._partial = {
+            datetime.datetime.fromisoformat(period): {
+                int(agent): {
+                    time_type: value * ONE_MICROSECOND
+                    for time_type, value in times.items()
+                }
+                for agent, times in agents.items()
+            }
+            for period, agents in state.get('partial', {}).items()
+        }
+
+    def state(self):
+        return {
+            'last_id': self.last_id,
+            'last_end': self.last_end.isoformat() if self.last_end else None,
+            'open': {
+                time_type: {
+                    str(agent): start.isoformat() for agent, start in opened.items()
+                }
+                for time_type, opened in self._open.items()
+            },
+            'partial': {
+                period.isoformat(): {
+                    str(agent): {
+                        time_type: value // ONE_MICROSECOND
+                        for time_type, value in times.items()
+                    }
+                    for agent, times in agents.items()
+                }
+                for period, agents in self._partial.items()
+            },
+        }
+
+    def run(self, events, end, start=None):
+        """Process the new events up to end.
+
+        On the first run, start limits the returned periods while every
+        event is still processed to know the open intervals.
+
+        Returns:
+            (first_period, stats) where stats maps each period start from
+            first_period to {agent: {'login_time': timedelta, ...}}.
+        """
+        if self.last_end is not None:
+            first_period = hour_start(self.last_end)
+        elif start is not None:
+            first_period = hour_start(start)
+        elif events:
+            first_period = hour_start(min(event.time for event in events))
+        else:
+            first_period = hour_start(end)
+
+        buckets = IntervalBuckets(first_period, end, INTERVAL)
+        for event in events:
+            self.last_id = max(self.last_id, event.id)
+            interval = self._apply(event)
+            if interval:
+                buckets.add(*interval)
+        closed = _merge_update_agent_statistics(_copy(self._partial), buckets.results())
+
+        buckets = IntervalBuckets(first_period, end, INTERVAL)
+        for time_type, opened in self._open.items():
+            for agent, interval_start in opened.items():
+                buckets.add(agent, time_type, interval_start, end)
+        totals = _merge_update_agent_statistics(_copy(closed), buckets.results())
+
+        next_period = hour_start(end)
+        self._partial = {
+            period: agents for period, agents in closed.items() if period >= next_period
+        }
+        self.last_end = end
+
+        return first_period, {
+            period: agents
+            for period, agents in totals.items()
+            if period >= first_period
+        }
+
+    def _apply(self, event):
+        logins, pauses = self._open[LOGIN], self._open[PAUSE]
+        if event.event == 'AGENTCALLBACKLOGIN':
+            logins.setdefault(event.agent, event.time)
+        elif event.event == 'AGENTCALLBACKLOGOFF':
+            # A logoff ends the login of every agent with its name, but is
+            # only counted for the agent of its tenant
+            logins.pop(event.agent, None)
+            if not event.counted:
+                return None
+            try:
+                duration = int(event.data2 or 0)
+            except ValueError:
+                duration = 0
+            if duration > 0:
+                start = event.time - datetime.timedelta(seconds=duration)
+                return event.agent, LOGIN, start, event.time
+        elif event.event == 'PAUSEALL':
+            pauses.setdefault(event.agent, event.time)
+        elif event.event == 'UNPAUSEALL':
+            start = pauses.pop(event.agent, None)
+            if start is not None:
+                return event.agent, PAUSE, start, event.time
+        return None
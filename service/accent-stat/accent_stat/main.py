@@ -33,9 +33,11 @@ def main():
                 config=main_config,
                 start_date=options.start,
                 end_date=options.end,
+                incremental=options.incremental
+                or main_config['incremental']['enabled'],
             )
         elif subcommand == 'clean_db':
-            core.clean_db()
+            core.clean_db(main_config)
         else:
             parser.print_help()
 
@@ -62,6 +64,11 @@ def parse_args(parser):
             HELP_DATETIME_FORMAT
         ),
     )
+    fill_db_parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Only process the queue_log rows added since the previous incremental run',
+    )
 
     return parser.parse_args()
 
@@ -12,32 +12,30 @@ from accent_dao import (
 logger = logging.getLogger(__name__)
 
 
-def fill_abandoned_call(dao_sess, start, end):
-    abandoned_calls = queue_log_dao.get_queue_abandoned_call(dao_sess, start, end)
-    for call in abandoned_calls:
+def _insert_calls(dao_sess, calls, status, label):
+    rows = []
+    for call in calls:
         if not call['waittime']:
             logger.error(
-                "Abandoned call (callid=%s) missing waittime value, skipping",
+                "%s call (callid=%s) missing waittime value, skipping",
+                label,
                 call['callid'],
             )
             continue
-        stat_call_on_queue_dao.add_abandoned_call(
-            dao_sess, call['callid'], call['time'], call['queue_name'], call['waittime']
+        rows.append(
+            (call['callid'], call['time'], call['queue_name'], status, call['waittime'])
         )
+    stat_call_on_queue_dao.add_calls(dao_sess, rows)
+
+
+def fill_abandoned_call(dao_sess, start, end):
+    abandoned_calls = queue_log_dao.get_queue_abandoned_call(dao_sess, start, end)
+    _insert_calls(dao_sess, abandoned_calls, 'abandoned', 'Abandoned')
 
 
 def fill_timeout_call(dao_sess, start, end):
     timeout_calls = queue_log_dao.get_queue_timeout_call(dao_sess, start, end)
-    for call in timeout_calls:
-        if not call['waittime']:
-            logger.error(
-                "Timeout call (callid=%s) missing waittime value, skipping",
-                call['callid'],
-            )
-            continue
-        stat_call_on_queue_dao.add_timeout_call(
-            dao_sess, call['callid'], call['time'], call['queue_name'], call['waittime']
-        )
+    _insert_calls(dao_sess, timeout_calls, 'timeout', 'Timeout')
 
 
 def fill_calls(dao_sess, start, end):
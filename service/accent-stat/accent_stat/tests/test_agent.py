@@ -18,7 +18,7 @@ def _session(session):
 
 
 class TestAgent(unittest.TestCase):
-    @patch('accent_dao.stat_agent_periodic_dao.insert_stats')
+    @patch('accent_dao.stat_agent_periodic_dao.insert_periodic_stats')
     @patch('accent_dao.stat_dao.get_login_intervals_in_range')
     @patch('accent_dao.stat_dao.get_pause_intervals_in_range')
     @patch('accent_dao.queue_log_dao.get_wrapup_times')
@@ -27,7 +27,7 @@ class TestAgent(unittest.TestCase):
         mock_get_wrapup_times,
         mock_get_pause_intervals_in_range,
         mock_get_login_intervals_in_range,
-        mock_insert_stats,
+        mock_insert_periodic_stats,
     ):
         agent_id_1 = 12
         agent_id_2 = 13
@@ -83,8 +83,7 @@ class TestAgent(unittest.TestCase):
 
         agent.insert_periodic_stat(_session(), start, end)
 
-        for period_start, agents_stats in output_stats.items():
-            mock_insert_stats.assert_any_call(ANY, agents_stats, period_start)
+        mock_insert_periodic_stats.assert_called_once_with(ANY, output_stats)
 
 
 class TestAgentLoginTimeComputer(unittest.TestCase):
@@ -0,0 +1,73 @@
+# Copyright 2023 Accent Communications
+
+import random
+import unittest
+from datetime import datetime as dt
+from datetime import timedelta
+
+from accent_stat.buckets import IntervalBuckets
+
+ONE_HOUR = timedelta(hours=1)
+
+
+def _brute_force(periods, interval_size, intervals):
+    result = {}
+    for key, time_type, start, end in intervals:
+        for period in periods:
+            overlap = min(end, period + interval_size) - max(start, period)
+            if overlap > timedelta(0):
+                times = result.setdefault(period, {}).setdefault(key, {})
+                times[time_type] = times.get(time_type, timedelta(0)) + overlap
+    return result
+
+
+class TestIntervalBuckets(unittest.TestCase):
+    def test_interval_inside_a_period(self):
+        buckets = IntervalBuckets(dt(2012, 1, 1, 1), dt(2012, 1, 1, 3), ONE_HOUR)
+
+        buckets.add(1, 'login_time', dt(2012, 1, 1, 1, 5), dt(2012, 1, 1, 1, 15))
+
+        self.assertEqual(
+            buckets.results(),
+            {dt(2012, 1, 1, 1): {1: {'login_time': timedelta(minutes=10)}}},
+        )
+
+    def test_interval_spanning_periods_is_clipped(self):
+        buckets = IntervalBuckets(dt(2012, 1, 1, 1), dt(2012, 1, 1, 3), ONE_HOUR)
+
+        buckets.add(1, 'pause_time', dt(2012, 1, 1, 0, 30), dt(2012, 1, 1, 5))
+
+        self.assertEqual(
+            buckets.results(),
+            {
+                dt(2012, 1, 1, 1): {1: {'pause_time': ONE_HOUR}},
+                dt(2012, 1, 1, 2): {1: {'pause_time': ONE_HOUR}},
+                dt(2012, 1, 1, 3): {1: {'pause_time': ONE_HOUR}},
+            },
+        )
+
+    def test_interval_outside_periods(self):
+        buckets = IntervalBuckets(dt(2012, 1, 1, 1), dt(2012, 1, 1, 3), ONE_HOUR)
+
+        buckets.add(1, 'login_time', dt(2012, 1, 1, 5), dt(2012, 1, 1, 6))
+        buckets.add(1, 'login_time', dt(2012, 1, 1, 2), dt(2012, 1, 1, 2))
+
+        self.assertEqual(buckets.results(), {})
+
+    def test_random_intervals_equal_brute_force(self):
+        rng = random.Random(42)
+        start, end = dt(2012, 1, 1), dt(2012, 1, 3, 23)
+        buckets = IntervalBuckets(start, end, ONE_HOUR)
+        intervals = []
+        for _ in range(500):
+            interval_start = start + timedelta(seconds=rng.randint(-7200, 180000))
+            interval_end = interval_start + timedelta(
+                seconds=rng.randint(0, 20000), microseconds=rng.randint(0, 999999)
+            )
+            time_type = rng.choice(['login_time', 'pause_time'])
+            intervals.append((rng.randint(1, 10), time_type, interval_start, interval_end))
+            buckets.add(*intervals[-1])
+
+        expected = _brute_force(buckets.periods, ONE_HOUR, intervals)
+
+        self.assertEqual(buckets.results(), expected)
@@ -0,0 +1,370 @@
+# Copyright 2023 Accent Communications
+
+import asyncio
+import os
+import random
+import tempfile
+import unittest
+from collections import namedtuple
+from datetime import datetime as dt
+from datetime import timedelta, timezone
+from unittest.mock import Mock
+
+from accent_dao import stat_dao
+
+from accent_stat import agent
+from accent_stat.incremental import (
+    AgentIntervalTracker,
+    StateFile,
+    hour_start,
+    queue_start_time,
+)
+
+Event = namedtuple(
+    'Event', ['id', 'time', 'event', 'agent', 'data2', 'counted'], defaults=(True,)
+)
+QueueLog = namedtuple('QueueLog', ['id', 'time', 'event', 'agent', 'data1', 'data2'])
+Row = namedtuple(
+    'Row',
+    [
+        'login_timestamp',
+        'logout_timestamp',
+        'login',
+        'logout',
+        'pauseall',
+        'unpauseall',
+        'agent',
+    ],
+    defaults=(None,) * 7,
+)
+
+ONE_HOUR = timedelta(hours=1)
+START = dt(2023, 3, 1, 8, tzinfo=timezone.utc)
+
+TENANT_A = '00000000-0000-4000-a000-00000000000a'
+TENANT_B = '00000000-0000-4000-a000-00000000000b'
+CONTEXTS = {'ctx-a': TENANT_A, 'ctx-b': TENANT_B}
+# Agents 1 and 2 have a namesake in the other tenant
+STAT_AGENTS = {
+    1: ('Agent/1', TENANT_A),
+    2: ('Agent/2', TENANT_A),
+    3: ('Agent/3', TENANT_A),
+    4: ('Agent/4', TENANT_A),
+    11: ('Agent/1', TENANT_B),
+    12: ('Agent/2', TENANT_B),
+}
+
+
+class QueueLogSession:
+    """Answers the agent queries of stat_dao from a list of queue_log rows.
+
+    Each query is answered with the joins and filters of its SQL, and
+    agent_events answers queue_log_dao.get_agent_events_after.
+    """
+
+    def __init__(self, queue_log):
+        self.queue_log = queue_log
+
+    async def execute(self, stmt):
+        sql = str(stmt)
+        params = {
+            name: dt.strptime(value, stat_dao._STR_TIME_FMT)
+            for name, value in stmt.compile().params.items()
+        }
+        if 'agent_logins' in sql:
+            rows = self._completed_logins(params['start'], params['end'])
+        elif 'AGENTCALLBACKLOG%' in sql:
+            rows = self._last_logins_and_logouts(params['end'])
+        elif 'PAUSEALL' in sql:
+            rows = self._pauses(params['start'])
+        else:
+            raise AssertionError(f'unexpected query {sql}')
+        return Mock(all=Mock(return_value=rows))
+
+    def agent_events(self, last_id, end):
+        return [
+            Event(
+                entry.id,
+                entry.time,
+                entry.event,
+                agent_id,
+                entry.data2,
+                entry.event == 'AGENTCALLBACKLOGOFF'
+                and bool(entry.data1)
+                and self._tenant(entry) == tenant_uuid,
+            )
+            for entry in self.queue_log
+            if entry.id > last_id and entry.time <= end
+            for agent_id, (name, tenant_uuid) in sorted(STAT_AGENTS.items())
+            if name == entry.agent
+        ]
+
+    def _completed_logins(self, start, end):
+        return [
+            Row(
+                login_timestamp=entry.time - timedelta(seconds=int(entry.data2)),
+                logout_timestamp=entry.time,
+                agent=agent_id,
+            )
+            for entry in self.queue_log
+            if entry.event == 'AGENTCALLBACKLOGOFF'
+            and entry.data1
+            and int(entry.data2) > 0
+            and start < entry.time <= end
+            for agent_id, agent in STAT_AGENTS.items()
+            if agent == (entry.agent, self._tenant(entry))
+        ]
+
+    def _last_logins_and_logouts(self, end):
+        rows = []
+        for agent_id, (name, _) in STAT_AGENTS.items():
+            entries = [entry for entry in self.queue_log if entry.agent == name]
+            login = max(
+                (e.time for e in entries if e.event == 'AGENTCALLBACKLOGIN'),
+                default=None,
+            )
+            logout = max(
+                (e.time for e in entries if e.event == 'AGENTCALLBACKLOGOFF'),
+                default=None,
+            )
+            if login and login < end:
+                rows.append(Row(login=login, logout=logout, agent=agent_id))
+        return rows
+
+    def _pauses(self, start):
+        pauses = {}
+        for entry in self.queue_log:
+            if entry.event != 'PAUSEALL' or entry.time < start:
+                continue
+            unpause = min(
+                (
+                    e.time
+                    for e in self.queue_log
+                    if e.event == 'UNPAUSEALL'
+                    and e.agent == entry.agent
+                    and e.time > entry.time
+                ),
+                default=None,
+            )
+            for agent_id, (name, _) in STAT_AGENTS.items():
+                if name == entry.agent:
+                    key = agent_id, unpause
+                    pauses[key] = min(pauses.get(key, entry.time), entry.time)
+        return [
+            Row(pauseall=pause, unpauseall=unpause, agent=agent_id)
+            for (agent_id, unpause), pause in pauses.items()
+        ]
+
+    def _tenant(self, entry):
+        return CONTEXTS.get(entry.data1.partition('@')[2])
+
+
+def _random_history(rng, agents=4, steps=60):
+    events = []
+    now = START + timedelta(seconds=rng.randint(0, 3600))
+    logged_in, paused = {}, set()
+    for _ in range(steps):
+        now += timedelta(seconds=rng.randint(1, 5400))
+        agent = f'Agent/{rng.randint(1, agents)}'
+        if agent not in logged_in:
+            logged_in[agent] = now
+            events.append((now, 'AGENTCALLBACKLOGIN', agent, '', ''))
+        elif agent in paused:
+            paused.discard(agent)
+            events.append((now, 'UNPAUSEALL', agent, '', ''))
+        elif rng.random() < 0.5:
+            paused.add(agent)
+            events.append((now, 'PAUSEALL', agent, '', ''))
+        else:
+            duration = int((now - logged_in.pop(agent)).total_seconds())
+            data1 = rng.choice(['1001@ctx-a', '1001@ctx-a', '1001@ctx-b', ''])
+            events.append((now, 'AGENTCALLBACKLOGOFF', agent, data1, str(duration)))
+    return [QueueLog(i + 1, *event) for i, event in enumerate(events)], now
+
+
+def _full_computation(session, end):
+    # The non incremental path of agent.insert_periodic_stat
+    login_intervals = asyncio.run(
+        stat_dao.get_login_intervals_in_range(session, START, end)
+    )
+    pause_intervals = asyncio.run(
+        stat_dao.get_pause_intervals_in_range(session, START, end)
+    )
+    time_computer = agent.AgentTimeComputer(START, end, ONE_HOUR)
+    return agent._merge_update_agent_statistics(
+        time_computer.compute_login_time_in_period(login_intervals),
+        time_computer.compute_pause_time_in_period(pause_intervals),
+    )
+
+
+def _full(queue_log, end, run_ends):
+    # Each run only replaces the periods from the hour of the previous run
+    # end, computed from the queue_log rows written up to the run end
+    table = {}
+    first_period = START
+    for run_end in run_ends + [end]:
+        session = QueueLogSession(
+            [entry for entry in queue_log if entry.time <= run_end]
+        )
+        stats = _full_computation(session, run_end)
+        for period in [period for period in table if period >= first_period]:
+            del table[period]
+        table.update(
+            (period, agents)
+            for period, agents in stats.items()
+            if period >= first_period
+        )
+        first_period = hour_start(run_end)
+    return table
+
+
+def _incremental(queue_log, end, run_ends):
+    session = QueueLogSession(queue_log)
+    table = {}
+    state = None
+    for run_end in run_ends + [end]:
+        tracker = AgentIntervalTracker(state)
+        new_events = session.agent_events(tracker.last_id, run_end)
+        first_period, stats = tracker.run(new_events, run_end)
+        for period in [period for period in table if period >= first_period]:
+            del table[period]
+        table.update(stats)
+        state = tracker.state()
+    return table
+
+
+def _non_zero(stats):
+    return {
+        period: {
+            agent: {name: value for name, value in times.items() if value}
+            for agent, times in agents.items()
+            if any(times.values())
+        }
+        for period, agents in stats.items()
+        if any(any(times.values()) for times in agents.values())
+    }
+
+
+class TestAgentIntervalTracker(unittest.TestCase):
+    def test_incremental_runs_equal_full_computation(self):
+        for seed in range(50):
+            rng = random.Random(seed)
+            queue_log, last_event_time = _random_history(rng)
+            end = last_event_time + timedelta(seconds=rng.randint(0, 7200))
+            span = int((end - START).total_seconds())
+            run_ends = sorted(
+                START + timedelta(seconds=rng.randint(0, span))
+                for _ in range(rng.randint(1, 12))
+            )
+
+            expected = _full(queue_log, end, run_ends)
+            result = _incremental(queue_log, end, run_ends)
+
+            self.assertEqual(_non_zero(result), _non_zero(expected), f'seed {seed}')
+
+    def test_open_login_is_carried_across_runs(self):
+        utc = timezone.utc
+        login = Event(
+            1, dt(2023, 1, 1, 9, 10, tzinfo=utc), 'AGENTCALLBACKLOGIN', 12, None
+        )
+        logoff = Event(
+            2, dt(2023, 1, 1, 11, tzinfo=utc), 'AGENTCALLBACKLOGOFF', 12, '6600'
+        )
+        tracker = AgentIntervalTracker()
+
+        first_period, stats = tracker.run([login], dt(2023, 1, 1, 10, 30, tzinfo=utc))
+
+        self.assertEqual(first_period, dt(2023, 1, 1, 9, tzinfo=utc))
+        self.assertEqual(
+            stats[dt(2023, 1, 1, 10, tzinfo=utc)],
+            {12: {'login_time': timedelta(minutes=30)}},
+        )
+
+        tracker = AgentIntervalTracker(tracker.state())
+        first_period, stats = tracker.run([logoff], dt(2023, 1, 1, 11, 30, tzinfo=utc))
+
+        self.assertEqual(first_period, dt(2023, 1, 1, 10, tzinfo=utc))
+        self.assertEqual(
+            stats, {dt(2023, 1, 1, 10, tzinfo=utc): {12: {'login_time': ONE_HOUR}}}
+        )
+        self.assertEqual(tracker.last_id, 2)
+
+    def test_logoff_of_another_tenant_is_not_counted(self):
+        utc = timezone.utc
+        login = Event(
+            1, dt(2023, 1, 1, 9, 10, tzinfo=utc), 'AGENTCALLBACKLOGIN', 12, None
+        )
+        logoff = Event(
+            2,
+            dt(2023, 1, 1, 9, 40, tzinfo=utc),
+            'AGENTCALLBACKLOGOFF',
+            12,
+            '1800',
+            counted=False,
+        )
+        tracker = AgentIntervalTracker()
+
+        _, stats = tracker.run([login, logoff], dt(2023, 1, 1, 10, tzinfo=utc))
+
+        self.assertEqual(stats, {})
+        self.assertEqual(tracker.state()['open']['login_time'], {})
+
+
+def _random_queue_calls(rng, calls=40):
+    # (callid, enter time, time of the event ending the call)
+    result = []
+    for callid in range(calls):
+        enter = START + timedelta(seconds=rng.randint(0, 12 * 3600))
+        duration = timedelta(seconds=rng.randint(0, 7 * 3600))
+        result.append((callid, enter, enter + duration))
+    return result
+
+
+def _queue_run(table, calls, start, end):
+    # queue.remove_between then the fill functions: a call is filled from
+    # its ENTERQUEUE row in the window once its ending row is written
+    for callid in [callid for callid, enter in table.items() if start <= enter <= end]:
+        del table[callid]
+    table.update(
+        (callid, enter)
+        for callid, enter, left in calls
+        if start <= enter <= end and left <= end
+    )
+
+
+class TestQueueWindow(unittest.TestCase):
+    look_back = timedelta(hours=8)
+
+    def test_calls_crossing_a_run_end_are_filled(self):
+        for seed in range(50):
+            rng = random.Random(seed)
+            calls = _random_queue_calls(rng)
+            end = START + timedelta(hours=20)
+            run_ends = sorted(
+                START + timedelta(seconds=rng.randint(0, 20 * 3600))
+                for _ in range(rng.randint(1, 12))
+            )
+
+            expected = {}
+            _queue_run(expected, calls, START - self.look_back, end)
+            result = {}
+            start = START - self.look_back
+            for run_end in run_ends + [end]:
+                _queue_run(result, calls, start, run_end)
+                start = queue_start_time(run_end, self.look_back)
+
+            self.assertEqual(result, expected, f'seed {seed}')
+
+
+class TestStateFile(unittest.TestCase):
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            state_file = StateFile(os.path.join(directory, 'state.json'))
+
+            self.assertEqual(state_file.load(), {})
+            state_file.save({'queue': {'last_end': '2023-01-01T00:00:00+00:00'}})
+            self.assertEqual(
+                state_file.load(), {'queue': {'last_end': '2023-01-01T00:00:00+00:00'}}
+            )
+            state_file.remove()
+            self.assertEqual(state_file.load(), {})
@@ -20,8 +20,8 @@ class TestQueue(unittest.TestCase):
         self._dao_sess = _session()
 
     @patch('accent_dao.queue_log_dao.get_queue_abandoned_call')
-    @patch('accent_dao.stat_call_on_queue_dao.add_abandoned_call')
-    def test_fill_abandoned(self, mock_add_abandoned_call, mock_get_abandoned_call):
+    @patch('accent_dao.stat_call_on_queue_dao.add_calls')
+    def test_fill_abandoned(self, mock_add_calls, mock_get_abandoned_call):
         d1 = datetime.datetime(2012, 1, 1).strftime("%Y-%m-%d %H:%M:%S.%f")
         d2 = datetime.datetime(2012, 1, 1, 23, 59, 59, 999999).strftime(
             "%Y-%m-%d %H:%M:%S.%f"
@@ -49,13 +49,13 @@ class TestQueue(unittest.TestCase):
 
         queue.fill_abandoned_call(self._dao_sess, d1, d2)
 
-        mock_add_abandoned_call.assert_called_once_with(
-            self._dao_sess, callid, d1, self._queue_name, waittime
+        mock_add_calls.assert_called_once_with(
+            self._dao_sess, [(callid, d1, self._queue_name, 'abandoned', waittime)]
         )
 
     @patch('accent_dao.queue_log_dao.get_queue_timeout_call')
-    @patch('accent_dao.stat_call_on_queue_dao.add_timeout_call')
-    def test_fill_timeout(self, mock_add_timeout_call, mock_get_timeout_call):
+    @patch('accent_dao.stat_call_on_queue_dao.add_calls')
+    def test_fill_timeout(self, mock_add_calls, mock_get_timeout_call):
         d1 = datetime.datetime(2012, 1, 1).strftime("%Y-%m-%d %H:%M:%S.%f")
         d2 = datetime.datetime(2012, 1, 1, 23, 59, 59, 999999).strftime(
             "%Y-%m-%d %H:%M:%S.%f"
@@ -83,8 +83,8 @@ class TestQueue(unittest.TestCase):
 
         queue.fill_timeout_call(self._dao_sess, d1, d2)
 
-        mock_add_timeout_call.assert_called_once_with(
-            self._dao_sess, callid, d1, self._queue_name, waittime
+        mock_add_calls.assert_called_once_with(
+            self._dao_sess, [(callid, d1, self._queue_name, 'timeout', waittime)]
         )
 
     @patch('accent_stat.queue.fill_abandoned_call')
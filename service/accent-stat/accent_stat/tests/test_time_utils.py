@@ -29,6 +29,24 @@ class TestTimeUtils(unittest.TestCase):
 
         self.assertEqual(result, expected)
 
+    def test_get_period_start_for_time_range_inside_periods(self):
+        time_list = [datetime(2012, 1, 1, hour) for hour in range(1, 6)]
+
+        result = time_utils.get_period_start_for_time_range(
+            time_list, datetime(2012, 1, 1, 2, 30), datetime(2012, 1, 1, 3, 10)
+        )
+
+        self.assertEqual(result, [datetime(2012, 1, 1, 2), datetime(2012, 1, 1, 3)])
+
+    def test_get_period_start_for_time_range_outside_periods(self):
+        time_list = [datetime(2012, 1, 1, hour) for hour in range(1, 6)]
+
+        result = time_utils.get_period_start_for_time_range(
+            time_list, datetime(2012, 1, 1, 0, 30), datetime(2012, 1, 1, 8)
+        )
+
+        self.assertEqual(result, time_list)
+
     def test_gen_time(self):
         s = datetime(2012, 1, 1)
         e = datetime(2012, 1, 1, 11, 59, 59)
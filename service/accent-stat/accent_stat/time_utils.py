@@ -1,15 +1,23 @@
 # Copyright (C) 2013-2014 Avencall
 
+import datetime
+from bisect import bisect_left, bisect_right
+
+
+def hour_start(t):
+    return datetime.datetime(t.year, t.month, t.day, t.hour, tzinfo=t.tzinfo)
+
 
 def get_period_start_for_time_range(time_list, start, end):
-    smaller = None
-    bigger = None
-
-    for i, t in enumerate(time_list):
-        if t <= start:
-            smaller = i
-        if t >= end and not bigger:
-            bigger = i
+    # time_list is sorted: the first period is the last one starting at or
+    # before start, the last one is before the first starting at or after end
+    smaller = bisect_right(time_list, start) - 1
+    bigger = bisect_left(time_list, end)
+
+    if smaller < 0:
+        smaller = None
+    if bigger == len(time_list):
+        bigger = None
 
     return time_list[smaller:bigger]
 
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# Copyright 2023 Accent Communications
+
+"""Time the agent login/pause bucketing over a synthetic month.
+
+Compares the previous linear scan of the periods with IntervalBuckets, on
+the sessions of every agent, and checks both give the same totals.
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from accent_stat.buckets import IntervalBuckets
+from accent_stat.time_utils import gen_time
+
+ONE_HOUR = timedelta(hours=1)
+
+
+def generate_sessions(agents, days, seed):
+    rng = random.Random(seed)
+    start = datetime(2023, 1, 1, tzinfo=timezone.utc)
+    logins, pauses = {}, {}
+    for agent in range(1, agents + 1):
+        for day in range(days):
+            login = start + timedelta(days=day, hours=8, minutes=rng.randint(0, 90))
+            logoff = login + timedelta(hours=rng.randint(4, 9), seconds=rng.random())
+            logins.setdefault(agent, []).append((login, logoff))
+            for _ in range(rng.randint(1, 4)):
+                pause = login + timedelta(minutes=rng.randint(0, 240))
+                pauses.setdefault(agent, []).append(
+                    (pause, pause + timedelta(minutes=rng.randint(1, 30)))
+                )
+    return start, start + timedelta(days=days) - ONE_HOUR, logins, pauses
+
+
+def linear_scan(start, end, time_type, sessions_by_agent):
+    periods = list(gen_time(start, end, ONE_HOUR))
+    results = {}
+    for agent, sessions in sessions_by_agent.items():
+        for time_start, time_end in sessions:
+            smaller = bigger = None
+            for i, t in enumerate(periods):
+                if t <= time_start:
+                    smaller = i
+                if t >= time_end and not bigger:
+                    bigger = i
+            for period_start in periods[smaller:bigger]:
+                delta = min(time_end, period_start + ONE_HOUR) - max(
+                    time_start, period_start
+                )
+                times = results.setdefault(period_start, {}).setdefault(agent, {})
+                times[time_type] = times.get(time_type, timedelta(0)) + delta
+    return results
+
+
+def bucketed(start, end, time_type, sessions_by_agent):
+    buckets = IntervalBuckets(start, end, ONE_HOUR)
+    for agent, sessions in sessions_by_agent.items():
+        for time_start, time_end in sessions:
+            buckets.add(agent, time_type, time_start, time_end)
+    return buckets.results()
+
+
+def timed(name, function, *args):
+    begin = time.perf_counter()
+    result = function(*args)
+    print(f'{name:<12} {time.perf_counter() - begin:8.2f} s')
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--agents', type=int, default=2000)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    start, end, logins, pauses = generate_sessions(args.agents, args.days, args.seed)
+    sessions = sum(len(s) for s in logins.values()) + sum(
+        len(s) for s in pauses.values()
+    )
+    print(f'{args.agents} agents, {args.days} days, {sessions} sessions')
+
+    for time_type, sessions_by_agent in (('login_time', logins), ('pause_time', pauses)):
+        print(time_type)
+        expected = timed('linear scan', linear_scan, start, end, time_type, sessions_by_agent)
+        result = timed('bisect', bucketed, start, end, time_type, sessions_by_agent)
+        assert result == expected, f'{time_type} totals differ'
+
+
+if __name__ == '__main__':
+    main()